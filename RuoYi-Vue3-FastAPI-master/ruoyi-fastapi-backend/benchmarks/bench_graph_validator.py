@@ -0,0 +1,246 @@
+"""
+任务配置图校验基准测试
+
+构造总节点数约10000的合成项目配置（阶段 + 任务，前置/后置列表两侧均填写，与前端提交的数据一致），
+对比改造前的递归DFS回环检测与当前的迭代式Tarjan/Kahn校验（TaskValidator），并检查是否在时间预算内完成：
+    layered：阶段串联，每个阶段内任务按层连接（递归深度较小）
+    chain：  单个阶段内的任务首尾相连成一条长链（递归深度接近节点数）
+    cycles： 在layered的基础上加入多个回边，形成多个回环
+原实现只包含邻接表构建、递归DFS及时间关系检查，与之对应的是"iterative(仅图计算)"；
+"TaskValidator"为完整的校验入口（另含自连接、引用存在性、跨阶段关联等数据校验）。
+
+运行方式（在后端根目录下）：
+    python benchmarks/bench_graph_validator.py --nodes 10000 --budget-ms 1000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+from bench_util import parse_args, print_table, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description='任务配置图校验基准测试')
+    parser.add_argument('--nodes', type=int, default=10000, help='阶段与任务的总节点数')
+    parser.add_argument('--stages', type=int, default=100, help='layered/cycles场景的阶段数')
+    parser.add_argument('--cycles', type=int, default=50, help='cycles场景的回环数')
+    parser.add_argument('--repeat', type=int, default=5, help='每种方式执行次数')
+    parser.add_argument('--budget-ms', type=float, default=1000, help='单次校验的时间预算（毫秒）')
+    args = parse_args(parser)
+
+    from exceptions.exception import ServiceException
+    from module_task.configuration.service.validator.graph_validator import DependencyGraph
+    from module_task.configuration.service.validator.task_validator import TaskValidator
+
+    scenarios = [
+        ('layered', build_layered_payload(args.nodes, args.stages, 0)),
+        ('chain', build_chain_payload(args.nodes)),
+        ('cycles', build_layered_payload(args.nodes, args.stages, args.cycles)),
+    ]
+    result_rows = []
+    for name, payload in scenarios:
+        node_count = len(payload.stages) + len(payload.tasks)
+        for implementation, validate in (
+            ('recursive', lambda: legacy_validate(payload, ServiceException)),
+            ('iterative(仅图计算)', lambda: graph_validate(payload, DependencyGraph, ServiceException)),
+            ('TaskValidator', lambda: asyncio.run(TaskValidator.validate_task_config_content(None, payload, 1))),
+        ):
+            timings, outcome = [], ''
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                try:
+                    validate()
+                    outcome = '通过'
+                except ServiceException as e:
+                    outcome = f'{e.message.count("【")}个回环'
+                except RecursionError:
+                    outcome = 'RecursionError'
+                timings.append((time.perf_counter() - started) * 1000)
+            _, median, _ = summarize(timings)
+            within_budget = '是' if outcome != 'RecursionError' and median <= args.budget_ms else '否'
+            result_rows.append((name, node_count, implementation, median, outcome, within_budget))
+
+    print_table(
+        f'图校验耗时中位数（毫秒，执行{args.repeat}次，时间预算{args.budget_ms:.0f}毫秒）',
+        ['场景', '节点数', '实现', '耗时', '结果', '预算内'],
+        result_rows,
+    )
+
+
+def build_layered_payload(node_count: int, stage_count: int, cycle_count: int):
+    """
+    构造分层的项目配置：阶段串联，每个阶段内的任务分层，每个任务连接下一层的两个任务
+
+    :param node_count: 总节点数
+    :param stage_count: 阶段数
+    :param cycle_count: 加入的回环数（从阶段末层回连到首层）
+    :return: 任务配置数据对象
+    """
+    from module_task.entity.vo.task_vo import StageModel, TaskConfigPayload, TaskModel
+
+    rng = random.Random(20240101)
+    start = date(2024, 1, 1)
+    tasks_per_stage = (node_count - stage_count) // stage_count
+    layer_size = 11
+    stages, tasks = [], []
+    for stage_index in range(stage_count):
+        stage_id = stage_index + 1
+        stages.append(
+            StageModel(
+                id=stage_id,
+                name=f'阶段{stage_id}',
+                start_time=start + timedelta(days=stage_index * 10),
+                end_time=start + timedelta(days=stage_index * 10 + 8),
+                predecessor_stages=[stage_id - 1] if stage_index > 0 else [],
+                successor_stages=[stage_id + 1] if stage_index < stage_count - 1 else [],
+                project_id=1,
+            )
+        )
+        base_id = 100000 + stage_index * tasks_per_stage
+        task_ids = [base_id + offset for offset in range(tasks_per_stage)]
+        layers = [task_ids[offset : offset + layer_size] for offset in range(0, len(task_ids), layer_size)]
+        successors = {task_id: set() for task_id in task_ids}
+        predecessors = {task_id: set() for task_id in task_ids}
+        for layer, next_layer in zip(layers, layers[1:]):
+            for task_id in layer:
+                for succ_id in rng.sample(next_layer, min(2, len(next_layer))):
+                    successors[task_id].add(succ_id)
+                    predecessors[succ_id].add(task_id)
+        if stage_index < cycle_count and len(layers) > 1:
+            # 沿后置任务从首层走到末层，再回连到首层任务，形成贯穿整个阶段的回环
+            tail_id = layers[0][0]
+            while successors[tail_id]:
+                tail_id = min(successors[tail_id])
+            successors[tail_id].add(layers[0][0])
+            predecessors[layers[0][0]].add(tail_id)
+        for task_id in task_ids:
+            tasks.append(
+                TaskModel(
+                    id=task_id,
+                    name=f'任务{task_id}',
+                    stage_id=stage_id,
+                    predecessor_tasks=sorted(predecessors[task_id]),
+                    successor_tasks=sorted(successors[task_id]),
+                    project_id=1,
+                )
+            )
+    return TaskConfigPayload(project_id=1, stages=stages, tasks=tasks)
+
+
+def build_chain_payload(node_count: int):
+    """
+    构造单条长链的项目配置：一个阶段，其余节点均为该阶段内首尾相连的任务
+
+    :param node_count: 总节点数
+    :return: 任务配置数据对象
+    """
+    from module_task.entity.vo.task_vo import StageModel, TaskConfigPayload, TaskModel
+
+    task_ids = [100000 + offset for offset in range(node_count - 1)]
+    tasks = [
+        TaskModel(
+            id=task_id,
+            name=f'任务{task_id}',
+            stage_id=1,
+            predecessor_tasks=[task_ids[index - 1]] if index > 0 else [],
+            successor_tasks=[task_ids[index + 1]] if index < len(task_ids) - 1 else [],
+            project_id=1,
+        )
+        for index, task_id in enumerate(task_ids)
+    ]
+    return TaskConfigPayload(project_id=1, stages=[StageModel(id=1, name='阶段1', project_id=1)], tasks=tasks)
+
+
+def graph_validate(payload, dependency_graph, service_exception):
+    """
+    当前实现中与原实现对应的部分：构建依赖关系图、迭代式Tarjan回环检测（报告所有回环）及按拓扑序检查时间关系
+
+    :param payload: 任务配置数据对象
+    :param dependency_graph: 依赖关系图类
+    :param service_exception: 校验失败时抛出的异常类型
+    """
+    stage_graph = dependency_graph.from_relations(payload.stages, 'predecessor_stages', 'successor_stages')
+    cycles = stage_graph.find_cycles()
+    if cycles:
+        raise service_exception(message='回环检测失败，涉及阶段' + '；'.join('【】' for _ in cycles))
+    task_graph = dependency_graph.from_relations(payload.tasks, 'predecessor_tasks', 'successor_tasks')
+    cycles = task_graph.find_cycles()
+    if cycles:
+        raise service_exception(message='回环检测失败，涉及任务' + '；'.join('【】' for _ in cycles))
+    stage_map = {stage.id: stage for stage in payload.stages}
+    for pred_id, succ_id in stage_graph.iter_edges_in_topological_order():
+        pred_stage, succ_stage = stage_map[pred_id], stage_map[succ_id]
+        if pred_stage.end_time and succ_stage.start_time and succ_stage.start_time <= pred_stage.end_time:
+            continue
+
+
+def legacy_validate(payload, service_exception):
+    """
+    原实现：每张图各自构建邻接表，递归DFS（染色 + path.index）检测回环，发现第一个回环即报错；
+    阶段时间关系逐个阶段检查前置与后置列表
+
+    :param payload: 任务配置数据对象
+    :param service_exception: 校验失败时抛出的异常类型
+    """
+
+    def find_first_cycle(nodes, predecessors_attr, successors_attr):
+        node_map = {node.id: node for node in nodes}
+        adjacency = {}
+        for node in nodes:
+            adjacency.setdefault(node.id, [])
+            adjacency[node.id].extend(getattr(node, successors_attr))
+            for pred_id in getattr(node, predecessors_attr):
+                adjacency.setdefault(pred_id, [])
+                if node.id not in adjacency[pred_id]:
+                    adjacency[pred_id].append(node.id)
+        color = {node_id: 0 for node_id in node_map}
+        cycle_path = []
+
+        def dfs(node_id, path):
+            if color[node_id] == 1:
+                cycle_start = path.index(node_id)
+                cycle_path.extend(path[cycle_start:] + [node_id])
+                return True
+            if color[node_id] == 2:
+                return False
+            color[node_id] = 1
+            path.append(node_id)
+            for successor_id in adjacency.get(node_id, []):
+                if dfs(successor_id, path):
+                    return True
+            color[node_id] = 2
+            path.pop()
+            return False
+
+        for node_id in node_map:
+            if color[node_id] == 0 and dfs(node_id, []):
+                return node_map[cycle_path[0]]
+        return None
+
+    cycle_stage = find_first_cycle(payload.stages, 'predecessor_stages', 'successor_stages')
+    if cycle_stage is not None:
+        raise service_exception(message=f'回环检测失败，涉及阶段【{cycle_stage.name}】。')
+    tasks_by_stage = {}
+    for task in payload.tasks:
+        if task.stage_id is not None:
+            tasks_by_stage.setdefault(task.stage_id, []).append(task)
+    for stage_tasks in tasks_by_stage.values():
+        cycle_task = find_first_cycle(stage_tasks, 'predecessor_tasks', 'successor_tasks')
+        if cycle_task is not None:
+            raise service_exception(message=f'回环检测失败，涉及任务【{cycle_task.name}】。')
+    stage_map = {stage.id: stage for stage in payload.stages}
+    for stage in payload.stages:
+        for pred_id in stage.predecessor_stages:
+            pred_stage = stage_map.get(pred_id)
+            if pred_stage and pred_stage.end_time and stage.start_time and stage.start_time <= pred_stage.end_time:
+                break
+        for succ_id in stage.successor_stages:
+            succ_stage = stage_map.get(succ_id)
+            if succ_stage and succ_stage.start_time and stage.end_time and stage.end_time >= succ_stage.start_time:
+                break
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+登录风暴基准测试
+
+启动一个最小的uvicorn服务，包含登录接口（仅执行密码校验）与一个无关的轻量接口，
+并发发起大量登录请求的同时持续探测无关接口，对比两种密码校验方式：
+    blocking：在事件循环中直接调用 PwdUtil.verify_password（改造前的方式）
+    pool：    调用 PwdUtil.verify_password_async，在有界密码计算线程池中执行
+输出登录吞吐量、登录延迟及无关接口的延迟分布（p50/p99/最大值）。
+
+运行方式（在后端根目录下）：
+    python benchmarks/bench_login_storm.py --logins 200 --concurrency 50 --rounds 10
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import threading
+import time
+from bench_util import parse_args, percentile, print_table
+
+
+PASSWORD = 'admin123'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='登录风暴基准测试')
+    parser.add_argument('--logins', type=int, default=200, help='登录请求总数')
+    parser.add_argument('--concurrency', type=int, default=50, help='登录并发数')
+    parser.add_argument('--rounds', type=int, default=10, help='测试密码的bcrypt计算轮数')
+    parser.add_argument('--probe-interval', type=float, default=0.02, help='无关接口探测间隔（秒）')
+    parser.add_argument('--modes', type=str, default='blocking,pool', help='测试的密码校验方式，逗号分隔')
+    args = parse_args(parser)
+
+    import bcrypt
+    from utils.pwd_util import PwdUtil
+
+    hashed_password = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=args.rounds)).decode('utf-8')
+    result_rows = []
+    for mode in [mode.strip() for mode in args.modes.split(',') if mode.strip()]:
+        result = run_mode(mode, hashed_password, args)
+        result_rows.append((mode, *result))
+        PwdUtil.shutdown()
+
+    print_table(
+        f'登录风暴（{args.logins}次登录，并发{args.concurrency}，bcrypt rounds={args.rounds}，CPU核数={os.cpu_count()}）',
+        ['方式', '登录/秒', '登录p99(ms)', '无关接口p50(ms)', '无关接口p99(ms)', '无关接口最大(ms)', '探测次数'],
+        result_rows,
+    )
+
+
+def run_mode(mode: str, hashed_password: str, args: argparse.Namespace):
+    """
+    启动服务并执行一轮登录风暴
+
+    :param mode: 密码校验方式
+    :param hashed_password: 数据库中存储的密码
+    :param args: 基准测试参数
+    :return: (登录吞吐量, 登录p99, 无关接口p50, 无关接口p99, 无关接口最大值, 探测次数)
+    """
+    import uvicorn
+
+    port = get_free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(mode, hashed_password), host='127.0.0.1', port=port, log_level='warning')
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        return asyncio.run(storm(f'http://127.0.0.1:{port}', args))
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def create_app(mode: str, hashed_password: str):
+    """
+    创建测试服务
+
+    :param mode: 密码校验方式
+    :param hashed_password: 数据库中存储的密码
+    :return: FastAPI应用
+    """
+    from fastapi import FastAPI
+    from utils.pwd_util import PwdUtil
+    from utils.response_util import ResponseUtil
+
+    app = FastAPI()
+
+    @app.post('/login')
+    async def login():
+        if mode == 'blocking':
+            verified = PwdUtil.verify_password(PASSWORD, hashed_password)
+        else:
+            verified = await PwdUtil.verify_password_async(PASSWORD, hashed_password)
+        return ResponseUtil.success(data=verified)
+
+    @app.get('/ping')
+    async def ping():
+        return ResponseUtil.success()
+
+    return app
+
+
+async def storm(base_url: str, args: argparse.Namespace):
+    """
+    并发登录并持续探测无关接口
+
+    :param base_url: 服务地址
+    :param args: 基准测试参数
+    :return: (登录吞吐量, 登录p99, 无关接口p50, 无关接口p99, 无关接口最大值, 探测次数)
+    """
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency + 1, max_keepalive_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=600) as client:
+        await client.get('/ping')
+        login_latencies = []
+        probe_latencies = []
+        remaining = args.logins
+        finished = asyncio.Event()
+
+        async def login_worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                response = await client.post('/login')
+                response.raise_for_status()
+                login_latencies.append((time.perf_counter() - started) * 1000)
+
+        async def probe_worker():
+            while not finished.is_set():
+                started = time.perf_counter()
+                response = await client.get('/ping')
+                response.raise_for_status()
+                probe_latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(args.probe_interval)
+
+        probe_task = asyncio.create_task(probe_worker())
+        started = time.perf_counter()
+        await asyncio.gather(*[login_worker() for _ in range(args.concurrency)])
+        elapsed = time.perf_counter() - started
+        finished.set()
+        await probe_task
+
+    return (
+        args.logins / elapsed,
+        percentile(login_latencies, 99),
+        percentile(probe_latencies, 50),
+        percentile(probe_latencies, 99),
+        max(probe_latencies),
+        len(probe_latencies),
+    )
+
+
+def get_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,399 @@
+"""
+列表序列化与响应渲染基准测试
+
+在内存SQLite中写入操作日志及用户列表数据，通过ORM查询得到真实的模型对象与查询结果行，对比单个请求消耗的CPU时间：
+    SysOperLog：原反射式序列化（逐行复制__dict__、逐字段转换字段名）+ jsonable_encoder/JSONResponse，
+                与编译后的模型序列化函数 + OrjsonResponse 处理同一页数据
+    用户列表：  原实现查询员工、本地用户、部门、职级、角色五个实体，反射式序列化后再经字段名往返转换聚合角色 + JSONResponse，
+                与当前接口的实现对比：UserDao.get_user_list_rows_by_ids 查询的Bundle行经
+                UserService._convert_user_list_rows 直接投影 + OrjsonResponse
+
+运行方式（在后端根目录下）：
+    python benchmarks/bench_serializer.py --rows 10000 --repeat 10
+"""
+
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta
+from bench_util import parse_args, print_table, measure_cpu, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description='列表序列化与响应渲染基准测试')
+    parser.add_argument('--rows', type=int, default=10000, help='每页数据行数')
+    parser.add_argument('--repeat', type=int, default=10, help='每种方式执行次数')
+    args = parse_args(parser)
+
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.dialects.mysql import TINYINT
+    from sqlalchemy.ext.compiler import compiles
+    from sqlalchemy.orm import Session
+    from module_admin.dao.user_dao import UserDao
+    from module_admin.entity.do.log_do import SysOperLog
+    from module_admin.entity.do.oa_department_do import OaDepartment
+    from module_admin.entity.do.oa_employee_primary_do import OaEmployeePrimary
+    from module_admin.entity.do.oa_rank_do import OaRank
+    from module_admin.entity.do.role_do import SysRole
+    from module_admin.entity.do.sys_user_local_do import SysUserLocal
+    from module_admin.entity.do.user_do import SysUserRole
+    from module_admin.service.user_service import UserService
+    from utils.common_util import CamelCaseUtil
+    from utils.page_util import PageResponseModel
+    from utils.response_util import ResponseUtil
+
+    legacy_transform_result, legacy_response_success, legacy_convert_user_list_rows = load_legacy_implementation()
+
+    @compiles(TINYINT, 'sqlite')
+    def compile_tinyint_for_sqlite(element, compiler, **kw):
+        # 角色表使用MySQL的TINYINT类型，内存SQLite中按INTEGER建表
+        return 'INTEGER'
+
+    engine = create_engine('sqlite://')
+    models = (SysOperLog, OaEmployeePrimary, SysUserLocal, OaDepartment, OaRank, SysRole, SysUserRole)
+    SysOperLog.metadata.create_all(engine, tables=[model.__table__ for model in models])
+    seed_data(engine, args.rows, *models)
+
+    with Session(engine) as session:
+        oper_log_rows = list(session.execute(select(SysOperLog).order_by(SysOperLog.oper_id)).scalars())
+        # 原实现：一次查询五个实体，一个用户有多个角色时返回多行
+        user_entity_rows = list(
+            session.execute(
+                select(OaEmployeePrimary, SysUserLocal, OaDepartment, OaRank, SysRole)
+                .join(SysUserLocal, SysUserLocal.employee_id == OaEmployeePrimary.id)
+                .outerjoin(OaDepartment, OaDepartment.id == OaEmployeePrimary.organization_id)
+                .outerjoin(OaRank, OaRank.id == OaEmployeePrimary.rank_id)
+                .outerjoin(SysUserRole, SysUserRole.user_id == SysUserLocal.user_id)
+                .outerjoin(SysRole, SysRole.role_id == SysUserRole.role_id)
+                .order_by(OaEmployeePrimary.id, SysUserLocal.user_id, SysRole.role_sort)
+            )
+        )
+        # 当前实现：与接口相同，由DAO查询当前页用户的展示字段及角色（各实体分组为Bundle）
+        user_ids = list(session.execute(select(SysUserLocal.user_id).order_by(SysUserLocal.user_id)).scalars())
+        user_bundle_rows = asyncio.run(UserDao.get_user_list_rows_by_ids(SyncSessionAdapter(session), user_ids))
+
+    cases = [
+        (
+            'SysOperLog',
+            lambda: legacy_transform_result(oper_log_rows),
+            lambda: CamelCaseUtil.transform_result(oper_log_rows),
+        ),
+        (
+            '用户列表',
+            lambda: legacy_convert_user_list_rows(legacy_transform_result(user_entity_rows)),
+            lambda: UserService._convert_user_list_rows(user_bundle_rows),
+        ),
+    ]
+    result_rows = []
+    for name, legacy_convert, new_convert in cases:
+        # 首次调用编译并缓存序列化函数，与常驻进程的稳态一致
+        new_rows = new_convert()
+        legacy_rows = legacy_convert()
+        # 当前用户列表不再返回密码字段，其余字段应与原实现一致
+        expected_rows = [{key: value for key, value in row.items() if key != 'password'} for row in legacy_rows]
+        assert expected_rows == new_rows, f'{name}: 新旧序列化结果不一致'
+
+        legacy_transform = measure_cpu(legacy_convert, args.repeat)
+        new_transform = measure_cpu(new_convert, args.repeat)
+        legacy_render = measure_cpu(
+            lambda: legacy_response_success(model_content=page_model(PageResponseModel, legacy_rows)), args.repeat
+        )
+        new_render = measure_cpu(
+            lambda: ResponseUtil.success(model_content=page_model(PageResponseModel, new_rows)), args.repeat
+        )
+        legacy_total = [a + b for a, b in zip(legacy_transform, legacy_render)]
+        new_total = [a + b for a, b in zip(new_transform, new_render)]
+        for stage, legacy_timings, new_timings in (
+            ('序列化', legacy_transform, new_transform),
+            ('响应渲染', legacy_render, new_render),
+            ('合计', legacy_total, new_total),
+        ):
+            legacy_median = summarize(legacy_timings)[1]
+            new_median = summarize(new_timings)[1]
+            result_rows.append(
+                (
+                    name,
+                    stage,
+                    legacy_median,
+                    new_median,
+                    f'{(1 - new_median / legacy_median) * 100:.1f}%' if legacy_median else '-',
+                )
+            )
+
+    print_table(
+        f'每请求CPU时间中位数（毫秒，{args.rows}行/页，执行{args.repeat}次）',
+        ['数据', '阶段', '原实现', '新实现', '降低'],
+        result_rows,
+    )
+
+
+def load_legacy_implementation():
+    """
+    原实现：反射式序列化（与改造前的SqlalchemyUtil.serialize_result一致）、jsonable_encoder + JSONResponse渲染，
+    及改造前的用户列表行转换（UserService._convert_user_list_rows）
+
+    :return: (原transform_result, 原ResponseUtil.success, 原用户列表行转换)
+    """
+    import re
+    from fastapi import status
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from sqlalchemy.engine.row import Row
+    from sqlalchemy.orm.collections import InstrumentedList
+    from config.constant import HttpStatusConstant
+    from config.database import Base
+    from utils.field_mapper import FieldMapper
+
+    def snake_to_camel(snake_str):
+        words = snake_str.split('_')
+        return words[0] + ''.join(word.capitalize() for word in words[1:])
+
+    def camel_to_snake(camel_str):
+        words = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', camel_str)
+        return re.sub('([a-z0-9])([A-Z])', r'\1_\2', words).lower()
+
+    def base_to_dict(obj, transform_case='no_case'):
+        if isinstance(obj, Base):
+            base_dict = obj.__dict__.copy()
+            base_dict.pop('_sa_instance_state', None)
+            for name, value in base_dict.items():
+                if isinstance(value, InstrumentedList):
+                    base_dict[name] = serialize_result(value, 'snake_to_camel')
+        elif isinstance(obj, dict):
+            base_dict = obj.copy()
+        else:
+            base_dict = obj.__dict__.copy() if hasattr(obj, '__dict__') else {}
+        if transform_case == 'snake_to_camel':
+            return {snake_to_camel(k): v for k, v in base_dict.items()}
+        elif transform_case == 'camel_to_snake':
+            return {camel_to_snake(k): v for k, v in base_dict.items()}
+        return base_dict
+
+    def serialize_result(result, transform_case='no_case'):
+        if isinstance(result, (Base, dict)) or (hasattr(result, '__dict__') and not isinstance(result, (list, Row))):
+            return base_to_dict(result, transform_case)
+        elif isinstance(result, list):
+            return [serialize_result(row, transform_case) for row in result]
+        elif isinstance(result, Row):
+            if all([isinstance(row, Base) for row in result]):
+                return [base_to_dict(row, transform_case) for row in result]
+            elif any([isinstance(row, Base) for row in result]):
+                return [serialize_result(row, transform_case) for row in result]
+            else:
+                result_dict = result._asdict()
+                if transform_case == 'snake_to_camel':
+                    return {snake_to_camel(k): v for k, v in result_dict.items()}
+                elif transform_case == 'camel_to_snake':
+                    return {camel_to_snake(k): v for k, v in result_dict.items()}
+                return result_dict
+        return result
+
+    def transform_result(result):
+        return serialize_result(result, 'snake_to_camel')
+
+    def response_success(msg='操作成功', model_content=None):
+        result = {'code': HttpStatusConstant.SUCCESS, 'msg': msg}
+        if model_content is not None:
+            result.update(model_content.model_dump(by_alias=True))
+        result.update({'success': True, 'time': datetime.now()})
+        return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(result))
+
+    def to_snake(value):
+        return {camel_to_snake(k): v for k, v in value.items()}
+
+    def to_camel(value):
+        return {snake_to_camel(k): v for k, v in value.items()}
+
+    def convert_user_list_rows(rows):
+        user_data_map = {}
+        for row in rows:
+            employee_dict, user_local_dict, dept_dict, rank_dict, role_dict = row
+            employee_snake = to_snake(employee_dict) if employee_dict else None
+            user_local_snake = to_snake(user_local_dict) if user_local_dict else {}
+            dept_snake = to_snake(dept_dict) if dept_dict else None
+            rank_snake = to_snake(rank_dict) if rank_dict else None
+            role_snake = to_snake(role_dict) if role_dict else None
+            user_id = user_local_snake.get('user_id')
+            if not employee_snake or not user_id:
+                continue
+            if user_id not in user_data_map:
+                mapped_user_dict = FieldMapper.map_employee_to_user_format(employee_snake, user_local_snake)
+                mapped_dept_dict = FieldMapper.map_dept_to_sys_format(dept_snake) if dept_snake else {}
+                user_camel = to_camel(mapped_user_dict)
+                dept_camel = to_camel(mapped_dept_dict) if mapped_dept_dict else {}
+                rank_camel = to_camel(rank_snake) if rank_snake else {}
+                user_camel['rankName'] = rank_camel.get('rankName') if rank_camel else None
+                user_camel['rankId'] = rank_camel.get('id') if rank_camel else None
+                if 'userName' in user_camel:
+                    user_camel['jobNumber'] = user_camel.pop('userName')
+                if 'nickName' in user_camel:
+                    user_camel['employeeName'] = user_camel.pop('nickName')
+                user_camel.pop('createTime', None)
+                if dept_camel and dept_camel.get('deptName'):
+                    dept_camel['deptNameWithId'] = dept_camel.get('deptName')
+                user_data_map[user_id] = {'user_data': {**user_camel, 'dept': dept_camel}, 'roles': []}
+            if role_snake and role_snake.get('role_id'):
+                role_camel = to_camel(role_snake)
+                role_obj = {'roleId': role_camel.get('roleId'), 'roleName': role_camel.get('roleName')}
+                roles = user_data_map[user_id]['roles']
+                if not next((r for r in roles if r.get('roleId') == role_obj.get('roleId')), None):
+                    roles.append(role_obj)
+        converted_rows = []
+        for data in user_data_map.values():
+            user_data = data['user_data']
+            valid_roles = [r for r in data['roles'] if r.get('roleId') is not None and r.get('roleName')]
+            user_data['roles'] = valid_roles
+            role_names = [r.get('roleName') for r in valid_roles if r.get('roleName')]
+            user_data['roleNames'] = ', '.join(role_names) if role_names else '未配置'
+            converted_rows.append(user_data)
+        return converted_rows
+
+    return transform_result, response_success, convert_user_list_rows
+
+
+class SyncSessionAdapter:
+    """
+    以同步会话执行DAO中的查询（内存SQLite使用同步驱动，查询语句与接口完全相同）
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def execute(self, statement):
+        return self.session.execute(statement)
+
+
+def page_model(page_response_model, rows):
+    return page_response_model(rows=rows, pageNum=1, pageSize=len(rows), total=len(rows), hasNext=False)
+
+
+def seed_data(
+    engine,
+    row_count,
+    oper_log_model,
+    employee_model,
+    user_local_model,
+    dept_model,
+    rank_model,
+    role_model,
+    user_role_model,
+):
+    """
+    写入测试数据
+
+    :param engine: 数据库引擎
+    :param row_count: 每张表的数据行数
+    :return:
+    """
+    rng = random.Random(20240101)
+    now = datetime(2024, 1, 1, 9, 0, 0)
+    dept_count = max(row_count // 50, 1)
+    rank_count = 20
+    role_count = 5
+    with engine.begin() as connection:
+        connection.execute(
+            rank_model.__table__.insert(),
+            [
+                dict(id=index + 1, rank_name=f'职级{index + 1}', rank_code=f'R{index + 1:02d}')
+                for index in range(rank_count)
+            ],
+        )
+        connection.execute(
+            role_model.__table__.insert(),
+            [
+                dict(
+                    role_id=index + 1,
+                    role_name=f'角色{index + 1}',
+                    role_key=f'role{index + 1}',
+                    role_sort=index,
+                    status='0',
+                )
+                for index in range(role_count)
+            ],
+        )
+        # 每个用户1~3个角色，与接口查询一样每个角色一行
+        connection.execute(
+            user_role_model.__table__.insert(),
+            [
+                dict(user_id=index + 1, role_id=role_id)
+                for index in range(row_count)
+                for role_id in rng.sample(range(1, role_count + 1), rng.randint(1, 3))
+            ],
+        )
+        connection.execute(
+            dept_model.__table__.insert(),
+            [
+                dict(
+                    id=index + 1,
+                    name=f'部门{index + 1}-{index + 1}',
+                    code=f'D{index + 1:05d}',
+                    parent_id=0,
+                    sort_no=index,
+                )
+                for index in range(dept_count)
+            ],
+        )
+        connection.execute(
+            employee_model.__table__.insert(),
+            [
+                dict(
+                    id=index + 1,
+                    name=f'员工{index + 1}',
+                    job_number=f'{100000 + index}',
+                    organization_id=rng.randint(1, dept_count),
+                    rank_id=rng.randint(1, rank_count),
+                    phone=f'138{index:08d}',
+                    sex=str(rng.randint(1, 2)),
+                    entry_date=now - timedelta(days=rng.randint(0, 3000)),
+                    unit_salary=rng.randint(3000, 30000),
+                    gmt_create_time=now,
+                    gmt_modify_time=now,
+                )
+                for index in range(row_count)
+            ],
+        )
+        connection.execute(
+            user_local_model.__table__.insert(),
+            [
+                dict(
+                    user_id=index + 1,
+                    employee_id=index + 1,
+                    job_number=f'{100000 + index}',
+                    password='$2b$12$' + 'x' * 53,
+                    login_ip='127.0.0.1',
+                    login_date=now,
+                    create_time=now,
+                    update_time=now,
+                )
+                for index in range(row_count)
+            ],
+        )
+        connection.execute(
+            oper_log_model.__table__.insert(),
+            [
+                dict(
+                    oper_id=index + 1,
+                    title='用户管理',
+                    business_type=rng.randint(0, 3),
+                    method='module_admin.controller.user_controller.edit_system_user()',
+                    request_method='PUT',
+                    operator_type=1,
+                    oper_name=f'{100000 + rng.randint(0, row_count - 1)}',
+                    dept_name='研发部门',
+                    oper_url='/system/user',
+                    oper_ip='127.0.0.1',
+                    oper_location='内网IP',
+                    oper_param='{"userId": %d, "status": "0"}' % index,
+                    json_result='{"code": 200, "msg": "操作成功"}',
+                    status=0,
+                    error_msg='',
+                    oper_time=now + timedelta(seconds=index),
+                    cost_time=rng.randint(1, 500),
+                )
+                for index in range(row_count)
+            ],
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import math
+import os
+import statistics
+import sys
+import time
+from typing import Callable, List, Sequence, Tuple
+
+
+# 后端根目录（基准测试脚本均在该目录下运行，以便加载与应用相同的.env配置）
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args(parser: argparse.ArgumentParser) -> argparse.Namespace:
+    """
+    解析基准测试参数（config.env在导入时会解析命令行参数，这里只把--env透传给应用配置）
+
+    :param parser: 基准测试参数解析器
+    :return: 解析结果
+    """
+    parser.add_argument('--env', type=str, default='', help='运行环境（与应用启动参数一致）')
+    args = parser.parse_args()
+    sys.argv = [sys.argv[0]] + (['--env', args.env] if args.env else [])
+    os.chdir(BACKEND_ROOT)
+    if BACKEND_ROOT not in sys.path:
+        sys.path.insert(0, BACKEND_ROOT)
+    return args
+
+
+def measure_cpu(func: Callable[[], object], repeat: int) -> List[float]:
+    """
+    多次执行并记录每次消耗的CPU时间（毫秒）
+
+    :param func: 待测函数
+    :param repeat: 执行次数
+    :return: 每次执行的CPU时间列表
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.process_time()
+        func()
+        timings.append((time.process_time() - started) * 1000)
+    return timings
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """
+    计算百分位数（最近秩法）
+
+    :param values: 数据列表
+    :param percent: 百分位（0~100）
+    :return: 百分位数
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def print_table(title: str, headers: Sequence[str], rows: Sequence[Tuple]) -> None:
+    """
+    以对齐的表格形式输出结果
+
+    :param title: 标题
+    :param headers: 表头
+    :param rows: 数据行
+    """
+    cells = [[str(header) for header in headers]] + [
+        [f'{value:.2f}' if isinstance(value, float) else str(value) for value in row] for row in rows
+    ]
+    widths = [max(len(row[index]) for row in cells) for index in range(len(headers))]
+    print(f'\n{title}')
+    for row_index, row in enumerate(cells):
+        print('  '.join(value.ljust(width) for value, width in zip(row, widths)))
+        if row_index == 0:
+            print('  '.join('-' * width for width in widths))
+
+
+def summarize(timings: Sequence[float]) -> Tuple[float, float, float]:
+    """
+    汇总耗时（最小值、中位数、p99）
+
+    :param timings: 耗时列表
+    :return: (最小值, 中位数, p99)
+    """
+    return min(timings), statistics.median(timings), percentile(timings, 99)
@@ -44,8 +44,13 @@ class RedisInitKeyConfig(Enum):
 
     ACCESS_TOKEN = {'key': 'ce_access_token', 'remark': '登录令牌信息'}
     SYS_DICT = {'key': 'ce_sys_dict', 'remark': '数据字典'}
+    SYS_DICT_VERSION = {'key': 'ce_sys_dict_version', 'remark': '数据字典版本号'}
     SYS_CONFIG = {'key': 'ce_sys_config', 'remark': '配置信息'}
     CAPTCHA_CODES = {'key': 'ce_captcha_codes', 'remark': '图片验证码'}
     ACCOUNT_LOCK = {'key': 'ce_account_lock', 'remark': '用户锁定'}
     PASSWORD_ERROR_COUNT = {'key': 'ce_password_error_count', 'remark': '密码错误次数'}
     SMS_CODE = {'key': 'ce_sms_code', 'remark': '短信验证码'}
+    CURRENT_USER = {'key': 'ce_current_user', 'remark': '当前用户信息快照'}
+    CURRENT_USER_VERSION = {'key': 'ce_current_user_version', 'remark': '当前用户信息版本号'}
+    ONLINE_SESSION = {'key': 'ce_online_session', 'remark': '在线会话索引'}
+    WORKBENCH_COUNTER = {'key': 'ce_workbench_counter', 'remark': '工作台任务计数'}
@@ -24,6 +24,16 @@ class AppSettings(BaseSettings):
     app_reload: bool = Field(..., description="应用是否开启热重载")
     app_ip_location_query: bool = Field(..., description="应用是否开启IP归属区域查询")
     app_same_time_login: bool = Field(..., description="应用是否允许账号同时登录")
+    app_pwd_hash_rounds: int = Field(default=12, ge=4, le=31, description="密码加密bcrypt计算轮数")
+    app_pwd_hash_workers: int = Field(default=4, ge=1, description="密码计算线程池大小")
+    app_pwd_hash_max_pending: int = Field(default=256, ge=1, description="密码计算最大排队数量")
+    app_server_timing: bool = Field(
+        default=False, description="应用是否在响应头中返回Server-Timing（包含服务调用名称及SQL/Redis统计，仅用于开发调试）"
+    )
+    app_job_log_events: str = Field(
+        default='executed,error,missed',
+        description="记录定时任务日志的调度事件，逗号分隔，可选added/removed/modified/submitted/max_instances/executed/error/missed/all",
+    )
 
 
 class JwtSettings(BaseSettings):
@@ -2,8 +2,10 @@ from redis import asyncio as aioredis
 from redis.exceptions import AuthenticationError, TimeoutError, RedisError
 from config.database import AsyncSessionLocal
 from config.env import RedisConfig
+from middlewares.trace_middleware import TracedRedis
 from module_admin.service.config_service import ConfigService
 from module_admin.service.dict_service import DictDataService
+from module_admin.service.online_session_service import OnlineSessionService
 from utils.log_util import logger
 
 
@@ -20,7 +22,7 @@ class RedisUtil:
         :return: Redis连接对象
         """
         logger.info('🔎 开始连接redis...')
-        redis = await aioredis.from_url(
+        redis = await TracedRedis.from_url(
             url=f'redis://{RedisConfig.redis_host}',
             port=RedisConfig.redis_port,
             username=RedisConfig.redis_username,
@@ -75,3 +77,16 @@ class RedisUtil:
         """
         async with AsyncSessionLocal() as session:
             await ConfigService.init_cache_sys_config_services(session, redis)
+
+    @classmethod
+    async def init_online_session(cls, redis):
+        """
+        应用启动时重建在线会话索引
+
+        :param redis: redis对象
+        :return:
+        """
+        try:
+            await OnlineSessionService.rebuild_sessions(redis)
+        except RedisError as e:
+            logger.warning(f'在线会话索引重建失败，详细错误信息：{e}')
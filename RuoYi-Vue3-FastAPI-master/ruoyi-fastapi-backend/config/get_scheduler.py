@@ -1,5 +1,16 @@
 import json
-from apscheduler.events import EVENT_ALL
+from apscheduler.events import (
+    EVENT_ALL,
+    EVENT_JOB_ADDED,
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_MODIFIED,
+    EVENT_JOB_REMOVED,
+    EVENT_JOB_SUBMITTED,
+    JobExecutionEvent,
+)
 from apscheduler.executors.asyncio import AsyncIOExecutor
 from apscheduler.executors.pool import ProcessPoolExecutor
 from apscheduler.jobstores.memory import MemoryJobStore
@@ -12,13 +23,12 @@ from apscheduler.triggers.date import DateTrigger
 from asyncio import iscoroutinefunction
 from datetime import datetime, timedelta
 from sqlalchemy.engine import create_engine
-from sqlalchemy.orm import sessionmaker
-from typing import Union
+from typing import Dict, Union
 from config.database import AsyncSessionLocal, quote_plus
-from config.env import DataBaseConfig, RedisConfig
+from config.env import AppConfig, DataBaseConfig, RedisConfig
 from module_admin.dao.job_dao import JobDao
 from module_admin.entity.vo.job_vo import JobLogModel, JobModel
-from module_admin.service.job_log_service import JobLogService
+from module_admin.service.log_writer_service import LogWriterService
 from utils.log_util import logger
 import module_task  # noqa: F401
 import module_admin.service.external_sync_job  # noqa: F401  # 导入外部数据库同步任务
@@ -92,15 +102,15 @@ if DataBaseConfig.db_type == 'postgresql':
         f'postgresql+psycopg2://{DataBaseConfig.db_username}:{quote_plus(DataBaseConfig.db_password)}@'
         f'{DataBaseConfig.db_host}:{DataBaseConfig.db_port}/{DataBaseConfig.db_database}'
     )
+# 同步引擎仅供SQLAlchemyJobStore持久化任务使用，定时任务日志经LogWriterService通过异步引擎写入
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     echo=DataBaseConfig.db_echo,
-    max_overflow=DataBaseConfig.db_max_overflow,
-    pool_size=DataBaseConfig.db_pool_size,
+    max_overflow=0,
+    pool_size=2,
     pool_recycle=DataBaseConfig.db_pool_recycle,
     pool_timeout=DataBaseConfig.db_pool_timeout,
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 job_stores = {
     'default': MemoryJobStore(),
     'sqlalchemy': SQLAlchemyJobStore(url=SQLALCHEMY_DATABASE_URL, engine=engine),
@@ -119,12 +129,28 @@ job_defaults = {'coalesce': False, 'max_instance': 1}
 scheduler = AsyncIOScheduler()
 scheduler.configure(jobstores=job_stores, executors=executors, job_defaults=job_defaults)
 
+# 定时任务日志可记录的调度事件
+JOB_LOG_EVENT_MASKS = {
+    'added': EVENT_JOB_ADDED,
+    'removed': EVENT_JOB_REMOVED,
+    'modified': EVENT_JOB_MODIFIED,
+    'submitted': EVENT_JOB_SUBMITTED,
+    'max_instances': EVENT_JOB_MAX_INSTANCES,
+    'executed': EVENT_JOB_EXECUTED,
+    'error': EVENT_JOB_ERROR,
+    'missed': EVENT_JOB_MISSED,
+    'all': EVENT_ALL,
+}
+
 
 class SchedulerUtil:
     """
     定时任务相关方法
     """
 
+    # 任务日志所需的任务信息缓存 {任务id: 任务信息}，事件监听器中不再查询任务存储
+    _job_log_info: Dict[str, Dict] = {}
+
     @classmethod
     async def init_system_scheduler(cls):
         """
@@ -139,7 +165,7 @@ class SchedulerUtil:
             for item in job_list:
                 cls.remove_scheduler_job(job_id=str(item.job_id))
                 cls.add_scheduler_job(item)
-        scheduler.add_listener(cls.scheduler_event_listener, EVENT_ALL)
+        scheduler.add_listener(cls.scheduler_event_listener, cls.get_job_log_event_mask())
         logger.info('✅️ 系统初始定时任务加载成功')
 
     @classmethod
@@ -176,7 +202,7 @@ class SchedulerUtil:
         job_executor = job_info.job_executor
         if iscoroutinefunction(job_func):
             job_executor = 'default'
-        scheduler.add_job(
+        job = scheduler.add_job(
             func=eval(job_info.invoke_target),
             trigger=MyCronTrigger.from_crontab(job_info.cron_expression),
             args=job_info.job_args.split(',') if job_info.job_args else None,
@@ -189,6 +215,7 @@ class SchedulerUtil:
             jobstore=job_info.job_group,
             executor=job_executor,
         )
+        cls._cache_job_log_info(job)
 
     @classmethod
     def execute_scheduler_job_once(cls, job_info: JobModel):
@@ -205,7 +232,7 @@ class SchedulerUtil:
         job_trigger = DateTrigger()
         if job_info.status == '0':
             job_trigger = OrTrigger(triggers=[DateTrigger(), MyCronTrigger.from_crontab(job_info.cron_expression)])
-        scheduler.add_job(
+        job = scheduler.add_job(
             func=eval(job_info.invoke_target),
             trigger=job_trigger,
             args=job_info.job_args.split(',') if job_info.job_args else None,
@@ -218,6 +245,7 @@ class SchedulerUtil:
             jobstore=job_info.job_group,
             executor=job_executor,
         )
+        cls._cache_job_log_info(job)
 
     @classmethod
     def remove_scheduler_job(cls, job_id: Union[str, int]):
@@ -230,51 +258,89 @@ class SchedulerUtil:
         query_job = cls.get_scheduler_job(job_id=job_id)
         if query_job:
             scheduler.remove_job(job_id=str(job_id))
+        cls._job_log_info.pop(str(job_id), None)
+
+    @classmethod
+    def get_job_log_event_mask(cls) -> int:
+        """
+        根据配置获取需要记录任务日志的调度事件掩码
+
+        :return: 调度事件掩码
+        """
+        mask = 0
+        for event_name in AppConfig.app_job_log_events.split(','):
+            event_name = event_name.strip().lower()
+            if not event_name:
+                continue
+            if event_name not in JOB_LOG_EVENT_MASKS:
+                logger.warning(f'未知的定时任务日志事件: {event_name}，已忽略')
+                continue
+            mask |= JOB_LOG_EVENT_MASKS[event_name]
+
+        return mask
+
+    @classmethod
+    def _cache_job_log_info(cls, job):
+        """
+        缓存任务日志所需的任务信息
+
+        :param job: 任务对象
+        :return:
+        """
+        cls._job_log_info[job.id] = dict(
+            job_name=job.name,
+            job_group=job._jobstore_alias,
+            job_executor=job.executor,
+            invoke_target=job.func_ref or repr(job.func),
+            job_args=','.join(str(arg) for arg in job.args),
+            job_kwargs=json.dumps(job.kwargs, ensure_ascii=False, default=str),
+            job_trigger=str(job.trigger),
+        )
 
     @classmethod
     def scheduler_event_listener(cls, event):
-        # 获取事件类型和任务ID
+        """
+        调度事件监听器：构造任务日志后放入日志写入队列，不在调度器线程中访问数据库
+
+        :param event: 调度事件
+        :return:
+        """
+        job_id = getattr(event, 'job_id', None)
+        if job_id is None:
+            return
+        job_info = cls._job_log_info.get(job_id)
+        if job_info is None:
+            # 非本工具类添加的任务，仅首次事件时查询一次任务存储
+            query_job = cls.get_scheduler_job(job_id=job_id)
+            if query_job is None:
+                return
+            cls._cache_job_log_info(query_job)
+            job_info = cls._job_log_info[job_id]
+        # 获取事件类型
         event_type = event.__class__.__name__
         # 获取任务执行异常信息
         status = '0'
         exception_info = ''
-        if event_type == 'JobExecutionEvent' and event.exception:
+        if isinstance(event, JobExecutionEvent) and event.exception:
             exception_info = str(event.exception)
             status = '1'
-        if hasattr(event, 'job_id'):
-            job_id = event.job_id
-            query_job = cls.get_scheduler_job(job_id=job_id)
-            if query_job:
-                query_job_info = query_job.__getstate__()
-                # 获取任务名称
-                job_name = query_job_info.get('name')
-                # 获取任务组名
-                job_group = query_job._jobstore_alias
-                # 获取任务执行器
-                job_executor = query_job_info.get('executor')
-                # 获取调用目标字符串
-                invoke_target = query_job_info.get('func')
-                # 获取调用函数位置参数
-                job_args = ','.join(query_job_info.get('args'))
-                # 获取调用函数关键字参数
-                job_kwargs = json.dumps(query_job_info.get('kwargs'))
-                # 获取任务触发器
-                job_trigger = str(query_job_info.get('trigger'))
-                # 构造日志消息
-                job_message = f"事件类型: {event_type}, 任务ID: {job_id}, 任务名称: {job_name}, 执行于{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                job_log = JobLogModel(
-                    jobName=job_name,
-                    jobGroup=job_group,
-                    jobExecutor=job_executor,
-                    invokeTarget=invoke_target,
-                    jobArgs=job_args,
-                    jobKwargs=job_kwargs,
-                    jobTrigger=job_trigger,
-                    jobMessage=job_message,
-                    status=status,
-                    exceptionInfo=exception_info,
-                    createTime=datetime.now(),
-                )
-                session = SessionLocal()
-                JobLogService.add_job_log_services(session, job_log)
-                session.close()
+        now = datetime.now()
+        # 构造日志消息
+        job_message = (
+            f"事件类型: {event_type}, 任务ID: {job_id}, 任务名称: {job_info['job_name']}, "
+            f"执行于{now.strftime('%Y-%m-%d %H:%M:%S')}"
+        )
+        job_log = JobLogModel(
+            jobName=job_info['job_name'],
+            jobGroup=job_info['job_group'],
+            jobExecutor=job_info['job_executor'],
+            invokeTarget=job_info['invoke_target'],
+            jobArgs=job_info['job_args'],
+            jobKwargs=job_info['job_kwargs'],
+            jobTrigger=job_info['job_trigger'],
+            jobMessage=job_message,
+            status=status,
+            exceptionInfo=exception_info,
+            createTime=now,
+        )
+        LogWriterService.enqueue_threadsafe(job_log)
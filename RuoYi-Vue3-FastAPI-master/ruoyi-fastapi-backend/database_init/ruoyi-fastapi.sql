@@ -112,7 +112,7 @@ CREATE TABLE `apply_rules` (
   `update_time` datetime DEFAULT NULL COMMENT '更新时间',
   PRIMARY KEY (`id`),
   UNIQUE KEY `uk_apply_id` (`apply_id`),
-  KEY `idx_current_approval_node` (`current_approval_node`)
+  KEY `idx_current_approval_node_apply_id` (`current_approval_node`,`apply_id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='审批规则表';
 /*!40101 SET character_set_client = @saved_cs_client */;
 
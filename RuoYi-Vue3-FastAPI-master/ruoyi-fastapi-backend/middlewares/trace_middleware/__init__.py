@@ -1,17 +1,22 @@
 from fastapi import FastAPI
 from .ctx import TraceCtx
+from .instrument import instrument_engine, traced, TracedRedis
+from .metrics import TraceMetrics
 from .middle import TraceASGIMiddleware
 
-__all__ = ('TraceASGIMiddleware', 'TraceCtx')
+__all__ = ('TraceASGIMiddleware', 'TraceCtx', 'TraceMetrics', 'TracedRedis', 'instrument_engine', 'traced')
 
 __version__ = '0.1.0'
 
 
 def add_trace_middleware(app: FastAPI):
     """
-    添加trace中间件
+    添加trace中间件，并为数据库引擎注册SQL耗时采集
 
     :param app: FastAPI对象
     :return:
     """
+    from config.database import async_engine
+
+    instrument_engine(async_engine)
     app.add_middleware(TraceASGIMiddleware)
@@ -6,9 +6,12 @@
 """
 
 import contextvars
+from typing import Optional
 from uuid import uuid4
+from .stats import TraceStats
 
 CTX_REQUEST_ID: contextvars.ContextVar[str] = contextvars.ContextVar('request-id', default='')
+CTX_TRACE_STATS: contextvars.ContextVar[Optional[TraceStats]] = contextvars.ContextVar('trace-stats', default=None)
 
 
 class TraceCtx:
@@ -21,3 +24,13 @@ class TraceCtx:
     @staticmethod
     def get_id():
         return CTX_REQUEST_ID.get()
+
+    @staticmethod
+    def set_stats():
+        stats = TraceStats()
+        CTX_TRACE_STATS.set(stats)
+        return stats
+
+    @staticmethod
+    def get_stats() -> Optional[TraceStats]:
+        return CTX_TRACE_STATS.get()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+SQL、Redis及服务调用的耗时采集
+"""
+
+import time
+from functools import wraps
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from typing import Optional
+from .ctx import CTX_TRACE_STATS
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and CTX_TRACE_STATS.get() is not None:
+        context._trace_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = CTX_TRACE_STATS.get()
+    start = getattr(context, '_trace_start', None)
+    if stats is not None and start is not None:
+        stats.add_sql(statement, time.perf_counter() - start)
+
+
+def instrument_engine(engine: AsyncEngine):
+    """
+    为数据库引擎注册SQL执行耗时采集事件（SQLAlchemy在调用协程的上下文中执行同步事件，可直接读取请求上下文）
+
+    :param engine: 异步数据库引擎
+    :return:
+    """
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(sync_engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(sync_engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+class TracedPipeline(Pipeline):
+    """
+    记录执行耗时的Redis流水线
+    """
+
+    async def execute(self, raise_on_error: bool = True):
+        stats = CTX_TRACE_STATS.get()
+        if stats is None:
+            return await super().execute(raise_on_error)
+        command_count = len(self.command_stack)
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            stats.add_redis(time.perf_counter() - start, max(command_count, 1))
+
+
+class TracedRedis(Redis):
+    """
+    记录命令耗时的Redis客户端
+    """
+
+    async def execute_command(self, *args, **options):
+        stats = CTX_TRACE_STATS.get()
+        if stats is None:
+            return await super().execute_command(*args, **options)
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            stats.add_redis(time.perf_counter() - start)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> TracedPipeline:
+        return TracedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+def traced(name: Optional[str] = None):
+    """
+    记录异步函数耗时的装饰器（与classmethod一起使用时放在classmethod之下）
+
+    :param name: 服务调用名称，默认为函数的限定名称
+    :return: 装饰器
+    """
+
+    def decorator(func):
+        timing_name = name or func.__qualname__
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            stats = CTX_TRACE_STATS.get()
+            if stats is None:
+                return await func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                stats.add_timing(timing_name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+按路由聚合的请求耗时直方图（进程内）
+"""
+
+from bisect import bisect_left
+from typing import Dict, List
+from .stats import TraceStats
+
+
+class TraceMetrics:
+    """
+    按路由聚合请求耗时、SQL及Redis统计，多进程部署时每个进程分别统计
+    """
+
+    # 直方图桶上限（毫秒），最后一个桶为超过最大上限的请求
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    # 路由统计 {路由: 统计信息}
+    _routes: Dict[str, Dict] = {}
+
+    @classmethod
+    def observe(cls, route: str, status_code: int, duration_ms: float, stats: TraceStats) -> None:
+        """
+        记录一次请求
+
+        :param route: 路由（请求方法 + 路径模板）
+        :param status_code: 响应状态码
+        :param duration_ms: 请求耗时（毫秒）
+        :param stats: 请求内的耗时统计
+        """
+        metric = cls._routes.get(route)
+        if metric is None:
+            metric = cls._routes[route] = dict(
+                count=0,
+                errors=0,
+                sum_ms=0.0,
+                max_ms=0.0,
+                buckets=[0] * (len(cls.BUCKETS_MS) + 1),
+                sql_count=0,
+                sql_ms=0.0,
+                redis_count=0,
+                redis_ms=0.0,
+            )
+        metric['count'] += 1
+        if status_code >= 500:
+            metric['errors'] += 1
+        metric['sum_ms'] += duration_ms
+        metric['max_ms'] = max(metric['max_ms'], duration_ms)
+        metric['buckets'][bisect_left(cls.BUCKETS_MS, duration_ms)] += 1
+        metric['sql_count'] += stats.sql_count
+        metric['sql_ms'] += stats.sql_time * 1000
+        metric['redis_count'] += stats.redis_count
+        metric['redis_ms'] += stats.redis_time * 1000
+
+    @classmethod
+    def snapshot(cls) -> List[Dict]:
+        """
+        获取各路由的统计信息（按累计耗时倒序）
+
+        :return: 路由统计列表
+        """
+        result = []
+        for route, metric in cls._routes.items():
+            count = metric['count']
+            bucket_labels = [f'le{bucket}' for bucket in cls.BUCKETS_MS] + ['inf']
+            result.append(
+                {
+                    'route': route,
+                    'count': count,
+                    'errors': metric['errors'],
+                    'avgMs': round(metric['sum_ms'] / count, 2),
+                    'maxMs': round(metric['max_ms'], 2),
+                    'sumMs': round(metric['sum_ms'], 2),
+                    'avgSqlCount': round(metric['sql_count'] / count, 2),
+                    'avgSqlMs': round(metric['sql_ms'] / count, 2),
+                    'avgRedisCount': round(metric['redis_count'] / count, 2),
+                    'avgRedisMs': round(metric['redis_ms'] / count, 2),
+                    'buckets': dict(zip(bucket_labels, metric['buckets'])),
+                }
+            )
+        result.sort(key=lambda item: item['sumMs'], reverse=True)
+        return result
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        清空统计信息
+
+        :return:
+        """
+        cls._routes = {}
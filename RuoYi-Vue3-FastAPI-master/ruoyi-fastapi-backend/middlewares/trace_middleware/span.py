@@ -6,24 +6,45 @@
 """
 
 from contextlib import asynccontextmanager
+from loguru import logger
 from starlette.types import Scope, Message
+from config.env import AppConfig
 from .ctx import TraceCtx
+from .metrics import TraceMetrics
 
 
 class Span:
     """
     整个http生命周期：
         request(before) --> request(after) --> response(before) --> response(after)
+
+    请求开始时在上下文中创建耗时统计，请求结束后按路由汇总耗时，超过慢请求阈值时记录累计耗时最长的SQL语句；
+    Server-Timing响应头会暴露内部服务名称及SQL/Redis统计，仅在开启app_server_timing配置时返回
     """
 
+    # 慢请求阈值（毫秒）
+    SLOW_REQUEST_MS = 1000
+
+    # 慢请求日志中记录的SQL语句数量
+    SLOW_TOP_STATEMENTS = 5
+
+    # 慢请求日志中单条SQL语句的最大长度
+    STATEMENT_LOG_MAX_LENGTH = 300
+
+    # Server-Timing中返回的服务调用数量
+    SERVER_TIMING_TOP_TIMINGS = 5
+
     def __init__(self, scope: Scope):
         self.scope = scope
+        self.stats = None
+        self.status_code = 500
 
     async def request_before(self):
         """
         request_before: 处理header信息等, 如记录请求体信息
         """
         TraceCtx.set_id()
+        self.stats = TraceCtx.set_stats()
 
     async def request_after(self, message: Message):
         """
@@ -43,10 +64,64 @@ class Span:
             pass
         """
         if message['type'] == 'http.response.start':
+            self.status_code = message.get('status', 200)
             message['headers'].append((b'request-id', TraceCtx.get_id().encode()))
+            if self.stats is not None and AppConfig.app_server_timing:
+                message['headers'].append((b'server-timing', self.get_server_timing().encode()))
         return message
 
+    def get_server_timing(self) -> str:
+        """
+        根据耗时统计生成Server-Timing响应头（耗时截至响应开始）
+
+        :return: Server-Timing响应头的值
+        """
+        stats = self.stats
+        metrics = [
+            f'db;dur={stats.sql_time * 1000:.1f};desc="SQL x{stats.sql_count}"',
+            f'redis;dur={stats.redis_time * 1000:.1f};desc="Redis x{stats.redis_count}"',
+        ]
+        for index, (name, count, total) in enumerate(stats.top_timings(self.SERVER_TIMING_TOP_TIMINGS)):
+            metrics.append(f'svc{index};dur={total * 1000:.1f};desc="{name} x{count}"')
+        metrics.append(f'app;dur={stats.elapsed() * 1000:.1f}')
+        return ', '.join(metrics)
+
+    def get_route(self) -> str:
+        """
+        获取请求对应的路由（使用路径模板，未匹配路由的请求归为同一条目）
+
+        :return: 请求方法 + 路径模板
+        """
+        route = self.scope.get('route')
+        path = getattr(route, 'path', None) or '<unmatched>'
+        return f'{self.scope.get("method", "")} {path}'
+
+    def finish(self):
+        """
+        请求结束：按路由汇总耗时，慢请求记录日志
+        """
+        stats = self.stats
+        if stats is None:
+            return
+        duration_ms = stats.elapsed() * 1000
+        route = self.get_route()
+        TraceMetrics.observe(route, self.status_code, duration_ms, stats)
+        if duration_ms >= self.SLOW_REQUEST_MS:
+            statements = '\n'.join(
+                f'  {total * 1000:.1f}ms x{count}: {statement[: self.STATEMENT_LOG_MAX_LENGTH]}'
+                for statement, count, total in stats.top_statements(self.SLOW_TOP_STATEMENTS)
+            )
+            logger.warning(
+                f'慢请求 {route} 耗时{duration_ms:.1f}ms，状态码{self.status_code}，'
+                f'SQL {stats.sql_count}次 {stats.sql_time * 1000:.1f}ms，'
+                f'Redis {stats.redis_count}次 {stats.redis_time * 1000:.1f}ms，耗时最长的SQL：\n{statements}'
+            )
+
 
 @asynccontextmanager
 async def get_current_span(scope: Scope):
-    yield Span(scope)
+    span = Span(scope)
+    try:
+        yield span
+    finally:
+        span.finish()
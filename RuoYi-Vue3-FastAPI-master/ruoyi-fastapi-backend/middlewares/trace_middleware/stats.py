@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+请求内的SQL、Redis及服务调用耗时统计
+"""
+
+import time
+from typing import Dict, List, Tuple
+
+
+class TraceStats:
+    """
+    单个请求的耗时统计（保存在请求上下文中，由SQLAlchemy事件、Redis客户端及traced装饰器写入）
+    """
+
+    # 单个请求最多分别记录的SQL语句数量，超出后归入同一条目
+    MAX_STATEMENTS = 200
+
+    # 超出记录数量的SQL语句的统计条目名称
+    OTHER_STATEMENTS = '<other>'
+
+    __slots__ = ('start', 'sql_count', 'sql_time', 'redis_count', 'redis_time', 'statements', 'timings')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.redis_count = 0
+        self.redis_time = 0.0
+        # {SQL语句: [执行次数, 累计耗时]}
+        self.statements: Dict[str, List] = {}
+        # {服务调用名称: [调用次数, 累计耗时]}
+        self.timings: Dict[str, List] = {}
+
+    def add_sql(self, statement: str, elapsed: float) -> None:
+        """
+        记录一次SQL执行
+
+        :param statement: SQL语句
+        :param elapsed: 耗时（秒）
+        """
+        self.sql_count += 1
+        self.sql_time += elapsed
+        entry = self.statements.get(statement)
+        if entry is None:
+            if len(self.statements) >= self.MAX_STATEMENTS:
+                statement = self.OTHER_STATEMENTS
+                entry = self.statements.get(statement)
+            if entry is None:
+                entry = self.statements[statement] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed
+
+    def add_redis(self, elapsed: float, count: int = 1) -> None:
+        """
+        记录一次Redis往返（流水线按命令数计数）
+
+        :param elapsed: 耗时（秒）
+        :param count: 命令数量
+        """
+        self.redis_count += count
+        self.redis_time += elapsed
+
+    def add_timing(self, name: str, elapsed: float) -> None:
+        """
+        记录一次服务调用
+
+        :param name: 服务调用名称
+        :param elapsed: 耗时（秒）
+        """
+        entry = self.timings.get(name)
+        if entry is None:
+            entry = self.timings[name] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed
+
+    def elapsed(self) -> float:
+        """
+        获取请求开始至今的耗时（秒）
+
+        :return: 耗时
+        """
+        return time.perf_counter() - self.start
+
+    def top_statements(self, limit: int) -> List[Tuple[str, int, float]]:
+        """
+        获取累计耗时最长的SQL语句
+
+        :param limit: 返回数量
+        :return: [(SQL语句, 执行次数, 累计耗时)]
+        """
+        entries = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [(statement, count, total) for statement, (count, total) in entries]
+
+    def top_timings(self, limit: int) -> List[Tuple[str, int, float]]:
+        """
+        获取累计耗时最长的服务调用
+
+        :param limit: 返回数量
+        :return: [(服务调用名称, 调用次数, 累计耗时)]
+        """
+        entries = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [(name, count, total) for name, (count, total) in entries]
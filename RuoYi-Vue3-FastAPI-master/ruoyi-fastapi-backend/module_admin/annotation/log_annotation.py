@@ -15,7 +15,7 @@ from config.enums import BusinessType
 from config.env import AppConfig
 from exceptions.exception import LoginException, ServiceException, ServiceWarning
 from module_admin.entity.vo.log_vo import LogininforModel, OperLogModel
-from module_admin.service.log_service import LoginLogService, OperationLogService
+from module_admin.service.log_writer_service import LogWriterService
 from module_admin.service.login_service import LoginService
 from utils.log_util import logger
 from utils.response_util import ResponseUtil
@@ -45,23 +45,34 @@ class Log:
         self.log_type = log_type
 
     def __call__(self, func):
+        # 被装饰函数的元信息在装饰时解析一次，避免每次请求重复解析
+        # 获取被装饰函数的文件路径
+        file_path = inspect.getfile(func)
+        # 获取项目根路径
+        project_root = os.getcwd()
+        # 处理文件路径，去除项目根路径部分
+        relative_path = os.path.relpath(file_path, start=project_root)[0:-2].replace('\\', '.').replace('/', '.')
+        # 获取当前被装饰函数所在路径
+        func_path = f'{relative_path}{func.__name__}()'
+        signature = inspect.signature(func)
+        request_name = get_function_parameters_name_by_type(func, Request)[0]
+        session_name = get_function_parameters_name_by_type(func, AsyncSession)[0]
+
+        def get_parameter_value(name: str, args: tuple, kwargs: dict):
+            # FastAPI以关键字参数调用路由函数，直接取值；其余情况回退到参数绑定
+            if name in kwargs:
+                return kwargs[name]
+            bound_parameters = signature.bind(*args, **kwargs)
+            bound_parameters.apply_defaults()
+            return bound_parameters.arguments.get(name)
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             start_time = time.perf_counter()
-            # 获取被装饰函数的文件路径
-            file_path = inspect.getfile(func)
-            # 获取项目根路径
-            project_root = os.getcwd()
-            # 处理文件路径，去除项目根路径部分
-            relative_path = os.path.relpath(file_path, start=project_root)[0:-2].replace('\\', '.').replace('/', '.')
-            # 获取当前被装饰函数所在路径
-            func_path = f'{relative_path}{func.__name__}()'
             # 获取上下文信息
-            request_name_list = get_function_parameters_name_by_type(func, Request)
-            request = get_function_parameters_value_by_name(func, request_name_list[0], *args, **kwargs)
+            request = get_parameter_value(request_name, args, kwargs)
             token = request.headers.get('Authorization')
-            session_name_list = get_function_parameters_name_by_type(func, AsyncSession)
-            query_db = get_function_parameters_value_by_name(func, session_name_list[0], *args, **kwargs)
+            query_db = get_parameter_value(session_name, args, kwargs)
             request_method = request.method
             operator_type = 0
             user_agent = request.headers.get('User-Agent')
@@ -139,12 +150,10 @@ class Log:
                 request.headers.get('referer').endswith('redoc') if request.headers.get('referer') else False
             )
             # 根据响应结果的类型使用不同的方法获取响应结果参数
-            if (
-                isinstance(result, JSONResponse)
-                or isinstance(result, ORJSONResponse)
-                or isinstance(result, UJSONResponse)
-            ):
-                result_dict = json.loads(str(result.body, 'utf-8'))
+            if isinstance(result, (JSONResponse, ORJSONResponse, UJSONResponse)):
+                # 响应体本身即为json，直接作为返回参数记录，不再重新序列化
+                json_result = str(result.body, 'utf-8')
+                result_dict = json.loads(json_result)
             else:
                 if request_from_swagger or request_from_redoc:
                     result_dict = {}
@@ -153,15 +162,19 @@ class Log:
                         result_dict = {'code': result.status_code, 'message': '获取成功'}
                     else:
                         result_dict = {'code': result.status_code, 'message': '获取失败'}
-            json_result = json.dumps(result_dict, ensure_ascii=False)
+                json_result = json.dumps(result_dict, ensure_ascii=False)
+            # 日志表返回参数字段长度最大为2000，超长时与请求参数一样替换，避免该条日志导致整批日志写入失败
+            if len(json_result) > 2000:
+                json_result = '返回参数过长'
             # 根据响应结果获取响应状态及异常信息
             status = 1
             error_msg = ''
             if result_dict.get('code') == 200:
                 status = 0
             else:
-                error_msg = result_dict.get('msg')
-            # 根据日志类型向对应的日志表插入数据
+                # 日志表错误消息字段长度最大为2000
+                error_msg = str(result_dict.get('msg') or '')[:2000]
+            # 根据日志类型将日志放入写入队列，由后台任务批量写入对应的日志表
             if self.log_type == 'login':
                 # 登录请求来自于api文档时不记录登录日志，其余情况则记录
                 if request_from_swagger or request_from_redoc:
@@ -172,11 +185,15 @@ class Log:
                     login_log['loginTime'] = oper_time
                     login_log['userName'] = user_name
                     login_log['status'] = str(status)
-                    login_log['msg'] = result_dict.get('msg')
+                    # 登录日志提示消息字段长度最大为255
+                    login_log['msg'] = str(result_dict.get('msg') or '')[:255]
 
-                    await LoginLogService.add_login_log_services(query_db, LogininforModel(**login_log))
+                    await LogWriterService.enqueue(LogininforModel(**login_log))
             else:
-                current_user = await LoginService.get_current_user(request, token, query_db)
+                # 当前用户已由路由依赖解析并缓存在request.state中
+                current_user = getattr(request.state, 'current_user', None) or await LoginService.get_current_user(
+                    request, token, query_db
+                )
                 oper_name = current_user.user.user_name
                 dept_name = current_user.user.dept.dept_name if current_user.user.dept else None
                 operation_log = OperLogModel(
@@ -197,7 +214,7 @@ class Log:
                     operTime=oper_time,
                     costTime=int(cost_time),
                 )
-                await OperationLogService.add_operation_log_services(query_db, operation_log)
+                await LogWriterService.enqueue(operation_log)
 
             return result
 
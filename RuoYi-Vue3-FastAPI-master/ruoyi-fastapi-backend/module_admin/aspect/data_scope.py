@@ -1,17 +1,16 @@
+from collections import OrderedDict
 from fastapi import Depends
 from typing import Optional
-from sqlalchemy import func, or_, select
-from sqlalchemy.ext.asyncio import AsyncSession
 from module_admin.entity.do.oa_department_do import OaDepartment
-from module_admin.entity.do.role_do import SysRoleDept
 from module_admin.entity.vo.user_vo import CurrentUserModel
 from module_admin.service.login_service import LoginService
-from config.get_db import get_db
+from module_admin.service.org_index_service import OrgIndexService
+from module_admin.utils.data_scope_util import DataScope
 
 
 class GetDataScope:
     """
-    获取当前用户数据权限对应的查询sql语句
+    获取当前用户数据权限（编译后的查询条件，替代原先经eval执行的查询sql语句）
     """
 
     DATA_SCOPE_ALL = '1'
@@ -20,6 +19,14 @@ class GetDataScope:
     DATA_SCOPE_DEPT_AND_CHILD = '4'
     DATA_SCOPE_SELF = '5'
 
+    # 当前用户数据权限缓存的数量上限
+    CACHE_MAX_SIZE = 1024
+
+    # query_alias 对应的sqlalchemy模型，为空时由DAO在查询时传入字段
+    QUERY_MODELS = {'OaDepartment': OaDepartment}
+
+    _cache: 'OrderedDict[tuple, DataScope]' = OrderedDict()
+
     def __init__(
         self,
         query_alias: Optional[str] = '',
@@ -28,7 +35,7 @@ class GetDataScope:
         dept_alias: Optional[str] = 'dept_id',
     ):
         """
-        获取当前用户数据权限对应的查询sql语句
+        获取当前用户数据权限
 
         :param query_alias: 所要查询表对应的sqlalchemy模型名称，默认为''
         :param db_alias: orm对象别名，默认为'db'
@@ -39,72 +46,78 @@ class GetDataScope:
         self.db_alias = db_alias
         self.user_alias = user_alias
         self.dept_alias = dept_alias
+        # 在依赖声明时解析默认字段，模型不存在对应字段时该类权限视为无权限
+        query_model = self.QUERY_MODELS.get(query_alias)
+        self.dept_column = getattr(query_model, dept_alias, None) if query_model is not None else None
+        self.user_column = getattr(query_model, user_alias, None) if query_model is not None else None
 
     async def __call__(
         self,
         current_user: CurrentUserModel = Depends(LoginService.get_current_user),
-        query_db: AsyncSession = Depends(get_db),
-    ):
+    ) -> DataScope:
+        cache_key = (
+            current_user.user.user_id,
+            current_user.user.dept_id,
+            bool(current_user.user.admin),
+            tuple((role.role_id, role.data_scope) for role in current_user.user.role),
+        )
+        data_scope = await self.get_data_scope(cache_key, current_user)
+
+        return data_scope.bind(self.dept_column, self.user_column)
+
+    @classmethod
+    async def get_data_scope(cls, cache_key: tuple, current_user: CurrentUserModel) -> DataScope:
+        """
+        获取当前用户的数据权限（按用户、部门、角色及组织架构索引版本缓存）
+
+        :param cache_key: 缓存键（用户id、部门id、是否管理员、角色及其数据范围）
+        :param current_user: 当前用户对象
+        :return: 数据权限
+        """
+        # 管理员账户可能没有部门（dept_id 为 None），部门code从组织架构索引获取（用于子部门查询）
+        org_index = await OrgIndexService.get_index()
+        cache_key = (*cache_key, org_index.version)
+        data_scope = cls._cache.get(cache_key)
+        if data_scope is not None:
+            cls._cache.move_to_end(cache_key)
+            return data_scope
+
         user_id = current_user.user.user_id
         dept_id = current_user.user.dept_id
-        
-        # 获取当前部门的 code（用于子部门查询）
-        # 管理员账户可能没有部门（dept_id 为 None）
-        dept_code = ''
-        if dept_id is not None:
-            dept = (
-                await query_db.execute(select(OaDepartment).where(OaDepartment.id == dept_id))
-            ).scalars().first()
-            if dept:
-                dept_code = dept.code or ''
-        
-        custom_data_scope_role_id_list = [
-            item.role_id for item in current_user.user.role if item.data_scope == self.DATA_SCOPE_CUSTOM
-        ]
-        param_sql_list = []
+        dept = org_index.get_dept(dept_id) if dept_id is not None else None
+        dept_code = (dept.code or '') if dept else ''
+
+        scope_kwargs = {}
+        custom_role_ids = []
         for role in current_user.user.role:
-            if current_user.user.admin or role.data_scope == self.DATA_SCOPE_ALL:
-                param_sql_list = ['1 == 1']
+            if current_user.user.admin or role.data_scope == cls.DATA_SCOPE_ALL:
+                scope_kwargs = {'is_all': True}
+                custom_role_ids = []
                 break
-            elif role.data_scope == self.DATA_SCOPE_CUSTOM:
-                if len(custom_data_scope_role_id_list) > 1:
-                    param_sql_list.append(
-                        f"{self.query_alias}.{self.dept_alias}.in_(select(SysRoleDept.dept_id).where(SysRoleDept.role_id.in_({custom_data_scope_role_id_list}))) if hasattr({self.query_alias}, '{self.dept_alias}') else 1 == 0"
-                    )
-                else:
-                    param_sql_list.append(
-                        f"{self.query_alias}.{self.dept_alias}.in_(select(SysRoleDept.dept_id).where(SysRoleDept.role_id == {role.role_id})) if hasattr({self.query_alias}, '{self.dept_alias}') else 1 == 0"
-                    )
-            elif role.data_scope == self.DATA_SCOPE_DEPT:
-                # 管理员账户可能没有部门
+            elif role.data_scope == cls.DATA_SCOPE_CUSTOM:
+                custom_role_ids.append(role.role_id)
+            elif role.data_scope == cls.DATA_SCOPE_DEPT:
+                # 没有部门，返回空结果
                 if dept_id is not None:
-                    param_sql_list.append(
-                        f"{self.query_alias}.{self.dept_alias} == {dept_id} if hasattr({self.query_alias}, '{self.dept_alias}') else 1 == 0"
-                    )
+                    scope_kwargs['include_dept'] = True
                 else:
-                    # 没有部门，返回空结果
-                    param_sql_list.append('1 == 0')
-            elif role.data_scope == self.DATA_SCOPE_DEPT_AND_CHILD:
-                # 使用 code LIKE 替代 ancestors 查询
-                if dept_id is not None and dept_code:
-                    param_sql_list.append(
-                        f"{self.query_alias}.{self.dept_alias}.in_(select(OaDepartment.id).where(or_(OaDepartment.id == {dept_id}, OaDepartment.code.like('{dept_code}%')))) if hasattr({self.query_alias}, '{self.dept_alias}') else 1 == 0"
-                    )
-                elif dept_id is not None:
-                    # 如果没有 code，只查询当前部门
-                    param_sql_list.append(
-                        f"{self.query_alias}.{self.dept_alias} == {dept_id} if hasattr({self.query_alias}, '{self.dept_alias}') else 1 == 0"
-                    )
+                    scope_kwargs['deny'] = True
+            elif role.data_scope == cls.DATA_SCOPE_DEPT_AND_CHILD:
+                # 使用 code LIKE 替代 ancestors 查询，没有 code 时只查询当前部门
+                if dept_id is not None:
+                    scope_kwargs['include_dept_and_child'] = True
                 else:
-                    # 没有部门，返回空结果
-                    param_sql_list.append('1 == 0')
-            elif role.data_scope == self.DATA_SCOPE_SELF:
-                param_sql_list.append(
-                    f"{self.query_alias}.{self.user_alias} == {user_id} if hasattr({self.query_alias}, '{self.user_alias}') else 1 == 0"
-                )
+                    scope_kwargs['deny'] = True
+            elif role.data_scope == cls.DATA_SCOPE_SELF:
+                scope_kwargs['self_user_id'] = user_id
             else:
-                param_sql_list.append('1 == 0')
-        param_sql_list = list(dict.fromkeys(param_sql_list))
-        param_sql = f"or_({', '.join(param_sql_list)})" if param_sql_list else '1 == 1'
+                scope_kwargs['deny'] = True
+
+        data_scope = DataScope(
+            custom_role_ids=tuple(dict.fromkeys(custom_role_ids)), dept_id=dept_id, dept_code=dept_code, **scope_kwargs
+        )
+        cls._cache[cache_key] = data_scope
+        while len(cls._cache) > cls.CACHE_MAX_SIZE:
+            cls._cache.popitem(last=False)
 
-        return param_sql
+        return data_scope
@@ -1,4 +1,4 @@
-from fastapi import Depends
+from fastapi import Depends, Request
 from typing import List, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from exceptions.exception import PermissionException
@@ -83,6 +83,7 @@ class CheckWorkbenchMenuAuth:
 
     async def __call__(
         self, 
+        request: Request,
         current_user: CurrentUserModel = Depends(LoginService.get_current_user),
         query_db: AsyncSession = Depends(get_db)
     ):
@@ -110,6 +111,13 @@ class CheckWorkbenchMenuAuth:
             logger.warning(f'工作台权限检查失败: 用户ID为空')
             raise PermissionException(data='', message='该用户无此接口权限')
         
+        # 优先使用当前用户信息快照中的工作台菜单标记，避免重复查询用户菜单
+        has_workbench_menu = getattr(request.state, 'has_workbench_menu', None)
+        if has_workbench_menu is not None:
+            if has_workbench_menu:
+                return True
+            raise PermissionException(data='', message='该用户无此接口权限')
+        
         # 查询用户菜单信息，检查是否有工作台相关菜单
         try:
             query_user = await UserDao.get_user_by_id(query_db, user_id=user_id)
@@ -10,7 +10,6 @@ from module_admin.entity.vo.config_vo import ConfigModel, ConfigPageQueryModel,
 from module_admin.entity.vo.user_vo import CurrentUserModel
 from module_admin.service.config_service import ConfigService
 from module_admin.service.login_service import LoginService
-from utils.common_util import bytes2file_response
 from utils.log_util import logger
 from utils.page_util import PageResponseModel
 from utils.response_util import ResponseUtil
@@ -115,9 +114,8 @@ async def export_system_config_list(
     config_page_query: ConfigPageQueryModel = Form(),
     query_db: AsyncSession = Depends(get_db),
 ):
-    # 获取全量数据
-    config_query_result = await ConfigService.get_config_list_services(query_db, config_page_query, is_page=False)
-    config_export_result = await ConfigService.export_config_list_services(config_query_result)
+    # 流式读取全量数据并导出
+    config_export_result = await ConfigService.export_config_list_services(query_db, config_page_query)
     logger.info('导出成功')
 
-    return ResponseUtil.streaming(data=bytes2file_response(config_export_result))
+    return ResponseUtil.streaming(data=config_export_result)
@@ -8,6 +8,7 @@ from module_admin.entity.vo.dept_vo import DeptModel, DeptQueryModel
 from module_admin.entity.vo.user_vo import CurrentUserModel
 from module_admin.service.dept_service import DeptService
 from module_admin.service.login_service import LoginService
+from module_admin.utils.data_scope_util import DataScope
 from utils.log_util import logger
 from utils.response_util import ResponseUtil
 
@@ -22,9 +23,9 @@ async def get_system_dept_list(
     request: Request,
     dept_query: DeptQueryModel = Depends(DeptQueryModel.as_query),
     query_db: AsyncSession = Depends(get_db),
-    data_scope_sql: str = Depends(GetDataScope('OaDepartment')),
+    data_scope: DataScope = Depends(GetDataScope('OaDepartment')),
 ):
-    dept_query_result = await DeptService.get_dept_list_services(query_db, dept_query, data_scope_sql)
+    dept_query_result = await DeptService.get_dept_list_services(query_db, dept_query, data_scope)
     logger.info('获取成功')
 
     return ResponseUtil.success(data=dept_query_result)
@@ -38,10 +39,10 @@ async def query_detail_system_dept(
     dept_id: int,
     query_db: AsyncSession = Depends(get_db),
     current_user: CurrentUserModel = Depends(LoginService.get_current_user),
-    data_scope_sql: str = Depends(GetDataScope('OaDepartment')),
+    data_scope: DataScope = Depends(GetDataScope('OaDepartment')),
 ):
     if not current_user.user.admin:
-        await DeptService.check_dept_data_scope_services(query_db, dept_id, data_scope_sql)
+        await DeptService.check_dept_data_scope_services(query_db, dept_id, data_scope)
     detail_dept_result = await DeptService.dept_detail_services(query_db, dept_id)
     logger.info(f'获取dept_id为{dept_id}的信息成功')
 
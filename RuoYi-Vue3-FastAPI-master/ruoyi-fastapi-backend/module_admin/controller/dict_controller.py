@@ -18,7 +18,6 @@ from module_admin.entity.vo.dict_vo import (
 from module_admin.entity.vo.user_vo import CurrentUserModel
 from module_admin.service.dict_service import DictDataService, DictTypeService
 from module_admin.service.login_service import LoginService
-from utils.common_util import bytes2file_response
 from utils.log_util import logger
 from utils.page_util import PageResponseModel
 from utils.response_util import ResponseUtil
@@ -126,14 +125,11 @@ async def export_system_dict_type_list(
     dict_type_page_query: DictTypePageQueryModel = Form(),
     query_db: AsyncSession = Depends(get_db),
 ):
-    # 获取全量数据
-    dict_type_query_result = await DictTypeService.get_dict_type_list_services(
-        query_db, dict_type_page_query, is_page=False
-    )
-    dict_type_export_result = await DictTypeService.export_dict_type_list_services(dict_type_query_result)
+    # 流式读取全量数据并导出
+    dict_type_export_result = await DictTypeService.export_dict_type_list_services(query_db, dict_type_page_query)
     logger.info('导出成功')
 
-    return ResponseUtil.streaming(data=bytes2file_response(dict_type_export_result))
+    return ResponseUtil.streaming(data=dict_type_export_result)
 
 
 @dictController.get('/data/type/{dict_type}')
@@ -229,11 +225,8 @@ async def export_system_dict_data_list(
     dict_data_page_query: DictDataPageQueryModel = Form(),
     query_db: AsyncSession = Depends(get_db),
 ):
-    # 获取全量数据
-    dict_data_query_result = await DictDataService.get_dict_data_list_services(
-        query_db, dict_data_page_query, is_page=False
-    )
-    dict_data_export_result = await DictDataService.export_dict_data_list_services(dict_data_query_result)
+    # 流式读取全量数据并导出
+    dict_data_export_result = await DictDataService.export_dict_data_list_services(query_db, dict_data_page_query)
     logger.info('导出成功')
 
-    return ResponseUtil.streaming(data=bytes2file_response(dict_data_export_result))
+    return ResponseUtil.streaming(data=dict_data_export_result)
@@ -13,7 +13,6 @@ from module_admin.entity.vo.log_vo import (
 )
 from module_admin.service.log_service import LoginLogService, OperationLogService
 from module_admin.service.login_service import LoginService
-from utils.common_util import bytes2file_response
 from utils.log_util import logger
 from utils.page_util import PageResponseModel
 from utils.response_util import ResponseUtil
@@ -69,16 +68,13 @@ async def export_system_operation_log_list(
     operation_log_page_query: OperLogPageQueryModel = Form(),
     query_db: AsyncSession = Depends(get_db),
 ):
-    # 获取全量数据
-    operation_log_query_result = await OperationLogService.get_operation_log_list_services(
-        query_db, operation_log_page_query, is_page=False
-    )
+    # 流式读取全量数据并导出
     operation_log_export_result = await OperationLogService.export_operation_log_list_services(
-        request, operation_log_query_result
+        request, query_db, operation_log_page_query
     )
     logger.info('导出成功')
 
-    return ResponseUtil.streaming(data=bytes2file_response(operation_log_export_result))
+    return ResponseUtil.streaming(data=operation_log_export_result)
 
 
 @logController.get(
@@ -140,11 +136,8 @@ async def export_system_login_log_list(
     login_log_page_query: LoginLogPageQueryModel = Form(),
     query_db: AsyncSession = Depends(get_db),
 ):
-    # 获取全量数据
-    login_log_query_result = await LoginLogService.get_login_log_list_services(
-        query_db, login_log_page_query, is_page=False
-    )
-    login_log_export_result = await LoginLogService.export_login_log_list_services(login_log_query_result)
+    # 流式读取全量数据并导出
+    login_log_export_result = await LoginLogService.export_login_log_list_services(query_db, login_log_page_query)
     logger.info('导出成功')
 
-    return ResponseUtil.streaming(data=bytes2file_response(login_log_export_result))
+    return ResponseUtil.streaming(data=login_log_export_result)
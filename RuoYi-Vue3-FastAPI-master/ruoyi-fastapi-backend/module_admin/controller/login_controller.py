@@ -12,6 +12,7 @@ from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.login_vo import UserLogin, UserRegister, Token
 from module_admin.entity.vo.user_vo import CurrentUserModel, EditUserModel
 from module_admin.service.login_service import CustomOAuth2PasswordRequestForm, LoginService, oauth2_scheme
+from module_admin.service.online_session_service import OnlineSessionService
 from module_admin.service.user_service import UserService
 from utils.log_util import logger
 from utils.response_util import ResponseUtil
@@ -52,14 +53,15 @@ async def login(
         # 这里可以进一步查询，但为了简化，暂时设为None
         dept_name = None
     
+    token_payload = {
+        'user_id': str(result[0].user_id),
+        'user_name': result[0].job_number,  # 使用 job_number 作为 user_name
+        'dept_name': dept_name,
+        'session_id': session_id,
+        'login_info': user.login_info,
+    }
     access_token = await LoginService.create_access_token(
-        data={
-            'user_id': str(result[0].user_id),
-            'user_name': result[0].job_number,  # 使用 job_number 作为 user_name
-            'dept_name': dept_name,
-            'session_id': session_id,
-            'login_info': user.login_info,
-        },
+        data=token_payload,
         expires_delta=access_token_expires,
     )
     if AppConfig.app_same_time_login:
@@ -75,6 +77,10 @@ async def login(
             access_token,
             ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
         )
+    # 登记在线会话索引，在线用户列表无需再枚举令牌
+    await OnlineSessionService.register_session(
+        request.app.state.redis, token_payload, JwtConfig.jwt_redis_expire_minutes * 60
+    )
     
     # 更新登录信息（更新本地用户表的登录时间和IP）
     from module_admin.entity.do.sys_user_local_do import SysUserLocal
@@ -11,9 +11,11 @@ from module_admin.entity.vo.dept_vo import DeptModel
 from module_admin.entity.vo.role_vo import AddRoleModel, DeleteRoleModel, RoleModel, RolePageQueryModel
 from module_admin.entity.vo.user_vo import CrudUserRoleModel, CurrentUserModel, UserRolePageQueryModel
 from module_admin.service.dept_service import DeptService
+from module_admin.service.current_user_cache_service import CurrentUserCacheService
 from module_admin.service.login_service import LoginService
 from module_admin.service.role_service import RoleService
 from module_admin.service.user_service import UserService
+from module_admin.utils.data_scope_util import DataScope
 from utils.common_util import bytes2file_response
 from utils.log_util import logger
 from utils.page_util import PageResponseModel
@@ -28,9 +30,9 @@ async def get_system_role_dept_tree(
     request: Request,
     role_id: int,
     query_db: AsyncSession = Depends(get_db),
-    data_scope_sql: str = Depends(GetDataScope('OaDepartment')),
+    data_scope: DataScope = Depends(GetDataScope('OaDepartment')),
 ):
-    dept_query_result = await DeptService.get_dept_tree_services(query_db, DeptModel(**{}), data_scope_sql)
+    dept_query_result = await DeptService.get_dept_tree_services(query_db, DeptModel(**{}), data_scope)
     role_dept_query_result = await RoleService.get_role_dept_tree_services(query_db, role_id)
     role_dept_query_result.depts = dept_query_result
     logger.info('获取成功')
@@ -45,10 +47,10 @@ async def get_system_role_list(
     request: Request,
     role_page_query: RolePageQueryModel = Depends(RolePageQueryModel.as_query),
     query_db: AsyncSession = Depends(get_db),
-    data_scope_sql: str = Depends(GetDataScope('OaDepartment')),
+    data_scope: DataScope = Depends(GetDataScope('OaDepartment')),
 ):
     role_page_query_result = await RoleService.get_role_list_services(
-        query_db, role_page_query, data_scope_sql, is_page=True
+        query_db, role_page_query, data_scope, is_page=True
     )
     logger.info('获取成功')
 
@@ -82,14 +84,15 @@ async def edit_system_role(
     edit_role: AddRoleModel,
     query_db: AsyncSession = Depends(get_db),
     current_user: CurrentUserModel = Depends(LoginService.get_current_user),
-    data_scope_sql: str = Depends(GetDataScope('OaDepartment')),
+    data_scope: DataScope = Depends(GetDataScope('OaDepartment')),
 ):
     await RoleService.check_role_allowed_services(edit_role)
     if not current_user.user.admin:
-        await RoleService.check_role_data_scope_services(query_db, str(edit_role.role_id), data_scope_sql)
+        await RoleService.check_role_data_scope_services(query_db, str(edit_role.role_id), data_scope)
     edit_role.update_by = current_user.user.user_name
     edit_role.update_time = datetime.now()
     edit_role_result = await RoleService.edit_role_services(query_db, edit_role)
+    await CurrentUserCacheService.invalidate_all(request.app.state.redis)
     logger.info(edit_role_result.message)
 
     return ResponseUtil.success(msg=edit_role_result.message)
@@ -102,11 +105,11 @@ async def edit_system_role_datascope(
     role_data_scope: AddRoleModel,
     query_db: AsyncSession = Depends(get_db),
     current_user: CurrentUserModel = Depends(LoginService.get_current_user),
-    data_scope_sql: str = Depends(GetDataScope('OaDepartment')),
+    data_scope: DataScope = Depends(GetDataScope('OaDepartment')),
 ):
     await RoleService.check_role_allowed_services(role_data_scope)
     if not current_user.user.admin:
-        await RoleService.check_role_data_scope_services(query_db, str(role_data_scope.role_id), data_scope_sql)
+        await RoleService.check_role_data_scope_services(query_db, str(role_data_scope.role_id), data_scope)
     edit_role = AddRoleModel(
         roleId=role_data_scope.role_id,
         dataScope=role_data_scope.data_scope,
@@ -116,6 +119,7 @@ async def edit_system_role_datascope(
         updateTime=datetime.now(),
     )
     role_data_scope_result = await RoleService.role_datascope_services(query_db, edit_role)
+    await CurrentUserCacheService.invalidate_all(request.app.state.redis)
     logger.info(role_data_scope_result.message)
 
     return ResponseUtil.success(msg=role_data_scope_result.message)
@@ -128,16 +132,17 @@ async def delete_system_role(
     role_ids: str,
     query_db: AsyncSession = Depends(get_db),
     current_user: CurrentUserModel = Depends(LoginService.get_current_user),
-    data_scope_sql: str = Depends(GetDataScope('OaDepartment')),
+    data_scope: DataScope = Depends(GetDataScope('OaDepartment')),
 ):
     role_id_list = role_ids.split(',') if role_ids else []
     if role_id_list:
         for role_id in role_id_list:
             await RoleService.check_role_allowed_services(RoleModel(roleId=int(role_id)))
             if not current_user.user.admin:
-                await RoleService.check_role_data_scope_services(query_db, role_id, data_scope_sql)
+                await RoleService.check_role_data_scope_services(query_db, role_id, data_scope)
     delete_role = DeleteRoleModel(roleIds=role_ids, updateBy=current_user.user.user_name, updateTime=datetime.now())
     delete_role_result = await RoleService.delete_role_services(query_db, delete_role)
+    await CurrentUserCacheService.invalidate_all(request.app.state.redis)
     logger.info(delete_role_result.message)
 
     return ResponseUtil.success(msg=delete_role_result.message)
@@ -151,10 +156,10 @@ async def query_detail_system_role(
     role_id: int,
     query_db: AsyncSession = Depends(get_db),
     current_user: CurrentUserModel = Depends(LoginService.get_current_user),
-    data_scope_sql: str = Depends(GetDataScope('OaDepartment')),
+    data_scope: DataScope = Depends(GetDataScope('OaDepartment')),
 ):
     if not current_user.user.admin:
-        await RoleService.check_role_data_scope_services(query_db, str(role_id), data_scope_sql)
+        await RoleService.check_role_data_scope_services(query_db, str(role_id), data_scope)
     role_detail_result = await RoleService.role_detail_services(query_db, role_id)
     logger.info(f'获取role_id为{role_id}的信息成功')
 
@@ -167,11 +172,11 @@ async def export_system_role_list(
     request: Request,
     role_page_query: RolePageQueryModel = Form(),
     query_db: AsyncSession = Depends(get_db),
-    data_scope_sql: str = Depends(GetDataScope('OaDepartment')),
+    data_scope: DataScope = Depends(GetDataScope('OaDepartment')),
 ):
     # 获取全量数据
     role_query_result = await RoleService.get_role_list_services(
-        query_db, role_page_query, data_scope_sql, is_page=False
+        query_db, role_page_query, data_scope, is_page=False
     )
     role_export_result = await RoleService.export_role_list_services(role_query_result)
     logger.info('导出成功')
@@ -186,11 +191,11 @@ async def reset_system_role_status(
     change_role: AddRoleModel,
     query_db: AsyncSession = Depends(get_db),
     current_user: CurrentUserModel = Depends(LoginService.get_current_user),
-    data_scope_sql: str = Depends(GetDataScope('OaDepartment')),
+    data_scope: DataScope = Depends(GetDataScope('OaDepartment')),
 ):
     await RoleService.check_role_allowed_services(change_role)
     if not current_user.user.admin:
-        await RoleService.check_role_data_scope_services(query_db, str(change_role.role_id), data_scope_sql)
+        await RoleService.check_role_data_scope_services(query_db, str(change_role.role_id), data_scope)
     edit_role = AddRoleModel(
         roleId=change_role.role_id,
         status=change_role.status,
@@ -199,6 +204,7 @@ async def reset_system_role_status(
         type='status',
     )
     edit_role_result = await RoleService.edit_role_services(query_db, edit_role)
+    await CurrentUserCacheService.invalidate_all(request.app.state.redis)
     logger.info(edit_role_result.message)
 
     return ResponseUtil.success(msg=edit_role_result.message)
@@ -213,10 +219,10 @@ async def get_system_allocated_user_list(
     request: Request,
     user_role: UserRolePageQueryModel = Depends(UserRolePageQueryModel.as_query),
     query_db: AsyncSession = Depends(get_db),
-    data_scope_sql: str = Depends(GetDataScope('', dept_alias='organization_id')),
+    data_scope: DataScope = Depends(GetDataScope('', dept_alias='organization_id')),
 ):
     role_user_allocated_page_query_result = await RoleService.get_role_user_allocated_list_services(
-        query_db, user_role, data_scope_sql, is_page=True
+        query_db, user_role, data_scope, is_page=True
     )
     logger.info('获取成功')
 
@@ -232,10 +238,10 @@ async def get_system_unallocated_user_list(
     request: Request,
     user_role: UserRolePageQueryModel = Depends(UserRolePageQueryModel.as_query),
     query_db: AsyncSession = Depends(get_db),
-    data_scope_sql: str = Depends(GetDataScope('', dept_alias='organization_id')),
+    data_scope: DataScope = Depends(GetDataScope('', dept_alias='organization_id')),
 ):
     role_user_unallocated_page_query_result = await RoleService.get_role_user_unallocated_list_services(
-        query_db, user_role, data_scope_sql, is_page=True
+        query_db, user_role, data_scope, is_page=True
     )
     logger.info('获取成功')
 
@@ -249,11 +255,12 @@ async def add_system_role_user(
     add_role_user: CrudUserRoleModel = Depends(CrudUserRoleModel.as_query),
     query_db: AsyncSession = Depends(get_db),
     current_user: CurrentUserModel = Depends(LoginService.get_current_user),
-    data_scope_sql: str = Depends(GetDataScope('OaDepartment')),
+    data_scope: DataScope = Depends(GetDataScope('OaDepartment')),
 ):
     if not current_user.user.admin:
-        await RoleService.check_role_data_scope_services(query_db, str(add_role_user.role_id), data_scope_sql)
+        await RoleService.check_role_data_scope_services(query_db, str(add_role_user.role_id), data_scope)
     add_role_user_result = await UserService.add_user_role_services(query_db, add_role_user)
+    await CurrentUserCacheService.invalidate_all(request.app.state.redis)
     logger.info(add_role_user_result.message)
 
     return ResponseUtil.success(msg=add_role_user_result.message)
@@ -265,6 +272,7 @@ async def cancel_system_role_user(
     request: Request, cancel_user_role: CrudUserRoleModel, query_db: AsyncSession = Depends(get_db)
 ):
     cancel_user_role_result = await UserService.delete_user_role_services(query_db, cancel_user_role)
+    await CurrentUserCacheService.invalidate_all(request.app.state.redis)
     logger.info(cancel_user_role_result.message)
 
     return ResponseUtil.success(msg=cancel_user_role_result.message)
@@ -278,6 +286,7 @@ async def batch_cancel_system_role_user(
     query_db: AsyncSession = Depends(get_db),
 ):
     batch_cancel_user_role_result = await UserService.delete_user_role_services(query_db, batch_cancel_user_role)
+    await CurrentUserCacheService.invalidate_all(request.app.state.redis)
     logger.info(batch_cancel_user_role_result.message)
 
     return ResponseUtil.success(msg=batch_cancel_user_role_result.message)
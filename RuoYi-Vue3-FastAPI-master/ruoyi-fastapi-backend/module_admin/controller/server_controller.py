@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, Request
+from middlewares.trace_middleware import TraceMetrics
 from module_admin.aspect.interface_auth import CheckUserInterfaceAuth
 from module_admin.entity.vo.server_vo import ServerMonitorModel
 from module_admin.service.login_service import LoginService
@@ -19,3 +20,12 @@ async def get_monitor_server_info(request: Request):
     logger.info('获取成功')
 
     return ResponseUtil.success(data=server_info_query_result)
+
+
+@serverController.get('/trace', dependencies=[Depends(CheckUserInterfaceAuth('monitor:server:list'))])
+async def get_monitor_server_trace(request: Request):
+    # 获取当前进程按路由汇总的请求耗时统计
+    trace_metrics_result = TraceMetrics.snapshot()
+    logger.info('获取成功')
+
+    return ResponseUtil.success(data=trace_metrics_result)
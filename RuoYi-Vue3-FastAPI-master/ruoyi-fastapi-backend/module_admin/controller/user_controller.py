@@ -28,11 +28,12 @@ from module_admin.entity.vo.user_vo import (
     UserRoleQueryModel,
     UserRoleResponseModel,
 )
+from module_admin.service.current_user_cache_service import CurrentUserCacheService
 from module_admin.service.login_service import LoginService
 from module_admin.service.user_service import UserService
 from module_admin.service.role_service import RoleService
 from module_admin.service.dept_service import DeptService
-from utils.common_util import bytes2file_response
+from module_admin.utils.data_scope_util import DataScope
 from utils.log_util import logger
 from utils.page_util import PageResponseModel
 from utils.pwd_util import PwdUtil
@@ -45,9 +46,9 @@ userController = APIRouter(prefix='/system/user', dependencies=[Depends(LoginSer
 
 @userController.get('/deptTree', dependencies=[Depends(CheckUserInterfaceAuth('system:user:list'))])
 async def get_system_dept_tree(
-    request: Request, query_db: AsyncSession = Depends(get_db), data_scope_sql: str = Depends(GetDataScope('OaDepartment', dept_alias='id'))
+    request: Request, query_db: AsyncSession = Depends(get_db), data_scope: DataScope = Depends(GetDataScope('OaDepartment', dept_alias='id'))
 ):
-    dept_query_result = await DeptService.get_dept_tree_services(query_db, DeptModel(**{}), data_scope_sql)
+    dept_query_result = await DeptService.get_dept_tree_services(query_db, DeptModel(**{}), data_scope)
     logger.info('获取成功')
 
     return ResponseUtil.success(data=dept_query_result)
@@ -62,11 +63,11 @@ async def get_system_user_list(
     query_db: AsyncSession = Depends(get_db),
     current_user: CurrentUserModel = Depends(LoginService.get_current_user),
     # 注意：使用空字符串作为 query_alias，因为实际查询中需要通过 OaEmployeePrimary.organization_id 访问部门
-    data_scope_sql: str = Depends(GetDataScope('', dept_alias='organization_id')),
+    data_scope: DataScope = Depends(GetDataScope('', dept_alias='organization_id')),
 ):
     # 获取分页数据
     user_page_query_result = await UserService.get_user_list_services(
-        query_db, user_page_query, data_scope_sql, is_page=True
+        query_db, user_page_query, data_scope, is_page=True
     )
     logger.info('获取成功')
 
@@ -83,20 +84,21 @@ async def reset_system_user_pwd(
     reset_user: EditUserModel,
     query_db: AsyncSession = Depends(get_db),
     current_user: CurrentUserModel = Depends(LoginService.get_current_user),
-    data_scope_sql: str = Depends(GetDataScope('', user_alias='user_id')),
+    data_scope: DataScope = Depends(GetDataScope('', user_alias='user_id')),
 ):
     await UserService.check_user_allowed_services(reset_user)
     if not current_user.user.admin:
-        await UserService.check_user_data_scope_services(query_db, reset_user.user_id, data_scope_sql)
+        await UserService.check_user_data_scope_services(query_db, reset_user.user_id, data_scope)
     edit_user = EditUserModel(
         userId=reset_user.user_id,
-        password=PwdUtil.get_password_hash(reset_user.password),
+        password=await PwdUtil.get_password_hash_async(reset_user.password),
         pwdUpdateDate=datetime.now(),
         updateBy=current_user.user.user_name,
         updateTime=datetime.now(),
         type='pwd',
     )
     edit_user_result = await UserService.edit_user_services(query_db, edit_user)
+    await CurrentUserCacheService.invalidate_users(request.app.state.redis, [edit_user.user_id])
     logger.info(edit_user_result.message)
 
     return ResponseUtil.success(msg=edit_user_result.message)
@@ -109,7 +111,7 @@ async def change_system_user_status(
     change_user: EditUserModel,
     query_db: AsyncSession = Depends(get_db),
     current_user: CurrentUserModel = Depends(LoginService.get_current_user),
-    data_scope_sql: str = Depends(GetDataScope('', user_alias='user_id')),
+    data_scope: DataScope = Depends(GetDataScope('', user_alias='user_id')),
 ):
     # 禁止用户修改自己的状态（避免误操作导致无法登录）
     if change_user.user_id == current_user.user.user_id:
@@ -117,7 +119,7 @@ async def change_system_user_status(
     
     await UserService.check_user_allowed_services(change_user)
     if not current_user.user.admin:
-        await UserService.check_user_data_scope_services(query_db, change_user.user_id, data_scope_sql)
+        await UserService.check_user_data_scope_services(query_db, change_user.user_id, data_scope)
     edit_user = EditUserModel(
         userId=change_user.user_id,
         status=change_user.status,
@@ -126,6 +128,7 @@ async def change_system_user_status(
         type='status',
     )
     edit_user_result = await UserService.edit_user_services(query_db, edit_user)
+    await CurrentUserCacheService.invalidate_users(request.app.state.redis, [edit_user.user_id])
     logger.info(edit_user_result.message)
 
     return ResponseUtil.success(msg=edit_user_result.message)
@@ -154,10 +157,10 @@ async def query_detail_system_user(
     user_id: Optional[Union[int, Literal['']]] = '',
     query_db: AsyncSession = Depends(get_db),
     current_user: CurrentUserModel = Depends(LoginService.get_current_user),
-    data_scope_sql: str = Depends(GetDataScope('', user_alias='user_id')),
+    data_scope: DataScope = Depends(GetDataScope('', user_alias='user_id')),
 ):
     if user_id and not current_user.user.admin:
-        await UserService.check_user_data_scope_services(query_db, user_id, data_scope_sql)
+        await UserService.check_user_data_scope_services(query_db, user_id, data_scope)
     detail_user_result = await UserService.user_detail_services(query_db, user_id)
     logger.info(f'获取user_id为{user_id}的信息成功')
 
@@ -193,6 +196,7 @@ async def change_system_user_profile_avatar(
             type='avatar',
         )
         edit_user_result = await UserService.edit_user_services(query_db, edit_user)
+        await CurrentUserCacheService.invalidate_users(request.app.state.redis, [edit_user.user_id])
         logger.info(edit_user_result.message)
 
         return ResponseUtil.success(dict_content={'imgUrl': edit_user.avatar}, msg=edit_user_result.message)
@@ -218,6 +222,7 @@ async def change_system_user_profile_info(
         role=current_user.user.role,
     )
     edit_user_result = await UserService.edit_user_services(query_db, edit_user)
+    await CurrentUserCacheService.invalidate_users(request.app.state.redis, [edit_user.user_id])
     logger.info(edit_user_result.message)
 
     return ResponseUtil.success(msg=edit_user_result.message)
@@ -240,6 +245,7 @@ async def reset_system_user_password(
         updateTime=datetime.now(),
     )
     reset_user_result = await UserService.reset_user_services(query_db, reset_user)
+    await CurrentUserCacheService.invalidate_users(request.app.state.redis, [reset_user.user_id])
     logger.info(reset_user_result.message)
 
     return ResponseUtil.success(msg=reset_user_result.message)
@@ -251,16 +257,13 @@ async def export_system_user_list(
     request: Request,
     user_page_query: UserPageQueryModel = Form(),
     query_db: AsyncSession = Depends(get_db),
-    data_scope_sql: str = Depends(GetDataScope('', user_alias='user_id')),
+    data_scope: DataScope = Depends(GetDataScope('', user_alias='user_id')),
 ):
-    # 获取全量数据
-    user_query_result = await UserService.get_user_list_services(
-        query_db, user_page_query, data_scope_sql, is_page=False
-    )
-    user_export_result = await UserService.export_user_list_services(user_query_result)
+    # 流式读取全量数据并导出
+    user_export_result = await UserService.export_user_list_services(query_db, user_page_query, data_scope)
     logger.info('导出成功')
 
-    return ResponseUtil.streaming(data=bytes2file_response(user_export_result))
+    return ResponseUtil.streaming(data=user_export_result)
 
 
 @userController.get(
@@ -290,15 +293,16 @@ async def update_system_role_user(
     role_ids: str = Query(alias='roleIds'),
     query_db: AsyncSession = Depends(get_db),
     current_user: CurrentUserModel = Depends(LoginService.get_current_user),
-    user_data_scope_sql: str = Depends(GetDataScope('', user_alias='user_id')),
-    role_data_scope_sql: str = Depends(GetDataScope('OaDepartment')),
+    user_data_scope: DataScope = Depends(GetDataScope('', user_alias='user_id')),
+    role_data_scope: DataScope = Depends(GetDataScope('OaDepartment')),
 ):
     if not current_user.user.admin:
-        await UserService.check_user_data_scope_services(query_db, user_id, user_data_scope_sql)
-        await RoleService.check_role_data_scope_services(query_db, role_ids, role_data_scope_sql)
+        await UserService.check_user_data_scope_services(query_db, user_id, user_data_scope)
+        await RoleService.check_role_data_scope_services(query_db, role_ids, role_data_scope)
     add_user_role_result = await UserService.add_user_role_services(
         query_db, CrudUserRoleModel(userId=user_id, roleIds=role_ids)
     )
+    await CurrentUserCacheService.invalidate_users(request.app.state.redis, [user_id])
     logger.info(add_user_role_result.message)
 
     return ResponseUtil.success(msg=add_user_role_result.message)
@@ -3,12 +3,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.util import immutabledict
 from typing import List
 from module_admin.entity.do.oa_department_do import OaDepartment
-from module_admin.entity.do.role_do import SysRoleDept  # noqa: F401
 from module_admin.entity.do.oa_employee_primary_do import OaEmployeePrimary
 from module_admin.entity.vo.dept_vo import DeptModel
-
-# 确保在 eval() 执行时这些类可以被访问
-# 这些导入是为了在 data_scope.py 生成的 SQL 字符串中使用
+from module_admin.utils.data_scope_util import DataScope
 
 
 class DeptDao:
@@ -101,13 +98,13 @@ class DeptDao:
         return dept_result
 
     @classmethod
-    async def get_dept_list_for_tree(cls, db: AsyncSession, dept_info: DeptModel, data_scope_sql: str):
+    async def get_dept_list_for_tree(cls, db: AsyncSession, dept_info: DeptModel, data_scope: DataScope):
         """
         获取所有在用部门列表信息
 
         :param db: orm对象
         :param dept_info: 部门对象
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :return: 在用部门列表信息
         """
         # 构建查询条件
@@ -121,18 +118,9 @@ class DeptDao:
             conditions.append(OaDepartment.name.like(f'%{dept_info.dept_name}%'))
         
         # 添加数据权限过滤
-        if data_scope_sql:
-            try:
-                # 确保在 eval 执行环境中可以访问到 OaDepartment
-                data_scope_condition = eval(data_scope_sql)
-                conditions.append(data_scope_condition)
-            except Exception as e:
-                # 如果 eval 失败，记录错误并返回空结果（安全策略：权限过滤失败时不显示任何数据）
-                from utils.log_util import logger
-                logger.error(f'部门树数据权限过滤失败: {str(e)}, data_scope_sql={data_scope_sql}')
-                # 返回空结果，而不是所有部门（安全策略）
-                return []
-        
+        if data_scope is not None:
+            conditions.append(data_scope.get_condition())
+
         dept_result = (
             (
                 await db.execute(
@@ -149,13 +137,13 @@ class DeptDao:
         return dept_result
 
     @classmethod
-    async def get_dept_list(cls, db: AsyncSession, page_object: DeptModel, data_scope_sql: str):
+    async def get_dept_list(cls, db: AsyncSession, page_object: DeptModel, data_scope: DataScope):
         """
         根据查询参数获取部门列表信息
 
         :param db: orm对象
         :param page_object: 不分页查询参数对象
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :return: 部门列表信息对象
         """
         dept_result = (
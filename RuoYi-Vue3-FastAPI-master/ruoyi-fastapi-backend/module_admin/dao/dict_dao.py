@@ -62,13 +62,16 @@ class DictTypeDao:
         return list_format_datetime(dict_type_info)
 
     @classmethod
-    async def get_dict_type_list(cls, db: AsyncSession, query_object: DictTypePageQueryModel, is_page: bool = False):
+    async def get_dict_type_list(
+        cls, db: AsyncSession, query_object: DictTypePageQueryModel, is_page: bool = False, is_stream: bool = False
+    ):
         """
         根据查询参数获取字典类型列表信息
 
         :param db: orm对象
         :param query_object: 查询参数对象
         :param is_page: 是否开启分页
+        :param is_stream: 是否流式读取全量数据（导出时使用）
         :return: 字典类型列表信息对象
         """
         query = (
@@ -87,7 +90,9 @@ class DictTypeDao:
             .order_by(SysDictType.dict_id)
             .distinct()
         )
-        dict_type_list = await PageUtil.paginate(db, query, query_object.page_num, query_object.page_size, is_page)
+        dict_type_list = await PageUtil.paginate(
+            db, query, query_object.page_num, query_object.page_size, is_page, is_stream=is_stream
+        )
 
         return dict_type_list
 
@@ -175,13 +180,16 @@ class DictDataDao:
         return dict_data_info
 
     @classmethod
-    async def get_dict_data_list(cls, db: AsyncSession, query_object: DictDataPageQueryModel, is_page: bool = False):
+    async def get_dict_data_list(
+        cls, db: AsyncSession, query_object: DictDataPageQueryModel, is_page: bool = False, is_stream: bool = False
+    ):
         """
         根据查询参数获取字典数据列表信息
 
         :param db: orm对象
         :param query_object: 查询参数对象
         :param is_page: 是否开启分页
+        :param is_stream: 是否流式读取全量数据（导出时使用）
         :return: 字典数据列表信息对象
         """
         query = (
@@ -194,7 +202,9 @@ class DictDataDao:
             .order_by(SysDictData.dict_sort)
             .distinct()
         )
-        dict_data_list = await PageUtil.paginate(db, query, query_object.page_num, query_object.page_size, is_page)
+        dict_data_list = await PageUtil.paginate(
+            db, query, query_object.page_num, query_object.page_size, is_page, is_stream=is_stream
+        )
 
         return dict_data_list
 
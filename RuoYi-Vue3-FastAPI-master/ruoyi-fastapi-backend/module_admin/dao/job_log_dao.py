@@ -1,7 +1,7 @@
 from datetime import datetime, time
-from sqlalchemy import delete, desc, select
+from sqlalchemy import delete, desc, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
+from typing import List
 from module_admin.entity.do.job_do import SysJobLog
 from module_admin.entity.vo.job_vo import JobLogModel, JobLogPageQueryModel
 from utils.page_util import PageUtil
@@ -13,13 +13,16 @@ class JobLogDao:
     """
 
     @classmethod
-    async def get_job_log_list(cls, db: AsyncSession, query_object: JobLogPageQueryModel, is_page: bool = False):
+    async def get_job_log_list(
+        cls, db: AsyncSession, query_object: JobLogPageQueryModel, is_page: bool = False, is_stream: bool = False
+    ):
         """
         根据查询参数获取定时任务日志列表信息
 
         :param db: orm对象
         :param query_object: 查询参数对象
         :param is_page: 是否开启分页
+        :param is_stream: 是否流式读取全量数据（导出时使用）
         :return: 定时任务日志列表信息对象
         """
         query = (
@@ -38,12 +41,14 @@ class JobLogDao:
             .order_by(desc(SysJobLog.create_time))
             .distinct()
         )
-        job_log_list = await PageUtil.paginate(db, query, query_object.page_num, query_object.page_size, is_page)
+        job_log_list = await PageUtil.paginate(
+            db, query, query_object.page_num, query_object.page_size, is_page, is_stream=is_stream
+        )
 
         return job_log_list
 
     @classmethod
-    def add_job_log_dao(cls, db: Session, job_log: JobLogModel):
+    async def add_job_log_dao(cls, db: AsyncSession, job_log: JobLogModel):
         """
         新增定时任务日志数据库操作
 
@@ -53,10 +58,24 @@ class JobLogDao:
         """
         db_job_log = SysJobLog(**job_log.model_dump())
         db.add(db_job_log)
-        db.flush()
+        await db.flush()
 
         return db_job_log
 
+    @classmethod
+    async def add_job_logs_dao(cls, db: AsyncSession, job_log_list: List[JobLogModel]):
+        """
+        批量新增定时任务日志数据库操作（多行插入）
+
+        :param db: orm对象
+        :param job_log_list: 定时任务日志对象列表
+        :return:
+        """
+        if job_log_list:
+            await db.execute(
+                insert(SysJobLog), [job_log.model_dump(exclude={'job_log_id'}) for job_log in job_log_list]
+            )
+
     @classmethod
     async def delete_job_log_dao(cls, db: AsyncSession, job_log: JobLogModel):
         """
@@ -1,6 +1,7 @@
 from datetime import datetime, time
-from sqlalchemy import asc, delete, desc, select
+from sqlalchemy import asc, delete, desc, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
 from module_admin.entity.do.log_do import SysLogininfor, SysOperLog
 from module_admin.entity.vo.log_vo import LogininforModel, LoginLogPageQueryModel, OperLogModel, OperLogPageQueryModel
 from utils.common_util import SnakeCaseUtil
@@ -14,23 +15,38 @@ class OperationLogDao:
     """
 
     @classmethod
-    async def get_operation_log_list(cls, db: AsyncSession, query_object: OperLogPageQueryModel, is_page: bool = False):
+    async def get_operation_log_list(
+        cls, db: AsyncSession, query_object: OperLogPageQueryModel, is_page: bool = False, is_stream: bool = False
+    ):
         """
         根据查询参数获取操作日志列表信息
 
         :param db: orm对象
         :param query_object: 查询参数对象
         :param is_page: 是否开启分页
+        :param is_stream: 是否流式读取全量数据（导出时使用）
         :return: 操作日志列表信息对象
         """
+        # 排序字段均可为NULL，游标排序键先按是否为NULL分组；排序字段无效时不使用游标分页
         if query_object.is_asc == 'ascending':
-            order_by_column = asc(getattr(SysOperLog, SnakeCaseUtil.camel_to_snake(query_object.order_by_column), None))
+            sort_column = getattr(SysOperLog, SnakeCaseUtil.camel_to_snake(query_object.order_by_column), None)
+            order_by_column = asc(sort_column)
+            cursor_keys = (
+                [*PageUtil.nullable_cursor_keys(sort_column, False), (SysOperLog.oper_id, False)]
+                if sort_column is not None
+                else None
+            )
         elif query_object.is_asc == 'descending':
-            order_by_column = desc(
-                getattr(SysOperLog, SnakeCaseUtil.camel_to_snake(query_object.order_by_column), None)
+            sort_column = getattr(SysOperLog, SnakeCaseUtil.camel_to_snake(query_object.order_by_column), None)
+            order_by_column = desc(sort_column)
+            cursor_keys = (
+                [*PageUtil.nullable_cursor_keys(sort_column, True), (SysOperLog.oper_id, True)]
+                if sort_column is not None
+                else None
             )
         else:
             order_by_column = desc(SysOperLog.oper_time)
+            cursor_keys = [*PageUtil.nullable_cursor_keys(SysOperLog.oper_time, True), (SysOperLog.oper_id, True)]
         query = (
             select(SysOperLog)
             .where(
@@ -48,7 +64,17 @@ class OperationLogDao:
             .distinct()
             .order_by(order_by_column)
         )
-        operation_log_list = await PageUtil.paginate(db, query, query_object.page_num, query_object.page_size, is_page)
+        operation_log_list = await PageUtil.paginate(
+            db,
+            query,
+            query_object.page_num,
+            query_object.page_size,
+            is_page,
+            cursor=query_object.cursor,
+            cursor_keys=cursor_keys,
+            with_total=query_object.with_total,
+            is_stream=is_stream,
+        )
 
         return operation_log_list
 
@@ -67,6 +93,21 @@ class OperationLogDao:
 
         return db_operation_log
 
+    @classmethod
+    async def add_operation_logs_dao(cls, db: AsyncSession, operation_log_list: List[OperLogModel]):
+        """
+        批量新增操作日志数据库操作（多行插入）
+
+        :param db: orm对象
+        :param operation_log_list: 操作日志对象列表
+        :return:
+        """
+        if operation_log_list:
+            await db.execute(
+                insert(SysOperLog),
+                [operation_log.model_dump(exclude={'oper_id'}) for operation_log in operation_log_list],
+            )
+
     @classmethod
     async def delete_operation_log_dao(cls, db: AsyncSession, operation_log: OperLogModel):
         """
@@ -95,25 +136,38 @@ class LoginLogDao:
     """
 
     @classmethod
-    async def get_login_log_list(cls, db: AsyncSession, query_object: LoginLogPageQueryModel, is_page: bool = False):
+    async def get_login_log_list(
+        cls, db: AsyncSession, query_object: LoginLogPageQueryModel, is_page: bool = False, is_stream: bool = False
+    ):
         """
         根据查询参数获取登录日志列表信息
 
         :param db: orm对象
         :param query_object: 查询参数对象
         :param is_page: 是否开启分页
+        :param is_stream: 是否流式读取全量数据（导出时使用）
         :return: 登录日志列表信息对象
         """
+        # 排序字段均可为NULL，游标排序键先按是否为NULL分组；排序字段无效时不使用游标分页
         if query_object.is_asc == 'ascending':
-            order_by_column = asc(
-                getattr(SysLogininfor, SnakeCaseUtil.camel_to_snake(query_object.order_by_column), None)
+            sort_column = getattr(SysLogininfor, SnakeCaseUtil.camel_to_snake(query_object.order_by_column), None)
+            order_by_column = asc(sort_column)
+            cursor_keys = (
+                [*PageUtil.nullable_cursor_keys(sort_column, False), (SysLogininfor.info_id, False)]
+                if sort_column is not None
+                else None
             )
         elif query_object.is_asc == 'descending':
-            order_by_column = desc(
-                getattr(SysLogininfor, SnakeCaseUtil.camel_to_snake(query_object.order_by_column), None)
+            sort_column = getattr(SysLogininfor, SnakeCaseUtil.camel_to_snake(query_object.order_by_column), None)
+            order_by_column = desc(sort_column)
+            cursor_keys = (
+                [*PageUtil.nullable_cursor_keys(sort_column, True), (SysLogininfor.info_id, True)]
+                if sort_column is not None
+                else None
             )
         else:
             order_by_column = desc(SysLogininfor.login_time)
+            cursor_keys = [*PageUtil.nullable_cursor_keys(SysLogininfor.login_time, True), (SysLogininfor.info_id, True)]
         query = (
             select(SysLogininfor)
             .where(
@@ -130,7 +184,17 @@ class LoginLogDao:
             .distinct()
             .order_by(order_by_column)
         )
-        login_log_list = await PageUtil.paginate(db, query, query_object.page_num, query_object.page_size, is_page)
+        login_log_list = await PageUtil.paginate(
+            db,
+            query,
+            query_object.page_num,
+            query_object.page_size,
+            is_page,
+            cursor=query_object.cursor,
+            cursor_keys=cursor_keys,
+            with_total=query_object.with_total,
+            is_stream=is_stream,
+        )
 
         return login_log_list
 
@@ -149,6 +213,20 @@ class LoginLogDao:
 
         return db_login_log
 
+    @classmethod
+    async def add_login_logs_dao(cls, db: AsyncSession, login_log_list: List[LogininforModel]):
+        """
+        批量新增登录日志数据库操作（多行插入）
+
+        :param db: orm对象
+        :param login_log_list: 登录日志对象列表
+        :return:
+        """
+        if login_log_list:
+            await db.execute(
+                insert(SysLogininfor), [login_log.model_dump(exclude={'info_id'}) for login_log in login_log_list]
+            )
+
     @classmethod
     async def delete_login_log_dao(cls, db: AsyncSession, login_log: LogininforModel):
         """
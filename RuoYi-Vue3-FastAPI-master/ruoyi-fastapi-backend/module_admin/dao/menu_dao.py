@@ -1,10 +1,12 @@
 from sqlalchemy import and_, delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from module_admin.entity.do.menu_do import SysMenu
 from module_admin.entity.do.role_do import SysRole, SysRoleMenu
 from module_admin.entity.do.user_do import SysUserRole
 from module_admin.entity.do.sys_user_local_do import SysUserLocal
 from module_admin.entity.vo.menu_vo import MenuModel, MenuQueryModel
+from module_admin.service.menu_index_service import MenuIndexService
 
 
 class MenuDao:
@@ -13,88 +15,36 @@ class MenuDao:
     """
 
     @classmethod
-    async def _get_user_menus_with_parents(cls, db: AsyncSession, user_id: int, role_id_list: list):
+    async def _get_user_menus_with_parents(
+        cls, db: AsyncSession, user_id: int, role_id_list: list, user_enabled: Optional[bool] = None
+    ):
         """
         根据用户ID和角色列表获取用户菜单（包含父菜单）
         公共方法，用于提取重复的菜单查询逻辑
-        
+        菜单闭包来自进程内菜单索引（角色直接分配的菜单及其在用祖先菜单已预先计算），只做集合并集
+
         :param db: orm对象
         :param user_id: 用户id
         :param role_id_list: 角色ID列表
+        :param user_enabled: 用户是否为正常状态（为None时查询本地用户表）
         :return: 菜单列表（包含直接分配的菜单和它们的父菜单）
         """
         # 超级管理员返回所有菜单
-        if 1 in role_id_list:
-            return (
-                (await db.execute(select(SysMenu).where(SysMenu.status == '0').order_by(SysMenu.order_num).distinct()))
-                .scalars()
-                .all()
-            )
-        
-        # 1. 查询角色直接分配的菜单（使用内连接确保只返回角色实际分配的菜单）
-        directly_assigned_menus = (
-            (
-                await db.execute(
-                    select(SysMenu)
-                    .select_from(SysUserLocal)
-                    .where(SysUserLocal.user_id == user_id, SysUserLocal.enable == '1', SysUserLocal.status == '0')
-                    .join(SysUserRole, SysUserLocal.user_id == SysUserRole.user_id)
-                    .join(
-                        SysRole,
-                        and_(
-                            SysUserRole.role_id == SysRole.role_id, SysRole.status == '0', SysRole.del_flag == '0'
-                        ),
+        if 1 not in role_id_list:
+            if user_enabled is None:
+                user_enabled = (
+                    await db.execute(
+                        select(SysUserLocal.user_id).where(
+                            SysUserLocal.user_id == user_id, SysUserLocal.enable == '1', SysUserLocal.status == '0'
+                        )
                     )
-                    .join(SysRoleMenu, SysRole.role_id == SysRoleMenu.role_id)
-                    .join(SysMenu, and_(SysRoleMenu.menu_id == SysMenu.menu_id, SysMenu.status == '0'))
-                    .order_by(SysMenu.order_num)
-                    .distinct()
-                )
-            )
-            .scalars()
-            .all()
-        )
-        
-        # 2. 获取所有直接分配的菜单ID
-        assigned_menu_ids = {menu.menu_id for menu in directly_assigned_menus}
-        
-        if not assigned_menu_ids:
-            return []
-        
-        # 3. 递归获取所有父菜单ID
-        def get_all_parents(menu_id: int, all_menus: list) -> set:
-            """递归获取所有父菜单ID"""
-            parent_ids = set()
-            for menu in all_menus:
-                if menu.menu_id == menu_id and menu.parent_id and menu.parent_id != 0:
-                    parent_ids.add(menu.parent_id)
-                    parent_ids.update(get_all_parents(menu.parent_id, all_menus))
-            return parent_ids
-        
-        # 4. 查询所有在用菜单（用于查找父菜单）
-        all_menus = (
-            (await db.execute(select(SysMenu).where(SysMenu.status == '0').order_by(SysMenu.order_num).distinct()))
-            .scalars()
-            .all()
-        )
-        
-        # 5. 对于每个直接分配的菜单，查找其所有父菜单
-        final_menu_ids = set(assigned_menu_ids)
-        for menu_id in assigned_menu_ids:
-            parent_ids = get_all_parents(menu_id, all_menus)
-            final_menu_ids.update(parent_ids)
-        
-        # 6. 查询最终的菜单列表（包含直接分配的菜单和它们的父菜单）
-        return (
-            (await db.execute(
-                select(SysMenu)
-                .where(SysMenu.menu_id.in_(final_menu_ids), SysMenu.status == '0')
-                .order_by(SysMenu.order_num)
-                .distinct()
-            ))
-            .scalars()
-            .all()
-        )
+                ).scalar() is not None
+            if not user_enabled:
+                return []
+
+        menu_index = await MenuIndexService.get_index()
+
+        return menu_index.get_menus_for_roles(role_id_list)
 
     @classmethod
     async def get_menu_detail_by_id(cls, db: AsyncSession, menu_id: int):
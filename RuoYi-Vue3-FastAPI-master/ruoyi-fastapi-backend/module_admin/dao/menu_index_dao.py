@@ -0,0 +1,45 @@
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from module_admin.entity.do.menu_do import SysMenu
+from module_admin.entity.do.role_do import SysRole, SysRoleMenu
+
+
+class MenuIndexDao:
+    """
+    菜单索引数据库操作层
+    """
+
+    @classmethod
+    async def get_all_enabled_menus(cls, db: AsyncSession):
+        """
+        获取全部在用菜单（按显示顺序排序）
+
+        :param db: orm对象
+        :return: 菜单列表
+        """
+        menu_list = (
+            (await db.execute(select(SysMenu).where(SysMenu.status == '0').order_by(SysMenu.order_num)))
+            .scalars()
+            .all()
+        )
+
+        return menu_list
+
+    @classmethod
+    async def get_enabled_role_menu_rows(cls, db: AsyncSession):
+        """
+        获取全部在用角色的角色菜单关联
+
+        :param db: orm对象
+        :return: (role_id, menu_id)行列表
+        """
+        role_menu_rows = (
+            await db.execute(
+                select(SysRoleMenu.role_id, SysRoleMenu.menu_id).join(
+                    SysRole,
+                    and_(SysRoleMenu.role_id == SysRole.role_id, SysRole.status == '0', SysRole.del_flag == '0'),
+                )
+            )
+        ).all()
+
+        return role_menu_rows
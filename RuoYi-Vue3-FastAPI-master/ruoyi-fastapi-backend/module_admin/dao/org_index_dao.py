@@ -0,0 +1,76 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from module_admin.entity.do.oa_department_do import OaDepartment
+from module_admin.entity.do.oa_employee_primary_do import OaEmployeePrimary
+from module_admin.entity.do.oa_rank_do import OaRank
+
+
+class OrgIndexDao:
+    """
+    组织架构索引数据库操作层（只查询构建索引所需的列）
+    """
+
+    @classmethod
+    async def get_all_employee_rows(cls, db: AsyncSession):
+        """
+        获取全部员工的索引列
+
+        :param db: orm对象
+        :return: 员工行列表
+        """
+        employee_rows = (
+            await db.execute(
+                select(
+                    OaEmployeePrimary.id,
+                    OaEmployeePrimary.name,
+                    OaEmployeePrimary.job_number,
+                    OaEmployeePrimary.organization_id,
+                    OaEmployeePrimary.rank_id,
+                    OaEmployeePrimary.company_id,
+                    OaEmployeePrimary.status,
+                    OaEmployeePrimary.enable,
+                ).order_by(OaEmployeePrimary.id)
+            )
+        ).all()
+
+        return employee_rows
+
+    @classmethod
+    async def get_all_dept_rows(cls, db: AsyncSession):
+        """
+        获取全部部门（编制）的索引列
+
+        :param db: orm对象
+        :return: 部门行列表
+        """
+        dept_rows = (
+            await db.execute(
+                select(
+                    OaDepartment.id,
+                    OaDepartment.name,
+                    OaDepartment.code,
+                    OaDepartment.parent_id,
+                    OaDepartment.rank_id,
+                    OaDepartment.status,
+                    OaDepartment.enable,
+                ).order_by(OaDepartment.id)
+            )
+        ).all()
+
+        return dept_rows
+
+    @classmethod
+    async def get_all_rank_rows(cls, db: AsyncSession):
+        """
+        获取全部职级的索引列
+
+        :param db: orm对象
+        :return: 职级行列表
+        """
+        rank_rows = (
+            await db.execute(
+                select(OaRank.id, OaRank.rank_name, OaRank.rank_code, OaRank.enable).order_by(OaRank.id)
+            )
+        ).all()
+
+        return rank_rows
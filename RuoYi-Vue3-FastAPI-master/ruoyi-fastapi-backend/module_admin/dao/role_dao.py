@@ -1,15 +1,14 @@
 from datetime import datetime, time
 from sqlalchemy import and_, delete, desc, func, or_, select, update  # noqa: F401
 from sqlalchemy.ext.asyncio import AsyncSession
-from module_admin.entity.do.oa_department_do import OaDepartment  # noqa: F401
-from module_admin.entity.do.oa_employee_primary_do import OaEmployeePrimary  # noqa: F401
+from module_admin.entity.do.oa_department_do import OaDepartment
+from module_admin.entity.do.oa_employee_primary_do import OaEmployeePrimary
 from module_admin.entity.do.menu_do import SysMenu
-from module_admin.entity.do.role_do import SysRole, SysRoleMenu, SysRoleDept  # noqa: F401
-from module_admin.entity.do.sys_user_local_do import SysUserLocal  # noqa: F401
+from module_admin.entity.do.role_do import SysRole, SysRoleMenu, SysRoleDept
+from module_admin.entity.do.sys_user_local_do import SysUserLocal
 from module_admin.entity.do.user_do import SysUserRole
-# 确保在 eval() 执行时这些类可以被访问
-# 这些导入是为了在 data_scope.py 生成的 SQL 字符串中使用
 from module_admin.entity.vo.role_vo import RoleDeptModel, RoleMenuModel, RoleModel, RolePageQueryModel
+from module_admin.utils.data_scope_util import DataScope
 from utils.page_util import PageUtil
 
 
@@ -130,14 +129,14 @@ class RoleDao:
 
     @classmethod
     async def get_role_list(
-        cls, db: AsyncSession, query_object: RolePageQueryModel, data_scope_sql: str, is_page: bool = False
+        cls, db: AsyncSession, query_object: RolePageQueryModel, data_scope: DataScope, is_page: bool = False
     ):
         """
         根据查询参数获取角色列表信息
 
         :param db: orm对象
         :param query_object: 查询参数对象
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :param is_page: 是否开启分页
         :return: 角色列表信息对象
         """
@@ -178,20 +177,10 @@ class RoleDao:
                 else True,
             )
         )
-        # 数据权限过滤：修改 SQL 字符串中的表名引用
-        # data_scope_sql 中使用的是 query_alias（'OaDepartment'），需要替换为实际的表对象
-        if data_scope_sql:
-            # 将 SQL 字符串中的 'OaDepartment' 替换为实际的表对象
-            # 例如：'OaDepartment.id == 1' → 'OaDepartment.id == 1'（OaDepartment 已经在环境中）
-            try:
-                # 确保 eval 执行环境中可以访问到 OaDepartment
-                data_scope_condition = eval(data_scope_sql)
-                query = query.where(data_scope_condition)
-            except Exception as e:
-                # 如果 eval 失败，记录错误但不中断查询（可能是权限配置问题）
-                from utils.log_util import logger
-                logger.warning(f'角色列表数据权限过滤失败: {str(e)}, data_scope_sql={data_scope_sql}')
-        
+        # 数据权限过滤：条件基于部门表（OaDepartment）
+        if data_scope is not None:
+            query = query.where(data_scope.get_condition())
+
         query = query.order_by(SysRole.role_sort).distinct()
         role_list = await PageUtil.paginate(db, query, query_object.page_num, query_object.page_size, is_page)
 
@@ -87,7 +87,7 @@ class SyncDao:
             default_password = '123456'  # 默认密码
         
         # 加密密码
-        hashed_password = PwdUtil.get_password_hash(default_password)
+        hashed_password = await PwdUtil.get_password_hash_async(default_password)
         
         # 创建本地用户对象
         local_user = SysUserLocal(
@@ -1,8 +1,12 @@
 import math
-import re
 from datetime import datetime, time
 from sqlalchemy import and_, delete, desc, func, or_, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Bundle
+from typing import AsyncIterator, List
+from config.database import AsyncSessionLocal
+from middlewares.trace_middleware import traced
 from module_admin.entity.do.menu_do import SysMenu
 from module_admin.entity.do.oa_department_do import OaDepartment  # noqa: F401
 from module_admin.entity.do.oa_employee_primary_do import OaEmployeePrimary
@@ -19,6 +23,7 @@ from module_admin.entity.vo.user_vo import (
     UserRolePageQueryModel,
     UserRoleQueryModel,
 )
+from module_admin.utils.data_scope_util import DataScope
 from utils.page_util import PageUtil, PageResponseModel
 
 
@@ -225,6 +230,7 @@ class UserDao:
         return MappedUser(user_basic_info_dict) if user_basic_info_dict else None
 
     @classmethod
+    @traced()
     async def get_user_by_id(cls, db: AsyncSession, user_id: int):
         """
         根据user_id获取用户信息
@@ -404,7 +410,9 @@ class UserDao:
         # 2. 如果子菜单被分配了，会自动包含其父菜单（用于构建树形结构）
         role_id_list = [item.role_id for item in query_user_role_info]
         from module_admin.dao.menu_dao import MenuDao
-        query_user_menu_info = await MenuDao._get_user_menus_with_parents(db, user_id, role_id_list)
+        query_user_menu_info = await MenuDao._get_user_menus_with_parents(
+            db, user_id, role_id_list, user_enabled=query_user_local.status == '0'
+        )
 
         results = dict(
             user_basic_info=query_user_basic_info,
@@ -431,17 +439,25 @@ class UserDao:
 
     @classmethod
     async def get_user_list(
-        cls, db: AsyncSession, query_object: UserPageQueryModel, data_scope_sql: str, is_page: bool = False
+        cls,
+        db: AsyncSession,
+        query_object: UserPageQueryModel,
+        data_scope: DataScope,
+        is_page: bool = False,
+        is_stream: bool = False,
     ):
         """
         根据查询参数获取用户列表信息
-        从真实员工表开始查询，LEFT JOIN 本地用户表、部门表、职级表和角色表
+        分两阶段查询：先按查询条件分页获取用户ID（从真实员工表开始，关联本地用户表），
+        再为当前页的用户一次查询部门、职级及角色信息
 
         :param db: orm对象
         :param query_object: 查询参数对象
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :param is_page: 是否开启分页
-        :return: 用户列表信息对象（返回格式：PageResponseModel 或列表）
+        :param is_stream: 是否流式读取全量数据（导出时使用）
+        :return: 用户列表信息对象（PageResponseModel、查询结果行列表或分批返回查询结果行的异步生成器，
+                 查询结果行格式见 get_user_list_rows_by_ids）
         """
         # 构建基础查询条件（从真实员工表开始）
         # 只查询 company_id=2 且 enable='1' 的员工
@@ -506,9 +522,11 @@ class UserDao:
                 conditions.append(OaEmployeePrimary.sex == '2')  # 真实表的"女"
             # 系统框架的"未知"在真实表中没有对应，不添加条件
         
-        # 构建查询：从真实员工表开始，LEFT JOIN 本地用户表、部门表、职级表和角色表
+        # 第一阶段：只查询分页所需的用户ID（员工表 INNER JOIN 本地用户表，没有登录账户的员工不展示）
+        # 不再关联角色表，一个用户多个角色不会占用多个分页位置，总数查询也不需要去重
         query = (
-            select(OaEmployeePrimary, SysUserLocal, OaDepartment, OaRank, SysRole)
+            select(SysUserLocal.user_id)
+            .select_from(OaEmployeePrimary)
             .where(*conditions)
             .join(
                 SysUserLocal,
@@ -516,90 +534,28 @@ class UserDao:
                     OaEmployeePrimary.id == SysUserLocal.employee_id,
                     SysUserLocal.enable == '1',  # 只查询启用的本地用户
                 ),
-                isouter=True,  # LEFT JOIN，因为可能没有登录账户
-            )
-            .join(
-                OaDepartment,
-                and_(
-                    OaEmployeePrimary.organization_id == OaDepartment.id,
-                    OaDepartment.enable == '1',
-                ),
-                isouter=True,  # LEFT JOIN，因为可能没有部门
-            )
-            .join(
-                OaRank,
-                # 只要能找到对应职级就返回名称，不再按 enable 过滤，避免等级名称为空
-                OaEmployeePrimary.rank_id == OaRank.id,
-                isouter=True,  # LEFT JOIN，因为可能没有职级
-            )
-            .join(
-                SysUserRole,
-                SysUserLocal.user_id == SysUserRole.user_id,
-                isouter=True,  # LEFT JOIN，因为可能没有角色
-            )
-            .join(
-                SysRole,
-                and_(
-                    SysUserRole.role_id == SysRole.role_id,
-                    SysRole.status == '0',  # 只查询正常状态的角色
-                    SysRole.del_flag == '0',  # 只查询未删除的角色
-                ),
-                isouter=True,  # LEFT JOIN，因为可能没有角色
             )
         )
         
         if query_object.begin_time and query_object.end_time:
             begin_datetime = datetime.combine(datetime.strptime(query_object.begin_time, '%Y-%m-%d'), time(00, 00, 00))
             end_datetime = datetime.combine(datetime.strptime(query_object.end_time, '%Y-%m-%d'), time(23, 59, 59))
-            # 使用本地用户表的创建时间，如果没有则使用员工表的创建时间
-            query = query.where(
-                or_(
-                    SysUserLocal.create_time.between(begin_datetime, end_datetime),
-                    and_(SysUserLocal.user_id.is_(None), OaEmployeePrimary.gmt_create_time.between(begin_datetime, end_datetime))
-                )
-            )
+            # 使用本地用户表的创建时间
+            query = query.where(SysUserLocal.create_time.between(begin_datetime, end_datetime))
         
         # 处理 user_id 查询条件（如果传了 user_id，需要通过本地用户表查询）
         if query_object.user_id is not None:
             query = query.where(SysUserLocal.user_id == query_object.user_id)
         
         # 数据权限过滤（需要在JOIN之后，在所有新增查询条件之前）
-        # 注意：data_scope_sql 中使用的是空字符串作为 query_alias，'organization_id' 作为 dept_alias
-        # 实际查询中，部门信息在 OaEmployeePrimary.organization_id，用户ID在 SysUserLocal.user_id
-        # 需要将 data_scope_sql 中的字段名替换为实际的查询路径
-        if data_scope_sql:
-            # 替换 data_scope_sql 中的字段引用
-            # '.organization_id' 或 '.dept_id' -> 'OaEmployeePrimary.organization_id'
-            # '.user_id' -> 'SysUserLocal.user_id'
-            modified_sql = data_scope_sql.replace('.organization_id', 'OaEmployeePrimary.organization_id')
-            modified_sql = modified_sql.replace('.dept_id', 'OaEmployeePrimary.organization_id')
-            modified_sql = modified_sql.replace('.user_id', 'SysUserLocal.user_id')
-            
-            # 修复 hasattr 检查：当 query_alias 是空字符串时，hasattr(, 'field') 会失败
-            # 使用正则表达式匹配所有 hasattr(, 'field_name') 模式并替换
-            def replace_hasattr(match):
-                field_name = match.group(1)
-                # 根据字段名决定使用哪个模型
-                if field_name in ('organization_id', 'dept_id'):
-                    return f"hasattr(OaEmployeePrimary, '{field_name}')"
-                elif field_name == 'user_id':
-                    return f"hasattr(SysUserLocal, '{field_name}')"
-                else:
-                    # 默认使用 OaEmployeePrimary（部门相关字段）
-                    return f"hasattr(OaEmployeePrimary, '{field_name}')"
-            
-            # 匹配 hasattr(, 'field_name') 模式
-            modified_sql = re.sub(r"hasattr\(\s*,\s*'([^']+)'\)", replace_hasattr, modified_sql)
-            
-            try:
-                data_scope_condition = eval(modified_sql)
-                query = query.where(data_scope_condition)
-            except Exception as e:
-                # 如果替换后的 SQL 无法执行，记录错误但不影响查询
-                from utils.log_util import logger
-                logger.warning(f'数据权限过滤失败: {str(e)}, SQL: {modified_sql}')
-                pass
-        
+        # 部门信息在 OaEmployeePrimary.organization_id，用户ID在 SysUserLocal.user_id
+        if data_scope is not None:
+            query = query.where(
+                data_scope.get_condition(
+                    dept_column=OaEmployeePrimary.organization_id, user_column=SysUserLocal.user_id
+                )
+            )
+
         # 添加额外的查询条件（需要在数据权限过滤之后，确保只在自己权限范围内查询）
         if query_object.status:
             # status 查询条件：使用本地用户表的 status（0正常,1停用）
@@ -608,22 +564,147 @@ class UserDao:
             elif query_object.status == '1':  # 查询停用状态
                 query = query.where(SysUserLocal.status == '1')
         
-        # 角色ID查询条件（需要在数据权限过滤之后）
+        # 角色ID查询条件使用 EXISTS，不展开角色行
         if query_object.role_id:
-            query = query.where(SysRole.role_id == query_object.role_id)
+            query = query.where(
+                select(SysUserRole.user_id)
+                .join(SysRole, SysUserRole.role_id == SysRole.role_id)
+                .where(
+                    SysUserRole.user_id == SysUserLocal.user_id,
+                    SysRole.role_id == query_object.role_id,
+                    SysRole.status == '0',
+                    SysRole.del_flag == '0',
+                )
+                .exists()
+            )
         
-        # 排序：使用员工ID排序
-        query = query.order_by(OaEmployeePrimary.id).distinct()
+        # 排序：使用员工ID排序（同一员工存在多个本地用户时按用户ID排序）
+        query = query.order_by(OaEmployeePrimary.id, SysUserLocal.user_id)
         
         # 注意：管理员账户（employee_id=0）不在真实员工表中，所以不会出现在查询结果中
         # 如果需要显示管理员账户，需要在 Service 层单独处理或使用 UNION 查询
         
-        # 使用 PageUtil.paginate，保持与框架原有逻辑一致
-        # 它会自动调用 CamelCaseUtil.transform_result 转换数据
-        # 返回格式：PageResponseModel(rows=[转换后的数据], ...)
-        # 对于 select(A, B, C) 多列查询，Row 对象经过 transform_result 后，会转换为列表 [dict1, dict2, dict3]
-        # 直接返回，让 Service 层处理转换（保持与原有逻辑一致）
-        return await PageUtil.paginate(db, query, query_object.page_num, query_object.page_size, is_page)
+        if is_stream:
+            return cls._stream_user_list_rows(query)
+        # 游标分页按员工ID、用户ID定位（与排序一致）
+        user_id_page = await PageUtil.paginate(
+            db,
+            query,
+            query_object.page_num,
+            query_object.page_size,
+            is_page,
+            cursor=query_object.cursor,
+            cursor_keys=[(OaEmployeePrimary.id, False), (SysUserLocal.user_id, False)],
+            with_total=query_object.with_total,
+        )
+        # 第二阶段：只为当前页的用户查询展示所需字段及角色
+        if is_page:
+            user_id_page.rows = await cls.get_user_list_rows_by_ids(db, user_id_page.rows)
+            return user_id_page
+        return await cls.get_user_list_rows_by_ids(db, user_id_page)
+
+    @classmethod
+    async def get_user_list_rows_by_ids(cls, db: AsyncSession, user_ids: List[int]) -> List[Row]:
+        """
+        根据用户ID列表一次查询用户列表展示所需的字段及角色
+        每行按实体分组为 (employee, user_local, dept, rank, role) 五个Bundle，一个用户有多个角色时返回相邻的多行
+
+        :param db: orm对象
+        :param user_ids: 用户ID列表
+        :return: 查询结果行列表（按员工ID、用户ID排序）
+        """
+        if not user_ids:
+            return []
+        query = (
+            select(
+                Bundle(
+                    'employee',
+                    OaEmployeePrimary.organization_id,
+                    OaEmployeePrimary.job_number,
+                    OaEmployeePrimary.name,
+                    OaEmployeePrimary.phone,
+                    OaEmployeePrimary.sex,
+                    OaEmployeePrimary.avatar_image,
+                    OaEmployeePrimary.gmt_create_by,
+                    OaEmployeePrimary.gmt_create_time,
+                    OaEmployeePrimary.gmt_modify_by,
+                    OaEmployeePrimary.gmt_modify_time,
+                ),
+                Bundle(
+                    'user_local',
+                    SysUserLocal.user_id,
+                    SysUserLocal.job_number,
+                    SysUserLocal.status,
+                    SysUserLocal.enable,
+                    SysUserLocal.login_ip,
+                    SysUserLocal.login_date,
+                    SysUserLocal.pwd_update_date,
+                    SysUserLocal.create_by,
+                    SysUserLocal.create_time,
+                    SysUserLocal.update_by,
+                    SysUserLocal.update_time,
+                    SysUserLocal.remark,
+                ),
+                Bundle(
+                    'dept',
+                    OaDepartment.id,
+                    OaDepartment.name,
+                    OaDepartment.parent_id,
+                    OaDepartment.sort_no,
+                    OaDepartment.status,
+                    OaDepartment.enable,
+                    OaDepartment.gmt_create_by,
+                    OaDepartment.gmt_create_time,
+                    OaDepartment.gmt_modify_by,
+                    OaDepartment.gmt_modify_time,
+                ),
+                Bundle('rank', OaRank.id, OaRank.rank_name),
+                Bundle('role', SysRole.role_id, SysRole.role_name),
+            )
+            .select_from(SysUserLocal)
+            .join(OaEmployeePrimary, OaEmployeePrimary.id == SysUserLocal.employee_id)
+            .join(
+                OaDepartment,
+                and_(
+                    OaEmployeePrimary.organization_id == OaDepartment.id,
+                    OaDepartment.enable == '1',
+                ),
+                isouter=True,  # LEFT JOIN，因为可能没有部门
+            )
+            .join(
+                OaRank,
+                # 只要能找到对应职级就返回名称，不再按 enable 过滤，避免等级名称为空
+                OaEmployeePrimary.rank_id == OaRank.id,
+                isouter=True,  # LEFT JOIN，因为可能没有职级
+            )
+            .join(SysUserRole, SysUserLocal.user_id == SysUserRole.user_id, isouter=True)
+            .join(
+                SysRole,
+                and_(
+                    SysUserRole.role_id == SysRole.role_id,
+                    SysRole.status == '0',  # 只查询正常状态的角色
+                    SysRole.del_flag == '0',  # 只查询未删除的角色
+                ),
+                isouter=True,  # LEFT JOIN，因为可能没有角色
+            )
+            .where(SysUserLocal.user_id.in_(user_ids))
+            .order_by(OaEmployeePrimary.id, SysUserLocal.user_id, SysRole.role_sort)
+        )
+
+        return list((await db.execute(query)).all())
+
+    @classmethod
+    async def _stream_user_list_rows(cls, query) -> AsyncIterator[List[Row]]:
+        """
+        流式读取用户ID后分批查询用户列表展示所需的字段及角色（同一用户的角色不会被拆分到两批）
+
+        :param query: 第一阶段的用户ID查询语句
+        :return: 分批返回查询结果行的异步生成器
+        """
+        # 流式读取占用一个连接，第二阶段查询使用另一个独立会话
+        async with AsyncSessionLocal() as session:
+            async for user_ids in PageUtil.stream(query):
+                yield await cls.get_user_list_rows_by_ids(session, user_ids)
 
     @classmethod
     async def add_user_dao(cls, db: AsyncSession, user: UserModel):
@@ -677,7 +758,11 @@ class UserDao:
         # 3. 创建新的本地用户记录
         default_password = user.password if user.password else '123456'
         # 检查密码是否已加密（bcrypt 加密的密码以 $2b$ 开头）
-        hashed_password = default_password if default_password.startswith('$2b$') else PwdUtil.get_password_hash(default_password)
+        hashed_password = (
+            default_password
+            if default_password.startswith('$2b$')
+            else await PwdUtil.get_password_hash_async(default_password)
+        )
         
         local_user = SysUserLocal(
             employee_id=employee.id,
@@ -784,7 +869,7 @@ class UserDao:
 
     @classmethod
     async def get_user_role_allocated_list_by_role_id(
-        cls, db: AsyncSession, query_object: UserRolePageQueryModel, data_scope_sql: str, is_page: bool = False
+        cls, db: AsyncSession, query_object: UserRolePageQueryModel, data_scope: DataScope, is_page: bool = False
     ):
         """
         根据角色id获取已分配的用户列表信息
@@ -792,7 +877,7 @@ class UserDao:
 
         :param db: orm对象
         :param query_object: 用户角色查询对象
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :param is_page: 是否开启分页
         :return: 角色已分配的用户列表信息
         """
@@ -847,14 +932,12 @@ class UserDao:
         )
         
         # 数据权限过滤
-        if data_scope_sql:
-            modified_sql = data_scope_sql.replace('.organization_id', 'OaEmployeePrimary.organization_id')
-            modified_sql = modified_sql.replace('.user_id', 'SysUserLocal.user_id')
-            try:
-                data_scope_condition = eval(modified_sql)
-                query = query.where(data_scope_condition)
-            except Exception:
-                pass
+        if data_scope is not None:
+            query = query.where(
+                data_scope.get_condition(
+                    dept_column=OaEmployeePrimary.organization_id, user_column=SysUserLocal.user_id
+                )
+            )
         
         query = query.order_by(OaEmployeePrimary.id).distinct()
         
@@ -864,7 +947,7 @@ class UserDao:
 
     @classmethod
     async def get_user_role_unallocated_list_by_role_id(
-        cls, db: AsyncSession, query_object: UserRolePageQueryModel, data_scope_sql: str, is_page: bool = False
+        cls, db: AsyncSession, query_object: UserRolePageQueryModel, data_scope: DataScope, is_page: bool = False
     ):
         """
         根据角色id获取未分配的用户列表信息
@@ -872,7 +955,7 @@ class UserDao:
 
         :param db: orm对象
         :param query_object: 用户角色查询对象
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :param is_page: 是否开启分页
         :return: 角色未分配的用户列表信息
         """
@@ -934,14 +1017,12 @@ class UserDao:
         )
         
         # 数据权限过滤
-        if data_scope_sql:
-            modified_sql = data_scope_sql.replace('.organization_id', 'OaEmployeePrimary.organization_id')
-            modified_sql = modified_sql.replace('.user_id', 'SysUserLocal.user_id')
-            try:
-                data_scope_condition = eval(modified_sql)
-                query = query.where(data_scope_condition)
-            except Exception:
-                pass
+        if data_scope is not None:
+            query = query.where(
+                data_scope.get_condition(
+                    dept_column=OaEmployeePrimary.organization_id, user_column=SysUserLocal.user_id
+                )
+            )
         
         query = query.order_by(OaEmployeePrimary.id).distinct()
         
@@ -76,6 +76,8 @@ class OperLogPageQueryModel(OperLogQueryModel):
 
     page_num: int = Field(default=1, description='当前页码')
     page_size: int = Field(default=10, description='每页记录数')
+    cursor: Optional[str] = Field(default=None, description='游标分页的游标（传空字符串查询第一页，不传使用页码分页）')
+    with_total: bool = Field(default=False, description='游标分页时是否返回总数')
 
 
 class DeleteOperLogModel(BaseModel):
@@ -109,6 +111,8 @@ class LoginLogPageQueryModel(LoginLogQueryModel):
 
     page_num: int = Field(default=1, description='当前页码')
     page_size: int = Field(default=10, description='每页记录数')
+    cursor: Optional[str] = Field(default=None, description='游标分页的游标（传空字符串查询第一页，不传使用页码分页）')
+    with_total: bool = Field(default=False, description='游标分页时是否返回总数')
 
 
 class DeleteLoginLogModel(BaseModel):
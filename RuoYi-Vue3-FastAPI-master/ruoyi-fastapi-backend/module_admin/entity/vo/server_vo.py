@@ -53,6 +53,29 @@ class SysFiles(BaseModel):
     usage: Optional[str] = Field(default=None, description='资源的使用率')
 
 
+class ServerMetricSample(BaseModel):
+    """
+    服务监控采样点对应pydantic模型
+    """
+
+    model_config = ConfigDict(alias_generator=to_camel)
+
+    sample_time: Optional[str] = Field(default=None, description='采样时间')
+    cpu_used: Optional[float] = Field(default=None, description='CPU用户使用率')
+    cpu_sys: Optional[float] = Field(default=None, description='CPU系统使用率')
+    mem_usage: Optional[float] = Field(default=None, description='内存使用率')
+    disk_usage: Optional[float] = Field(default=None, description='磁盘最高使用率')
+    process_rss: Optional[int] = Field(default=None, description='进程常驻内存（字节）')
+    loop_lag: Optional[float] = Field(default=None, description='事件循环延迟（毫秒）')
+    db_pool_size: Optional[int] = Field(default=None, description='数据库连接池大小')
+    db_pool_checked_out: Optional[int] = Field(default=None, description='数据库连接池已借出连接数')
+    db_pool_overflow: Optional[int] = Field(default=None, description='数据库连接池溢出连接数')
+    redis_pool_in_use: Optional[int] = Field(default=None, description='Redis连接池使用中连接数')
+    redis_pool_available: Optional[int] = Field(default=None, description='Redis连接池空闲连接数')
+    pwd_hash_pending: Optional[int] = Field(default=None, description='密码计算排队数量')
+    pwd_hash_rejected: Optional[int] = Field(default=None, description='密码计算累计拒绝数量')
+
+
 class ServerMonitorModel(BaseModel):
     """
     服务监控对应pydantic模型
@@ -65,3 +88,5 @@ class ServerMonitorModel(BaseModel):
     mem: Optional[MemoryInfo] = Field(description='內存相关信息')
     sys: Optional[SysInfo] = Field(description='服务器相关信息')
     sys_files: Optional[List[SysFiles]] = Field(description='磁盘相关信息')
+    metrics: Optional[ServerMetricSample] = Field(default=None, description='最新采样点')
+    history: Optional[List[ServerMetricSample]] = Field(default=None, description='采样时间序列')
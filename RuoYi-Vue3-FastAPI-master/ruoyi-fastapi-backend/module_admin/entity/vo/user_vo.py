@@ -173,6 +173,8 @@ class UserPageQueryModel(UserQueryModel):
 
     page_num: int = Field(default=1, description='当前页码')
     page_size: int = Field(default=10, description='每页记录数')
+    cursor: Optional[str] = Field(default=None, description='游标分页的游标（传空字符串查询第一页，不传使用页码分页）')
+    with_total: bool = Field(default=False, description='游标分页时是否返回总数')
     job_number: Optional[str] = Field(default=None, description='工号查询')
     employee_name: Optional[str] = Field(default=None, description='员工姓名查询')
     rank_id: Optional[int] = Field(default=None, description='级别ID查询')
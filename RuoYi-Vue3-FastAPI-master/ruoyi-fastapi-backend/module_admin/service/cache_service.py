@@ -4,6 +4,7 @@ from config.get_redis import RedisUtil
 from module_admin.entity.vo.cache_vo import CacheInfoModel, CacheMonitorModel
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from exceptions.exception import ServiceException
+from utils.redis_util import RedisKeyUtil
 
 
 class CacheService:
@@ -80,8 +81,8 @@ class CacheService:
         :param cache_name: 缓存名称
         :return: 缓存键名列表信息
         """
-        cache_keys = await request.app.state.redis.keys(f'{cache_name}*')
-        cache_key_list = [key.split(':', 1)[1] for key in cache_keys if key.startswith(f'{cache_name}:')]
+        cache_keys = await RedisKeyUtil.scan_keys(request.app.state.redis, f'{cache_name}:*')
+        cache_key_list = [key.split(':', 1)[1] for key in cache_keys]
 
         return cache_key_list
 
@@ -113,9 +114,7 @@ class CacheService:
         cls._validate_cache_name(cache_name)
         
         # 只清除以指定前缀开头的key，确保只操作本项目的缓存
-        cache_keys = await request.app.state.redis.keys(f'{cache_name}:*')
-        if cache_keys:
-            await request.app.state.redis.delete(*cache_keys)
+        await RedisKeyUtil.unlink_by_pattern(request.app.state.redis, f'{cache_name}:*')
 
         return CrudResponseModel(is_success=True, message=f'{cache_name}对应键值清除成功')
 
@@ -132,17 +131,9 @@ class CacheService:
         # 获取本项目使用的所有key前缀
         key_prefixes = cls._get_project_key_prefixes()
         
-        # 只在本项目定义的key前缀下查找匹配的key
-        all_matched_keys = []
+        # 只在本项目定义的key前缀下查找匹配的key，边遍历边删除
         for prefix in key_prefixes:
-            pattern = f'{prefix}:*{cache_key}*'
-            matched_keys = await request.app.state.redis.keys(pattern)
-            all_matched_keys.extend(matched_keys)
-        
-        # 去重
-        unique_keys = list(set(all_matched_keys))
-        if unique_keys:
-            await request.app.state.redis.delete(*unique_keys)
+            await RedisKeyUtil.unlink_by_pattern(request.app.state.redis, f'{prefix}:*{cache_key}*')
 
         return CrudResponseModel(is_success=True, message=f'{cache_key}清除成功')
 
@@ -158,17 +149,9 @@ class CacheService:
         # 获取本项目使用的所有key前缀
         key_prefixes = cls._get_project_key_prefixes()
         
-        # 只清除本项目定义的key前缀下的所有key
-        all_keys = []
+        # 只清除本项目定义的key前缀下的所有key，边遍历边删除
         for prefix in key_prefixes:
-            pattern = f'{prefix}:*'
-            matched_keys = await request.app.state.redis.keys(pattern)
-            all_keys.extend(matched_keys)
-        
-        # 去重并删除
-        unique_keys = list(set(all_keys))
-        if unique_keys:
-            await request.app.state.redis.delete(*unique_keys)
+            await RedisKeyUtil.unlink_by_pattern(request.app.state.redis, f'{prefix}:*')
 
         # 重新初始化系统字典和配置缓存
         await RedisUtil.init_sys_dict(request.app.state.redis)
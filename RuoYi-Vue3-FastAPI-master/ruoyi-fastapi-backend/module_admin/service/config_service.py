@@ -1,6 +1,6 @@
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Dict
 from config.constant import CommonConstant
 from config.enums import RedisInitKeyConfig
 from exceptions.exception import ServiceException
@@ -9,6 +9,7 @@ from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.config_vo import ConfigModel, ConfigPageQueryModel, DeleteConfigModel
 from utils.common_util import CamelCaseUtil
 from utils.excel_util import ExcelUtil
+from utils.redis_util import RedisKeyUtil
 
 
 class ConfigService:
@@ -41,11 +42,8 @@ class ConfigService:
         :param redis: redis对象
         :return:
         """
-        # 获取以ce_sys_config:开头的键列表
-        keys = await redis.keys(f'{RedisInitKeyConfig.SYS_CONFIG.key}:*')
-        # 删除匹配的键
-        if keys:
-            await redis.delete(*keys)
+        # 删除以ce_sys_config:开头的键（SCAN分批遍历，不阻塞Redis）
+        await RedisKeyUtil.unlink_by_pattern(redis, f'{RedisInitKeyConfig.SYS_CONFIG.key}:*')
         config_all = await ConfigDao.get_config_list(query_db, ConfigPageQueryModel(**dict()), is_page=False)
         for config_obj in config_all:
             await redis.set(
@@ -187,12 +185,13 @@ class ConfigService:
         return result
 
     @staticmethod
-    async def export_config_list_services(config_list: List):
+    async def export_config_list_services(query_db: AsyncSession, query_object: ConfigPageQueryModel):
         """
         导出参数配置信息service
 
-        :param config_list: 参数配置信息列表
-        :return: 参数配置信息对应excel的二进制数据
+        :param query_db: orm对象
+        :param query_object: 查询参数对象
+        :return: 参数配置信息对应excel的二进制数据块异步生成器
         """
         # 创建一个映射字典，将英文键映射到中文键
         mapping_dict = {
@@ -208,14 +207,15 @@ class ConfigService:
             'remark': '备注',
         }
 
-        for item in config_list:
+        def format_row(item: Dict):
             if item.get('configType') == 'Y':
                 item['configType'] = '是'
             else:
                 item['configType'] = '否'
-        binary_data = ExcelUtil.export_list2excel(config_list, mapping_dict)
 
-        return binary_data
+        config_rows = await ConfigDao.get_config_list(query_db, query_object, is_stream=True)
+
+        return ExcelUtil.stream_list2excel(config_rows, mapping_dict, format_row)
 
     @classmethod
     async def refresh_sys_config_services(cls, request: Request, query_db: AsyncSession):
@@ -0,0 +1,212 @@
+import json
+import time
+from collections import OrderedDict
+from redis import asyncio as aioredis
+from typing import Iterable, Optional
+from config.enums import RedisInitKeyConfig
+from module_admin.entity.vo.user_vo import CurrentUserModel
+from utils.log_util import logger
+
+
+class CurrentUserSnapshot:
+    """
+    当前用户信息快照（按会话缓存）
+    """
+
+    __slots__ = ('version', 'current_user', 'has_workbench_menu', 'built_monotonic')
+
+    def __init__(self, version: str, current_user: CurrentUserModel, has_workbench_menu: bool):
+        self.version = version
+        self.current_user = current_user
+        self.has_workbench_menu = has_workbench_menu
+        self.built_monotonic = time.monotonic()
+
+    def dumps(self) -> str:
+        """
+        序列化快照
+
+        :return: json字符串
+        """
+        return json.dumps(
+            {
+                'version': self.version,
+                'hasWorkbenchMenu': self.has_workbench_menu,
+                'currentUser': self.current_user.model_dump(mode='json', by_alias=True),
+            },
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def loads(cls, value: str) -> 'CurrentUserSnapshot':
+        """
+        反序列化快照
+
+        :param value: json字符串
+        :return: 当前用户信息快照
+        """
+        data = json.loads(value)
+        return cls(
+            data.get('version'),
+            CurrentUserModel.model_validate(data.get('currentUser')),
+            data.get('hasWorkbenchMenu', False),
+        )
+
+
+class CurrentUserCacheService:
+    """
+    当前用户信息缓存服务层
+
+    快照存放于Redis（按会话）并在进程内保留一份LRU副本，快照版本由全局版本号（角色、菜单、部门变更）
+    与用户版本号（用户信息变更）组成，版本号变化后快照自动失效并在下次请求时重建。
+    """
+
+    # 快照过期时间（秒），用于兜底外部同步的组织数据变化
+    SNAPSHOT_EXPIRE_SECONDS = 600
+
+    # 进程内缓存的会话数量上限
+    LOCAL_CACHE_MAX_SIZE = 1024
+
+    # 令牌过期时间的最小续期间隔（秒）
+    TOKEN_REFRESH_INTERVAL_SECONDS = 60
+
+    _local_cache: 'OrderedDict[str, CurrentUserSnapshot]' = OrderedDict()
+    _token_refreshed_at: 'OrderedDict[str, float]' = OrderedDict()
+
+    @classmethod
+    def get_snapshot_key(cls, session_id: str) -> str:
+        """
+        获取会话快照的Redis键
+
+        :param session_id: 会话编号
+        :return: Redis键
+        """
+        return f'{RedisInitKeyConfig.CURRENT_USER.key}:{session_id}'
+
+    @classmethod
+    def get_user_version_key(cls, user_id: int) -> str:
+        """
+        获取用户版本号的Redis键
+
+        :param user_id: 用户id
+        :return: Redis键
+        """
+        return f'{RedisInitKeyConfig.CURRENT_USER_VERSION.key}:{user_id}'
+
+    @classmethod
+    def get_global_version_key(cls) -> str:
+        """
+        获取全局版本号的Redis键
+
+        :return: Redis键
+        """
+        return f'{RedisInitKeyConfig.CURRENT_USER_VERSION.key}:global'
+
+    @staticmethod
+    def build_version(global_version: Optional[str], user_version: Optional[str]) -> str:
+        """
+        根据全局版本号与用户版本号生成快照版本
+
+        :param global_version: 全局版本号
+        :param user_version: 用户版本号
+        :return: 快照版本
+        """
+        return f'{global_version or 0}:{user_version or 0}'
+
+    @classmethod
+    def get_snapshot(cls, session_id: str, version: str, snapshot_value: Optional[str]) -> Optional[CurrentUserSnapshot]:
+        """
+        获取版本匹配的快照（优先进程内缓存，其次Redis中的快照）
+
+        :param session_id: 会话编号
+        :param version: 当前快照版本
+        :param snapshot_value: Redis中的快照值
+        :return: 当前用户信息快照
+        """
+        snapshot = cls._local_cache.get(session_id)
+        if (
+            snapshot is not None
+            and snapshot.version == version
+            and time.monotonic() - snapshot.built_monotonic < cls.SNAPSHOT_EXPIRE_SECONDS
+        ):
+            cls._local_cache.move_to_end(session_id)
+            return snapshot
+        if not snapshot_value:
+            return None
+        try:
+            snapshot = CurrentUserSnapshot.loads(snapshot_value)
+        except Exception as e:
+            logger.warning(f'用户信息快照解析失败: session_id={session_id}, error={str(e)}')
+            return None
+        if snapshot.version != version:
+            return None
+        cls._put_local(session_id, snapshot)
+        return snapshot
+
+    @classmethod
+    async def save_snapshot(cls, redis: aioredis.Redis, session_id: str, snapshot: CurrentUserSnapshot) -> None:
+        """
+        保存快照到Redis和进程内缓存
+
+        :param redis: Redis连接对象
+        :param session_id: 会话编号
+        :param snapshot: 当前用户信息快照
+        """
+        await redis.set(cls.get_snapshot_key(session_id), snapshot.dumps(), ex=cls.SNAPSHOT_EXPIRE_SECONDS)
+        cls._put_local(session_id, snapshot)
+
+    @classmethod
+    def _put_local(cls, session_id: str, snapshot: CurrentUserSnapshot) -> None:
+        """
+        写入进程内缓存
+
+        :param session_id: 会话编号
+        :param snapshot: 当前用户信息快照
+        """
+        cls._local_cache[session_id] = snapshot
+        cls._local_cache.move_to_end(session_id)
+        while len(cls._local_cache) > cls.LOCAL_CACHE_MAX_SIZE:
+            cls._local_cache.popitem(last=False)
+
+    @classmethod
+    def need_refresh_token(cls, token_key: str) -> bool:
+        """
+        判断令牌是否需要续期（同一令牌在最小续期间隔内只续期一次）
+
+        :param token_key: 令牌的Redis键
+        :return: 是否需要续期
+        """
+        now = time.monotonic()
+        refreshed_at = cls._token_refreshed_at.get(token_key)
+        if refreshed_at is not None and now - refreshed_at < cls.TOKEN_REFRESH_INTERVAL_SECONDS:
+            return False
+        cls._token_refreshed_at[token_key] = now
+        cls._token_refreshed_at.move_to_end(token_key)
+        while len(cls._token_refreshed_at) > cls.LOCAL_CACHE_MAX_SIZE:
+            cls._token_refreshed_at.popitem(last=False)
+        return True
+
+    @classmethod
+    async def invalidate_users(cls, redis: aioredis.Redis, user_ids: Iterable[int]) -> None:
+        """
+        失效指定用户的快照（用户信息、状态、密码、角色分配变更后调用）
+
+        :param redis: Redis连接对象
+        :param user_ids: 用户id列表
+        """
+        user_ids = [int(user_id) for user_id in user_ids if user_id]
+        if not user_ids:
+            return
+        async with redis.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.incr(cls.get_user_version_key(user_id))
+            await pipe.execute()
+
+    @classmethod
+    async def invalidate_all(cls, redis: aioredis.Redis) -> None:
+        """
+        失效所有用户的快照（角色、菜单、部门变更后调用）
+
+        :param redis: Redis连接对象
+        """
+        await redis.incr(cls.get_global_version_key())
+        cls._local_cache.clear()
@@ -4,6 +4,7 @@ from exceptions.exception import ServiceException, ServiceWarning
 from module_admin.dao.dept_dao import DeptDao
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.dept_vo import DeptModel
+from module_admin.utils.data_scope_util import DataScope
 from utils.common_util import CamelCaseUtil
 from utils.field_mapper import FieldMapper
 
@@ -14,31 +15,31 @@ class DeptService:
     """
 
     @classmethod
-    async def get_dept_tree_services(cls, query_db: AsyncSession, page_object: DeptModel, data_scope_sql: str):
+    async def get_dept_tree_services(cls, query_db: AsyncSession, page_object: DeptModel, data_scope: DataScope):
         """
         获取部门树信息service
 
         :param query_db: orm对象
         :param page_object: 查询参数对象
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :return: 部门树信息对象
         """
-        dept_list_result = await DeptDao.get_dept_list_for_tree(query_db, page_object, data_scope_sql)
+        dept_list_result = await DeptDao.get_dept_list_for_tree(query_db, page_object, data_scope)
         dept_tree_result = cls.list_to_tree(dept_list_result)
 
         return dept_tree_result
 
     @classmethod
-    async def get_dept_list_services(cls, query_db: AsyncSession, page_object: DeptModel, data_scope_sql: str):
+    async def get_dept_list_services(cls, query_db: AsyncSession, page_object: DeptModel, data_scope: DataScope):
         """
         获取部门列表信息service
 
         :param query_db: orm对象
         :param page_object: 分页查询参数对象
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :return: 部门列表信息对象
         """
-        dept_list_result = await DeptDao.get_dept_list(query_db, page_object, data_scope_sql)
+        dept_list_result = await DeptDao.get_dept_list(query_db, page_object, data_scope)
 
         # 使用字段映射工具转换数据格式
         mapped_result = [FieldMapper.map_dept_to_sys_format(dept) for dept in dept_list_result]
@@ -46,16 +47,16 @@ class DeptService:
         return CamelCaseUtil.transform_result(mapped_result)
 
     @classmethod
-    async def check_dept_data_scope_services(cls, query_db: AsyncSession, dept_id: int, data_scope_sql: str):
+    async def check_dept_data_scope_services(cls, query_db: AsyncSession, dept_id: int, data_scope: DataScope):
         """
         校验部门是否有数据权限service
 
         :param query_db: orm对象
         :param dept_id: 部门id
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :return: 校验结果
         """
-        depts = await DeptDao.get_dept_list(query_db, DeptModel(deptId=dept_id), data_scope_sql)
+        depts = await DeptDao.get_dept_list(query_db, DeptModel(deptId=dept_id), data_scope)
         if depts:
             return CrudResponseModel(is_success=True, message='校验通过')
         else:
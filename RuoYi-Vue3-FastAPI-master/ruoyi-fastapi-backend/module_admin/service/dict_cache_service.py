@@ -0,0 +1,233 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from redis import asyncio as aioredis
+from typing import Dict, Iterable, List, Optional
+from config.database import AsyncSessionLocal
+from config.enums import RedisInitKeyConfig
+from module_admin.dao.dict_dao import DictDataDao
+from utils.common_util import CamelCaseUtil
+from utils.log_util import logger
+
+
+class DictCacheEntry:
+    """
+    单个字典类型的进程内缓存（构建完成后只读）
+    """
+
+    __slots__ = ('version', 'rows', 'labels', 'built_monotonic')
+
+    def __init__(self, version: int, rows: List[Dict]):
+        """
+        构建字典缓存
+
+        :param version: 构建时的字典版本号
+        :param rows: 字典数据列表（小驼峰形式，与Redis中的缓存一致）
+        """
+        self.version = version
+        self.rows = rows
+        self.labels = {str(row.get('dictValue')): row.get('dictLabel') for row in rows}
+        self.built_monotonic = time.monotonic()
+
+
+class DictCacheService:
+    """
+    字典数据二级缓存服务层
+
+    第一级为进程内字典（每个字典类型记录构建时的版本号），第二级为应用启动时写入的Redis字典缓存，
+    Redis中不存在时回源数据库并回写。字典数据变更后递增Redis中的版本号并通过发布订阅通知所有进程，
+    各进程收到通知后丢弃对应字典类型的进程内缓存；订阅断开重连后比对版本号，不一致则清空进程内缓存，
+    超过最大存活时间的缓存在下次访问时重新加载作为兜底。
+    字典类型由调用方传入，进程内缓存按最近使用淘汰，最多保留CACHE_MAX_ENTRIES个字典类型。
+    """
+
+    # 进程内缓存最大存活时间（秒）
+    CACHE_MAX_AGE_SECONDS = 300
+
+    # 进程内缓存的最大字典类型数
+    CACHE_MAX_ENTRIES = 512
+
+    # 订阅断开后的重连间隔（秒）
+    RESUBSCRIBE_INTERVAL_SECONDS = 5
+
+    # 通知全部字典类型失效的消息内容
+    ALL_DICT_TYPES = '*'
+
+    _redis: Optional[aioredis.Redis] = None
+    _entries: 'OrderedDict[str, DictCacheEntry]' = OrderedDict()
+    _version = 0
+    _listener_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def get_version_key(cls) -> str:
+        """
+        获取字典版本号的Redis键
+
+        :return: Redis键
+        """
+        return f'{RedisInitKeyConfig.SYS_DICT_VERSION.key}:global'
+
+    @classmethod
+    def get_channel(cls) -> str:
+        """
+        获取字典变更通知的频道名称
+
+        :return: 频道名称
+        """
+        return f'{RedisInitKeyConfig.SYS_DICT_VERSION.key}:channel'
+
+    @classmethod
+    async def init_dict_cache(cls, redis: aioredis.Redis):
+        """
+        应用启动时初始化字典缓存并订阅字典变更通知
+
+        :param redis: Redis连接对象
+        :return:
+        """
+        cls._redis = redis
+        cls._version = int(await redis.get(cls.get_version_key()) or 0)
+        cls._entries = OrderedDict()
+        if cls._listener_task is None or cls._listener_task.done():
+            cls._listener_task = asyncio.create_task(cls._listen())
+
+    @classmethod
+    async def close_dict_cache(cls):
+        """
+        应用关闭时取消字典变更订阅
+
+        :return:
+        """
+        if cls._listener_task is not None:
+            cls._listener_task.cancel()
+            try:
+                await cls._listener_task
+            except asyncio.CancelledError:
+                pass
+            cls._listener_task = None
+
+    @classmethod
+    async def get_dict_data_list(cls, dict_type: str) -> List[Dict]:
+        """
+        获取字典数据列表（小驼峰形式，调用方不得修改返回的数据）
+
+        :param dict_type: 字典类型
+        :return: 字典数据列表
+        """
+        return (await cls._get_entry(dict_type)).rows
+
+    @classmethod
+    async def get_label_map(cls, dict_type: str) -> Dict[str, str]:
+        """
+        获取字典键值到字典标签的映射（调用方不得修改返回的数据）
+
+        :param dict_type: 字典类型
+        :return: {字典键值: 字典标签}
+        """
+        return (await cls._get_entry(dict_type)).labels
+
+    @classmethod
+    async def notify_changed(cls, redis: aioredis.Redis, dict_types: Iterable[str]) -> None:
+        """
+        字典数据写入Redis后通知所有进程丢弃对应的进程内缓存
+
+        :param redis: Redis连接对象
+        :param dict_types: 发生变更的字典类型列表，传入ALL_DICT_TYPES表示全部
+        """
+        dict_types = list(dict.fromkeys(dict_type for dict_type in dict_types if dict_type))
+        if not dict_types:
+            return
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.incr(cls.get_version_key())
+            for dict_type in dict_types:
+                pipe.publish(cls.get_channel(), dict_type)
+            results = await pipe.execute()
+        cls._apply_change(results[0], dict_types)
+
+    @classmethod
+    def _apply_change(cls, version: int, dict_types: Iterable[str]) -> None:
+        """
+        丢弃发生变更的字典类型的进程内缓存
+
+        :param version: 变更后的字典版本号
+        :param dict_types: 发生变更的字典类型列表
+        """
+        cls._version = max(cls._version, int(version))
+        for dict_type in dict_types:
+            if dict_type == cls.ALL_DICT_TYPES:
+                cls._entries = OrderedDict()
+                return
+            cls._entries.pop(dict_type, None)
+
+    @classmethod
+    async def _get_entry(cls, dict_type: str) -> DictCacheEntry:
+        """
+        获取字典类型的进程内缓存（不存在或已过期时重新加载，超过最大字典类型数时淘汰最久未使用的缓存）
+
+        :param dict_type: 字典类型
+        :return: 字典缓存
+        """
+        entry = cls._entries.get(dict_type)
+        if entry is not None and time.monotonic() - entry.built_monotonic < cls.CACHE_MAX_AGE_SECONDS:
+            cls._entries.move_to_end(dict_type)
+            return entry
+        version = cls._version
+        entry = DictCacheEntry(version, await cls._load_rows(dict_type))
+        # 加载期间收到变更通知时不写入，避免缓存旧数据
+        if version == cls._version:
+            cls._entries[dict_type] = entry
+            cls._entries.move_to_end(dict_type)
+            while len(cls._entries) > cls.CACHE_MAX_ENTRIES:
+                cls._entries.popitem(last=False)
+        return entry
+
+    @classmethod
+    async def _load_rows(cls, dict_type: str) -> List[Dict]:
+        """
+        从Redis加载字典数据，Redis中不存在时查询数据库并回写Redis
+
+        :param dict_type: 字典类型
+        :return: 字典数据列表
+        """
+        redis_key = f'{RedisInitKeyConfig.SYS_DICT.key}:{dict_type}'
+        if cls._redis is not None:
+            value = await cls._redis.get(redis_key)
+            if value:
+                return json.loads(value)
+        async with AsyncSessionLocal() as session:
+            dict_data_list = await DictDataDao.query_dict_data_list(session, dict_type)
+        rows = [CamelCaseUtil.transform_result(row) for row in dict_data_list if row]
+        if cls._redis is not None and rows:
+            await cls._redis.set(redis_key, json.dumps(rows, ensure_ascii=False, default=str))
+        return rows
+
+    @classmethod
+    async def _listen(cls):
+        """
+        后台任务：订阅字典变更通知，断开后重连
+
+        :return:
+        """
+        while True:
+            pubsub = cls._redis.pubsub()
+            try:
+                await pubsub.subscribe(cls.get_channel())
+                # 订阅期间可能错过通知，重新订阅后比对版本号
+                version = int(await cls._redis.get(cls.get_version_key()) or 0)
+                if version != cls._version:
+                    cls._apply_change(version, [cls.ALL_DICT_TYPES])
+                async for message in pubsub.listen():
+                    if message.get('type') != 'message':
+                        continue
+                    version = int(await cls._redis.get(cls.get_version_key()) or 0)
+                    cls._apply_change(version, [message.get('data')])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f'字典变更订阅断开，{cls.RESUBSCRIBE_INTERVAL_SECONDS}秒后重连: {str(e)}')
+                await asyncio.sleep(cls.RESUBSCRIBE_INTERVAL_SECONDS)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
@@ -1,11 +1,12 @@
 import json
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Dict
 from config.constant import CommonConstant
 from config.enums import RedisInitKeyConfig
 from exceptions.exception import ServiceException
 from module_admin.dao.dict_dao import DictDataDao, DictTypeDao
+from module_admin.service.dict_cache_service import DictCacheService
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.dict_vo import (
     DeleteDictDataModel,
@@ -17,6 +18,7 @@ from module_admin.entity.vo.dict_vo import (
 )
 from utils.common_util import CamelCaseUtil
 from utils.excel_util import ExcelUtil
+from utils.redis_util import RedisKeyUtil
 
 
 class DictTypeService:
@@ -117,6 +119,9 @@ class DictTypeService:
                             f'{RedisInitKeyConfig.SYS_DICT.key}:{page_object.dict_type}',
                             json.dumps(dict_data, ensure_ascii=False, default=str),
                         )
+                        await DictCacheService.notify_changed(
+                            request.app.state.redis, [dict_type_info.dict_type, page_object.dict_type]
+                        )
                     return CrudResponseModel(is_success=True, message='更新成功')
                 except Exception as e:
                     await query_db.rollback()
@@ -145,10 +150,13 @@ class DictTypeService:
                     if (await DictDataDao.count_dict_data_dao(query_db, dict_type_into.dict_type)) > 0:
                         raise ServiceException(message=f'{dict_type_into.dict_name}已分配，不能删除')
                     await DictTypeDao.delete_dict_type_dao(query_db, DictTypeModel(dictId=int(dict_id)))
-                    delete_dict_type_list.append(f'{RedisInitKeyConfig.SYS_DICT.key}:{dict_type_into.dict_type}')
+                    delete_dict_type_list.append(dict_type_into.dict_type)
                 await query_db.commit()
                 if delete_dict_type_list:
-                    await request.app.state.redis.delete(*delete_dict_type_list)
+                    await request.app.state.redis.delete(
+                        *[f'{RedisInitKeyConfig.SYS_DICT.key}:{dict_type}' for dict_type in delete_dict_type_list]
+                    )
+                    await DictCacheService.notify_changed(request.app.state.redis, delete_dict_type_list)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -174,12 +182,13 @@ class DictTypeService:
         return result
 
     @staticmethod
-    async def export_dict_type_list_services(dict_type_list: List):
+    async def export_dict_type_list_services(query_db: AsyncSession, query_object: DictTypePageQueryModel):
         """
         导出字典类型信息service
 
-        :param dict_type_list: 字典信息列表
-        :return: 字典信息对应excel的二进制数据
+        :param query_db: orm对象
+        :param query_object: 查询参数对象
+        :return: 字典类型信息对应excel的二进制数据块异步生成器
         """
         # 创建一个映射字典，将英文键映射到中文键
         mapping_dict = {
@@ -194,14 +203,15 @@ class DictTypeService:
             'remark': '备注',
         }
 
-        for item in dict_type_list:
+        def format_row(item: Dict):
             if item.get('status') == '0':
                 item['status'] = '正常'
             else:
                 item['status'] = '停用'
-        binary_data = ExcelUtil.export_list2excel(dict_type_list, mapping_dict)
 
-        return binary_data
+        dict_type_rows = await DictTypeDao.get_dict_type_list(query_db, query_object, is_stream=True)
+
+        return ExcelUtil.stream_list2excel(dict_type_rows, mapping_dict, format_row)
 
     @classmethod
     async def refresh_sys_dict_services(cls, request: Request, query_db: AsyncSession):
@@ -261,20 +271,20 @@ class DictDataService:
         :param redis: redis对象
         :return:
         """
-        # 获取以ce_sys_dict:开头的键列表
-        keys = await redis.keys(f'{RedisInitKeyConfig.SYS_DICT.key}:*')
-        # 删除匹配的键
-        if keys:
-            await redis.delete(*keys)
+        # 删除以ce_sys_dict:开头的键（SCAN分批遍历，不阻塞Redis）
+        await RedisKeyUtil.unlink_by_pattern(redis, f'{RedisInitKeyConfig.SYS_DICT.key}:*')
         dict_type_all = await DictTypeDao.get_all_dict_type(query_db)
-        for dict_type_obj in [item for item in dict_type_all if item.status == '0']:
-            dict_type = dict_type_obj.dict_type
-            dict_data_list = await DictDataDao.query_dict_data_list(query_db, dict_type)
-            dict_data = [CamelCaseUtil.transform_result(row) for row in dict_data_list if row]
-            await redis.set(
-                f'{RedisInitKeyConfig.SYS_DICT.key}:{dict_type}',
-                json.dumps(dict_data, ensure_ascii=False, default=str),
-            )
+        async with redis.pipeline(transaction=False) as pipe:
+            for dict_type_obj in [item for item in dict_type_all if item.status == '0']:
+                dict_type = dict_type_obj.dict_type
+                dict_data_list = await DictDataDao.query_dict_data_list(query_db, dict_type)
+                dict_data = [CamelCaseUtil.transform_result(row) for row in dict_data_list if row]
+                pipe.set(
+                    f'{RedisInitKeyConfig.SYS_DICT.key}:{dict_type}',
+                    json.dumps(dict_data, ensure_ascii=False, default=str),
+                )
+            await pipe.execute()
+        await DictCacheService.notify_changed(redis, [DictCacheService.ALL_DICT_TYPES])
 
     @classmethod
     async def query_dict_data_list_from_cache_services(cls, redis, dict_type: str):
@@ -285,10 +295,8 @@ class DictDataService:
         :param dict_type: 字典类型
         :return: 字典数据列表信息对象
         """
-        result = []
-        dict_data_list_result = await redis.get(f'{RedisInitKeyConfig.SYS_DICT.key}:{dict_type}')
-        if dict_data_list_result:
-            result = json.loads(dict_data_list_result)
+        # 优先读取进程内缓存，返回副本避免调用方修改缓存数据
+        result = await DictCacheService.get_dict_data_list(dict_type)
 
         return CamelCaseUtil.transform_result(result)
 
@@ -330,6 +338,7 @@ class DictDataService:
                     f'{RedisInitKeyConfig.SYS_DICT.key}:{page_object.dict_type}',
                     json.dumps(CamelCaseUtil.transform_result(dict_data_list), ensure_ascii=False, default=str),
                 )
+                await DictCacheService.notify_changed(request.app.state.redis, [page_object.dict_type])
                 return CrudResponseModel(is_success=True, message='新增成功')
             except Exception as e:
                 await query_db.rollback()
@@ -361,6 +370,9 @@ class DictDataService:
                         f'{RedisInitKeyConfig.SYS_DICT.key}:{page_object.dict_type}',
                         json.dumps(CamelCaseUtil.transform_result(dict_data_list), ensure_ascii=False, default=str),
                     )
+                    await DictCacheService.notify_changed(
+                        request.app.state.redis, [dict_data_info.dict_type, page_object.dict_type]
+                    )
                     return CrudResponseModel(is_success=True, message='更新成功')
                 except Exception as e:
                     await query_db.rollback()
@@ -395,6 +407,7 @@ class DictDataService:
                         f'{RedisInitKeyConfig.SYS_DICT.key}:{dict_type}',
                         json.dumps(CamelCaseUtil.transform_result(dict_data_list), ensure_ascii=False, default=str),
                     )
+                await DictCacheService.notify_changed(request.app.state.redis, delete_dict_type_list)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -420,12 +433,13 @@ class DictDataService:
         return result
 
     @staticmethod
-    async def export_dict_data_list_services(dict_data_list: List):
+    async def export_dict_data_list_services(query_db: AsyncSession, query_object: DictDataPageQueryModel):
         """
         导出字典数据信息service
 
-        :param dict_data_list: 字典数据信息列表
-        :return: 字典数据信息对应excel的二进制数据
+        :param query_db: orm对象
+        :param query_object: 查询参数对象
+        :return: 字典数据信息对应excel的二进制数据块异步生成器
         """
         # 创建一个映射字典，将英文键映射到中文键
         mapping_dict = {
@@ -445,7 +459,7 @@ class DictDataService:
             'remark': '备注',
         }
 
-        for item in dict_data_list:
+        def format_row(item: Dict):
             if item.get('status') == '0':
                 item['status'] = '正常'
             else:
@@ -454,6 +468,7 @@ class DictDataService:
                 item['isDefault'] = '是'
             else:
                 item['isDefault'] = '否'
-        binary_data = ExcelUtil.export_list2excel(dict_data_list, mapping_dict)
 
-        return binary_data
+        dict_data_rows = await DictDataDao.get_dict_data_list(query_db, query_object, is_stream=True)
+
+        return ExcelUtil.stream_list2excel(dict_data_rows, mapping_dict, format_row)
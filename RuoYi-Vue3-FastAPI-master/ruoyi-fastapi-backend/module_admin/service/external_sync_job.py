@@ -30,7 +30,12 @@ async def sync_external_database_job():
         # 记录详细结果
         for table_name, success in results.items():
             if success:
-                logger.info(f"  - {table_name}: 同步成功")
+                stats = ExternalSyncService.last_sync_stats.get(table_name, {})
+                logger.info(
+                    f"  - {table_name}: 同步成功，读取 {stats.get('read', 0)}，新增 {stats.get('inserted', 0)}，"
+                    f"更新 {stats.get('updated', 0)}，删除 {stats.get('deleted', 0)}，"
+                    f"耗时 {stats.get('timings', {}).get('total', 0)} 秒"
+                )
             else:
                 logger.warning(f"  - {table_name}: 同步失败")
                 
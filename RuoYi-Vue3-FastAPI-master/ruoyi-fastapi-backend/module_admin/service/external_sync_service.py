@@ -2,16 +2,17 @@
 外部数据库同步服务
 用于从外部数据库同步基础信息表到本系统数据库
 """
+import asyncio
+import threading
+import time
 from datetime import datetime
-from sqlalchemy import create_engine, text, delete
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import sessionmaker
-from typing import List, Dict, Any
+from sqlalchemy import bindparam, column, create_engine, table, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Engine
+from typing import List, Dict, Any, Optional, Tuple
 from config.env import SourceDataBaseConfig, DataBaseConfig
-from config.database import AsyncSessionLocal
-from module_admin.entity.do.oa_department_do import OaDepartment
-from module_admin.entity.do.oa_employee_primary_do import OaEmployeePrimary
-from module_admin.entity.do.oa_rank_do import OaRank
+from module_admin.service.org_index_service import OrgIndexService
 from utils.log_util import logger
 from urllib.parse import quote_plus
 
@@ -19,13 +20,34 @@ from urllib.parse import quote_plus
 class ExternalSyncService:
     """
     外部数据库同步服务
+
+    同步在线程池中执行，不阻塞事件循环：通过服务端游标分块读取源表，
+    按主键和 gmt_modify_time 与目标表比对，只对新增/变更的行做批量 upsert，最后删除源表已不存在的行。
     """
 
+    # 流式读取与批量写入的分块大小
+    SYNC_CHUNK_SIZE = 1000
+
+    # oa_rank 表同步的字段
+    OA_RANK_COLUMNS = [
+        'id', 'rank_name', 'rank_code', 'rank_description', 'node_penalty', 'order_no',
+        'rank_level', 'real_flag', 'hotel_standard', 'meal_standard',
+        'salary_from', 'salary_to', 'enable',
+        'gmt_create_by', 'gmt_create_time', 'gmt_modify_by', 'gmt_modify_time',
+    ]
+
+    # 最近一次各表的同步统计 {table_name: {read, inserted, updated, deleted, skipped, timings}}
+    last_sync_stats: Dict[str, Dict[str, Any]] = {}
+
+    _source_engine: Optional[Engine] = None
+    _target_engine: Optional[Engine] = None
+    _engine_lock = threading.Lock()
+
     @classmethod
     def _get_source_db_url(cls) -> str:
         """
         获取源数据库连接URL
-        
+
         :return: 数据库连接URL
         """
         if SourceDataBaseConfig.source_db_type == "postgresql":
@@ -47,7 +69,7 @@ class ExternalSyncService:
     def _get_target_db_url(cls) -> str:
         """
         获取目标数据库连接URL
-        
+
         :return: 数据库连接URL
         """
         if DataBaseConfig.db_type == "postgresql":
@@ -66,243 +88,204 @@ class ExternalSyncService:
             )
 
     @classmethod
-    async def sync_oa_rank(cls) -> bool:
+    def _get_engines(cls) -> Tuple[Engine, Engine]:
+        """
+        获取源/目标数据库同步引擎（首次使用时创建，之后复用）
+
+        :return: (源数据库引擎, 目标数据库引擎)
+        """
+        with cls._engine_lock:
+            if cls._source_engine is None:
+                cls._source_engine = create_engine(cls._get_source_db_url(), pool_pre_ping=True, pool_size=1)
+            if cls._target_engine is None:
+                cls._target_engine = create_engine(cls._get_target_db_url(), pool_pre_ping=True, pool_size=1)
+            return cls._source_engine, cls._target_engine
+
+    @classmethod
+    def _build_upsert_statement(cls, table_name: str, columns: List[str]):
+        """
+        构建按主键 upsert 的批量写入语句（MySQL: ON DUPLICATE KEY UPDATE，PostgreSQL: ON CONFLICT）
+
+        :param table_name: 表名
+        :param columns: 字段列表
+        :return: insert语句
+        """
+        target_table = table(table_name, *[column(col) for col in columns])
+        update_columns = [col for col in columns if col != 'id']
+        if DataBaseConfig.db_type == 'postgresql':
+            stmt = pg_insert(target_table)
+            return stmt.on_conflict_do_update(
+                index_elements=['id'], set_={col: stmt.excluded[col] for col in update_columns}
+            )
+        stmt = mysql_insert(target_table)
+        return stmt.on_duplicate_key_update({col: stmt.inserted[col] for col in update_columns})
+
+    @classmethod
+    def _sync_table(cls, table_name: str, scope_condition: Optional[str], columns: List[str] = None) -> Dict[str, Any]:
+        """
+        同步单张表（同步方法，在线程池中执行）
+        1. 读取目标表同步范围内的 id 与 gmt_modify_time
+        2. 通过服务端游标分块读取源表，新增/变更的行按块批量 upsert，未变更的行跳过
+        3. 删除目标表同步范围内源表已不存在的行
+        所有写入在同一个事务中提交，源表无数据时回滚，不修改目标表
+
+        :param table_name: 表名
+        :param scope_condition: 同步范围条件（源表和目标表相同，为None时同步全表）
+        :param columns: 同步的字段列表（为None时同步源表所有字段）
+        :return: 同步统计信息
+        """
+        stats = {'read': 0, 'inserted': 0, 'updated': 0, 'deleted': 0, 'skipped': 0, 'timings': {}}
+        timings = stats['timings']
+        where_sql = f' WHERE {scope_condition}' if scope_condition else ''
+        source_engine, target_engine = cls._get_engines()
+        total_start = time.perf_counter()
+
+        with target_engine.connect() as target_conn:
+            try:
+                # 1. 目标表快照
+                phase_start = time.perf_counter()
+                target_versions = {
+                    row.id: row.gmt_modify_time
+                    for row in target_conn.execute(text(f'SELECT id, gmt_modify_time FROM {table_name}{where_sql}'))
+                }
+                timings['load_target'] = round(time.perf_counter() - phase_start, 3)
+
+                # 2. 分块读取源表并批量 upsert
+                seen_ids = set()
+                upsert_stmt = None
+                read_seconds = 0.0
+                write_seconds = 0.0
+                with source_engine.connect() as source_conn:
+                    phase_start = time.perf_counter()
+                    result = source_conn.execution_options(
+                        stream_results=True, yield_per=cls.SYNC_CHUNK_SIZE
+                    ).execute(text(f'SELECT * FROM {table_name}{where_sql}'))
+                    for partition in result.partitions():
+                        batch = []
+                        for row in partition:
+                            row_dict = dict(row._mapping)
+                            if columns:
+                                row_dict = {col: row_dict.get(col) for col in columns}
+                            row_id = row_dict['id']
+                            seen_ids.add(row_id)
+                            stats['read'] += 1
+                            if row_id not in target_versions:
+                                stats['inserted'] += 1
+                            elif (
+                                row_dict.get('gmt_modify_time') is not None
+                                and row_dict.get('gmt_modify_time') == target_versions[row_id]
+                            ):
+                                stats['skipped'] += 1
+                                continue
+                            else:
+                                stats['updated'] += 1
+                            batch.append(row_dict)
+                        read_seconds += time.perf_counter() - phase_start
+
+                        phase_start = time.perf_counter()
+                        if batch:
+                            if upsert_stmt is None:
+                                upsert_stmt = cls._build_upsert_statement(table_name, list(batch[0].keys()))
+                            target_conn.execute(upsert_stmt, batch)
+                        write_seconds += time.perf_counter() - phase_start
+                        phase_start = time.perf_counter()
+                timings['read_source'] = round(read_seconds, 3)
+                timings['upsert'] = round(write_seconds, 3)
+
+                if stats['read'] == 0:
+                    target_conn.rollback()
+                    return stats
+
+                # 3. 删除源表已不存在的行
+                phase_start = time.perf_counter()
+                stale_ids = [row_id for row_id in target_versions if row_id not in seen_ids]
+                delete_stmt = text(f'DELETE FROM {table_name} WHERE id IN :ids').bindparams(
+                    bindparam('ids', expanding=True)
+                )
+                for i in range(0, len(stale_ids), cls.SYNC_CHUNK_SIZE):
+                    target_conn.execute(delete_stmt, {'ids': stale_ids[i:i + cls.SYNC_CHUNK_SIZE]})
+                stats['deleted'] = len(stale_ids)
+                timings['delete'] = round(time.perf_counter() - phase_start, 3)
+
+                target_conn.commit()
+            except Exception:
+                target_conn.rollback()
+                raise
+
+        timings['total'] = round(time.perf_counter() - total_start, 3)
+        return stats
+
+    @classmethod
+    async def _sync_table_in_thread(
+        cls, table_name: str, scope_condition: Optional[str], scope_desc: str, columns: List[str] = None
+    ) -> bool:
         """
-        同步 oa_rank 表（全量更新）
-        
+        在线程池中同步单张表并记录同步结果
+
+        :param table_name: 表名
+        :param scope_condition: 同步范围条件
+        :param scope_desc: 同步范围描述（用于日志）
+        :param columns: 同步的字段列表
         :return: 是否成功
         """
+        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        source_address = f"{SourceDataBaseConfig.source_db_host}:{SourceDataBaseConfig.source_db_port}/{SourceDataBaseConfig.source_db_database}"
+
+        # 检查源数据库配置
+        if not SourceDataBaseConfig.source_db_host or SourceDataBaseConfig.source_db_host == "placeholder_host":
+            logger.warning(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（源数据库配置未设置）")
+            return False
+
         try:
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            source_address = f"{SourceDataBaseConfig.source_db_host}:{SourceDataBaseConfig.source_db_port}/{SourceDataBaseConfig.source_db_database}"
-            
-            # 检查源数据库配置
-            if not SourceDataBaseConfig.source_db_host or SourceDataBaseConfig.source_db_host == "placeholder_host":
-                logger.warning(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（源数据库配置未设置）")
-                return False
-            
-            # 连接源数据库
-            source_engine = create_engine(cls._get_source_db_url(), pool_pre_ping=True)
-            source_session = sessionmaker(bind=source_engine)()
-            
-            try:
-                # 从源数据库查询所有数据
-                query = text("SELECT * FROM oa_rank")
-                source_data = source_session.execute(query).fetchall()
-                
-                if not source_data:
-                    logger.warning(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（oa_rank 表无数据）")
-                    return False
-                
-                # 连接目标数据库
-                target_engine = create_engine(cls._get_target_db_url(), pool_pre_ping=True)
-                target_session = sessionmaker(bind=target_engine)()
-                
-                try:
-                    # 全量更新：先删除所有数据，再插入新数据
-                    target_session.execute(delete(OaRank))
-                    
-                    # 插入新数据
-                    for row in source_data:
-                        row_dict = dict(row._mapping)
-                        target_session.execute(
-                            text("""
-                                INSERT INTO oa_rank (
-                                    id, rank_name, rank_code, rank_description, node_penalty, order_no,
-                                    rank_level, real_flag, hotel_standard, meal_standard,
-                                    salary_from, salary_to, enable,
-                                    gmt_create_by, gmt_create_time, gmt_modify_by, gmt_modify_time
-                                ) VALUES (
-                                    :id, :rank_name, :rank_code, :rank_description, :node_penalty, :order_no,
-                                    :rank_level, :real_flag, :hotel_standard, :meal_standard,
-                                    :salary_from, :salary_to, :enable,
-                                    :gmt_create_by, :gmt_create_time, :gmt_modify_by, :gmt_modify_time
-                                )
-                            """),
-                            row_dict
-                        )
-                    
-                    target_session.commit()
-                    logger.info(f"{current_time} 从 {source_address} 同步 oa_rank 表成功，共 {len(source_data)} 条记录")
-                    return True
-                    
-                except Exception as e:
-                    target_session.rollback()
-                    logger.error(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（目标数据库操作失败: {str(e)}）")
-                    return False
-                finally:
-                    target_session.close()
-                    target_engine.dispose()
-                    
-            except Exception as e:
-                logger.error(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（源数据库查询失败: {str(e)}）")
-                return False
-            finally:
-                source_session.close()
-                source_engine.dispose()
-                
+            stats = await asyncio.to_thread(cls._sync_table, table_name, scope_condition, columns)
         except Exception as e:
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            source_address = f"{SourceDataBaseConfig.source_db_host}:{SourceDataBaseConfig.source_db_port}/{SourceDataBaseConfig.source_db_database}"
-            logger.error(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（连接失败: {str(e)}）")
+            logger.error(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（{table_name} 表同步失败: {str(e)}）")
+            return False
+
+        if stats['read'] == 0:
+            logger.warning(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（{table_name} 表无{scope_desc}数据）")
             return False
 
+        cls.last_sync_stats[table_name] = stats
+        logger.info(
+            f"{current_time} 从 {source_address} 同步 {table_name} 表成功（{scope_desc}），"
+            f"读取 {stats['read']} 条，新增 {stats['inserted']} 条，更新 {stats['updated']} 条，"
+            f"删除 {stats['deleted']} 条，未变更 {stats['skipped']} 条，耗时(秒) {stats['timings']}"
+        )
+        return True
+
+    @classmethod
+    async def sync_oa_rank(cls) -> bool:
+        """
+        同步 oa_rank 表（全表）
+
+        :return: 是否成功
+        """
+        return await cls._sync_table_in_thread('oa_rank', None, '全表', columns=cls.OA_RANK_COLUMNS)
+
     @classmethod
     async def sync_oa_employee_primary(cls) -> bool:
         """
-        同步 oa_employee_primary 表（全量更新，只同步 company_id=2 的数据）
-        
+        同步 oa_employee_primary 表（只同步 company_id=2 的数据）
+
         :return: 是否成功
         """
-        try:
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            source_address = f"{SourceDataBaseConfig.source_db_host}:{SourceDataBaseConfig.source_db_port}/{SourceDataBaseConfig.source_db_database}"
-            
-            # 检查源数据库配置
-            if not SourceDataBaseConfig.source_db_host or SourceDataBaseConfig.source_db_host == "placeholder_host":
-                logger.warning(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（源数据库配置未设置）")
-                return False
-            
-            # 连接源数据库
-            source_engine = create_engine(cls._get_source_db_url(), pool_pre_ping=True)
-            source_session = sessionmaker(bind=source_engine)()
-            
-            try:
-                # 从源数据库查询 company_id=2 的数据
-                query = text("SELECT * FROM oa_employee_primary WHERE company_id = 2")
-                source_data = source_session.execute(query).fetchall()
-                
-                if not source_data:
-                    logger.warning(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（oa_employee_primary 表无 company_id=2 的数据）")
-                    return False
-                
-                # 连接目标数据库
-                target_engine = create_engine(cls._get_target_db_url(), pool_pre_ping=True)
-                target_session = sessionmaker(bind=target_engine)()
-                
-                try:
-                    # 全量更新：先删除 company_id=2 的数据，再插入新数据
-                    target_session.execute(text("DELETE FROM oa_employee_primary WHERE company_id = 2"))
-                    
-                    # 插入新数据（需要构建完整的 INSERT 语句，因为字段很多）
-                    # 这里使用批量插入的方式
-                    for row in source_data:
-                        row_dict = dict(row._mapping)
-                        # 构建字段名和值的占位符
-                        columns = list(row_dict.keys())
-                        values_placeholder = ', '.join([f':{col}' for col in columns])
-                        columns_str = ', '.join(columns)
-                        
-                        target_session.execute(
-                            text(f"INSERT INTO oa_employee_primary ({columns_str}) VALUES ({values_placeholder})"),
-                            row_dict
-                        )
-                    
-                    target_session.commit()
-                    logger.info(f"{current_time} 从 {source_address} 同步 oa_employee_primary 表成功，共 {len(source_data)} 条记录（company_id=2）")
-                    return True
-                    
-                except Exception as e:
-                    target_session.rollback()
-                    logger.error(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（目标数据库操作失败: {str(e)}）")
-                    return False
-                finally:
-                    target_session.close()
-                    target_engine.dispose()
-                    
-            except Exception as e:
-                logger.error(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（源数据库查询失败: {str(e)}）")
-                return False
-            finally:
-                source_session.close()
-                source_engine.dispose()
-                
-        except Exception as e:
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            source_address = f"{SourceDataBaseConfig.source_db_host}:{SourceDataBaseConfig.source_db_port}/{SourceDataBaseConfig.source_db_database}"
-            logger.error(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（连接失败: {str(e)}）")
-            return False
+        return await cls._sync_table_in_thread('oa_employee_primary', 'company_id = 2', 'company_id=2 的')
 
     @classmethod
     async def sync_oa_department(cls) -> bool:
         """
-        同步 oa_department 表（全量更新，只同步 code 以 '02' 开头的数据，包括 '02' 本身）
-        
+        同步 oa_department 表（只同步 code 以 '02' 开头的数据，包括 '02' 本身）
+
         :return: 是否成功
         """
-        try:
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            source_address = f"{SourceDataBaseConfig.source_db_host}:{SourceDataBaseConfig.source_db_port}/{SourceDataBaseConfig.source_db_database}"
-            
-            # 检查源数据库配置
-            if not SourceDataBaseConfig.source_db_host or SourceDataBaseConfig.source_db_host == "placeholder_host":
-                logger.warning(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（源数据库配置未设置）")
-                return False
-            
-            # 连接源数据库
-            source_engine = create_engine(cls._get_source_db_url(), pool_pre_ping=True)
-            source_session = sessionmaker(bind=source_engine)()
-            
-            try:
-                # 从源数据库查询 code 以 '02' 开头的数据（包括 '02' 本身）
-                query = text("SELECT * FROM oa_department WHERE code LIKE '02%'")
-                source_data = source_session.execute(query).fetchall()
-                
-                if not source_data:
-                    logger.warning(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（oa_department 表无 code 以 '02' 开头的数据）")
-                    return False
-                
-                # 连接目标数据库
-                target_engine = create_engine(cls._get_target_db_url(), pool_pre_ping=True)
-                target_session = sessionmaker(bind=target_engine)()
-                
-                try:
-                    # 全量更新：先删除 code 以 '02' 开头的数据，再插入新数据
-                    target_session.execute(text("DELETE FROM oa_department WHERE code LIKE '02%'"))
-                    
-                    # 插入新数据
-                    for row in source_data:
-                        row_dict = dict(row._mapping)
-                        # 构建字段名和值的占位符
-                        columns = list(row_dict.keys())
-                        values_placeholder = ', '.join([f':{col}' for col in columns])
-                        columns_str = ', '.join(columns)
-                        
-                        target_session.execute(
-                            text(f"INSERT INTO oa_department ({columns_str}) VALUES ({values_placeholder})"),
-                            row_dict
-                        )
-                    
-                    target_session.commit()
-                    logger.info(f"{current_time} 从 {source_address} 同步 oa_department 表成功，共 {len(source_data)} 条记录（code 以 '02' 开头）")
-                    return True
-                    
-                except Exception as e:
-                    target_session.rollback()
-                    logger.error(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（目标数据库操作失败: {str(e)}）")
-                    return False
-                finally:
-                    target_session.close()
-                    target_engine.dispose()
-                    
-            except Exception as e:
-                logger.error(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（源数据库查询失败: {str(e)}）")
-                return False
-            finally:
-                source_session.close()
-                source_engine.dispose()
-                
-        except Exception as e:
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            source_address = f"{SourceDataBaseConfig.source_db_host}:{SourceDataBaseConfig.source_db_port}/{SourceDataBaseConfig.source_db_database}"
-            logger.error(f"{current_time} 从 {source_address} 试图获取数据，结果：失败（连接失败: {str(e)}）")
-            return False
+        return await cls._sync_table_in_thread('oa_department', "code LIKE '02%'", "code 以 '02' 开头的")
 
     @classmethod
     async def sync_all_tables(cls) -> Dict[str, bool]:
         """
         同步所有表
-        
+
         :return: 同步结果字典
         """
         results = {
@@ -310,4 +293,10 @@ class ExternalSyncService:
             'oa_employee_primary': await cls.sync_oa_employee_primary(),
             'oa_department': await cls.sync_oa_department(),
         }
+        # 组织数据变更后重建进程内组织架构索引
+        if any(results.values()):
+            try:
+                await OrgIndexService.rebuild_index(force=True)
+            except Exception as e:
+                logger.error(f'同步后重建组织架构索引失败: {str(e)}')
         return results
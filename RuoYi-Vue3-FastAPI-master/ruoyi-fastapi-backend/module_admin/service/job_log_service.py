@@ -1,7 +1,6 @@
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict
 from module_admin.dao.job_log_dao import JobLogDao
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.job_vo import DeleteJobLogModel, JobLogModel, JobLogPageQueryModel
@@ -31,7 +30,7 @@ class JobLogService:
         return job_log_list_result
 
     @classmethod
-    def add_job_log_services(cls, query_db: Session, page_object: JobLogModel):
+    async def add_job_log_services(cls, query_db: AsyncSession, page_object: JobLogModel):
         """
         新增定时任务日志信息service
 
@@ -40,11 +39,11 @@ class JobLogService:
         :return: 新增定时任务日志校验结果
         """
         try:
-            JobLogDao.add_job_log_dao(query_db, page_object)
-            query_db.commit()
+            await JobLogDao.add_job_log_dao(query_db, page_object)
+            await query_db.commit()
             result = dict(is_success=True, message='新增成功')
         except Exception as e:
-            query_db.rollback()
+            await query_db.rollback()
             result = dict(is_success=False, message=str(e))
 
         return CrudResponseModel(**result)
@@ -91,13 +90,14 @@ class JobLogService:
         return CrudResponseModel(**result)
 
     @staticmethod
-    async def export_job_log_list_services(request: Request, job_log_list: List):
+    async def export_job_log_list_services(request: Request, query_db: AsyncSession, query_object: JobLogPageQueryModel):
         """
         导出定时任务日志信息service
 
         :param request: Request对象
-        :param job_log_list: 定时任务日志信息列表
-        :return: 定时任务日志信息对应excel的二进制数据
+        :param query_db: orm对象
+        :param query_object: 查询参数对象
+        :return: 定时任务日志信息对应excel的二进制数据块异步生成器
         """
         # 创建一个映射字典，将英文键映射到中文键
         mapping_dict = {
@@ -128,7 +128,7 @@ class JobLogService:
         ]
         job_executor_option_dict = {item.get('value'): item for item in job_executor_option}
 
-        for item in job_log_list:
+        def format_row(item: Dict):
             if item.get('status') == '0':
                 item['status'] = '正常'
             else:
@@ -137,6 +137,7 @@ class JobLogService:
                 item['jobGroup'] = job_group_option_dict.get(str(item.get('jobGroup'))).get('label')
             if str(item.get('jobExecutor')) in job_executor_option_dict.keys():
                 item['jobExecutor'] = job_executor_option_dict.get(str(item.get('jobExecutor'))).get('label')
-        binary_data = ExcelUtil.export_list2excel(job_log_list, mapping_dict)
 
-        return binary_data
+        job_log_rows = await JobLogDao.get_job_log_list(query_db, query_object, is_stream=True)
+
+        return ExcelUtil.stream_list2excel(job_log_rows, mapping_dict, format_row)
@@ -1,6 +1,6 @@
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Dict
 from config.constant import CommonConstant, JobConstant
 from config.get_scheduler import SchedulerUtil
 from exceptions.exception import ServiceException
@@ -200,13 +200,14 @@ class JobService:
         return result
 
     @staticmethod
-    async def export_job_list_services(request: Request, job_list: List):
+    async def export_job_list_services(request: Request, query_db: AsyncSession, query_object: JobPageQueryModel):
         """
         导出定时任务信息service
 
         :param request: Request对象
-        :param job_list: 定时任务信息列表
-        :return: 定时任务信息对应excel的二进制数据
+        :param query_db: orm对象
+        :param query_object: 查询参数对象
+        :return: 定时任务信息对应excel的二进制数据块异步生成器
         """
         # 创建一个映射字典，将英文键映射到中文键
         mapping_dict = {
@@ -241,7 +242,7 @@ class JobService:
         ]
         job_executor_option_dict = {item.get('value'): item for item in job_executor_option}
 
-        for item in job_list:
+        def format_row(item: Dict):
             if item.get('status') == '0':
                 item['status'] = '正常'
             else:
@@ -260,6 +261,7 @@ class JobService:
                 item['concurrent'] = '允许'
             else:
                 item['concurrent'] = '禁止'
-        binary_data = ExcelUtil.export_list2excel(job_list, mapping_dict)
 
-        return binary_data
+        job_rows = await JobDao.get_job_list(query_db, query_object, is_stream=True)
+
+        return ExcelUtil.stream_list2excel(job_rows, mapping_dict, format_row)
@@ -1,6 +1,6 @@
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Dict
 from exceptions.exception import ServiceException
 from module_admin.dao.log_dao import LoginLogDao, OperationLogDao
 from module_admin.entity.vo.common_vo import CrudResponseModel
@@ -94,13 +94,16 @@ class OperationLogService:
             raise e
 
     @classmethod
-    async def export_operation_log_list_services(cls, request: Request, operation_log_list: List):
+    async def export_operation_log_list_services(
+        cls, request: Request, query_db: AsyncSession, query_object: OperLogPageQueryModel
+    ):
         """
         导出操作日志信息service
 
         :param request: Request对象
-        :param operation_log_list: 操作日志信息列表
-        :return: 操作日志信息对应excel的二进制数据
+        :param query_db: orm对象
+        :param query_object: 查询参数对象
+        :return: 操作日志信息对应excel的二进制数据块异步生成器
         """
         # 创建一个映射字典，将英文键映射到中文键
         mapping_dict = {
@@ -130,16 +133,17 @@ class OperationLogService:
         ]
         operation_type_option_dict = {item.get('value'): item for item in operation_type_option}
 
-        for item in operation_log_list:
+        def format_row(item: Dict):
             if item.get('status') == 0:
                 item['status'] = '成功'
             else:
                 item['status'] = '失败'
             if str(item.get('businessType')) in operation_type_option_dict.keys():
                 item['businessType'] = operation_type_option_dict.get(str(item.get('businessType'))).get('label')
-        binary_data = ExcelUtil.export_list2excel(operation_log_list, mapping_dict)
 
-        return binary_data
+        operation_log_rows = await OperationLogDao.get_operation_log_list(query_db, query_object, is_stream=True)
+
+        return ExcelUtil.stream_list2excel(operation_log_rows, mapping_dict, format_row)
 
 
 class LoginLogService:
@@ -229,12 +233,13 @@ class LoginLogService:
             raise ServiceException(message='该用户未锁定')
 
     @staticmethod
-    async def export_login_log_list_services(login_log_list: List):
+    async def export_login_log_list_services(query_db: AsyncSession, query_object: LoginLogPageQueryModel):
         """
         导出登录日志信息service
 
-        :param login_log_list: 登录日志信息列表
-        :return: 登录日志信息对应excel的二进制数据
+        :param query_db: orm对象
+        :param query_object: 查询参数对象
+        :return: 登录日志信息对应excel的二进制数据块异步生成器
         """
         # 创建一个映射字典，将英文键映射到中文键
         mapping_dict = {
@@ -249,11 +254,12 @@ class LoginLogService:
             'loginTime': '登录日期',
         }
 
-        for item in login_log_list:
+        def format_row(item: Dict):
             if item.get('status') == '0':
                 item['status'] = '成功'
             else:
                 item['status'] = '失败'
-        binary_data = ExcelUtil.export_list2excel(login_log_list, mapping_dict)
 
-        return binary_data
+        login_log_rows = await LoginLogDao.get_login_log_list(query_db, query_object, is_stream=True)
+
+        return ExcelUtil.stream_list2excel(login_log_rows, mapping_dict, format_row)
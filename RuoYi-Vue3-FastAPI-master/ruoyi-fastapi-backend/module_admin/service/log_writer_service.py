@@ -0,0 +1,221 @@
+import asyncio
+from typing import Dict, List, Optional, Union
+from config.database import AsyncSessionLocal
+from module_admin.dao.job_log_dao import JobLogDao
+from module_admin.dao.log_dao import LoginLogDao, OperationLogDao
+from module_admin.entity.vo.job_vo import JobLogModel
+from module_admin.entity.vo.log_vo import LogininforModel, OperLogModel
+from utils.log_util import logger
+
+
+class LogWriterService:
+    """
+    日志异步写入服务层
+
+    日志装饰器及定时任务事件监听器只负责把日志记录放入进程内有界队列，由后台任务批量取出后使用独立会话多行插入日志表，
+    请求及调度器不再同步等待日志写入；队列已满时短暂等待（背压），仍无空位则丢弃并计数。
+    停止时通过停止标记及停止信号通知后台任务写完当前批次后退出，不在写入过程中取消后台任务。
+    """
+
+    # 队列容量上限
+    QUEUE_MAX_SIZE = 10000
+
+    # 单次批量写入的最大条数
+    BATCH_SIZE = 200
+
+    # 批量写入前等待更多日志的最长时间（秒）
+    FLUSH_INTERVAL_SECONDS = 0.5
+
+    # 队列已满时入队的最长等待时间（秒）
+    ENQUEUE_TIMEOUT_SECONDS = 0.05
+
+    # 写入统计 {enqueued: 入队数, written: 写入数, dropped: 丢弃数, failed: 写入失败数}
+    stats: Dict[str, int] = {'enqueued': 0, 'written': 0, 'dropped': 0, 'failed': 0}
+
+    # 停止信号，放入队列唤醒正在等待日志的后台任务
+    _STOP_SIGNAL = object()
+
+    _queue: Optional[asyncio.Queue] = None
+    _stopping: bool = False
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _worker_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def start(cls):
+        """
+        启动日志写入后台任务（未启动时在首次入队时自动启动）
+
+        :return:
+        """
+        if cls._worker_task is not None and not cls._worker_task.done():
+            return
+        if cls._queue is None:
+            cls._queue = asyncio.Queue(maxsize=cls.QUEUE_MAX_SIZE)
+        cls._loop = asyncio.get_running_loop()
+        cls._stopping = False
+        cls._worker_task = asyncio.create_task(cls._run())
+
+    @classmethod
+    async def stop(cls):
+        """
+        停止日志写入后台任务，并写入队列中剩余的日志
+
+        :return:
+        """
+        if cls._worker_task is not None:
+            cls._stopping = True
+            if not cls._worker_task.done():
+                await cls._queue.put(cls._STOP_SIGNAL)
+            try:
+                await cls._worker_task
+            except Exception as e:
+                logger.error(f'日志写入任务异常退出: {str(e)}')
+            cls._worker_task = None
+        if cls._queue is not None:
+            while not cls._queue.empty():
+                await cls._write_batch(cls._drain(cls.BATCH_SIZE))
+        logger.info(f'日志写入任务已停止，统计：{cls.stats}')
+
+    @classmethod
+    async def enqueue(cls, log: Union[OperLogModel, LogininforModel, JobLogModel]) -> bool:
+        """
+        日志入队
+
+        :param log: 操作日志、登录日志或定时任务日志对象
+        :return: 是否入队成功
+        """
+        cls.start()
+        try:
+            cls._queue.put_nowait(log)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(cls._queue.put(log), timeout=cls.ENQUEUE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                cls.stats['dropped'] += 1
+                if cls.stats['dropped'] % 100 == 1:
+                    logger.warning(f'日志队列已满，已丢弃日志{cls.stats["dropped"]}条')
+                return False
+        cls.stats['enqueued'] += 1
+        return True
+
+    @classmethod
+    def enqueue_threadsafe(cls, log: Union[OperLogModel, LogininforModel, JobLogModel]) -> None:
+        """
+        在同步代码中日志入队，不等待（定时任务事件监听器可能在线程池执行器的线程中被调用）
+
+        :param log: 操作日志、登录日志或定时任务日志对象
+        :return:
+        """
+        loop = cls._loop
+        if loop is None or loop.is_closed():
+            cls.stats['dropped'] += 1
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            cls._put_nowait(log)
+        else:
+            loop.call_soon_threadsafe(cls._put_nowait, log)
+
+    @classmethod
+    def _put_nowait(cls, log: Union[OperLogModel, LogininforModel, JobLogModel]) -> None:
+        """
+        日志入队，队列已满时直接丢弃并计数（在事件循环线程中调用）
+
+        :param log: 操作日志、登录日志或定时任务日志对象
+        :return:
+        """
+        try:
+            cls._queue.put_nowait(log)
+        except asyncio.QueueFull:
+            cls.stats['dropped'] += 1
+            if cls.stats['dropped'] % 100 == 1:
+                logger.warning(f'日志队列已满，已丢弃日志{cls.stats["dropped"]}条')
+            return
+        cls.stats['enqueued'] += 1
+
+    @classmethod
+    def _drain(cls, limit: int) -> List[Union[OperLogModel, LogininforModel, JobLogModel]]:
+        """
+        取出队列中已有的日志（不等待）
+
+        :param limit: 最大条数
+        :return: 日志列表
+        """
+        batch = []
+        while len(batch) < limit:
+            try:
+                log = cls._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if log is not cls._STOP_SIGNAL:
+                batch.append(log)
+        return batch
+
+    @classmethod
+    async def _run(cls):
+        """
+        后台任务：等待日志入队，凑批后写入数据库；收到停止信号后写完当前批次即退出
+
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        while not cls._stopping:
+            log = await cls._queue.get()
+            batch = [] if log is cls._STOP_SIGNAL else [log]
+            deadline = loop.time() + cls.FLUSH_INTERVAL_SECONDS
+            while batch and len(batch) < cls.BATCH_SIZE and not cls._stopping:
+                batch.extend(cls._drain(cls.BATCH_SIZE - len(batch)))
+                timeout = deadline - loop.time()
+                if len(batch) >= cls.BATCH_SIZE or timeout <= 0:
+                    break
+                try:
+                    log = await asyncio.wait_for(cls._queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if log is cls._STOP_SIGNAL:
+                    break
+                batch.append(log)
+            await cls._write_batch(batch)
+
+    @classmethod
+    async def _write_batch(cls, batch: List[Union[OperLogModel, LogininforModel, JobLogModel]]):
+        """
+        按日志类型多行插入日志表，批量写入失败时改为逐条写入，避免个别日志导致整批丢失
+
+        :param batch: 日志列表
+        :return:
+        """
+        if not batch:
+            return
+        try:
+            await cls._insert_logs(batch)
+            cls.stats['written'] += len(batch)
+            return
+        except Exception as e:
+            logger.warning(f'批量写入日志失败，改为逐条写入{len(batch)}条: {str(e)}')
+        for log in batch:
+            try:
+                await cls._insert_logs([log])
+                cls.stats['written'] += 1
+            except Exception as e:
+                cls.stats['failed'] += 1
+                logger.error(f'写入{type(log).__name__}失败，丢失日志1条: {str(e)}')
+
+    @classmethod
+    async def _insert_logs(cls, logs: List[Union[OperLogModel, LogininforModel, JobLogModel]]):
+        """
+        使用独立会话按日志类型多行插入日志表（同一事务）
+
+        :param logs: 日志列表
+        :return:
+        """
+        async with AsyncSessionLocal() as session:
+            await OperationLogDao.add_operation_logs_dao(
+                session, [log for log in logs if isinstance(log, OperLogModel)]
+            )
+            await LoginLogDao.add_login_logs_dao(session, [log for log in logs if isinstance(log, LogininforModel)])
+            await JobLogDao.add_job_logs_dao(session, [log for log in logs if isinstance(log, JobLogModel)])
+            await session.commit()
@@ -18,6 +18,9 @@ from module_admin.entity.do.menu_do import SysMenu
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.login_vo import MenuTreeModel, MetaModel, RouterModel, SmsCode, UserLogin, UserRegister
 from module_admin.entity.vo.user_vo import AddUserModel, CurrentUserModel, ResetUserModel, TokenData, UserInfoModel
+from module_admin.service.menu_index_service import MenuIndexService
+from module_admin.service.current_user_cache_service import CurrentUserCacheService, CurrentUserSnapshot
+from module_admin.service.online_session_service import OnlineSessionService
 from module_admin.service.user_service import UserService
 from utils.common_util import CamelCaseUtil
 from utils.log_util import logger
@@ -98,7 +101,7 @@ class LoginService:
             logger.warning('用户不存在')
             raise LoginException(data='', message='用户不存在')
         # user[0] = SysUserLocal, user[1] = OaEmployeePrimary, user[2] = OaDepartment
-        if not PwdUtil.verify_password(login_user.password, user[0].password):
+        if not await PwdUtil.verify_password_async(login_user.password, user[0].password):
             cache_password_error_count = await request.app.state.redis.get(
                 f'{RedisInitKeyConfig.PASSWORD_ERROR_COUNT.key}:{login_user.user_name}'
             )
@@ -195,9 +198,10 @@ class LoginService:
         :return: 当前用户信息对象
         :raise: 令牌异常AuthException
         """
-        # if token[:6] != 'Bearer':
-        #     logger.warning("用户token不合法")
-        #     raise AuthException(data="", message="用户token不合法")
+        # 同一请求内复用已解析的当前用户信息（如Log装饰器会再次调用）
+        request_current_user = getattr(request.state, 'current_user', None)
+        if request_current_user is not None:
+            return request_current_user
         try:
             if token.startswith('Bearer'):
                 token = token.split(' ')[1]
@@ -211,93 +215,130 @@ class LoginService:
         except InvalidTokenError:
             logger.warning('用户token已失效，请重新登录')
             raise AuthException(data='', message='用户token已失效，请重新登录')
-        query_user = await UserDao.get_user_by_id(query_db, user_id=token_data.user_id)
-        if query_user.get('user_basic_info') is None:
-            logger.warning('用户token不合法')
-            raise AuthException(data='', message='用户token不合法')
+        redis = request.app.state.redis
         if AppConfig.app_same_time_login:
-            redis_token = await request.app.state.redis.get(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}')
+            token_key = f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}'
         else:
             # 此方法可实现同一账号同一时间只能登录一次
-            redis_token = await request.app.state.redis.get(
-                f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{query_user.get("user_basic_info").user_id}'
-            )
-        if token == redis_token:
-            if AppConfig.app_same_time_login:
-                await request.app.state.redis.set(
-                    f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}',
-                    redis_token,
-                    ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
-                )
-            else:
-                await request.app.state.redis.set(
-                    f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{query_user.get("user_basic_info").user_id}',
-                    redis_token,
-                    ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
+            token_key = f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_data.user_id}'
+        # 令牌、用户信息快照、快照版本号及密码相关配置一次读取
+        (
+            redis_token,
+            snapshot_value,
+            global_version,
+            user_version,
+            init_password_modify,
+            password_validate_days,
+        ) = await redis.mget(
+            token_key,
+            CurrentUserCacheService.get_snapshot_key(session_id),
+            CurrentUserCacheService.get_global_version_key(),
+            CurrentUserCacheService.get_user_version_key(token_data.user_id),
+            f'{RedisInitKeyConfig.SYS_CONFIG.key}:sys.account.initPasswordModify',
+            f'{RedisInitKeyConfig.SYS_CONFIG.key}:sys.account.passwordValidateDays',
+        )
+        if token != redis_token:
+            logger.warning('用户token已失效，请重新登录')
+            raise AuthException(data='', message='用户token已失效，请重新登录')
+        if CurrentUserCacheService.need_refresh_token(token_key):
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.expire(token_key, timedelta(minutes=JwtConfig.jwt_redis_expire_minutes))
+                OnlineSessionService.touch_session(
+                    pipe, token_key.split(':', 1)[1], JwtConfig.jwt_redis_expire_minutes * 60
                 )
+                await pipe.execute()
+
+        version = CurrentUserCacheService.build_version(global_version, user_version)
+        snapshot = CurrentUserCacheService.get_snapshot(session_id, version, snapshot_value)
+        if snapshot is None:
+            # 全局版本号变化说明其他进程修改过菜单或角色，菜单索引需重建
+            MenuIndexService.observe_version(global_version)
+            snapshot = await cls.__build_current_user_snapshot(query_db, token_data.user_id, version)
+            await CurrentUserCacheService.save_snapshot(redis, session_id, snapshot)
+
+        pwd_update_date = snapshot.current_user.user.pwd_update_date
+        current_user = snapshot.current_user.model_copy(
+            update={
+                'is_default_modify_pwd': cls.__init_password_is_modify(init_password_modify, pwd_update_date),
+                'is_password_expired': cls.__password_is_expired(password_validate_days, pwd_update_date),
+            },
+            deep=True,
+        )
+        request.state.current_user = current_user
+        request.state.has_workbench_menu = snapshot.has_workbench_menu
+        return current_user
 
-            role_id_list = [item.role_id for item in query_user.get('user_role_info', [])]
-            if 1 in role_id_list:
-                permissions = ['*:*:*']
-            else:
-                # 安全处理：如果 user_menu_info 为空或 None，返回空列表
-                user_menu_info = query_user.get('user_menu_info', []) or []
-                permissions = [row.perms for row in user_menu_info if row.perms]  # 过滤掉 None 或空字符串
-            # 岗位信息：从 oa_department.rank_id → oa_rank 获取（只读显示）
-            post_ids = ','.join([str(row.post_id) for row in query_user.get('user_post_info', [])]) if query_user.get('user_post_info') else ''
-            role_ids = ','.join([str(row.role_id) for row in query_user.get('user_role_info', [])]) if query_user.get('user_role_info') else ''
-            roles = [row.role_key for row in query_user.get('user_role_info', [])]
-            is_default_modify_pwd = await cls.__init_password_is_modify(
-                request, query_user.get('user_basic_info').pwd_update_date
-            )
-            is_password_expired = await cls.__password_is_expired(
-                request, query_user.get('user_basic_info').pwd_update_date
-            )
+    @classmethod
+    async def __build_current_user_snapshot(cls, query_db: AsyncSession, user_id: int, version: str):
+        """
+        查询数据库构建当前用户信息快照
 
-            current_user = CurrentUserModel(
-                permissions=permissions,
-                roles=roles,
-                user=UserInfoModel(
-                    **CamelCaseUtil.transform_result(query_user.get('user_basic_info')),
-                    postIds=post_ids,
-                    roleIds=role_ids,
-                    dept=CamelCaseUtil.transform_result(query_user.get('user_dept_info')),
-                    role=CamelCaseUtil.transform_result(query_user.get('user_role_info')),
-                ),
-                isDefaultModifyPwd=is_default_modify_pwd,
-                isPasswordExpired=is_password_expired,
-            )
-            return current_user
+        :param query_db: orm对象
+        :param user_id: 用户id
+        :param version: 快照版本
+        :return: 当前用户信息快照
+        :raise: 令牌异常AuthException
+        """
+        query_user = await UserDao.get_user_by_id(query_db, user_id=user_id)
+        if query_user.get('user_basic_info') is None:
+            logger.warning('用户token不合法')
+            raise AuthException(data='', message='用户token不合法')
+
+        # 安全处理：如果 user_menu_info 为空或 None，返回空列表
+        user_menu_info = query_user.get('user_menu_info', []) or []
+        role_id_list = [item.role_id for item in query_user.get('user_role_info', [])]
+        if 1 in role_id_list:
+            permissions = ['*:*:*']
+        elif user_menu_info:
+            # 角色权限标识在菜单索引中预先计算，直接取并集
+            permissions = sorted((await MenuIndexService.get_index()).get_permissions(role_id_list))
         else:
-            logger.warning('用户token已失效，请重新登录')
-            raise AuthException(data='', message='用户token已失效，请重新登录')
+            permissions = []
+        # 岗位信息：从 oa_department.rank_id → oa_rank 获取（只读显示）
+        post_ids = ','.join([str(row.post_id) for row in query_user.get('user_post_info', [])]) if query_user.get('user_post_info') else ''
+        role_ids = ','.join([str(row.role_id) for row in query_user.get('user_role_info', [])]) if query_user.get('user_role_info') else ''
+        roles = [row.role_key for row in query_user.get('user_role_info', [])]
+        # 是否有工作台相关菜单（菜单名称包含"工作台"、路径包含"workbench"或权限标识以task:开头）
+        has_workbench_menu = any(
+            '工作台' in (menu.menu_name or '')
+            or 'workbench' in (menu.path or '').lower()
+            or (menu.perms and menu.perms.startswith('task:'))
+            for menu in user_menu_info
+        )
+
+        current_user = CurrentUserModel(
+            permissions=permissions,
+            roles=roles,
+            user=UserInfoModel(
+                **CamelCaseUtil.transform_result(query_user.get('user_basic_info')),
+                postIds=post_ids,
+                roleIds=role_ids,
+                dept=CamelCaseUtil.transform_result(query_user.get('user_dept_info')),
+                role=CamelCaseUtil.transform_result(query_user.get('user_role_info')),
+            ),
+        )
+        return CurrentUserSnapshot(version, current_user, has_workbench_menu)
 
     @classmethod
-    async def __init_password_is_modify(cls, request: Request, pwd_update_date: datetime):
+    def __init_password_is_modify(cls, init_password_is_modify: Optional[str], pwd_update_date: datetime):
         """
         判断当前用户是否初始密码登录
 
-        :param request: Request对象
+        :param init_password_is_modify: 系统配置sys.account.initPasswordModify的值
         :param pwd_update_date: 密码最后更新时间
         :return: 是否初始密码登录
         """
-        init_password_is_modify = await request.app.state.redis.get(
-            f'{RedisInitKeyConfig.SYS_CONFIG.key}:sys.account.initPasswordModify'
-        )
         return init_password_is_modify == '1' and pwd_update_date is None
 
     @classmethod
-    async def __password_is_expired(cls, request: Request, pwd_update_date: datetime):
+    def __password_is_expired(cls, password_validate_days: Optional[str], pwd_update_date: datetime):
         """
         判断当前用户密码是否过期
 
-        :param request: Request对象
+        :param password_validate_days: 系统配置sys.account.passwordValidateDays的值
         :param pwd_update_date: 密码最后更新时间
         :return: 密码是否过期
         """
-        password_validate_days = await request.app.state.redis.get(
-            f'{RedisInitKeyConfig.SYS_CONFIG.key}:sys.account.passwordValidateDays'
-        )
         if password_validate_days and int(password_validate_days) > 0:
             if pwd_update_date is None:
                 return True
@@ -489,7 +530,7 @@ class LoginService:
                 add_user = AddUserModel(
                     userName=user_register.username,
                     nickName=user_register.username,
-                    password=PwdUtil.get_password_hash(user_register.password),
+                    password=await PwdUtil.get_password_hash_async(user_register.password),
                     pwdUpdateDate=datetime.now(),
                 )
                 result = await UserService.add_user_services(query_db, add_user)
@@ -540,7 +581,7 @@ class LoginService:
             f'{RedisInitKeyConfig.SMS_CODE.key}:{forget_user.session_id}'
         )
         if forget_user.sms_code == redis_sms_result:
-            forget_user.password = PwdUtil.get_password_hash(forget_user.password)
+            forget_user.password = await PwdUtil.get_password_hash_async(forget_user.password)
             forget_user.user_id = (await UserDao.get_user_by_name(query_db, forget_user.user_name)).user_id
             edit_result = await UserService.reset_user_services(query_db, forget_user)
             result = edit_result.dict()
@@ -561,7 +602,7 @@ class LoginService:
         :param token_id: 令牌编号
         :return: 退出登录结果
         """
-        await request.app.state.redis.delete(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_id}')
+        await OnlineSessionService.remove_sessions(request.app.state.redis, [token_id])
         # await request.app.state.redis.delete(f'{current_user.user.user_id}_access_token')
         # await request.app.state.redis.delete(f'{current_user.user.user_id}_session_id')
 
@@ -0,0 +1,232 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+from config.database import AsyncSessionLocal
+from module_admin.dao.menu_index_dao import MenuIndexDao
+from utils.log_util import logger
+
+
+class MenuIndex:
+    """
+    菜单树索引快照（构建完成后只读，重建时整体替换）
+    """
+
+    def __init__(self, version: int, source_version: Optional[str], menus, role_menu_rows):
+        """
+        根据在用菜单与在用角色的角色菜单关联构建索引
+
+        :param version: 索引版本号
+        :param source_version: 构建时观测到的全局数据版本号
+        :param menus: 在用菜单列表（按显示顺序排序）
+        :param role_menu_rows: (role_id, menu_id)行列表
+        """
+        self.version = version
+        self.source_version = source_version
+        self.built_at = datetime.now()
+        self.built_monotonic = time.monotonic()
+
+        self.menus = list(menus)
+        self.menus_by_id = {menu.menu_id: menu for menu in self.menus}
+        self._order_by_id = {menu.menu_id: position for position, menu in enumerate(self.menus)}
+
+        # 预先计算每个菜单的在用祖先菜单（遇到停用或不存在的父菜单时停止）
+        self.ancestor_ids: Dict[int, FrozenSet[int]] = {}
+        for menu in self.menus:
+            self._get_ancestor_ids(menu.menu_id)
+
+        # 预先计算每个角色的菜单闭包（直接分配的菜单及其祖先菜单）与权限标识
+        assigned_menu_ids: Dict[int, Set[int]] = {}
+        for role_id, menu_id in role_menu_rows:
+            if menu_id in self.menus_by_id:
+                assigned_menu_ids.setdefault(role_id, set()).add(menu_id)
+        self.role_menu_ids: Dict[int, FrozenSet[int]] = {}
+        self.role_permissions: Dict[int, FrozenSet[str]] = {}
+        for role_id, menu_ids in assigned_menu_ids.items():
+            closure = set(menu_ids)
+            for menu_id in menu_ids:
+                closure.update(self.ancestor_ids[menu_id])
+            self.role_menu_ids[role_id] = frozenset(closure)
+            self.role_permissions[role_id] = frozenset(
+                self.menus_by_id[menu_id].perms for menu_id in closure if self.menus_by_id[menu_id].perms
+            )
+
+    def _get_ancestor_ids(self, menu_id: int) -> FrozenSet[int]:
+        """
+        迭代计算菜单的在用祖先菜单ID（带缓存与环检测）
+
+        :param menu_id: 菜单ID
+        :return: 祖先菜单ID集合
+        """
+        cached = self.ancestor_ids.get(menu_id)
+        if cached is not None:
+            return cached
+        path: List[int] = []
+        visited: Set[int] = set()
+        current_id = menu_id
+        base: FrozenSet[int] = frozenset()
+        while current_id in self.menus_by_id and current_id not in visited:
+            if current_id in self.ancestor_ids:
+                base = self.ancestor_ids[current_id] | {current_id}
+                break
+            visited.add(current_id)
+            path.append(current_id)
+            parent_id = self.menus_by_id[current_id].parent_id
+            if not parent_id:
+                break
+            current_id = parent_id
+        # 自顶向下回填路径上每个菜单的祖先集合
+        for node_id in reversed(path):
+            self.ancestor_ids[node_id] = base
+            base = base | {node_id}
+        return self.ancestor_ids.get(menu_id, frozenset())
+
+    def get_menu_ids_for_roles(self, role_id_list: Iterable[int]) -> Set[int]:
+        """
+        获取角色列表的菜单ID并集
+
+        :param role_id_list: 角色ID列表
+        :return: 菜单ID集合
+        """
+        menu_ids: Set[int] = set()
+        for role_id in role_id_list:
+            menu_ids |= self.role_menu_ids.get(role_id, frozenset())
+        return menu_ids
+
+    def get_menus_for_roles(self, role_id_list: Iterable[int]) -> list:
+        """
+        获取角色列表可见的菜单（包含父菜单，按显示顺序排序），超级管理员返回所有在用菜单
+
+        :param role_id_list: 角色ID列表
+        :return: 菜单列表
+        """
+        role_id_list = list(role_id_list)
+        if 1 in role_id_list:
+            return list(self.menus)
+        menu_ids = self.get_menu_ids_for_roles(role_id_list)
+        return [self.menus_by_id[menu_id] for menu_id in sorted(menu_ids, key=self._order_by_id.__getitem__)]
+
+    def get_permissions(self, role_id_list: Iterable[int]) -> Set[str]:
+        """
+        获取角色列表的权限标识并集
+
+        :param role_id_list: 角色ID列表
+        :return: 权限标识集合
+        """
+        permissions: Set[str] = set()
+        for role_id in role_id_list:
+            permissions |= self.role_permissions.get(role_id, frozenset())
+        return permissions
+
+
+class MenuIndexService:
+    """
+    菜单索引服务层
+
+    菜单与角色菜单关联只通过菜单管理、角色管理写入，因此在进程内维护一份只读的菜单树索引，
+    本进程写入后立即标记失效；其他进程通过当前用户快照的全局版本号感知变更，
+    超过最大存活时间的索引在下次访问时重建作为兜底。
+    """
+
+    # 索引最大存活时间（秒）
+    INDEX_MAX_AGE_SECONDS = 300
+
+    _index: Optional[MenuIndex] = None
+    _version = 0
+    _stale = True
+    _observed_version: Optional[str] = None
+    _lock = asyncio.Lock()
+
+    @classmethod
+    async def init_menu_index(cls):
+        """
+        应用启动时构建菜单索引
+
+        :return:
+        """
+        logger.info('🔎 开始构建菜单索引...')
+        index = await cls.rebuild_index(force=True)
+        logger.info(f'✅️ 菜单索引构建成功，菜单{len(index.menus_by_id)}个，角色{len(index.role_menu_ids)}个')
+
+    @classmethod
+    def _is_fresh(cls, index: Optional[MenuIndex]) -> bool:
+        """
+        判断索引是否可直接使用
+
+        :param index: 菜单索引
+        :return: 是否可用
+        """
+        return (
+            index is not None
+            and not cls._stale
+            and time.monotonic() - index.built_monotonic < cls.INDEX_MAX_AGE_SECONDS
+        )
+
+    @classmethod
+    async def get_index(cls) -> MenuIndex:
+        """
+        获取当前菜单索引（未构建、已失效或已过期时重建）
+
+        :return: 菜单索引
+        """
+        index = cls._index
+        if cls._is_fresh(index):
+            return index
+        # 仅因过期需要重建且已有其他协程在重建时直接使用旧索引；菜单或角色变更导致的失效必须等待重建完成
+        if index is not None and not cls._stale and cls._lock.locked():
+            return index
+        return await cls.rebuild_index()
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """
+        标记菜单索引失效（菜单或角色菜单关联变更后调用）
+
+        :return:
+        """
+        cls._stale = True
+
+    @classmethod
+    def observe_version(cls, global_version: Optional[str]) -> None:
+        """
+        观测全局数据版本号，与索引构建时的版本不一致时标记失效（用于感知其他进程的菜单、角色变更）
+
+        :param global_version: 全局数据版本号
+        :return:
+        """
+        global_version = global_version or '0'
+        cls._observed_version = global_version
+        index = cls._index
+        if index is not None and index.source_version != global_version:
+            cls._stale = True
+
+    @classmethod
+    async def rebuild_index(cls, force: bool = False) -> MenuIndex:
+        """
+        重建菜单索引并原子替换
+
+        :param force: 是否强制重建
+        :return: 新的菜单索引
+        """
+        async with cls._lock:
+            index = cls._index
+            if not force and cls._is_fresh(index):
+                return index
+
+            # 先清除失效标记，重建期间再次发生的变更会重新标记失效
+            cls._stale = False
+            source_version = cls._observed_version
+            try:
+                async with AsyncSessionLocal() as session:
+                    menus = await MenuIndexDao.get_all_enabled_menus(session)
+                    role_menu_rows = await MenuIndexDao.get_enabled_role_menu_rows(session)
+            except Exception:
+                cls._stale = True
+                raise
+
+            new_index = MenuIndex(cls._version + 1, source_version, menus, role_menu_rows)
+            cls._version = new_index.version
+            cls._index = new_index
+            logger.info(f'菜单索引已重建，版本：{new_index.version}')
+
+            return new_index
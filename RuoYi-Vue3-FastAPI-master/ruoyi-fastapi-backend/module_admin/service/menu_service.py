@@ -4,6 +4,7 @@ from config.constant import CommonConstant, MenuConstant
 from exceptions.exception import ServiceException, ServiceWarning
 from module_admin.dao.menu_dao import MenuDao
 from module_admin.dao.role_dao import RoleDao
+from module_admin.service.menu_index_service import MenuIndexService
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.menu_vo import DeleteMenuModel, MenuQueryModel, MenuModel
 from module_admin.entity.vo.role_vo import RoleMenuQueryModel
@@ -106,6 +107,7 @@ class MenuService:
             try:
                 await MenuDao.add_menu_dao(query_db, page_object)
                 await query_db.commit()
+                MenuIndexService.invalidate()
                 return CrudResponseModel(is_success=True, message='新增成功')
             except Exception as e:
                 await query_db.rollback()
@@ -133,6 +135,7 @@ class MenuService:
                 try:
                     await MenuDao.edit_menu_dao(query_db, edit_menu)
                     await query_db.commit()
+                    MenuIndexService.invalidate()
                     return CrudResponseModel(is_success=True, message='更新成功')
                 except Exception as e:
                     await query_db.rollback()
@@ -159,6 +162,7 @@ class MenuService:
                         raise ServiceWarning(message='菜单已分配,不允许删除')
                     await MenuDao.delete_menu_dao(query_db, MenuModel(menuId=menu_id))
                 await query_db.commit()
+                MenuIndexService.invalidate()
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
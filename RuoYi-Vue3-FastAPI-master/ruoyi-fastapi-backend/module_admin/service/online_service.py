@@ -1,10 +1,8 @@
-import jwt
 from fastapi import Request
-from config.enums import RedisInitKeyConfig
-from config.env import JwtConfig
 from exceptions.exception import ServiceException
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.online_vo import DeleteOnlineModel, OnlineQueryModel
+from module_admin.service.online_session_service import OnlineSessionService
 from utils.common_util import CamelCaseUtil
 
 
@@ -22,35 +20,21 @@ class OnlineService:
         :param query_object: 查询参数对象
         :return: 在线用户列表信息
         """
-        access_token_keys = await request.app.state.redis.keys(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}*')
-        if not access_token_keys:
-            access_token_keys = []
-        access_token_values_list = [await request.app.state.redis.get(key) for key in access_token_keys]
+        session_list = await OnlineSessionService.get_sessions(request.app.state.redis)
         online_info_list = []
-        for item in access_token_values_list:
-            payload = jwt.decode(item, JwtConfig.jwt_secret_key, algorithms=[JwtConfig.jwt_algorithm])
-            online_dict = dict(
-                token_id=payload.get('session_id'),
-                user_name=payload.get('user_name'),
-                dept_name=payload.get('dept_name'),
-                ipaddr=payload.get('login_info').get('ipaddr'),
-                login_location=payload.get('login_info').get('loginLocation'),
-                browser=payload.get('login_info').get('browser'),
-                os=payload.get('login_info').get('os'),
-                login_time=payload.get('login_info').get('loginTime'),
-            )
+        for online_dict in session_list:
             if query_object.user_name and not query_object.ipaddr:
-                if query_object.user_name == payload.get('user_name'):
+                if query_object.user_name == online_dict.get('user_name'):
                     online_info_list = [online_dict]
                     break
             elif not query_object.user_name and query_object.ipaddr:
-                if query_object.ipaddr == payload.get('login_info').get('ipaddr'):
+                if query_object.ipaddr == online_dict.get('ipaddr'):
                     online_info_list = [online_dict]
                     break
             elif query_object.user_name and query_object.ipaddr:
-                if query_object.user_name == payload.get('user_name') and query_object.ipaddr == payload.get(
-                    'login_info'
-                ).get('ipaddr'):
+                if query_object.user_name == online_dict.get('user_name') and query_object.ipaddr == online_dict.get(
+                    'ipaddr'
+                ):
                     online_info_list = [online_dict]
                     break
             else:
@@ -69,8 +53,7 @@ class OnlineService:
         """
         if page_object.token_ids:
             token_id_list = page_object.token_ids.split(',')
-            for token_id in token_id_list:
-                await request.app.state.redis.delete(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_id}')
+            await OnlineSessionService.remove_sessions(request.app.state.redis, token_id_list)
             return CrudResponseModel(is_success=True, message='强退成功')
         else:
             raise ServiceException(message='传入session_id为空')
@@ -0,0 +1,217 @@
+import json
+import jwt
+import time
+from redis import asyncio as aioredis
+from typing import Dict, Iterable, List, Optional
+from config.enums import RedisInitKeyConfig
+from config.env import AppConfig, JwtConfig
+from utils.log_util import logger
+from utils.redis_util import RedisKeyUtil
+
+
+class OnlineSessionService:
+    """
+    在线会话索引服务层
+
+    登录时将会话的展示信息写入Redis哈希（会话编号 -> 会话信息），同时在有序集合中以令牌过期时间为分值记录会话，
+    在线用户列表直接读取索引并按分值清理过期会话，无需枚举令牌键、逐个读取并解码令牌。
+    会话编号与令牌键后缀一致：允许同一账号多处登录时为session_id，否则为user_id。
+    """
+
+    @classmethod
+    def get_info_key(cls) -> str:
+        """
+        获取会话信息哈希的Redis键
+
+        :return: Redis键
+        """
+        return f'{RedisInitKeyConfig.ONLINE_SESSION.key}:info'
+
+    @classmethod
+    def get_expire_key(cls) -> str:
+        """
+        获取会话过期时间有序集合的Redis键
+
+        :return: Redis键
+        """
+        return f'{RedisInitKeyConfig.ONLINE_SESSION.key}:expire'
+
+    @classmethod
+    def get_token_key(cls, token_id: str) -> str:
+        """
+        获取会话令牌的Redis键
+
+        :param token_id: 会话编号
+        :return: Redis键
+        """
+        return f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_id}'
+
+    @staticmethod
+    def get_token_id(payload: dict) -> str:
+        """
+        根据令牌内容获取会话编号
+
+        :param payload: 令牌内容
+        :return: 会话编号
+        """
+        return str(payload.get('session_id') if AppConfig.app_same_time_login else payload.get('user_id'))
+
+    @staticmethod
+    def build_session_info(token_id: str, payload: dict) -> dict:
+        """
+        根据令牌内容构建会话信息
+
+        :param token_id: 会话编号
+        :param payload: 令牌内容
+        :return: 会话信息
+        """
+        login_info = payload.get('login_info') or {}
+        return dict(
+            token_id=token_id,
+            user_name=payload.get('user_name'),
+            dept_name=payload.get('dept_name'),
+            ipaddr=login_info.get('ipaddr'),
+            login_location=login_info.get('loginLocation'),
+            browser=login_info.get('browser'),
+            os=login_info.get('os'),
+            login_time=login_info.get('loginTime'),
+        )
+
+    @classmethod
+    async def register_session(cls, redis: aioredis.Redis, payload: dict, expire_seconds: float) -> None:
+        """
+        登录成功后登记会话
+
+        :param redis: Redis连接对象
+        :param payload: 令牌内容
+        :param expire_seconds: 令牌在Redis中的过期时间（秒）
+        """
+        token_id = cls.get_token_id(payload)
+        session_info = cls.build_session_info(token_id, payload)
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hset(cls.get_info_key(), token_id, json.dumps(session_info, ensure_ascii=False, default=str))
+            pipe.zadd(cls.get_expire_key(), {token_id: time.time() + expire_seconds})
+            await pipe.execute()
+
+    @classmethod
+    def touch_session(cls, pipe, token_id: str, expire_seconds: float) -> None:
+        """
+        令牌续期时同步更新会话过期时间（在调用方的流水线中执行）
+
+        :param pipe: Redis流水线对象
+        :param token_id: 会话编号
+        :param expire_seconds: 令牌在Redis中的过期时间（秒）
+        """
+        pipe.zadd(cls.get_expire_key(), {token_id: time.time() + expire_seconds}, xx=True)
+
+    @classmethod
+    async def remove_sessions(cls, redis: aioredis.Redis, token_ids: Iterable[str]) -> None:
+        """
+        删除会话令牌及会话索引（退出登录、强退时调用）
+
+        :param redis: Redis连接对象
+        :param token_ids: 会话编号列表
+        """
+        token_ids = [str(token_id) for token_id in token_ids if token_id]
+        if not token_ids:
+            return
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.unlink(*[cls.get_token_key(token_id) for token_id in token_ids])
+            pipe.hdel(cls.get_info_key(), *token_ids)
+            pipe.zrem(cls.get_expire_key(), *token_ids)
+            await pipe.execute()
+
+    @classmethod
+    async def get_sessions(cls, redis: aioredis.Redis) -> List[Dict]:
+        """
+        获取在线会话列表（顺带清理已过期或令牌已不存在的会话）
+
+        :param redis: Redis连接对象
+        :return: 会话信息列表
+        """
+        now = time.time()
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zrangebyscore(cls.get_expire_key(), '-inf', now)
+            pipe.hgetall(cls.get_info_key())
+            expired_token_ids, session_values = await pipe.execute()
+        expired_token_ids = set(expired_token_ids)
+        token_ids = [token_id for token_id in session_values if token_id not in expired_token_ids]
+
+        # 令牌可能被缓存清理等操作直接删除，一次往返确认令牌仍然存在
+        async with redis.pipeline(transaction=False) as pipe:
+            for token_id in token_ids:
+                pipe.exists(cls.get_token_key(token_id))
+            exists_list = await pipe.execute() if token_ids else []
+
+        session_list = []
+        stale_token_ids = list(expired_token_ids)
+        for token_id, exists in zip(token_ids, exists_list):
+            if not exists:
+                stale_token_ids.append(token_id)
+                continue
+            try:
+                session_list.append(json.loads(session_values[token_id]))
+            except (json.JSONDecodeError, TypeError):
+                stale_token_ids.append(token_id)
+        if stale_token_ids:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.hdel(cls.get_info_key(), *stale_token_ids)
+                pipe.zrem(cls.get_expire_key(), *stale_token_ids)
+                await pipe.execute()
+
+        return session_list
+
+    @classmethod
+    async def rebuild_sessions(cls, redis: aioredis.Redis) -> int:
+        """
+        应用启动时根据现有令牌重建会话索引（兼容索引启用前登录的会话）
+
+        :param redis: Redis连接对象
+        :return: 登记的会话数量
+        """
+        token_keys = await RedisKeyUtil.scan_keys(redis, f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:*')
+        tokens = await RedisKeyUtil.mget_values(redis, token_keys)
+        async with redis.pipeline(transaction=False) as pipe:
+            for token_key in token_keys:
+                pipe.ttl(token_key)
+            ttl_list = await pipe.execute() if token_keys else []
+
+        now = time.time()
+        session_values: Dict[str, str] = {}
+        session_scores: Dict[str, float] = {}
+        for token_key, token, ttl in zip(token_keys, tokens, ttl_list):
+            if not token or ttl is None or ttl == -2:
+                continue
+            payload = cls._decode_token(token)
+            if payload is None:
+                continue
+            token_id = token_key.split(':', 1)[1]
+            session_values[token_id] = json.dumps(
+                cls.build_session_info(token_id, payload), ensure_ascii=False, default=str
+            )
+            session_scores[token_id] = now + ttl if ttl >= 0 else now + JwtConfig.jwt_redis_expire_minutes * 60
+
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.unlink(cls.get_info_key(), cls.get_expire_key())
+            if session_values:
+                pipe.hset(cls.get_info_key(), mapping=session_values)
+                pipe.zadd(cls.get_expire_key(), session_scores)
+            await pipe.execute()
+        logger.info(f'在线会话索引已重建，会话{len(session_values)}个')
+
+        return len(session_values)
+
+    @staticmethod
+    def _decode_token(token: str) -> Optional[dict]:
+        """
+        解码令牌（令牌不合法时返回None）
+
+        :param token: 令牌
+        :return: 令牌内容
+        """
+        try:
+            return jwt.decode(
+                token, JwtConfig.jwt_secret_key, algorithms=[JwtConfig.jwt_algorithm], options={'verify_exp': False}
+            )
+        except jwt.InvalidTokenError:
+            return None
@@ -0,0 +1,353 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from config.database import AsyncSessionLocal
+from module_admin.dao.org_index_dao import OrgIndexDao
+from module_task.todo.utils.dept_util import DeptUtil
+from utils.log_util import logger
+
+
+class OrgEmployeeNode:
+    """
+    组织索引中的员工节点（属性名与OaEmployeePrimary保持一致）
+    """
+
+    __slots__ = ('id', 'name', 'job_number', 'organization_id', 'rank_id', 'company_id', 'status', 'enable')
+
+    def __init__(self, row):
+        self.id = row.id
+        self.name = row.name
+        self.job_number = row.job_number
+        self.organization_id = row.organization_id
+        self.rank_id = row.rank_id
+        self.company_id = row.company_id
+        self.status = row.status
+        self.enable = row.enable
+
+
+class OrgDeptNode:
+    """
+    组织索引中的部门（编制）节点（属性名与OaDepartment保持一致）
+    """
+
+    __slots__ = ('id', 'name', 'code', 'parent_id', 'rank_id', 'status', 'enable')
+
+    def __init__(self, row):
+        self.id = row.id
+        self.name = row.name
+        self.code = row.code
+        self.parent_id = row.parent_id
+        self.rank_id = row.rank_id
+        self.status = row.status
+        self.enable = row.enable
+
+
+class OrgRankNode:
+    """
+    组织索引中的职级节点（属性名与OaRank保持一致）
+    """
+
+    __slots__ = ('id', 'rank_name', 'rank_code', 'enable')
+
+    def __init__(self, row):
+        self.id = row.id
+        self.rank_name = row.rank_name
+        self.rank_code = row.rank_code
+        self.enable = row.enable
+
+
+class _CodeTrieNode:
+    """
+    部门code前缀树节点
+    """
+
+    __slots__ = ('children', 'dept_ids')
+
+    def __init__(self):
+        self.children: Dict[str, '_CodeTrieNode'] = {}
+        self.dept_ids: List[int] = []
+
+
+class OrgIndex:
+    """
+    组织架构索引快照（构建完成后只读，重建时整体替换）
+    """
+
+    def __init__(self, version: int, employee_rows, dept_rows, rank_rows):
+        """
+        根据员工、部门、职级行数据构建索引
+
+        :param version: 索引版本号
+        :param employee_rows: 员工行列表
+        :param dept_rows: 部门行列表
+        :param rank_rows: 职级行列表
+        """
+        self.version = version
+        self.built_at = datetime.now()
+        self.built_monotonic = time.monotonic()
+
+        self.employees_by_id: Dict[int, OrgEmployeeNode] = {}
+        self.employees_by_job_number: Dict[str, OrgEmployeeNode] = {}
+        self.employees_by_organization: Dict[int, List[OrgEmployeeNode]] = {}
+        for row in employee_rows:
+            employee = OrgEmployeeNode(row)
+            self.employees_by_id[employee.id] = employee
+            if employee.job_number:
+                self.employees_by_job_number[employee.job_number] = employee
+            if employee.organization_id:
+                self.employees_by_organization.setdefault(employee.organization_id, []).append(employee)
+
+        self.depts_by_id: Dict[int, OrgDeptNode] = {}
+        self.depts_by_code: Dict[str, OrgDeptNode] = {}
+        self._code_trie = _CodeTrieNode()
+        for row in dept_rows:
+            dept = OrgDeptNode(row)
+            self.depts_by_id[dept.id] = dept
+            if dept.code:
+                self.depts_by_code[dept.code] = dept
+                trie_node = self._code_trie
+                for char in dept.code:
+                    trie_node = trie_node.children.setdefault(char, _CodeTrieNode())
+                trie_node.dept_ids.append(dept.id)
+
+        # 预先计算每个部门对应的第二级部门
+        self.second_level_dept_by_dept_id: Dict[int, OrgDeptNode] = {}
+        for dept in self.depts_by_id.values():
+            second_level_code = DeptUtil.get_second_level_dept_code(dept.code)
+            second_level_dept = self.depts_by_code.get(second_level_code) if second_level_code else None
+            if second_level_dept:
+                self.second_level_dept_by_dept_id[dept.id] = second_level_dept
+
+        self.ranks_by_id: Dict[int, OrgRankNode] = {}
+        for row in rank_rows:
+            rank = OrgRankNode(row)
+            self.ranks_by_id[rank.id] = rank
+
+    def get_employee(self, job_number: Optional[str]) -> Optional[OrgEmployeeNode]:
+        """
+        根据工号获取员工
+
+        :param job_number: 工号
+        :return: 员工节点
+        """
+        if not job_number:
+            return None
+        return self.employees_by_job_number.get(job_number)
+
+    def get_employee_by_id(self, employee_id: Optional[int]) -> Optional[OrgEmployeeNode]:
+        """
+        根据员工ID获取员工
+
+        :param employee_id: 员工ID
+        :return: 员工节点
+        """
+        if not employee_id:
+            return None
+        return self.employees_by_id.get(employee_id)
+
+    def get_employees_by_organization(self, organization_id: Optional[int]) -> List[OrgEmployeeNode]:
+        """
+        获取编制（岗位）下的员工列表
+
+        :param organization_id: 编制ID
+        :return: 员工节点列表
+        """
+        if not organization_id:
+            return []
+        return self.employees_by_organization.get(organization_id, [])
+
+    def get_post_approver(self, organization_id: Optional[int]) -> Optional[OrgEmployeeNode]:
+        """
+        获取编制（岗位）对应的审批人（取第一个启用的员工，空岗返回None）
+
+        :param organization_id: 编制ID
+        :return: 员工节点
+        """
+        for employee in self.get_employees_by_organization(organization_id):
+            if employee.enable == '1':
+                return employee
+        return None
+
+    def get_dept(self, dept_id: Optional[int]) -> Optional[OrgDeptNode]:
+        """
+        根据部门ID获取部门
+
+        :param dept_id: 部门ID
+        :return: 部门节点
+        """
+        if not dept_id:
+            return None
+        return self.depts_by_id.get(dept_id)
+
+    def get_dept_by_code(self, code: Optional[str]) -> Optional[OrgDeptNode]:
+        """
+        根据部门code获取部门
+
+        :param code: 部门code
+        :return: 部门节点
+        """
+        if not code:
+            return None
+        return self.depts_by_code.get(code)
+
+    def get_rank(self, rank_id: Optional[int]) -> Optional[OrgRankNode]:
+        """
+        根据职级ID获取职级
+
+        :param rank_id: 职级ID
+        :return: 职级节点
+        """
+        if not rank_id:
+            return None
+        return self.ranks_by_id.get(rank_id)
+
+    def get_second_level_dept(self, dept_id: Optional[int]) -> Optional[OrgDeptNode]:
+        """
+        获取部门对应的第二级部门
+
+        :param dept_id: 部门ID
+        :return: 第二级部门节点
+        """
+        if not dept_id:
+            return None
+        return self.second_level_dept_by_dept_id.get(dept_id)
+
+    def get_employee_dept(self, job_number: Optional[str]) -> Optional[OrgDeptNode]:
+        """
+        获取员工所在部门（编制）
+
+        :param job_number: 工号
+        :return: 部门节点
+        """
+        employee = self.get_employee(job_number)
+        if not employee:
+            return None
+        return self.get_dept(employee.organization_id)
+
+    def get_employee_second_level_dept(self, job_number: Optional[str]) -> Optional[OrgDeptNode]:
+        """
+        获取员工所在的第二级部门
+
+        :param job_number: 工号
+        :return: 第二级部门节点
+        """
+        employee = self.get_employee(job_number)
+        if not employee:
+            return None
+        return self.get_second_level_dept(employee.organization_id)
+
+    def get_subtree_dept_ids(self, code_prefix: Optional[str]) -> List[int]:
+        """
+        获取code以指定前缀开头的所有部门ID（等价于 code LIKE 'prefix%'）
+
+        :param code_prefix: 部门code前缀
+        :return: 部门ID列表
+        """
+        if not code_prefix:
+            return []
+        trie_node = self._code_trie
+        for char in code_prefix:
+            trie_node = trie_node.children.get(char)
+            if trie_node is None:
+                return []
+
+        dept_ids = []
+        stack = [trie_node]
+        while stack:
+            current = stack.pop()
+            dept_ids.extend(current.dept_ids)
+            stack.extend(current.children.values())
+        return dept_ids
+
+    def get_subtree_job_numbers(self, code_prefix: Optional[str], enabled_only: bool = True) -> List[str]:
+        """
+        获取部门子树下所有员工的工号
+
+        :param code_prefix: 部门code前缀
+        :param enabled_only: 是否只返回启用的员工
+        :return: 工号列表
+        """
+        job_numbers = []
+        for dept_id in self.get_subtree_dept_ids(code_prefix):
+            for employee in self.employees_by_organization.get(dept_id, []):
+                if not employee.job_number:
+                    continue
+                if enabled_only and employee.enable != '1':
+                    continue
+                job_numbers.append(employee.job_number)
+        return job_numbers
+
+
+class OrgIndexService:
+    """
+    组织架构索引服务层
+
+    组织数据（员工、部门、职级）只通过外部同步任务写入，因此在进程内维护一份只读索引，
+    同步完成后整体重建并原子替换；超过最大存活时间的索引在下次访问时重建，保证多进程部署下最终一致。
+    """
+
+    # 索引最大存活时间（秒）
+    INDEX_MAX_AGE_SECONDS = 600
+
+    _index: Optional[OrgIndex] = None
+    _version = 0
+    _lock = asyncio.Lock()
+
+    @classmethod
+    async def init_org_index(cls):
+        """
+        应用启动时构建组织架构索引
+
+        :return:
+        """
+        logger.info('🔎 开始构建组织架构索引...')
+        index = await cls.rebuild_index(force=True)
+        logger.info(
+            f'✅️ 组织架构索引构建成功，员工{len(index.employees_by_id)}人，部门{len(index.depts_by_id)}个，'
+            f'职级{len(index.ranks_by_id)}个'
+        )
+
+    @classmethod
+    async def get_index(cls) -> OrgIndex:
+        """
+        获取当前组织架构索引（未构建或已过期时重建）
+
+        :return: 组织架构索引
+        """
+        index = cls._index
+        if index is not None and time.monotonic() - index.built_monotonic < cls.INDEX_MAX_AGE_SECONDS:
+            return index
+        # 已有其他协程在重建时直接使用旧索引，避免请求排队等待
+        if index is not None and cls._lock.locked():
+            return index
+        return await cls.rebuild_index()
+
+    @classmethod
+    async def rebuild_index(cls, force: bool = False) -> OrgIndex:
+        """
+        重建组织架构索引并原子替换
+
+        :param force: 是否强制重建（同步完成后调用）
+        :return: 新的组织架构索引
+        """
+        async with cls._lock:
+            index = cls._index
+            if (
+                not force
+                and index is not None
+                and time.monotonic() - index.built_monotonic < cls.INDEX_MAX_AGE_SECONDS
+            ):
+                return index
+
+            async with AsyncSessionLocal() as session:
+                employee_rows = await OrgIndexDao.get_all_employee_rows(session)
+                dept_rows = await OrgIndexDao.get_all_dept_rows(session)
+                rank_rows = await OrgIndexDao.get_all_rank_rows(session)
+
+            new_index = OrgIndex(cls._version + 1, employee_rows, dept_rows, rank_rows)
+            cls._version = new_index.version
+            cls._index = new_index
+            logger.info(f'组织架构索引已重建，版本：{new_index.version}')
+
+            return new_index
@@ -15,6 +15,8 @@ from module_admin.entity.vo.role_vo import (
 from module_admin.entity.vo.user_vo import UserInfoModel, UserRolePageQueryModel
 from module_admin.dao.role_dao import RoleDao
 from module_admin.dao.user_dao import UserDao
+from module_admin.service.menu_index_service import MenuIndexService
+from module_admin.utils.data_scope_util import DataScope
 from utils.common_util import CamelCaseUtil
 from utils.excel_util import ExcelUtil
 from utils.page_util import PageResponseModel
@@ -55,18 +57,18 @@ class RoleService:
 
     @classmethod
     async def get_role_list_services(
-        cls, query_db: AsyncSession, query_object: RolePageQueryModel, data_scope_sql: str, is_page: bool = False
+        cls, query_db: AsyncSession, query_object: RolePageQueryModel, data_scope: DataScope, is_page: bool = False
     ):
         """
         获取角色列表信息service
 
         :param query_db: orm对象
         :param query_object: 查询参数对象
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :param is_page: 是否开启分页
         :return: 角色列表信息对象
         """
-        role_list_result = await RoleDao.get_role_list(query_db, query_object, data_scope_sql, is_page)
+        role_list_result = await RoleDao.get_role_list(query_db, query_object, data_scope, is_page)
 
         return role_list_result
 
@@ -84,20 +86,20 @@ class RoleService:
             return CrudResponseModel(is_success=True, message='校验通过')
 
     @classmethod
-    async def check_role_data_scope_services(cls, query_db: AsyncSession, role_ids: str, data_scope_sql: str):
+    async def check_role_data_scope_services(cls, query_db: AsyncSession, role_ids: str, data_scope: DataScope):
         """
         校验角色是否有数据权限service
 
         :param query_db: orm对象
         :param role_ids: 角色id
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :return: 校验结果
         """
         role_id_list = role_ids.split(',') if role_ids else []
         if role_id_list:
             for role_id in role_id_list:
                 roles = await RoleDao.get_role_list(
-                    query_db, RolePageQueryModel(roleId=int(role_id)), data_scope_sql, is_page=False
+                    query_db, RolePageQueryModel(roleId=int(role_id)), data_scope, is_page=False
                 )
                 if roles:
                     continue
@@ -156,6 +158,7 @@ class RoleService:
                     for menu in page_object.menu_ids:
                         await RoleDao.add_role_menu_dao(query_db, RoleMenuModel(roleId=role_id, menuId=menu))
                 await query_db.commit()
+                MenuIndexService.invalidate()
                 return CrudResponseModel(is_success=True, message='新增成功')
             except Exception as e:
                 await query_db.rollback()
@@ -192,6 +195,7 @@ class RoleService:
                                 query_db, RoleMenuModel(roleId=page_object.role_id, menuId=menu)
                             )
                 await query_db.commit()
+                MenuIndexService.invalidate()
                 return CrudResponseModel(is_success=True, message='更新成功')
             except Exception as e:
                 await query_db.rollback()
@@ -250,6 +254,7 @@ class RoleService:
                     await RoleDao.delete_role_dept_dao(query_db, RoleDeptModel(**role_id_dict))
                     await RoleDao.delete_role_dao(query_db, RoleModel(**role_id_dict))
                 await query_db.commit()
+                MenuIndexService.invalidate()
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -307,7 +312,7 @@ class RoleService:
 
     @classmethod
     async def get_role_user_allocated_list_services(
-        cls, query_db: AsyncSession, page_object: UserRolePageQueryModel, data_scope_sql: str, is_page: bool = False
+        cls, query_db: AsyncSession, page_object: UserRolePageQueryModel, data_scope: DataScope, is_page: bool = False
     ):
         """
         根据角色id获取已分配用户列表
@@ -315,7 +320,7 @@ class RoleService:
 
         :param query_db: orm对象
         :param page_object: 用户关联角色对象
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :param is_page: 是否开启分页
         :return: 已分配用户列表
         """
@@ -323,7 +328,7 @@ class RoleService:
         from utils.field_mapper import FieldMapper
         
         query_user_list = await UserDao.get_user_role_allocated_list_by_role_id(
-            query_db, page_object, data_scope_sql, is_page
+            query_db, page_object, data_scope, is_page
         )
         
         # 转换数据格式：将真实表数据转换为系统框架格式
@@ -371,7 +376,7 @@ class RoleService:
 
     @classmethod
     async def get_role_user_unallocated_list_services(
-        cls, query_db: AsyncSession, page_object: UserRolePageQueryModel, data_scope_sql: str, is_page: bool = False
+        cls, query_db: AsyncSession, page_object: UserRolePageQueryModel, data_scope: DataScope, is_page: bool = False
     ):
         """
         根据角色id获取未分配用户列表
@@ -379,7 +384,7 @@ class RoleService:
 
         :param query_db: orm对象
         :param page_object: 用户关联角色对象
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :param is_page: 是否开启分页
         :return: 未分配用户列表
         """
@@ -387,7 +392,7 @@ class RoleService:
         from utils.field_mapper import FieldMapper
         
         query_user_list = await UserDao.get_user_role_unallocated_list_by_role_id(
-            query_db, page_object, data_scope_sql, is_page
+            query_db, page_object, data_scope, is_page
         )
         
         # 转换数据格式：将真实表数据转换为系统框架格式
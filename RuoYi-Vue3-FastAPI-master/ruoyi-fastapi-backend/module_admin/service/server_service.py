@@ -1,96 +1,262 @@
+import asyncio
 import os
 import platform
 import psutil
 import socket
 import time
-from module_admin.entity.vo.server_vo import CpuInfo, MemoryInfo, PyInfo, ServerMonitorModel, SysFiles, SysInfo
+from collections import deque
+from redis import asyncio as aioredis
+from typing import Deque, Dict, Optional, Tuple
+from config.database import async_engine
+from module_admin.entity.vo.server_vo import (
+    CpuInfo,
+    MemoryInfo,
+    PyInfo,
+    ServerMetricSample,
+    ServerMonitorModel,
+    SysFiles,
+    SysInfo,
+)
 from utils.common_util import bytes2human
+from utils.log_util import logger
+from utils.pwd_util import PwdUtil
 
 
 class ServerService:
     """
     服务监控模块服务层
+
+    由后台任务按固定间隔采样CPU、内存、磁盘、进程内存、事件循环延迟、数据库/Redis连接池及密码计算排队状态，
+    psutil等阻塞调用在线程中执行，采样结果写入有界环形缓冲区；监控接口直接返回内存中的最新快照与时间序列，
+    不在请求中执行任何系统调用。
     """
 
-    @staticmethod
-    async def get_server_monitor_info():
+    # 采样间隔（秒）
+    SAMPLE_INTERVAL_SECONDS = 5
+
+    # 环形缓冲区保留的采样点数量（默认保留最近1小时）
+    HISTORY_MAX_SIZE = 720
+
+    _redis: Optional[aioredis.Redis] = None
+    _history: Deque[ServerMetricSample] = deque(maxlen=HISTORY_MAX_SIZE)
+    _snapshot: Optional[ServerMonitorModel] = None
+    _static_info: Optional[Dict] = None
+    _sampler_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def start_sampler(cls, redis: Optional[aioredis.Redis] = None):
+        """
+        应用启动时启动监控采样后台任务
+
+        :param redis: Redis连接对象（用于采集连接池状态）
+        :return:
+        """
+        cls._redis = redis
+        if cls._sampler_task is not None and not cls._sampler_task.done():
+            return
+        # 首次调用cpu_times_percent(interval=None)只用于建立基准，同时预先获取静态信息
+        await asyncio.to_thread(cls._prime)
+        cls._sampler_task = asyncio.create_task(cls._run())
+
+    @classmethod
+    async def stop_sampler(cls):
+        """
+        应用关闭时停止监控采样后台任务
+
+        :return:
+        """
+        if cls._sampler_task is not None:
+            cls._sampler_task.cancel()
+            try:
+                await cls._sampler_task
+            except asyncio.CancelledError:
+                pass
+            cls._sampler_task = None
+
+    @classmethod
+    async def get_server_monitor_info(cls) -> ServerMonitorModel:
+        """
+        获取服务监控信息（最新快照及采样时间序列）
+
+        :return: 服务监控信息
+        """
+        snapshot = cls._snapshot
+        if snapshot is None:
+            # 采样任务尚未产生数据时在线程中采集一次，不阻塞事件循环
+            snapshot, sample = await asyncio.to_thread(cls._collect, 0.0)
+            cls._fill_pool_stats(sample)
+            snapshot.metrics = sample
+        return snapshot.model_copy(update={'history': list(cls._history)})
+
+    @classmethod
+    async def _run(cls):
+        """
+        后台任务：按固定间隔采样，采样失败时记录日志后继续
+
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(cls.SAMPLE_INTERVAL_SECONDS)
+            # 实际唤醒时间超出预期的部分即为事件循环延迟
+            loop_lag = max(loop.time() - started - cls.SAMPLE_INTERVAL_SECONDS, 0.0)
+            try:
+                snapshot, sample = await asyncio.to_thread(cls._collect, loop_lag)
+                cls._fill_pool_stats(sample)
+                snapshot.metrics = sample
+                cls._history.append(sample)
+                cls._snapshot = snapshot
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f'服务监控采样失败: {str(e)}')
+
+    @classmethod
+    def _fill_pool_stats(cls, sample: ServerMetricSample) -> None:
+        """
+        采集数据库、Redis连接池及密码计算线程池状态（仅读取内存中的计数，在事件循环中执行）
+
+        :param sample: 采样点
+        """
+        pool = async_engine.pool
+        for field, method in (
+            ('db_pool_size', 'size'),
+            ('db_pool_checked_out', 'checkedout'),
+            ('db_pool_overflow', 'overflow'),
+        ):
+            if hasattr(pool, method):
+                setattr(sample, field, getattr(pool, method)())
+        if cls._redis is not None:
+            connection_pool = cls._redis.connection_pool
+            in_use = getattr(connection_pool, '_in_use_connections', None)
+            available = getattr(connection_pool, '_available_connections', None)
+            sample.redis_pool_in_use = len(in_use) if in_use is not None else None
+            sample.redis_pool_available = len(available) if available is not None else None
+        sample.pwd_hash_pending = PwdUtil.stats['pending']
+        sample.pwd_hash_rejected = PwdUtil.stats['rejected']
+
+    @classmethod
+    def _prime(cls) -> None:
+        """
+        建立CPU使用率基准并缓存静态信息（在线程中执行）
+
+        :return:
+        """
+        psutil.cpu_times_percent(interval=None)
+        cls._get_static_info()
+
+    @classmethod
+    def _get_static_info(cls) -> Dict:
+        """
+        获取运行期间不变的主机及Python解释器信息（仅首次获取时执行DNS解析等系统调用）
+
+        :return: 静态信息
+        """
+        if cls._static_info is None:
+            # 获取主机名
+            hostname = socket.gethostname()
+            # 获取IP
+            try:
+                computer_ip = socket.gethostbyname(hostname)
+            except OSError:
+                computer_ip = None
+            current_process = psutil.Process(os.getpid())
+            cls._static_info = dict(
+                sys=SysInfo(
+                    computerIp=computer_ip,
+                    computerName=platform.node(),
+                    osArch=platform.machine(),
+                    osName=platform.platform(),
+                    userDir=os.path.abspath(os.getcwd()),
+                ),
+                python_name=current_process.name(),
+                python_version=platform.python_version(),
+                python_home=current_process.exe(),
+                start_time_stamp=current_process.create_time(),
+            )
+        return cls._static_info
+
+    @classmethod
+    def _collect(cls, loop_lag: float) -> Tuple[ServerMonitorModel, ServerMetricSample]:
+        """
+        采集服务监控快照及采样点（包含阻塞的系统调用，在线程中执行）
+
+        :param loop_lag: 事件循环延迟（秒）
+        :return: (服务监控快照, 采样点)
+        """
+        static_info = cls._get_static_info()
+
         # CPU信息
         # 获取CPU总核心数
         cpu_num = psutil.cpu_count(logical=True)
-        cpu_usage_percent = psutil.cpu_times_percent()
-        cpu_used = cpu_usage_percent.user
-        cpu_sys = cpu_usage_percent.system
-        cpu_free = cpu_usage_percent.idle
-        cpu = CpuInfo(cpuNum=cpu_num, used=cpu_used, sys=cpu_sys, free=cpu_free)
+        # 非阻塞获取自上次调用以来的CPU使用率
+        cpu_usage_percent = psutil.cpu_times_percent(interval=None)
+        cpu = CpuInfo(
+            cpuNum=cpu_num, used=cpu_usage_percent.user, sys=cpu_usage_percent.system, free=cpu_usage_percent.idle
+        )
 
         # 内存信息
         memory_info = psutil.virtual_memory()
-        memory_total = bytes2human(memory_info.total)
-        memory_used = bytes2human(memory_info.used)
-        memory_free = bytes2human(memory_info.free)
-        memory_usage = memory_info.percent
-        mem = MemoryInfo(total=memory_total, used=memory_used, free=memory_free, usage=memory_usage)
-
-        # 主机信息
-        # 获取主机名
-        hostname = socket.gethostname()
-        # 获取IP
-        computer_ip = socket.gethostbyname(hostname)
-        os_name = platform.platform()
-        computer_name = platform.node()
-        os_arch = platform.machine()
-        user_dir = os.path.abspath(os.getcwd())
-        sys = SysInfo(
-            computerIp=computer_ip, computerName=computer_name, osArch=os_arch, osName=os_name, userDir=user_dir
+        mem = MemoryInfo(
+            total=bytes2human(memory_info.total),
+            used=bytes2human(memory_info.used),
+            free=bytes2human(memory_info.free),
+            usage=memory_info.percent,
         )
 
         # python解释器信息
-        current_pid = os.getpid()
-        current_process = psutil.Process(current_pid)
-        python_name = current_process.name()
-        python_version = platform.python_version()
-        python_home = current_process.exe()
-        start_time_stamp = current_process.create_time()
-        start_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_time_stamp))
-        current_time_stamp = time.time()
-        difference = current_time_stamp - start_time_stamp
+        start_time_stamp = static_info['start_time_stamp']
+        difference = time.time() - start_time_stamp
         # 将时间差转换为天、小时和分钟数
         days = int(difference // (24 * 60 * 60))  # 每天的秒数
         hours = int((difference % (24 * 60 * 60)) // (60 * 60))  # 每小时的秒数
         minutes = int((difference % (60 * 60)) // 60)  # 每分钟的秒数
-        run_time = f'{days}天{hours}小时{minutes}分钟'
-        # 获取当前Python程序的pid
-        pid = os.getpid()
         # 获取该进程的内存信息
-        current_process_memory_info = psutil.Process(pid).memory_info()
+        current_process_rss = psutil.Process(os.getpid()).memory_info().rss
         py = PyInfo(
-            name=python_name,
-            version=python_version,
-            startTime=start_time,
-            runTime=run_time,
-            home=python_home,
+            name=static_info['python_name'],
+            version=static_info['python_version'],
+            startTime=time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_time_stamp)),
+            runTime=f'{days}天{hours}小时{minutes}分钟',
+            home=static_info['python_home'],
             total=bytes2human(memory_info.available),
-            used=bytes2human(current_process_memory_info.rss),
-            free=bytes2human(memory_info.available - current_process_memory_info.rss),
-            usage=round((current_process_memory_info.rss / memory_info.available) * 100, 2),
+            used=bytes2human(current_process_rss),
+            free=bytes2human(memory_info.available - current_process_rss),
+            usage=round((current_process_rss / memory_info.available) * 100, 2),
         )
 
         # 磁盘信息
-        io = psutil.disk_partitions()
         sys_files = []
-        for i in io:
-            o = psutil.disk_usage(i.device)
-            disk_data = SysFiles(
-                dirName=i.device,
-                sysTypeName=i.fstype,
-                typeName='本地固定磁盘（' + i.mountpoint.replace('\\', '') + '）',
-                total=bytes2human(o.total),
-                used=bytes2human(o.used),
-                free=bytes2human(o.free),
-                usage=f'{psutil.disk_usage(i.device).percent}%',
+        disk_usage = None
+        for partition in psutil.disk_partitions():
+            try:
+                usage = psutil.disk_usage(partition.mountpoint)
+            except OSError:
+                # 未就绪的光驱、已卸载的挂载点等跳过
+                continue
+            disk_usage = max(disk_usage or 0.0, usage.percent)
+            sys_files.append(
+                SysFiles(
+                    dirName=partition.device,
+                    sysTypeName=partition.fstype,
+                    typeName='本地固定磁盘（' + partition.mountpoint.replace('\\', '') + '）',
+                    total=bytes2human(usage.total),
+                    used=bytes2human(usage.used),
+                    free=bytes2human(usage.free),
+                    usage=f'{usage.percent}%',
+                )
             )
-            sys_files.append(disk_data)
 
-        result = ServerMonitorModel(cpu=cpu, mem=mem, sys=sys, py=py, sysFiles=sys_files)
+        snapshot = ServerMonitorModel(cpu=cpu, mem=mem, sys=static_info['sys'], py=py, sysFiles=sys_files)
+        sample = ServerMetricSample(
+            sampleTime=time.strftime('%Y-%m-%d %H:%M:%S'),
+            cpuUsed=cpu_usage_percent.user,
+            cpuSys=cpu_usage_percent.system,
+            memUsage=memory_info.percent,
+            diskUsage=disk_usage,
+            processRss=current_process_rss,
+            loopLag=round(loop_lag * 1000, 2),
+        )
 
-        return result
+        return snapshot, sample
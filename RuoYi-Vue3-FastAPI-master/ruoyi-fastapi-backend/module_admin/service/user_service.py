@@ -1,7 +1,8 @@
 from datetime import datetime
 from sqlalchemy import select
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Union
+from typing import AsyncIterator, Dict, List, Optional, Union
 from module_admin.entity.do.oa_rank_do import OaRank
 from utils.field_mapper import FieldMapper
 from config.constant import CommonConstant
@@ -27,9 +28,9 @@ from module_admin.entity.vo.user_vo import (
 )
 from module_admin.service.dept_service import DeptService
 from module_admin.service.role_service import RoleService
+from module_admin.utils.data_scope_util import DataScope
 from utils.common_util import CamelCaseUtil
 from utils.excel_util import ExcelUtil
-from utils.page_util import PageResponseModel
 from utils.pwd_util import PwdUtil
 
 
@@ -38,139 +39,93 @@ class UserService:
     用户管理模块服务层
     """
 
-    @staticmethod
-    def _convert_user_list_rows(rows: list) -> list:
+    @classmethod
+    def _convert_user_list_rows(cls, rows: List[Row]) -> List[Dict]:
         """
-        将用户列表查询结果转换为系统框架格式
-        处理角色聚合、字段名称转换等
-        
-        :param rows: 查询结果行列表（每个 row 是 [employee_dict, user_local_dict, dept_dict, rank_dict, role_dict]）
-        :return: 转换后的用户列表
+        将用户列表查询结果直接投影为前端所需格式，并按用户ID聚合角色
+
+        :param rows: 查询结果行列表（每行为 employee、user_local、dept、rank、role 五个Bundle，见 UserDao.get_user_list_rows_by_ids）
+        :return: 转换后的用户列表（顺序与查询结果一致）
         """
-        from utils.common_util import CamelCaseUtil, SnakeCaseUtil
-        from utils.field_mapper import FieldMapper
-        
-        # 由于一个用户可能有多个角色，JOIN 会产生多行，需要按 user_id 分组聚合
-        user_data_map = {}  # {user_id: {user_data, roles: []}}
-        
+        user_data_map: Dict[int, Dict] = {}
         for row in rows:
-            # row 是列表格式：[employee_dict, user_local_dict, dept_dict, rank_dict, role_dict]
-            # 查询顺序：OaEmployeePrimary, SysUserLocal, OaDepartment, OaRank, SysRole
-            if isinstance(row, list):
-                employee_dict = row[0] if len(row) > 0 else None
-                user_local_dict = row[1] if len(row) > 1 else None
-                dept_dict = row[2] if len(row) > 2 else None
-                rank_dict = row[3] if len(row) > 3 else None
-                role_dict = row[4] if len(row) > 4 else None
-            else:
-                # Row 对象，通过索引访问
-                employee_dict = row[0] if hasattr(row, '__getitem__') and len(row) > 0 else None
-                user_local_dict = row[1] if hasattr(row, '__getitem__') and len(row) > 1 else None
-                dept_dict = row[2] if hasattr(row, '__getitem__') and len(row) > 2 else None
-                rank_dict = row[3] if hasattr(row, '__getitem__') and len(row) > 3 else None
-                role_dict = row[4] if hasattr(row, '__getitem__') and len(row) > 4 else None
-            
-            # 转换为下划线格式以便处理
-            employee_snake = SnakeCaseUtil.transform_result(employee_dict) if isinstance(employee_dict, dict) and employee_dict else None
-            user_local_snake = SnakeCaseUtil.transform_result(user_local_dict) if isinstance(user_local_dict, dict) and user_local_dict else {}
-            dept_snake = SnakeCaseUtil.transform_result(dept_dict) if isinstance(dept_dict, dict) and dept_dict else None
-            rank_snake = SnakeCaseUtil.transform_result(rank_dict) if isinstance(rank_dict, dict) and rank_dict else None
-            role_snake = SnakeCaseUtil.transform_result(role_dict) if isinstance(role_dict, dict) and role_dict else None
-            
-            # 获取 user_id（用于分组）
-            user_id = user_local_snake.get('user_id') if isinstance(user_local_snake, dict) else None
-            
-            if not employee_snake or not user_id:
+            user_local = row.user_local._asdict()
+            user_id = user_local.get('user_id')
+            if user_id is None:
                 continue
-            
-            # 如果该用户还没有处理过，初始化用户数据
-            if user_id not in user_data_map:
-                # 转换为系统框架格式
-                mapped_user_dict = FieldMapper.map_employee_to_user_format(employee_snake, user_local_snake)
-                mapped_dept_dict = FieldMapper.map_dept_to_sys_format(dept_snake) if dept_snake else {}
-                
-                # 转换为 camelCase
-                user_camel = CamelCaseUtil.transform_result(mapped_user_dict)
-                dept_camel = CamelCaseUtil.transform_result(mapped_dept_dict) if mapped_dept_dict else {}
-                
-                # 添加岗位信息
-                rank_camel = CamelCaseUtil.transform_result(rank_snake) if rank_snake else {}
-                user_camel['rankName'] = rank_camel.get('rankName') if rank_camel else None
-                user_camel['rankId'] = rank_camel.get('id') if rank_camel else None
-                
-                # 修改字段名称
-                if 'userName' in user_camel:
-                    user_camel['jobNumber'] = user_camel.pop('userName')
-                if 'nickName' in user_camel:
-                    user_camel['employeeName'] = user_camel.pop('nickName')
-                
-                # 移除 createTime 字段
-                user_camel.pop('createTime', None)
-                
-                # 添加编制显示格式（deptName 已经是"部门名称-deptID"格式，直接使用）
-                if dept_camel and dept_camel.get('deptName'):
-                    dept_camel['deptNameWithId'] = dept_camel.get('deptName')
-                
-                user_data_map[user_id] = {
-                    'user_data': {**user_camel, 'dept': dept_camel},
-                    'roles': []
-                }
-            
-            # 聚合角色信息
-            if role_snake and role_snake.get('role_id'):
-                role_camel = CamelCaseUtil.transform_result(role_snake)
-                role_obj = {
-                    'roleId': role_camel.get('roleId'),
-                    'roleName': role_camel.get('roleName')
-                }
-                # 避免重复添加相同角色
-                existing_role = next((r for r in user_data_map[user_id]['roles'] if r.get('roleId') == role_obj.get('roleId')), None)
-                if not existing_role:
-                    user_data_map[user_id]['roles'].append(role_obj)
-        
-        # 构建最终返回数据
-        converted_rows = []
-        for user_id, data in user_data_map.items():
-            user_data = data['user_data']
-            roles = data['roles']
-            
-            # 清洗角色信息，过滤无效角色
-            valid_roles = [r for r in roles if r.get('roleId') is not None and r.get('roleName')]
-            user_data['roles'] = valid_roles
-            # 生成角色名称字符串，过滤掉 None 值
-            role_names = [r.get('roleName') for r in valid_roles if r.get('roleName')]
+            user_data = user_data_map.get(user_id)
+            if user_data is None:
+                user_data = cls._build_user_list_item(row.employee._asdict(), user_local, row.dept, row.rank)
+                user_data_map[user_id] = user_data
+            # 聚合角色信息，过滤无效及重复角色
+            role = row.role
+            if role is not None and role.role_id is not None and role.role_name:
+                if all(item['roleId'] != role.role_id for item in user_data['roles']):
+                    user_data['roles'].append({'roleId': role.role_id, 'roleName': role.role_name})
+
+        converted_rows = list(user_data_map.values())
+        for user_data in converted_rows:
+            role_names = [item['roleName'] for item in user_data['roles']]
             user_data['roleNames'] = ', '.join(role_names) if role_names else '未配置'
-            
-            converted_rows.append(user_data)
-        
+
         return converted_rows
 
+    @staticmethod
+    def _build_user_list_item(employee: Dict, user_local: Dict, dept: Optional[Row], rank: Optional[Row]) -> Dict:
+        """
+        构建单个用户的列表展示数据（不含角色名称汇总）
+
+        :param employee: 员工字段字典
+        :param user_local: 本地用户字段字典
+        :param dept: 部门字段（LEFT JOIN 未关联到时各字段为None）
+        :param rank: 职级字段（LEFT JOIN 未关联到时各字段为None）
+        :return: 用户展示数据
+        """
+        mapped_user_dict = FieldMapper.map_employee_to_user_format(employee, user_local)
+        # 列表不返回密码及创建时间
+        mapped_user_dict.pop('password', None)
+        mapped_user_dict.pop('create_time', None)
+        user_item = {CamelCaseUtil.snake_to_camel(key): value for key, value in mapped_user_dict.items()}
+        # 修改字段名称
+        user_item['jobNumber'] = user_item.pop('userName')
+        user_item['employeeName'] = user_item.pop('nickName')
+        # 添加岗位信息
+        user_item['rankName'] = rank.rank_name if rank is not None else None
+        user_item['rankId'] = rank.id if rank is not None else None
+
+        dept_item = {}
+        if dept is not None and dept.id is not None:
+            mapped_dept_dict = FieldMapper.map_dept_to_sys_format(dept._asdict())
+            dept_item = {CamelCaseUtil.snake_to_camel(key): value for key, value in mapped_dept_dict.items()}
+            # 添加编制显示格式（deptName 已经是"部门名称-deptID"格式，直接使用）
+            if dept_item.get('deptName'):
+                dept_item['deptNameWithId'] = dept_item['deptName']
+        user_item['dept'] = dept_item
+        user_item['roles'] = []
+
+        return user_item
+
     @classmethod
     async def get_user_list_services(
-        cls, query_db: AsyncSession, query_object: UserPageQueryModel, data_scope_sql: str, is_page: bool = False
+        cls, query_db: AsyncSession, query_object: UserPageQueryModel, data_scope: DataScope, is_page: bool = False
     ):
         """
         获取用户列表信息service
 
         :param query_db: orm对象
         :param query_object: 查询参数对象
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :param is_page: 是否开启分页
         :return: 用户列表信息对象
         """
-        query_result = await UserDao.get_user_list(query_db, query_object, data_scope_sql, is_page)
+        query_result = await UserDao.get_user_list(query_db, query_object, data_scope, is_page)
         
         # 处理查询结果（分页和非分页使用相同的转换逻辑）
         converted_rows = cls._convert_user_list_rows(query_result.rows if is_page else query_result)
         
         if is_page:
             # 返回分页结果，保持原有格式
-            return PageResponseModel(
-                **{
-                    **query_result.model_dump(by_alias=True),
-                    'rows': converted_rows,
-                }
-            )
+            return query_result.model_copy(update={'rows': converted_rows})
         else:
             # 返回非分页结果
             return converted_rows
@@ -189,17 +144,17 @@ class UserService:
             return CrudResponseModel(is_success=True, message='校验通过')
 
     @classmethod
-    async def check_user_data_scope_services(cls, query_db: AsyncSession, user_id: int, data_scope_sql: str):
+    async def check_user_data_scope_services(cls, query_db: AsyncSession, user_id: int, data_scope: DataScope):
         """
         校验用户数据权限service
 
         :param query_db: orm对象
         :param user_id: 用户id
-        :param data_scope_sql: 数据权限对应的查询sql语句
+        :param data_scope: 数据权限对象
         :return: 校验结果
         """
         # 恢复原有逻辑：沿用用户列表查询校验数据权限
-        users = await UserDao.get_user_list(query_db, UserPageQueryModel(userId=user_id), data_scope_sql, is_page=False)
+        users = await UserDao.get_user_list(query_db, UserPageQueryModel(userId=user_id), data_scope, is_page=False)
         if users:
             return CrudResponseModel(is_success=True, message='校验通过')
         else:
@@ -415,9 +370,9 @@ class UserService:
         reset_user = page_object.model_dump(exclude_unset=True, exclude={'admin'})
         if page_object.old_password:
             user = (await UserDao.get_user_detail_by_id(query_db, user_id=page_object.user_id)).get('user_basic_info')
-            if not PwdUtil.verify_password(page_object.old_password, user.password):
+            if not await PwdUtil.verify_password_async(page_object.old_password, user.password):
                 raise ServiceException(message='修改密码失败，旧密码错误')
-            elif PwdUtil.verify_password(page_object.password, user.password):
+            elif await PwdUtil.verify_password_async(page_object.password, user.password):
                 raise ServiceException(message='新密码不能与旧密码相同')
             else:
                 del reset_user['old_password']
@@ -425,7 +380,7 @@ class UserService:
             del reset_user['sms_code']
             del reset_user['session_id']
         try:
-            reset_user['password'] = PwdUtil.get_password_hash(page_object.password)
+            reset_user['password'] = await PwdUtil.get_password_hash_async(page_object.password)
             await UserDao.edit_user_dao(query_db, reset_user)
             await query_db.commit()
             return CrudResponseModel(is_success=True, message='重置成功')
@@ -433,13 +388,17 @@ class UserService:
             await query_db.rollback()
             raise e
 
-    @staticmethod
-    async def export_user_list_services(user_list: List):
+    @classmethod
+    async def export_user_list_services(
+        cls, query_db: AsyncSession, query_object: UserPageQueryModel, data_scope: DataScope
+    ):
         """
         导出用户信息service
 
-        :param user_list: 用户信息列表
-        :return: 用户信息对应excel的二进制数据
+        :param query_db: orm对象
+        :param query_object: 查询参数对象
+        :param data_scope: 数据权限对象
+        :return: 用户信息对应excel的二进制数据块异步生成器
         """
         # 创建一个映射字典，将英文键映射到中文键
         mapping_dict = {
@@ -458,7 +417,7 @@ class UserService:
             'remark': '备注',
         }
 
-        for item in user_list:
+        def format_row(item: Dict):
             item['deptName'] = item.get('dept').get('deptName')
             if item.get('status') == '0':
                 item['status'] = '正常'
@@ -470,9 +429,21 @@ class UserService:
                 item['sex'] = '女'
             else:
                 item['sex'] = '未知'
-        binary_data = ExcelUtil.export_list2excel(user_list, mapping_dict)
 
-        return binary_data
+        user_rows = await UserDao.get_user_list(query_db, query_object, data_scope, is_stream=True)
+
+        return ExcelUtil.stream_list2excel(cls._convert_user_row_batches(user_rows), mapping_dict, format_row)
+
+    @classmethod
+    async def _convert_user_row_batches(cls, row_batches: AsyncIterator[List[Row]]) -> AsyncIterator[List[Dict]]:
+        """
+        分批转换流式读取的用户列表查询结果（每批包含完整的用户角色行）
+
+        :param row_batches: 分批返回查询结果行的异步迭代器
+        :return: 分批返回转换后用户列表的异步生成器
+        """
+        async for batch in row_batches:
+            yield cls._convert_user_list_rows(batch)
 
     @classmethod
     async def get_user_role_allocated_list_services(cls, query_db: AsyncSession, page_object: UserRoleQueryModel):
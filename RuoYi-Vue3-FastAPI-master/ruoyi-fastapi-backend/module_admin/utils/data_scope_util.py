@@ -0,0 +1,146 @@
+"""
+数据权限工具：将当前用户的数据权限编译为可直接用于查询的SQLAlchemy条件
+"""
+from sqlalchemy import false, or_, select, true
+from sqlalchemy.sql.elements import ColumnElement
+from typing import Dict, Optional, Tuple
+from module_admin.entity.do.oa_department_do import OaDepartment
+from module_admin.entity.do.role_do import SysRoleDept
+
+
+class DataScope:
+    """
+    当前用户的数据权限（构建完成后只读，可在请求间复用）
+
+    权限范围只保存角色、部门等取值，查询条件按字段绑定后缓存，
+    条件中的取值均为绑定参数，生成的语句可以命中SQLAlchemy的语句编译缓存。
+    """
+
+    __slots__ = (
+        'is_all',
+        'custom_role_ids',
+        'dept_id',
+        'dept_code',
+        'include_dept',
+        'include_dept_and_child',
+        'self_user_id',
+        'deny',
+        'dept_column',
+        'user_column',
+        '_condition_cache',
+    )
+
+    def __init__(
+        self,
+        is_all: bool = False,
+        custom_role_ids: Tuple[int, ...] = (),
+        dept_id: Optional[int] = None,
+        dept_code: str = '',
+        include_dept: bool = False,
+        include_dept_and_child: bool = False,
+        self_user_id: Optional[int] = None,
+        deny: bool = False,
+        condition_cache: Optional[Dict[tuple, ColumnElement]] = None,
+    ):
+        """
+        构建数据权限
+
+        :param is_all: 是否拥有全部数据权限
+        :param custom_role_ids: 自定数据权限的角色id
+        :param dept_id: 用户所在部门id
+        :param dept_code: 用户所在部门code
+        :param include_dept: 是否包含本部门数据权限
+        :param include_dept_and_child: 是否包含本部门及以下数据权限
+        :param self_user_id: 仅本人数据权限的用户id
+        :param deny: 是否存在无法满足的权限项（例如无部门的本部门权限）
+        :param condition_cache: 查询条件缓存（与其他字段绑定的副本共享）
+        """
+        self.is_all = is_all
+        self.custom_role_ids = custom_role_ids
+        self.dept_id = dept_id
+        self.dept_code = dept_code
+        self.include_dept = include_dept
+        self.include_dept_and_child = include_dept_and_child
+        self.self_user_id = self_user_id
+        self.deny = deny
+        self.dept_column = None
+        self.user_column = None
+        self._condition_cache = condition_cache if condition_cache is not None else {}
+
+    def bind(self, dept_column=None, user_column=None) -> 'DataScope':
+        """
+        获取绑定了默认部门字段与用户字段的数据权限副本
+
+        :param dept_column: 部门id字段
+        :param user_column: 用户id字段
+        :return: 数据权限副本
+        """
+        data_scope = DataScope(
+            self.is_all,
+            self.custom_role_ids,
+            self.dept_id,
+            self.dept_code,
+            self.include_dept,
+            self.include_dept_and_child,
+            self.self_user_id,
+            self.deny,
+            self._condition_cache,
+        )
+        data_scope.dept_column = dept_column
+        data_scope.user_column = user_column
+        return data_scope
+
+    def get_condition(self, dept_column=None, user_column=None) -> ColumnElement:
+        """
+        获取数据权限查询条件，未传入的字段使用绑定的默认字段，字段不存在的权限项视为无权限
+
+        :param dept_column: 部门id字段
+        :param user_column: 用户id字段
+        :return: 查询条件
+        """
+        if self.is_all:
+            return true()
+        dept_column = dept_column if dept_column is not None else self.dept_column
+        user_column = user_column if user_column is not None else self.user_column
+        cache_key = (id(dept_column), id(user_column))
+        condition = self._condition_cache.get(cache_key)
+        if condition is None:
+            condition = self._build_condition(dept_column, user_column)
+            self._condition_cache[cache_key] = condition
+        return condition
+
+    def _build_condition(self, dept_column, user_column) -> ColumnElement:
+        """
+        根据权限范围构建查询条件
+
+        :param dept_column: 部门id字段
+        :param user_column: 用户id字段
+        :return: 查询条件
+        """
+        clauses = []
+        if self.custom_role_ids:
+            clauses.append(
+                dept_column.in_(select(SysRoleDept.dept_id).where(SysRoleDept.role_id.in_(self.custom_role_ids)))
+                if dept_column is not None
+                else false()
+            )
+        if self.include_dept_and_child and self.dept_code:
+            # 使用部门code前缀匹配本部门及以下部门
+            clauses.append(
+                dept_column.in_(
+                    select(OaDepartment.id).where(
+                        or_(OaDepartment.id == self.dept_id, OaDepartment.code.like(f'{self.dept_code}%'))
+                    )
+                )
+                if dept_column is not None
+                else false()
+            )
+        elif self.include_dept or self.include_dept_and_child:
+            clauses.append(dept_column == self.dept_id if dept_column is not None else false())
+        if self.self_user_id is not None:
+            clauses.append(user_column == self.self_user_id if user_column is not None else false())
+        if self.deny:
+            clauses.append(false())
+        if not clauses:
+            return true()
+        return or_(*clauses) if len(clauses) > 1 else clauses[0]
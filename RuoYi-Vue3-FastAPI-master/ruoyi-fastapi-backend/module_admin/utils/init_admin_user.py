@@ -37,7 +37,7 @@ async def init_admin_user():
             
             # 创建默认管理员账户
             default_password = 'admin123456'  # 默认密码
-            hashed_password = PwdUtil.get_password_hash(default_password)
+            hashed_password = await PwdUtil.get_password_hash_async(default_password)
             
             admin_user = SysUserLocal(
                 employee_id=0,  # 0 表示管理员账户，不关联真实员工表
@@ -2,8 +2,8 @@
 审批日志表DAO
 """
 from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import select, desc
+from typing import Dict, List, Optional
+from sqlalchemy import select, desc, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from module_apply.entity.do.apply_log_do import ApplyLog
 import json
@@ -28,6 +28,56 @@ class ApprovalLogDao:
         )
         return list(result.scalars().all())
     
+    @classmethod
+    async def get_logs_by_apply_ids(cls, db: AsyncSession, apply_ids: List[str]) -> Dict[str, List[ApplyLog]]:
+        """
+        根据申请单ID列表批量查询审批日志（每个申请单内按审批开始时间倒序）
+        
+        :param db: orm对象
+        :param apply_ids: 申请单ID列表
+        :return: 审批日志字典，key为申请单ID
+        """
+        if not apply_ids:
+            return {}
+        
+        result = await db.execute(
+            select(ApplyLog)
+            .where(ApplyLog.apply_id.in_(apply_ids))
+            .order_by(desc(ApplyLog.approval_start_time), desc(ApplyLog.id))
+        )
+        logs_map = {apply_id: [] for apply_id in apply_ids}
+        for log in result.scalars().all():
+            logs_map[log.apply_id].append(log)
+        return logs_map
+    
+    @classmethod
+    async def get_latest_reject_logs_by_apply_ids(cls, db: AsyncSession, apply_ids: List[str]) -> Dict[str, ApplyLog]:
+        """
+        根据申请单ID列表批量查询每个申请单最近一次的驳回日志（窗口函数，一次查询）
+        
+        :param db: orm对象
+        :param apply_ids: 申请单ID列表
+        :return: 驳回日志字典，key为申请单ID
+        """
+        if not apply_ids:
+            return {}
+        
+        row_number = func.row_number().over(
+            partition_by=ApplyLog.apply_id,
+            order_by=(desc(ApplyLog.approval_start_time), desc(ApplyLog.id))
+        ).label('row_number')
+        ranked_logs = (
+            select(ApplyLog.id, row_number)
+            .where(ApplyLog.apply_id.in_(apply_ids), ApplyLog.approval_result == 2)
+            .subquery()
+        )
+        result = await db.execute(
+            select(ApplyLog)
+            .join(ranked_logs, ApplyLog.id == ranked_logs.c.id)
+            .where(ranked_logs.c.row_number == 1)
+        )
+        return {log.apply_id: log for log in result.scalars().all()}
+    
     @classmethod
     async def create_log(cls, db: AsyncSession, log_data: dict) -> ApplyLog:
         """
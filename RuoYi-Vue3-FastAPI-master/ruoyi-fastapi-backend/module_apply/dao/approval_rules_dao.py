@@ -2,9 +2,10 @@
 审批规则表DAO
 """
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from module_apply.entity.do.apply_primary_do import ApplyPrimary
 from module_apply.entity.do.apply_rules_do import ApplyRules
 import json
 
@@ -26,6 +27,25 @@ class ApprovalRulesDao:
         )
         return result.scalar_one_or_none()
     
+    @classmethod
+    async def get_rules_with_apply_status_by_apply_ids(cls, db: AsyncSession, apply_ids: List[str]):
+        """
+        根据申请单ID列表批量查询审批规则及对应申请单状态
+        
+        :param db: orm对象
+        :param apply_ids: 申请单ID列表
+        :return: (审批规则对象, 申请单状态) 列表
+        """
+        if not apply_ids:
+            return []
+        
+        result = await db.execute(
+            select(ApplyRules, ApplyPrimary.apply_status)
+            .outerjoin(ApplyPrimary, ApplyRules.apply_id == ApplyPrimary.apply_id)
+            .where(ApplyRules.apply_id.in_(apply_ids))
+        )
+        return list(result.all())
+    
     @classmethod
     async def create_rules(cls, db: AsyncSession, rules_data: dict) -> ApplyRules:
         """
@@ -10,7 +10,7 @@ class ApplyRules(Base):
 
     __tablename__ = 'apply_rules'
     __table_args__ = (
-        Index('idx_current_approval_node', 'current_approval_node'),
+        Index('idx_current_approval_node_apply_id', 'current_approval_node', 'apply_id'),
         {'comment': '审批规则表'},
     )
 
@@ -6,6 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from module_apply.service.apply_service import ApplyService
 from module_apply.service.approval_service import ApprovalService
+from module_apply.service.approval_timeline_service import ApprovalTimelineService
 from module_apply.dao.approval_rules_dao import ApprovalRulesDao
 from module_apply.entity.do.apply_rules_do import ApplyRules
 from module_admin.entity.do.oa_employee_primary_do import OaEmployeePrimary
@@ -17,6 +18,20 @@ import json
 class ApprovalEngine:
     """审批引擎 - 处理审批流程的核心逻辑"""
     
+    # 会话info中记录本事务内待审批队列发生变化的审批节点（编制ID集合），供提交后刷新工作台计数等使用
+    CHANGED_NODES_INFO_KEY = 'approval_changed_nodes'
+    
+    @classmethod
+    def _mark_nodes_changed(cls, query_db: AsyncSession, *nodes: Optional[int]) -> None:
+        """
+        记录待审批队列发生变化的审批节点
+        
+        :param query_db: orm对象
+        :param nodes: 审批节点（编制ID）
+        """
+        changed_nodes = query_db.info.setdefault(cls.CHANGED_NODES_INFO_KEY, set())
+        changed_nodes.update(node for node in nodes if node is not None)
+    
     @staticmethod
     async def _check_if_post_is_empty(
         query_db: AsyncSession,
@@ -86,6 +101,7 @@ class ApprovalEngine:
                 'current_approval_node': None,
             }
             await ApprovalRulesDao.update_rules(query_db, apply_id, update_data)
+            ApprovalEngine._mark_nodes_changed(query_db, current_node)
             
             # 更新申请单状态为完成
             await ApplyService.update_apply_status(query_db, apply_id, 1)  # 1-完成
@@ -108,6 +124,7 @@ class ApprovalEngine:
                 'current_approval_node': next_node,
             }
             await ApprovalRulesDao.update_rules(query_db, apply_id, update_data)
+            ApprovalEngine._mark_nodes_changed(query_db, current_node, next_node)
             
             logger.info(f'空岗自动审批推进到下一节点: apply_id={apply_id}, next_node={next_node}')
             
@@ -152,6 +169,7 @@ class ApprovalEngine:
         
         # 创建审批规则
         await ApprovalService.create_approval_rules(query_db, apply_id, approval_nodes)
+        ApprovalEngine._mark_nodes_changed(query_db, approval_nodes[0])
         
         # 创建审批日志（申请提交）
         await ApprovalService.create_approval_log(
@@ -227,6 +245,9 @@ class ApprovalEngine:
         
         current_node = rules.current_approval_node
         
+        # 审批状态即将变化，失效审批时间线缓存
+        ApprovalTimelineService.invalidate(apply_id)
+        
         # 创建审批日志
         await ApprovalService.create_approval_log(
             query_db=query_db,
@@ -249,6 +270,7 @@ class ApprovalEngine:
                 'current_approval_node': None,
             }
             await ApprovalRulesDao.update_rules(query_db, apply_id, update_data)
+            ApprovalEngine._mark_nodes_changed(query_db, current_node)
             
             # 更新申请单状态为完成
             await ApplyService.update_apply_status(query_db, apply_id, 1)  # 1-完成
@@ -271,6 +293,7 @@ class ApprovalEngine:
                 'current_approval_node': next_node,
             }
             await ApprovalRulesDao.update_rules(query_db, apply_id, update_data)
+            ApprovalEngine._mark_nodes_changed(query_db, current_node, next_node)
             
             # 检查下一节点是否为空岗，如果是则自动审批
             is_empty = await ApprovalEngine._check_if_post_is_empty(query_db, next_node)
@@ -330,6 +353,9 @@ class ApprovalEngine:
             except (json.JSONDecodeError, TypeError):
                 approved_nodes = []
         
+        # 审批状态即将变化，失效审批时间线缓存
+        ApprovalTimelineService.invalidate(apply_id)
+        
         # 创建审批日志
         await ApprovalService.create_approval_log(
             query_db=query_db,
@@ -348,6 +374,7 @@ class ApprovalEngine:
             'current_approval_node': None,
         }
         await ApprovalRulesDao.update_rules(query_db, apply_id, update_data)
+        ApprovalEngine._mark_nodes_changed(query_db, current_node)
         
         # 更新申请单状态为驳回
         await ApplyService.update_apply_status(query_db, apply_id, 2)  # 2-驳回
@@ -0,0 +1,186 @@
+"""
+审批时间线服务（按申请单缓存审批规则与审批日志的投影）
+"""
+import json
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from module_apply.dao.approval_log_dao import ApprovalLogDao
+from module_apply.dao.approval_rules_dao import ApprovalRulesDao
+
+
+class ApprovalLogView:
+    """审批日志投影（与会话无关，可跨请求缓存）"""
+
+    __slots__ = (
+        'apply_id',
+        'approval_node',
+        'approver_id',
+        'approval_result',
+        'approval_comment',
+        'approval_images',
+        'approval_start_time',
+        'approval_end_time',
+    )
+
+    def __init__(self, log):
+        self.apply_id = log.apply_id
+        self.approval_node = log.approval_node
+        self.approver_id = log.approver_id
+        self.approval_result = log.approval_result
+        self.approval_comment = log.approval_comment
+        self.approval_images = log.approval_images
+        self.approval_start_time = log.approval_start_time
+        self.approval_end_time = log.approval_end_time
+
+
+class ApprovalTimeline:
+    """单个申请单的审批时间线投影"""
+
+    def __init__(self, rules, apply_status: Optional[int], logs: List):
+        """
+        构建审批时间线
+
+        :param rules: 审批规则对象
+        :param apply_status: 申请单状态
+        :param logs: 审批日志列表（按审批开始时间倒序）
+        """
+        self.apply_id = rules.apply_id
+        self.apply_status = apply_status
+        self.current_approval_node = rules.current_approval_node
+        self.version = ApprovalTimelineService.get_version(rules, apply_status)
+
+        self.approved_nodes = []
+        if rules.approved_nodes:
+            try:
+                self.approved_nodes = json.loads(rules.approved_nodes) if isinstance(rules.approved_nodes, str) else rules.approved_nodes
+            except (json.JSONDecodeError, TypeError):
+                self.approved_nodes = []
+
+        self.logs = [ApprovalLogView(log) for log in logs]
+        self.logs_map: Dict[int, List[ApprovalLogView]] = {}
+        for log in self.logs:
+            self.logs_map.setdefault(log.approval_node, []).append(log)
+
+    def get_node_result_logs(self, approval_node: int) -> Tuple[Optional[ApprovalLogView], Optional[ApprovalLogView]]:
+        """
+        获取审批节点的驳回日志与同意日志（驳回优先，同意只取最近一条）
+
+        :param approval_node: 审批节点（编制ID）
+        :return: (驳回日志, 同意日志)
+        """
+        reject_log = None
+        approve_log = None
+        for log in self.logs_map.get(approval_node, []):
+            if log.approval_result == 2:  # 驳回
+                reject_log = log
+                break
+            elif log.approval_result == 1:  # 同意
+                if not approve_log:
+                    approve_log = log
+        return reject_log, approve_log
+
+    def get_latest_reject_log(self) -> Optional[ApprovalLogView]:
+        """
+        获取最近一次驳回日志
+
+        :return: 驳回日志
+        """
+        for log in self.logs:
+            if log.approval_result == 2:
+                return log
+        return None
+
+    def get_submitter_id(self) -> Optional[str]:
+        """
+        获取提交人工号（approval_result=0 的日志）
+
+        :return: 提交人工号
+        """
+        for log in self.logs:
+            if log.approval_result == 0:
+                return log.approver_id
+        return None
+
+
+class ApprovalTimelineService:
+    """
+    审批时间线服务
+
+    每次读取都会批量查询审批规则（含申请单状态）用于校验缓存版本，审批日志只在版本变化时重新查询；
+    审批引擎写入时主动失效本进程缓存，其他进程通过版本校验感知变化。
+    """
+
+    # 缓存的申请单数量上限
+    CACHE_MAX_SIZE = 2048
+
+    _cache: 'OrderedDict[str, ApprovalTimeline]' = OrderedDict()
+
+    @staticmethod
+    def get_version(rules, apply_status: Optional[int]) -> tuple:
+        """
+        计算审批时间线版本（审批规则每次更新都会刷新update_time）
+
+        :param rules: 审批规则对象
+        :param apply_status: 申请单状态
+        :return: 版本元组
+        """
+        return rules.update_time or rules.create_time, rules.current_approval_node, apply_status
+
+    @classmethod
+    def invalidate(cls, apply_id: str) -> None:
+        """
+        失效申请单的审批时间线缓存
+
+        :param apply_id: 申请单ID
+        """
+        cls._cache.pop(apply_id, None)
+
+    @classmethod
+    async def get_timelines(cls, db: AsyncSession, apply_ids: List[str]) -> Dict[str, ApprovalTimeline]:
+        """
+        批量获取申请单的审批时间线（没有审批规则的申请单不返回）
+
+        :param db: orm对象
+        :param apply_ids: 申请单ID列表
+        :return: 审批时间线字典，key为申请单ID
+        """
+        apply_ids = list(dict.fromkeys(apply_id for apply_id in apply_ids if apply_id))
+        if not apply_ids:
+            return {}
+
+        rules_rows = await ApprovalRulesDao.get_rules_with_apply_status_by_apply_ids(db, apply_ids)
+
+        timelines = {}
+        stale_rows = []
+        for rules, apply_status in rules_rows:
+            cached = cls._cache.get(rules.apply_id)
+            if cached is not None and cached.version == cls.get_version(rules, apply_status):
+                cls._cache.move_to_end(rules.apply_id)
+                timelines[rules.apply_id] = cached
+            else:
+                stale_rows.append((rules, apply_status))
+
+        if stale_rows:
+            logs_map = await ApprovalLogDao.get_logs_by_apply_ids(db, [rules.apply_id for rules, _ in stale_rows])
+            for rules, apply_status in stale_rows:
+                timeline = ApprovalTimeline(rules, apply_status, logs_map.get(rules.apply_id, []))
+                timelines[rules.apply_id] = timeline
+                cls._cache[rules.apply_id] = timeline
+                cls._cache.move_to_end(rules.apply_id)
+            while len(cls._cache) > cls.CACHE_MAX_SIZE:
+                cls._cache.popitem(last=False)
+
+        return timelines
+
+    @classmethod
+    async def get_timeline(cls, db: AsyncSession, apply_id: str) -> Optional[ApprovalTimeline]:
+        """
+        获取单个申请单的审批时间线
+
+        :param db: orm对象
+        :param apply_id: 申请单ID
+        :return: 审批时间线或None
+        """
+        timelines = await cls.get_timelines(db, [apply_id])
+        return timelines.get(apply_id)
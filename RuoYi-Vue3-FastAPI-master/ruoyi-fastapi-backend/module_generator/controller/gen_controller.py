@@ -11,7 +11,6 @@ from module_admin.service.login_service import LoginService
 from module_admin.entity.vo.user_vo import CurrentUserModel
 from module_generator.entity.vo.gen_vo import DeleteGenTableModel, EditGenTableModel, GenTablePageQueryModel
 from module_generator.service.gen_service import GenTableColumnService, GenTableService
-from utils.common_util import bytes2file_response
 from utils.log_util import logger
 from utils.page_util import PageResponseModel
 from utils.response_util import ResponseUtil
@@ -115,7 +114,7 @@ async def batch_gen_code(request: Request, tables: str = Query(), query_db: Asyn
     batch_gen_code_result = await GenTableService.batch_gen_code_services(query_db, table_names)
     logger.info('生成代码成功')
 
-    return ResponseUtil.streaming(data=bytes2file_response(batch_gen_code_result))
+    return ResponseUtil.streaming(data=batch_gen_code_result)
 
 
 @genController.get('/genCode/{table_name}', dependencies=[Depends(CheckUserInterfaceAuth('tool:gen:code'))])
@@ -1,12 +1,14 @@
+import asyncio
 import io
 import json
 import os
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlglot import parse as sqlglot_parse
 from sqlglot.expressions import Add, Alter, Create, Delete, Drop, Expression, Insert, Table, TruncateTable, Update
-from typing import List
+from typing import List, Optional
 from config.constant import GenConstant
 from config.env import DataBaseConfig, GenConfig
 from exceptions.exception import ServiceException
@@ -25,11 +27,45 @@ from utils.gen_util import GenUtils
 from utils.template_util import TemplateInitializer, TemplateUtils
 
 
+class ZipStreamBuffer(io.RawIOBase):
+    """
+    压缩包流式输出缓冲区
+
+    只支持追加写入（不可定位），zipfile会使用数据描述符记录文件大小，已写入的数据可以随时取出发送给客户端
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self) -> bytes:
+        """
+        取出并清空已写入的数据
+
+        :return: 已写入的数据
+        """
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
 class GenTableService:
     """
     代码生成业务表服务层
     """
 
+    # 模板渲染线程池大小
+    RENDER_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+    _render_executor: Optional[ThreadPoolExecutor] = None
+
     @classmethod
     async def get_gen_table_list_services(
         cls, query_db: AsyncSession, query_object: GenTablePageQueryModel, is_page: bool = False
@@ -260,14 +296,10 @@ class GenTableService:
         )
         await cls.set_sub_table(query_db, gen_table)
         await cls.set_pk_column(gen_table)
-        env = TemplateInitializer.init_jinja2()
         context = TemplateUtils.prepare_context(gen_table)
         template_list = TemplateUtils.get_template_list(gen_table.tpl_category, gen_table.tpl_web_type)
-        preview_code_result = {}
-        for template in template_list:
-            render_content = env.get_template(template).render(**context)
-            preview_code_result[template] = render_content
-        return preview_code_result
+        render_contents = await cls.__run_in_render_pool(cls.__render_templates, template_list, context)
+        return dict(zip(template_list, render_contents))
 
     @classmethod
     async def generate_code_services(cls, query_db: AsyncSession, table_name: str):
@@ -278,8 +310,99 @@ class GenTableService:
         :param table_name: 业务表名称
         :return: 生成代码结果
         """
-        env = TemplateInitializer.init_jinja2()
         render_info = await cls.__get_gen_render_info(query_db, table_name)
+        await cls.__run_in_render_pool(cls.__write_gen_files, render_info)
+
+        return CrudResponseModel(is_success=True, message='生成代码成功')
+
+    @classmethod
+    async def batch_gen_code_services(cls, query_db: AsyncSession, table_names: List[str]):
+        """
+        批量生成代码service
+        业务表信息在返回前全部查询完成，各表的模板在渲染线程池中并行渲染，渲染完成的表依次写入压缩包并流式返回
+
+        :param query_db: orm对象
+        :param table_names: 业务表名称组
+        :return: 压缩包数据块异步生成器
+        """
+        render_info_list = [await cls.__get_gen_render_info(query_db, table_name) for table_name in table_names]
+
+        return cls.__stream_gen_zip(render_info_list)
+
+    @classmethod
+    async def __stream_gen_zip(cls, render_info_list: List[list]):
+        """
+        渲染并流式输出代码压缩包
+
+        :param render_info_list: 各业务表的生成代码渲染模板相关信息
+        :return: 压缩包数据块
+        """
+        loop = asyncio.get_running_loop()
+        zip_buffer = ZipStreamBuffer()
+        zip_file = zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED)
+        render_futures = [
+            cls.__run_in_render_pool(cls.__render_templates, render_info[0], render_info[2])
+            for render_info in render_info_list
+        ]
+        try:
+            for render_info, render_future in zip(render_info_list, render_futures):
+                render_contents = await render_future
+                await loop.run_in_executor(
+                    cls.__get_render_executor(), cls.__write_zip_entries, zip_file, render_info[1], render_contents
+                )
+                chunk = zip_buffer.pop()
+                if chunk:
+                    yield chunk
+            await loop.run_in_executor(cls.__get_render_executor(), zip_file.close)
+            yield zip_buffer.pop()
+        finally:
+            for render_future in render_futures:
+                render_future.cancel()
+
+    @classmethod
+    def __get_render_executor(cls) -> ThreadPoolExecutor:
+        """
+        获取模板渲染线程池（首次调用时创建）
+
+        :return: 线程池
+        """
+        if cls._render_executor is None:
+            cls._render_executor = ThreadPoolExecutor(
+                max_workers=cls.RENDER_MAX_WORKERS, thread_name_prefix='gen-render'
+            )
+        return cls._render_executor
+
+    @classmethod
+    def __run_in_render_pool(cls, func, *args) -> asyncio.Future:
+        """
+        在模板渲染线程池中执行，避免阻塞事件循环
+
+        :param func: 执行的函数
+        :param args: 函数参数
+        :return: 执行结果Future
+        """
+        return asyncio.get_running_loop().run_in_executor(cls.__get_render_executor(), func, *args)
+
+    @staticmethod
+    def __render_templates(template_list: List[str], context: dict) -> List[str]:
+        """
+        渲染模板列表（在渲染线程池中执行）
+
+        :param template_list: 模板列表
+        :param context: 模板变量
+        :return: 渲染结果列表，与模板列表一一对应
+        """
+        env = TemplateInitializer.init_jinja2()
+        return [env.get_template(template).render(**context) for template in template_list]
+
+    @classmethod
+    def __write_gen_files(cls, render_info: list) -> None:
+        """
+        渲染模板并写入生成路径（在渲染线程池中执行）
+
+        :param render_info: 生成代码渲染模板相关信息
+        """
+        env = TemplateInitializer.init_jinja2()
         for template in render_info[0]:
             try:
                 render_content = env.get_template(template).render(**render_info[2])
@@ -292,29 +415,17 @@ class GenTableService:
                     message=f'渲染模板失败，表名：{render_info[3].table_name}，详细错误信息：{str(e)}'
                 )
 
-        return CrudResponseModel(is_success=True, message='生成代码成功')
-
-    @classmethod
-    async def batch_gen_code_services(cls, query_db: AsyncSession, table_names: List[str]):
+    @staticmethod
+    def __write_zip_entries(zip_file: zipfile.ZipFile, output_files: List[str], render_contents: List[str]) -> None:
         """
-        批量生成代码service
+        将渲染结果写入压缩包（在渲染线程池中执行，同一压缩包的写入由调用方保证串行）
 
-        :param query_db: orm对象
-        :param table_names: 业务表名称组
-        :return: 下载代码结果
-        """
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for table_name in table_names:
-                env = TemplateInitializer.init_jinja2()
-                render_info = await cls.__get_gen_render_info(query_db, table_name)
-                for template_file, output_file in zip(render_info[0], render_info[1]):
-                    render_content = env.get_template(template_file).render(**render_info[2])
-                    zip_file.writestr(output_file, render_content)
-
-        zip_data = zip_buffer.getvalue()
-        zip_buffer.close()
-        return zip_data
+        :param zip_file: 压缩包对象
+        :param output_files: 输出文件名列表
+        :param render_contents: 渲染结果列表
+        """
+        for output_file, render_content in zip(output_files, render_contents):
+            zip_file.writestr(output_file, render_content)
 
     @classmethod
     async def __get_gen_render_info(cls, query_db: AsyncSession, table_name: str):
@@ -57,13 +57,20 @@ class TaskDao:
         return tasks
 
     @classmethod
-    async def get_project_statistics(cls, db: AsyncSession):
+    async def get_project_statistics(cls, db: AsyncSession, project_ids: list[int] = None):
         """
         获取各项目的阶段/任务统计信息
 
         :param db: orm对象
+        :param project_ids: 项目ID列表（为None时统计所有项目）
         :return: 字典列表
         """
+        stage_conditions = [ProjStage.enable == '1']
+        task_conditions = [ProjTask.enable == '1']
+        if project_ids is not None:
+            stage_conditions.append(ProjStage.project_id.in_(project_ids))
+            task_conditions.append(ProjTask.project_id.in_(project_ids))
+
         stage_rows = (
             (
                 await db.execute(
@@ -73,7 +80,7 @@ class TaskDao:
                         func.min(ProjStage.create_time).label('stage_min_create'),
                         func.max(ProjStage.update_time).label('stage_max_update'),
                     )
-                    .where(ProjStage.enable == '1')
+                    .where(*stage_conditions)
                     .group_by(ProjStage.project_id)
                 )
             )
@@ -89,7 +96,7 @@ class TaskDao:
                         func.min(ProjTask.create_time).label('task_min_create'),
                         func.max(ProjTask.update_time).label('task_max_update'),
                     )
-                    .where(ProjTask.enable == '1')
+                    .where(*task_conditions)
                     .group_by(ProjTask.project_id)
                 )
             )
@@ -123,23 +130,33 @@ class TaskDao:
         return stats_map
 
     @classmethod
-    async def get_project_validation_statistics(cls, db: AsyncSession):
+    async def get_project_validation_statistics(cls, db: AsyncSession, project_ids: list[int] = None):
         """
         获取各项目的验证统计信息
         包括：信息缺失数（仅任务：负责人、开始时间、结束时间、审批层级）、时间关系异常数（阶段+任务）、未分配到阶段数（仅任务）、项目状态
 
         :param db: orm对象
+        :param project_ids: 项目ID列表（为None时统计所有项目）
         :return: 字典 {project_id: {missing_info_count, time_relation_error_count, unassigned_stage_count, project_status}}
         """
         import json
-        from datetime import date as DateType
+        from module_task.configuration.service.validator.task_validator import TaskValidator
+
+        if project_ids is not None and not project_ids:
+            return {}
+
+        task_conditions = [ProjTask.enable == '1']
+        stage_conditions = [ProjStage.enable == '1']
+        if project_ids is not None:
+            task_conditions.append(ProjTask.project_id.in_(project_ids))
+            stage_conditions.append(ProjStage.project_id.in_(project_ids))
 
-        # 查询所有有效任务
+        # 查询范围内所有有效任务
         tasks = (
             (
                 await db.execute(
                     select(ProjTask)
-                    .where(ProjTask.enable == '1')
+                    .where(*task_conditions)
                     .order_by(ProjTask.project_id, ProjTask.task_id)
                 )
             )
@@ -147,12 +164,12 @@ class TaskDao:
             .all()
         )
 
-        # 查询所有有效阶段
+        # 查询范围内所有有效阶段
         stages = (
             (
                 await db.execute(
                     select(ProjStage)
-                    .where(ProjStage.enable == '1')
+                    .where(*stage_conditions)
                     .order_by(ProjStage.project_id, ProjStage.stage_id)
                 )
             )
@@ -181,9 +198,8 @@ class TaskDao:
 
             stats = project_stats[project_id]
 
-            # 使用统一的校验方法检查单个任务
-            from module_task.configuration.service.validator.task_validator import TaskValidator
-            validation_result = await TaskValidator.check_single_task_validation(db, task, task_map)
+            # 使用统一的校验方法检查单个任务（已提供task_map，无需查询数据库）
+            validation_result = TaskValidator.evaluate_task_validation(task, task_map)
             
             if validation_result['has_missing_info']:
                 stats['missing_info_count'] += 1
@@ -4,6 +4,8 @@ from typing import Optional, Union
 from sqlalchemy import update, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from module_task.configuration.dao.task_dao import TaskDao
+from module_task.configuration.service.project_validation_service import ProjectValidationService
+from module_task.configuration.service.validator.graph_validator import DependencyGraph
 from module_task.entity.do.proj_stage_do import ProjStage
 from module_task.entity.do.proj_task_do import ProjTask
 from module_task.entity.vo.task_vo import StageModel, TaskModel, TaskConfigPayload
@@ -50,7 +52,9 @@ class TaskPersistence:
         existing_tasks_map = {task.task_id: task for task in existing_tasks}
 
         # ===== 步骤1.5：检查编辑限制 =====
-        await cls._check_edit_permissions(query_db, payload.stages, payload.tasks, existing_stages_map, existing_tasks_map)
+        await cls._check_edit_permissions(
+            query_db, project_id, payload.stages, payload.tasks, existing_stages_map, existing_tasks_map
+        )
 
         # ===== 步骤2：处理阶段数据 =====
         # 返回临时ID到真实ID的映射
@@ -63,16 +67,18 @@ class TaskPersistence:
 
         # ===== 步骤3：处理任务数据 =====
         # 传递stage_id映射，用于更新任务的stage_id
-        # 返回任务临时ID到真实ID的映射
-        task_id_mapping = await cls._process_tasks(
+        await cls._process_tasks(
             query_db, payload.tasks, existing_tasks_map, project_id, current_user_name, stage_id_mapping
         )
 
+        # 项目配置已变更，失效项目验证统计缓存
+        ProjectValidationService.invalidate_projects([project_id])
+
         logger.info('数据持久化完成')
         
         # ===== 步骤4：保存后检查并生成满足条件的任务 =====
         if generate_tasks:
-            await cls._check_and_generate_tasks_after_save(query_db, project_id, payload.tasks, existing_tasks_map, task_id_mapping)
+            await cls._check_and_generate_tasks_after_save(query_db, project_id)
 
     @classmethod
     async def _process_stages(
@@ -542,6 +548,7 @@ class TaskPersistence:
     async def _check_edit_permissions(
         cls,
         query_db: AsyncSession,
+        project_id: int,
         stages: list[StageModel],
         tasks: list[TaskModel],
         existing_stages_map: dict,
@@ -550,197 +557,118 @@ class TaskPersistence:
         """
         检查编辑权限
         对于已生成的任务/阶段，只允许编辑后置关系，不允许编辑其他字段
+        已生成的阶段/任务ID一次查询，现有数据的JSON字段每项只解析一次
         
         :param query_db: orm对象
+        :param project_id: 项目ID
         :param stages: 前端传入的阶段列表
         :param tasks: 前端传入的任务列表
         :param existing_stages_map: 现有阶段映射
         :param existing_tasks_map: 现有任务映射
         """
+        if not any(stage_id in existing_stages_map for stage_id in (stage.id for stage in stages)) and not any(
+            task_id in existing_tasks_map for task_id in (task.id for task in tasks)
+        ):
+            return
+        generated_stage_ids, generated_task_ids = await TaskGenerationUtil.get_generated_ids(query_db, project_id)
+        parse_id_list = DependencyGraph.parse_id_list
+
         # 检查阶段的编辑权限
         for stage in stages:
             stage_id = stage.id
-            if stage_id > 0 and stage_id in existing_stages_map:
-                # 这是已存在的阶段，检查是否已生成
-                is_generated = not await TaskGenerationUtil.is_stage_editable(query_db, stage_id)
-                if is_generated:
-                    # 已生成的阶段，检查是否尝试修改不允许修改的字段
-                    existing_stage = existing_stages_map[stage_id]
-                    
-                    # 检查名称是否被修改（已生成的阶段不允许修改名称）
-                    # 注意：开始时间、结束时间、时长允许修改，因为添加新任务可能会改变阶段的时间范围
-                    if stage.name != existing_stage.name:
-                        raise ServiceException(
-                            message=f'阶段【{stage.name}】已生成，不允许修改阶段名称'
-                        )
-                    
-                    # 检查前置关系是否被修改（不允许修改前置关系）
-                    existing_predecessor_stages = []
-                    if existing_stage.predecessor_stages:
-                        try:
-                            existing_predecessor_stages = json.loads(existing_stage.predecessor_stages) if isinstance(existing_stage.predecessor_stages, str) else existing_stage.predecessor_stages
-                        except (json.JSONDecodeError, TypeError):
-                            existing_predecessor_stages = []
-                    
-                    new_predecessor_stages = stage.predecessor_stages or []
-                    if sorted(existing_predecessor_stages) != sorted(new_predecessor_stages):
+            # 这是已存在且已生成的阶段，检查是否尝试修改不允许修改的字段
+            if stage_id > 0 and stage_id in existing_stages_map and stage_id in generated_stage_ids:
+                existing_stage = existing_stages_map[stage_id]
+                
+                # 检查名称是否被修改（已生成的阶段不允许修改名称）
+                # 注意：开始时间、结束时间、时长允许修改，因为添加新任务可能会改变阶段的时间范围
+                if stage.name != existing_stage.name:
+                    raise ServiceException(
+                        message=f'阶段【{stage.name}】已生成，不允许修改阶段名称'
+                    )
+                
+                # 检查前置关系是否被修改（不允许修改前置关系）
+                existing_predecessor_stages = parse_id_list(existing_stage.predecessor_stages)
+                new_predecessor_stages = stage.predecessor_stages or []
+                if sorted(existing_predecessor_stages) != sorted(new_predecessor_stages):
+                    raise ServiceException(
+                        message=f'阶段【{stage.name}】已生成，不允许修改前置关系'
+                    )
+                
+                # 检查后置关系（允许修改，但只限于添加/删除未生成的阶段）
+                existing_successor_stages = set(parse_id_list(existing_stage.successor_stages))
+                new_successor_stages = stage.successor_stages or []
+                # 检查新增的后置阶段是否都是未生成的
+                for succ_id in new_successor_stages:
+                    if succ_id not in existing_successor_stages and succ_id in generated_stage_ids:
                         raise ServiceException(
-                            message=f'阶段【{stage.name}】已生成，不允许修改前置关系'
+                            message=f'阶段【{stage.name}】已生成，只能添加未生成的阶段作为后置阶段'
                         )
-                    
-                    # 检查后置关系（允许修改，但只限于添加/删除未生成的阶段）
-                    existing_successor_stages = []
-                    if existing_stage.successor_stages:
-                        try:
-                            existing_successor_stages = json.loads(existing_stage.successor_stages) if isinstance(existing_stage.successor_stages, str) else existing_stage.successor_stages
-                        except (json.JSONDecodeError, TypeError):
-                            existing_successor_stages = []
-                    
-                    new_successor_stages = stage.successor_stages or []
-                    # 检查新增的后置阶段是否都是未生成的
-                    added_successor_stages = [s for s in new_successor_stages if s not in existing_successor_stages]
-                    for succ_id in added_successor_stages:
-                        if not await TaskGenerationUtil.is_stage_editable(query_db, succ_id):
-                            raise ServiceException(
-                                message=f'阶段【{stage.name}】已生成，只能添加未生成的阶段作为后置阶段'
-                            )
         
         # 检查任务的编辑权限
         for task in tasks:
             task_id = task.id
-            if task_id > 0 and task_id in existing_tasks_map:
-                # 这是已存在的任务，检查是否已生成
-                is_generated = not await TaskGenerationUtil.is_task_editable(query_db, task_id)
-                if is_generated:
-                    # 已生成的任务，检查是否尝试修改不允许修改的字段
-                    existing_task = existing_tasks_map[task_id]
-                    
-                    # 检查基本信息是否被修改
-                    if (task.name != existing_task.name or
-                        task.description != existing_task.description or
-                        task.start_time != existing_task.start_time or
-                        task.end_time != existing_task.end_time or
-                        task.duration != existing_task.duration or
-                        task.job_number != existing_task.job_number or
-                        task.approval_type != existing_task.approval_type):
-                        raise ServiceException(
-                            message=f'任务【{task.name}】已生成，不允许修改基本信息（名称、描述、时间、负责人、审批模式等）'
-                        )
-                    
-                    # 检查审批节点是否被修改
-                    existing_approval_nodes = []
-                    if existing_task.approval_nodes:
-                        try:
-                            existing_approval_nodes = json.loads(existing_task.approval_nodes) if isinstance(existing_task.approval_nodes, str) else existing_task.approval_nodes
-                        except (json.JSONDecodeError, TypeError):
-                            existing_approval_nodes = []
-                    
-                    new_approval_nodes = task.approval_nodes or []
-                    if sorted(existing_approval_nodes) != sorted(new_approval_nodes):
-                        raise ServiceException(
-                            message=f'任务【{task.name}】已生成，不允许修改审批节点'
-                        )
-                    
-                    # 检查前置关系是否被修改（不允许修改前置关系）
-                    existing_predecessor_tasks = []
-                    if existing_task.predecessor_tasks:
-                        try:
-                            existing_predecessor_tasks = json.loads(existing_task.predecessor_tasks) if isinstance(existing_task.predecessor_tasks, str) else existing_task.predecessor_tasks
-                        except (json.JSONDecodeError, TypeError):
-                            existing_predecessor_tasks = []
-                    
-                    new_predecessor_tasks = task.predecessor_tasks or []
-                    if sorted(existing_predecessor_tasks) != sorted(new_predecessor_tasks):
+            # 这是已存在且已生成的任务，检查是否尝试修改不允许修改的字段
+            if task_id > 0 and task_id in existing_tasks_map and task_id in generated_task_ids:
+                existing_task = existing_tasks_map[task_id]
+                
+                # 检查基本信息是否被修改
+                if (task.name != existing_task.name or
+                    task.description != existing_task.description or
+                    task.start_time != existing_task.start_time or
+                    task.end_time != existing_task.end_time or
+                    task.duration != existing_task.duration or
+                    task.job_number != existing_task.job_number or
+                    task.approval_type != existing_task.approval_type):
+                    raise ServiceException(
+                        message=f'任务【{task.name}】已生成，不允许修改基本信息（名称、描述、时间、负责人、审批模式等）'
+                    )
+                
+                # 检查审批节点是否被修改
+                existing_approval_nodes = parse_id_list(existing_task.approval_nodes)
+                new_approval_nodes = task.approval_nodes or []
+                if sorted(existing_approval_nodes) != sorted(new_approval_nodes):
+                    raise ServiceException(
+                        message=f'任务【{task.name}】已生成，不允许修改审批节点'
+                    )
+                
+                # 检查前置关系是否被修改（不允许修改前置关系）
+                existing_predecessor_tasks = parse_id_list(existing_task.predecessor_tasks)
+                new_predecessor_tasks = task.predecessor_tasks or []
+                if sorted(existing_predecessor_tasks) != sorted(new_predecessor_tasks):
+                    raise ServiceException(
+                        message=f'任务【{task.name}】已生成，不允许修改前置关系'
+                    )
+                
+                # 检查后置关系（允许修改，但只限于添加/删除未生成的任务）
+                existing_successor_tasks = set(parse_id_list(existing_task.successor_tasks))
+                new_successor_tasks = task.successor_tasks or []
+                # 检查新增的后置任务是否都是未生成的
+                for succ_id in new_successor_tasks:
+                    if succ_id not in existing_successor_tasks and succ_id in generated_task_ids:
                         raise ServiceException(
-                            message=f'任务【{task.name}】已生成，不允许修改前置关系'
+                            message=f'任务【{task.name}】已生成，只能添加未生成的任务作为后置任务'
                         )
-                    
-                    # 检查后置关系（允许修改，但只限于添加/删除未生成的任务）
-                    existing_successor_tasks = []
-                    if existing_task.successor_tasks:
-                        try:
-                            existing_successor_tasks = json.loads(existing_task.successor_tasks) if isinstance(existing_task.successor_tasks, str) else existing_task.successor_tasks
-                        except (json.JSONDecodeError, TypeError):
-                            existing_successor_tasks = []
-                    
-                    new_successor_tasks = task.successor_tasks or []
-                    # 检查新增的后置任务是否都是未生成的
-                    added_successor_tasks = [t for t in new_successor_tasks if t not in existing_successor_tasks]
-                    for succ_id in added_successor_tasks:
-                        if not await TaskGenerationUtil.is_task_editable(query_db, succ_id):
-                            raise ServiceException(
-                                message=f'任务【{task.name}】已生成，只能添加未生成的任务作为后置任务'
-                            )
     
     @classmethod
     async def _check_and_generate_tasks_after_save(
         cls,
         query_db: AsyncSession,
         project_id: int,
-        tasks: list[TaskModel],
-        existing_tasks_map: dict,
-        task_id_mapping: dict,
     ) -> None:
         """
         保存后检查并生成满足条件的任务
         无论项目是否已生成任务，都会执行生成逻辑
+        新增/编辑的任务以及因前后置关系变更而新满足生成条件的阶段和任务，都在一次依赖图加载中批量生成
         
         :param query_db: orm对象
         :param project_id: 项目ID
-        :param tasks: 前端传入的任务列表
-        :param existing_tasks_map: 现有任务映射
-        :param task_id_mapping: 任务临时ID到真实ID的映射
         """
         from module_task.todo.service.todo_service import TodoService
         
-        # 获取所有需要检查的任务ID（新增和编辑的任务）
-        task_ids_to_check = set()
-        
-        # 1. 新增的任务（临时ID）
-        for task in tasks:
-            if task.id <= 0 and task.id in task_id_mapping:
-                task_ids_to_check.add(task_id_mapping[task.id])
-        
-        # 2. 编辑的任务（真实ID）
-        for task in tasks:
-            if task.id > 0 and task.id in existing_tasks_map:
-                task_ids_to_check.add(task.id)
-        
-        # 3. 检查由于前后置关系变更而新满足生成条件的任务
-        # 获取所有任务的前置/后置关系，检查是否有任务因为关系变更而满足生成条件
-        all_proj_tasks = await TaskDao.get_tasks_by_project_id(query_db, project_id)
-        all_task_ids = {task.task_id for task in all_proj_tasks}
-        
-        # 检查所有未生成的任务是否满足生成条件
-        for task_id in all_task_ids:
-            # 如果任务已生成，跳过
-            if not await TaskGenerationUtil.is_task_editable(query_db, task_id):
-                continue
-            
-            # 检查任务是否通过校验（信息完整且无校验失败）
-            validation_passed = await TaskGenerationUtil.check_task_validation_status(query_db, task_id)
-            if not validation_passed:
-                logger.debug(f'任务校验未通过，跳过生成: task_id={task_id}')
-                continue
-            
-            # 检查任务是否满足生成条件（前置任务都完成）
-            can_generate = await TaskGenerationUtil.check_task_generation_condition(query_db, task_id)
-            if can_generate:
-                # 生成任务
-                await TodoService.generate_task_if_ready(query_db, task_id, project_id)
-        
-        # 检查所有未生成的阶段是否满足生成条件
-        all_proj_stages = await TaskDao.get_stages_by_project_id(query_db, project_id)
-        all_stage_ids = {stage.stage_id for stage in all_proj_stages}
-        
-        for stage_id in all_stage_ids:
-            # 如果阶段已生成，跳过
-            if not await TaskGenerationUtil.is_stage_editable(query_db, stage_id):
-                continue
-            
-            # 检查阶段是否满足生成条件
-            can_generate = await TaskGenerationUtil.check_stage_generation_condition(query_db, stage_id)
-            if can_generate:
-                # 生成阶段
-                await TodoService.generate_stage_if_ready(query_db, stage_id, project_id)
+        generated_stage_count, generated_task_count = await TodoService.generate_ready_frontier(query_db, project_id)
+        logger.info(
+            f'保存后生成任务完成: project_id={project_id}, '
+            f'generated_stages={generated_stage_count}, generated_tasks={generated_task_count}'
+        )
 
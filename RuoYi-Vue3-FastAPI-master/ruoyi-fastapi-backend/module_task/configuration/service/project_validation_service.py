@@ -0,0 +1,97 @@
+from typing import Dict, Iterable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from module_task.configuration.dao.task_dao import TaskDao
+from utils.log_util import logger
+
+
+class ProjectValidationService:
+    """
+    项目验证统计服务层
+
+    按项目缓存验证统计结果，缓存版本为项目有效阶段/任务的数量与最近更新时间（来自分组统计查询），
+    只有版本变化或被任务配置保存主动失效的项目才重新计算，其余项目直接复用缓存结果。
+    """
+
+    _cache: Dict[int, tuple] = {}
+
+    @staticmethod
+    def _get_version(stats: dict) -> tuple:
+        """
+        根据项目阶段/任务统计信息计算缓存版本
+
+        :param stats: 项目统计信息（get_project_statistics的单项结果）
+        :return: 版本元组
+        """
+        return stats.get('stage_count', 0), stats.get('task_count', 0), stats.get('update_time')
+
+    @staticmethod
+    def _get_default_stats() -> dict:
+        """
+        项目没有有效阶段/任务时的验证统计结果
+
+        :return: 验证统计信息
+        """
+        return {
+            'missing_info_count': 0,
+            'time_relation_error_count': 0,
+            'unassigned_stage_count': 0,
+            'project_status': '正常',
+        }
+
+    @classmethod
+    def invalidate_projects(cls, project_ids: Iterable[int]) -> None:
+        """
+        失效项目的验证统计缓存（任务配置保存后调用）
+
+        :param project_ids: 项目ID列表
+        """
+        for project_id in project_ids:
+            cls._cache.pop(project_id, None)
+
+    @classmethod
+    async def get_projects_validation_stats(
+        cls, query_db: AsyncSession, stats_map: Optional[Dict[int, dict]] = None
+    ) -> Dict[int, dict]:
+        """
+        批量获取项目验证统计信息，只重新计算发生变化的项目
+
+        :param query_db: orm对象
+        :param stats_map: 项目阶段/任务统计信息（为None时查询所有项目）
+        :return: 字典 {project_id: {missing_info_count, time_relation_error_count, unassigned_stage_count, project_status}}
+        """
+        if stats_map is None:
+            stats_map = await TaskDao.get_project_statistics(query_db)
+
+        result = {}
+        stale_project_ids = []
+        for project_id, stats in stats_map.items():
+            cached = cls._cache.get(project_id)
+            if cached is not None and cached[0] == cls._get_version(stats):
+                result[project_id] = cached[1]
+            else:
+                stale_project_ids.append(project_id)
+
+        if stale_project_ids:
+            logger.info(f'[项目验证统计] 重新计算项目: {stale_project_ids}')
+            fresh_stats_map = await TaskDao.get_project_validation_statistics(query_db, stale_project_ids)
+            for project_id in stale_project_ids:
+                validation_stats = fresh_stats_map.get(project_id, cls._get_default_stats())
+                cls._cache[project_id] = (cls._get_version(stats_map[project_id]), validation_stats)
+                result[project_id] = validation_stats
+
+        return result
+
+    @classmethod
+    async def get_project_validation_stats(cls, query_db: AsyncSession, project_id: int) -> Optional[dict]:
+        """
+        获取单个项目的验证统计信息
+
+        :param query_db: orm对象
+        :param project_id: 项目ID
+        :return: 验证统计信息，项目没有有效阶段/任务时返回None
+        """
+        stats_map = await TaskDao.get_project_statistics(query_db, [project_id])
+        if project_id not in stats_map:
+            return None
+        validation_stats_map = await cls.get_projects_validation_stats(query_db, stats_map)
+        return validation_stats_map.get(project_id)
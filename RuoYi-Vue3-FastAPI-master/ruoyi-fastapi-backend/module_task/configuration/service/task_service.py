@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import ValidationError
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_task.configuration.dao.task_dao import TaskDao
-from module_admin.service.dict_service import DictDataService
+from module_admin.service.dict_cache_service import DictCacheService
 from module_task.entity.vo.task_vo import (
     StageModel,
     StagePositionModel,
@@ -16,6 +16,7 @@ from module_task.entity.vo.task_vo import (
 )
 from module_task.configuration.service.validator.task_validator import TaskValidator
 from module_task.configuration.service.persistence.task_persistence import TaskPersistence
+from module_task.configuration.service.project_validation_service import ProjectValidationService
 from utils.common_util import CamelCaseUtil
 from utils.log_util import logger
 from exceptions.exception import ServiceException
@@ -139,11 +140,11 @@ class TaskService:
         from sqlalchemy import select, func
         from module_task.entity.do.todo_task_do import TodoTask
         
-        dict_data_list = await DictDataService.query_dict_data_list_services(query_db, 'sys_task_project')
+        dict_data_list = await DictCacheService.get_dict_data_list('sys_task_project')
         logger.info(f'[项目列表] 字典数据查询结果: dict_type=sys_task_project, count={len(dict_data_list)}')
         stats_map = await TaskDao.get_project_statistics(query_db)
         logger.info(f'[项目列表] 项目统计信息: count={len(stats_map)}')
-        validation_stats_map = await TaskDao.get_project_validation_statistics(query_db)
+        validation_stats_map = await ProjectValidationService.get_projects_validation_stats(query_db, stats_map)
         logger.info(f'[项目列表] 项目验证统计信息: count={len(validation_stats_map)}')
         
         # 批量查询哪些项目已经有生成的任务
@@ -159,7 +160,7 @@ class TaskService:
 
         for dict_data in dict_data_list:
             try:
-                project_id = int(dict_data.dict_value)
+                project_id = int(dict_data.get('dictValue'))
             except (TypeError, ValueError):
                 continue
 
@@ -186,7 +187,7 @@ class TaskService:
             result.append(
                 ProjectSummaryModel(
                     project_id=project_id,
-                    project_name=dict_data.dict_label,
+                    project_name=dict_data.get('dictLabel'),
                     stage_count=stage_count,
                     task_count=task_count,
                     create_time=stats.get('create_time'),
@@ -265,6 +266,10 @@ class TaskService:
         
         # 检查项目是否已生成任务
         tasks_generated = await TaskGenerationUtil.get_tasks_generated_status(query_db, project_id)
+        # 已生成任务的项目一次查询所有已生成的阶段ID与任务ID，已生成的阶段/任务不可编辑
+        generated_stage_ids, generated_task_ids = (
+            await TaskGenerationUtil.get_generated_ids(query_db, project_id) if tasks_generated else (set(), set())
+        )
 
         # 转换阶段数据
         stages = []
@@ -293,12 +298,8 @@ class TaskService:
                 except (json.JSONDecodeError, TypeError):
                     position = None
 
-            # 计算阶段是否可编辑
-            if tasks_generated:
-                is_editable = await TaskGenerationUtil.is_stage_editable(query_db, stage_do.stage_id)
-            else:
-                # 未生成任务的项目，所有阶段都可以编辑
-                is_editable = True
+            # 计算阶段是否可编辑（未生成任务的项目，所有阶段都可以编辑）
+            is_editable = stage_do.stage_id not in generated_stage_ids
             
             stage = StageModel(
                 id=stage_do.stage_id,
@@ -350,12 +351,8 @@ class TaskService:
                 except (json.JSONDecodeError, TypeError):
                     approval_nodes = []
 
-            # 计算任务是否可编辑
-            if tasks_generated:
-                is_editable = await TaskGenerationUtil.is_task_editable(query_db, task_do.task_id)
-            else:
-                # 未生成任务的项目，所有任务都可以编辑
-                is_editable = True
+            # 计算任务是否可编辑（未生成任务的项目，所有任务都可以编辑）
+            is_editable = task_do.task_id not in generated_task_ids
             
             task = TaskModel(
                 id=task_do.task_id,
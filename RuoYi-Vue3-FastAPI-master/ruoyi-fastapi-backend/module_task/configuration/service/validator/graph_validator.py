@@ -0,0 +1,152 @@
+import json
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+
+class DependencyGraph:
+    """
+    前后置依赖关系图
+    每次校验只构建一次邻接表，回环检测（Tarjan强连通分量）与拓扑排序（Kahn）均为迭代实现，
+    时间复杂度为 O(节点数 + 边数)，不受Python递归深度限制
+    """
+
+    def __init__(self, node_ids: Iterable[int], edges: Iterable[Tuple[int, int]]):
+        """
+        构建依赖关系图
+
+        :param node_ids: 节点ID列表（保持传入顺序，用于稳定的遍历与报错顺序）
+        :param edges: 有向边列表 (from_id, to_id)，表示 from_id 是 to_id 的前置
+        """
+        self.adjacency: Dict[int, List[int]] = {}
+        self._edge_set = set()
+        for node_id in node_ids:
+            self.adjacency.setdefault(node_id, [])
+        for from_id, to_id in edges:
+            if (from_id, to_id) in self._edge_set:
+                continue
+            self._edge_set.add((from_id, to_id))
+            self.adjacency.setdefault(from_id, []).append(to_id)
+            self.adjacency.setdefault(to_id, [])
+        self._position = {node_id: position for position, node_id in enumerate(self.adjacency)}
+
+    @classmethod
+    def from_relations(cls, nodes: Iterable, predecessors_attr: str, successors_attr: str) -> 'DependencyGraph':
+        """
+        根据节点的前置/后置列表构建依赖关系图（A的后置是B表示A->B，A的前置是B表示B->A）
+
+        :param nodes: 节点对象列表（需包含id属性）
+        :param predecessors_attr: 前置ID列表属性名
+        :param successors_attr: 后置ID列表属性名
+        :return: 依赖关系图
+        """
+        nodes = list(nodes)
+        edges = []
+        for node in nodes:
+            for succ_id in getattr(node, successors_attr) or []:
+                edges.append((node.id, succ_id))
+            for pred_id in getattr(node, predecessors_attr) or []:
+                edges.append((pred_id, node.id))
+        return cls([node.id for node in nodes], edges)
+
+    @staticmethod
+    def parse_id_list(value) -> list:
+        """
+        解析JSON格式的ID列表（数据库中以JSON字符串存储）
+
+        :param value: JSON字符串或列表
+        :return: ID列表
+        """
+        if not value:
+            return []
+        try:
+            id_list = json.loads(value) if isinstance(value, str) else value
+        except (json.JSONDecodeError, TypeError):
+            return []
+        return id_list if isinstance(id_list, list) else []
+
+    def find_cycles(self) -> List[List[int]]:
+        """
+        迭代式Tarjan算法查找所有回环（节点数大于1或包含自连接的强连通分量）
+
+        :return: 回环列表，每个回环为按节点顺序排列的节点ID列表
+        """
+        index: Dict[int, int] = {}
+        lowlink: Dict[int, int] = {}
+        on_stack = set()
+        stack: List[int] = []
+        cycles: List[List[int]] = []
+        counter = 0
+
+        for root_id in self.adjacency:
+            if root_id in index:
+                continue
+            index[root_id] = lowlink[root_id] = counter
+            counter += 1
+            stack.append(root_id)
+            on_stack.add(root_id)
+            work = [(root_id, 0)]
+            while work:
+                node_id, next_child = work[-1]
+                successors = self.adjacency[node_id]
+                if next_child < len(successors):
+                    work[-1] = (node_id, next_child + 1)
+                    succ_id = successors[next_child]
+                    if succ_id not in index:
+                        index[succ_id] = lowlink[succ_id] = counter
+                        counter += 1
+                        stack.append(succ_id)
+                        on_stack.add(succ_id)
+                        work.append((succ_id, 0))
+                    elif succ_id in on_stack:
+                        lowlink[node_id] = min(lowlink[node_id], index[succ_id])
+                    continue
+
+                work.pop()
+                if work:
+                    parent_id = work[-1][0]
+                    lowlink[parent_id] = min(lowlink[parent_id], lowlink[node_id])
+                if lowlink[node_id] == index[node_id]:
+                    component = []
+                    while True:
+                        member_id = stack.pop()
+                        on_stack.discard(member_id)
+                        component.append(member_id)
+                        if member_id == node_id:
+                            break
+                    if len(component) > 1 or (node_id, node_id) in self._edge_set:
+                        component.sort(key=self._position.__getitem__)
+                        cycles.append(component)
+
+        cycles.sort(key=lambda component: self._position[component[0]])
+        return cycles
+
+    def topological_order(self) -> List[int]:
+        """
+        Kahn算法计算拓扑序（回环中的节点及其下游节点不会出现在结果中）
+
+        :return: 节点ID列表
+        """
+        in_degree = {node_id: 0 for node_id in self.adjacency}
+        for successors in self.adjacency.values():
+            for succ_id in successors:
+                in_degree[succ_id] += 1
+        queue = deque(node_id for node_id, degree in in_degree.items() if degree == 0)
+        order = []
+        while queue:
+            node_id = queue.popleft()
+            order.append(node_id)
+            for succ_id in self.adjacency[node_id]:
+                in_degree[succ_id] -= 1
+                if in_degree[succ_id] == 0:
+                    queue.append(succ_id)
+        return order
+
+    def iter_edges_in_topological_order(self):
+        """
+        按拓扑序遍历所有边（用于一次遍历完成前后置时间关系检查）
+
+        :return: (from_id, to_id) 生成器
+        """
+        for node_id in self.topological_order():
+            for succ_id in self.adjacency[node_id]:
+                yield node_id, succ_id
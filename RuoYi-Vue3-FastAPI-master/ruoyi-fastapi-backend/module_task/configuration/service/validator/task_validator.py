@@ -1,4 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from module_task.configuration.service.validator.graph_validator import DependencyGraph
 from module_task.entity.vo.task_vo import TaskConfigPayload
 from utils.log_util import logger
 from exceptions.exception import ServiceException
@@ -26,14 +28,14 @@ class TaskValidator:
         # 1. 基础数据校验
         await cls._validate_basic_data(query_db, payload, current_user_id)
 
-        # 2. 阶段图回环检测
-        cls._validate_stage_cycles(payload)
+        # 2. 阶段图回环检测（阶段依赖关系图只构建一次，供时间校验复用）
+        stage_graph = cls._validate_stage_cycles(payload)
 
         # 3. 任务图回环检测
         cls._validate_task_cycles(payload)
 
         # 4. 阶段时间校验（允许保存，只记录日志）
-        cls._validate_stage_time_relations(payload)
+        cls._validate_stage_time_relations(payload, stage_graph)
 
     @classmethod
     async def _validate_basic_data(
@@ -60,23 +62,24 @@ class TaskValidator:
         pass
 
     @classmethod
-    def _validate_stage_cycles(cls, payload: TaskConfigPayload):
+    def _validate_stage_cycles(cls, payload: TaskConfigPayload) -> Optional[DependencyGraph]:
         """
         阶段图回环检测
-        使用DFS染色算法检测阶段之间的回环依赖
+        使用迭代式Tarjan算法检测阶段之间的回环依赖，报告所有回环
 
         :param payload: 任务配置数据对象
+        :return: 阶段依赖关系图（供阶段时间校验复用），无阶段时返回None
         """
         stages = payload.stages
         if not stages:
-            return
+            return None
 
         # 构建阶段ID到阶段对象的映射
         stage_map = {stage.id: stage for stage in stages}
 
-        # ===== 校验1：自连接检查 =====
         for stage in stages:
             stage_name = stage.name
+            # ===== 校验1：自连接检查 =====
             # 检查前置阶段列表中是否包含自己
             if stage.id in stage.predecessor_stages:
                 raise ServiceException(
@@ -104,74 +107,23 @@ class TaskValidator:
                         message=f'阶段数据校验失败，涉及阶段【{stage_name}】，错误信息：后置阶段 {succ_id} 不存在于阶段列表中，阶段只能与阶段连接'
                     )
 
-        # 构建邻接表（有向图）：stage_id -> [successor_stage_ids]
-        # 注意：同时考虑predecessor和successor关系，构建完整的图
-        adjacency = {}
-        for stage in stages:
-            # 初始化邻接表
-            if stage.id not in adjacency:
-                adjacency[stage.id] = []
-            # 添加后置阶段（A的后置是B，表示A->B）
-            adjacency[stage.id].extend(stage.successor_stages)
-            # 添加前置阶段的反向关系（A的前置是B，表示B->A）
-            for pred_id in stage.predecessor_stages:
-                if pred_id not in adjacency:
-                    adjacency[pred_id] = []
-                if stage.id not in adjacency[pred_id]:
-                    adjacency[pred_id].append(stage.id)
-
-        # 使用DFS检测回环（染色算法：0=未访问，1=访问中，2=已访问）
-        color = {stage_id: 0 for stage_id in stage_map.keys()}
-        cycle_path = []
-
-        def dfs(node_id: int, path: list):
-            """DFS遍历，检测回环"""
-            if color[node_id] == 1:  # 发现回环
-                # 找到回环路径
-                cycle_start = path.index(node_id)
-                cycle_path.extend(path[cycle_start:] + [node_id])
-                return True
-            if color[node_id] == 2:  # 已访问过，无回环
-                return False
-
-            color[node_id] = 1  # 标记为访问中
-            path.append(node_id)
-
-            # 遍历所有后继节点
-            for successor_id in adjacency.get(node_id, []):
-                # 验证后继节点是否存在
-                if successor_id not in stage_map:
-                    current_stage = stage_map.get(node_id)
-                    stage_name = current_stage.name if current_stage else str(node_id)
-                    raise ServiceException(
-                        message=f'阶段数据校验失败，涉及阶段【{stage_name}】，错误信息：后置阶段 {successor_id} 不存在于阶段列表中'
-                    )
-                if dfs(successor_id, path):
-                    return True
-
-            color[node_id] = 2  # 标记为已访问
-            path.pop()
-            return False
-
-        # 对每个未访问的节点进行DFS（处理多个独立的有向图）
-        for stage_id in stage_map.keys():
-            if color[stage_id] == 0:
-                if dfs(stage_id, []):
-                    # 发现回环，生成错误信息
-                    # 获取回环中第一个阶段的名称
-                    first_stage_id = cycle_path[0] if cycle_path else stage_id
-                    first_stage = stage_map.get(first_stage_id)
-                    stage_name = first_stage.name if first_stage else str(first_stage_id)
-                    raise ServiceException(
-                        message=f'回环检测失败，涉及阶段【{stage_name}】。请检查阶段的前置/后置关系配置。'
-                    )
+        # 构建依赖关系图：同时考虑predecessor和successor关系，构建完整的图
+        stage_graph = DependencyGraph.from_relations(stages, 'predecessor_stages', 'successor_stages')
+
+        cycles = stage_graph.find_cycles()
+        if cycles:
+            raise ServiceException(
+                message=f'回环检测失败，涉及阶段{cls._format_cycles(cycles, stage_map)}。请检查阶段的前置/后置关系配置。'
+            )
+
+        return stage_graph
 
     @classmethod
     def _validate_task_cycles(cls, payload: TaskConfigPayload):
         """
         任务图回环检测
-        按阶段分组，对每个阶段内的任务进行回环检测
-        同时校验跨阶段任务引用和未归属阶段任务的规则
+        校验跨阶段任务引用和未归属阶段任务的规则后，对所有任务构建一次依赖关系图并检测回环
+        （跨阶段关联已被禁止，因此整体检测与按阶段分别检测等价）
 
         :param payload: 任务配置数据对象
         """
@@ -182,21 +134,9 @@ class TaskValidator:
         # 构建任务ID到任务对象的映射
         task_map = {task.id: task for task in tasks}
 
-        # 按阶段分组任务
-        tasks_by_stage = {}
-        tasks_without_stage = []
-
-        for task in tasks:
-            if task.stage_id is None:
-                tasks_without_stage.append(task)
-            else:
-                if task.stage_id not in tasks_by_stage:
-                    tasks_by_stage[task.stage_id] = []
-                tasks_by_stage[task.stage_id].append(task)
-
         # 校验未归属阶段的任务
-        for task in tasks_without_stage:
-            if task.predecessor_tasks or task.successor_tasks:
+        for task in tasks:
+            if task.stage_id is None and (task.predecessor_tasks or task.successor_tasks):
                 raise ServiceException(
                     message=f'任务数据校验失败，涉及任务【{task.name}】，错误信息：未归属任何阶段的任务不能配置前后置关系'
                 )
@@ -231,84 +171,49 @@ class TaskValidator:
                         message=f'任务数据校验失败，涉及任务【{task_name}】，错误信息：后置任务 {succ_id} 不存在于任务列表中，任务只能与任务连接'
                     )
 
-        # 对每个阶段内的任务进行回环检测
-        for stage_id, stage_tasks in tasks_by_stage.items():
-            # 构建该阶段内任务的ID集合，用于快速查找
-            stage_task_ids = {task.id for task in stage_tasks}
-
-            # 构建该阶段内任务的邻接表（有向图）
-            # 同时考虑predecessor和successor关系，构建完整的图
-            adjacency = {}
-            for task in stage_tasks:
-                # 初始化邻接表
-                if task.id not in adjacency:
-                    adjacency[task.id] = []
-                # 添加后置任务（A的后置是B，表示A->B）
-                # ===== 校验3：任务跨阶段链接检查（后置任务） =====
-                for succ_id in task.successor_tasks:
-                    if succ_id not in stage_task_ids:
-                        raise ServiceException(
-                            message=f'任务数据校验失败，涉及任务【{task.name}】，错误信息：后置任务 {succ_id} 不属于当前阶段，不同阶段的任务不能直接关联'
-                        )
-                    adjacency[task.id].append(succ_id)
-                # 添加前置任务的反向关系（A的前置是B，表示B->A）
-                # ===== 校验3：任务跨阶段链接检查（前置任务） =====
-                for pred_id in task.predecessor_tasks:
-                    if pred_id not in stage_task_ids:
-                        raise ServiceException(
-                            message=f'任务数据校验失败，涉及任务【{task.name}】，错误信息：前置任务 {pred_id} 不属于当前阶段，不同阶段的任务不能直接关联'
-                        )
-                    if pred_id not in adjacency:
-                        adjacency[pred_id] = []
-                    if task.id not in adjacency[pred_id]:
-                        adjacency[pred_id].append(task.id)
-
-            # 使用DFS检测回环
-            color = {task.id: 0 for task in stage_tasks}
-            cycle_path = []
-
-            def dfs(node_id: int, path: list):
-                """DFS遍历，检测回环"""
-                if color[node_id] == 1:  # 发现回环
-                    cycle_start = path.index(node_id)
-                    cycle_path.extend(path[cycle_start:] + [node_id])
-                    return True
-                if color[node_id] == 2:  # 已访问过
-                    return False
-
-                color[node_id] = 1
-                path.append(node_id)
-
-                # 遍历所有后继任务
-                # 注意：跨阶段检查和任务存在性检查已在构建邻接表时完成，这里只需要进行DFS遍历
-                for successor_id in adjacency.get(node_id, []):
-                    if dfs(successor_id, path):
-                        return True
-
-                color[node_id] = 2
-                path.pop()
-                return False
-
-            # 对每个未访问的任务进行DFS
-            for task in stage_tasks:
-                if color[task.id] == 0:
-                    if dfs(task.id, []):
-                        # 发现回环，获取回环中第一个任务的名称
-                        first_task_id = cycle_path[0] if cycle_path else task.id
-                        first_task = task_map.get(first_task_id)
-                        task_name = first_task.name if first_task else task.name
-                        raise ServiceException(
-                            message=f'回环检测失败，涉及任务【{task_name}】。请检查任务的前置/后置关系配置。'
-                        )
+        # ===== 校验3：任务跨阶段链接检查 =====
+        for task in tasks:
+            for succ_id in task.successor_tasks:
+                if task_map[succ_id].stage_id != task.stage_id:
+                    raise ServiceException(
+                        message=f'任务数据校验失败，涉及任务【{task.name}】，错误信息：后置任务 {succ_id} 不属于当前阶段，不同阶段的任务不能直接关联'
+                    )
+            for pred_id in task.predecessor_tasks:
+                if task_map[pred_id].stage_id != task.stage_id:
+                    raise ServiceException(
+                        message=f'任务数据校验失败，涉及任务【{task.name}】，错误信息：前置任务 {pred_id} 不属于当前阶段，不同阶段的任务不能直接关联'
+                    )
+
+        task_graph = DependencyGraph.from_relations(tasks, 'predecessor_tasks', 'successor_tasks')
+        cycles = task_graph.find_cycles()
+        if cycles:
+            raise ServiceException(
+                message=f'回环检测失败，涉及任务{cls._format_cycles(cycles, task_map)}。请检查任务的前置/后置关系配置。'
+            )
+
+    @staticmethod
+    def _format_cycles(cycles: List[List[int]], node_map: dict) -> str:
+        """
+        格式化回环信息，每个回环列出其中所有节点名称
+
+        :param cycles: 回环列表
+        :param node_map: 节点ID到节点对象的映射
+        :return: 回环描述，如【阶段1、阶段2】；【阶段3、阶段4】
+        """
+        return '；'.join(
+            '【' + '、'.join(node_map[node_id].name if node_id in node_map else str(node_id) for node_id in cycle) + '】'
+            for cycle in cycles
+        )
 
     @classmethod
-    def _validate_stage_time_relations(cls, payload: TaskConfigPayload):
+    def _validate_stage_time_relations(cls, payload: TaskConfigPayload, stage_graph: Optional[DependencyGraph] = None):
         """
         阶段时间关系校验
-        校验前置阶段的结束时间是否早于后置阶段的开始时间
+        按拓扑序一次遍历所有前后置关系，校验前置阶段的结束时间是否早于后置阶段的开始时间
         允许保存，只记录日志，不抛出异常
 
         :param payload: 任务配置数据对象
+        :param stage_graph: 阶段依赖关系图（为None时根据payload构建）
         """
         stages = payload.stages
         if not stages:
@@ -316,47 +221,28 @@ class TaskValidator:
 
         # 构建阶段ID到阶段对象的映射
         stage_map = {stage.id: stage for stage in stages}
-
-        # 检查每个阶段的前后置时间关系
-        for stage in stages:
-            stage_name = stage.name
-            has_time_error = False
-
-            # 检查前置阶段关系：当前阶段开始时间 <= 前置阶段结束时间，异常
-            if stage.predecessor_stages and stage.start_time:
-                for pred_id in stage.predecessor_stages:
-                    pred_stage = stage_map.get(pred_id)
-                    if pred_stage and pred_stage.end_time and stage.start_time:
-                        if stage.start_time <= pred_stage.end_time:
-                            has_time_error = True
-                            logger.warning(
-                                f'阶段时间关系异常：阶段【{stage_name}】(ID: {stage.id}) 的开始时间 {stage.start_time} '
-                                f'<= 前置阶段【{pred_stage.name}】(ID: {pred_id}) 的结束时间 {pred_stage.end_time}'
-                            )
-                            break
-
-            # 检查后置阶段关系：当前阶段结束时间 >= 后置阶段开始时间，异常
-            if not has_time_error and stage.successor_stages and stage.end_time:
-                for succ_id in stage.successor_stages:
-                    succ_stage = stage_map.get(succ_id)
-                    if succ_stage and succ_stage.start_time and stage.end_time:
-                        if stage.end_time >= succ_stage.start_time:
-                            has_time_error = True
-                            logger.warning(
-                                f'阶段时间关系异常：阶段【{stage_name}】(ID: {stage.id}) 的结束时间 {stage.end_time} '
-                                f'>= 后置阶段【{succ_stage.name}】(ID: {succ_id}) 的开始时间 {succ_stage.start_time}'
-                            )
-                            break
+        if stage_graph is None:
+            stage_graph = DependencyGraph.from_relations(stages, 'predecessor_stages', 'successor_stages')
+
+        # 检查每条前后置关系：后置阶段开始时间 <= 前置阶段结束时间，异常
+        for pred_id, succ_id in stage_graph.iter_edges_in_topological_order():
+            pred_stage = stage_map.get(pred_id)
+            succ_stage = stage_map.get(succ_id)
+            if not pred_stage or not succ_stage or not pred_stage.end_time or not succ_stage.start_time:
+                continue
+            if succ_stage.start_time <= pred_stage.end_time:
+                logger.warning(
+                    f'阶段时间关系异常：阶段【{succ_stage.name}】(ID: {succ_id}) 的开始时间 {succ_stage.start_time} '
+                    f'<= 前置阶段【{pred_stage.name}】(ID: {pred_id}) 的结束时间 {pred_stage.end_time}'
+                )
     
     @classmethod
-    async def check_single_task_validation(cls, db: AsyncSession, task, task_map: dict = None) -> dict:
+    def evaluate_task_validation(cls, task, task_map: dict) -> dict:
         """
-        检查单个任务的校验状态（信息完整性和时间关系）
-        用于任务生成前的校验和项目列表的统计
+        根据已加载的任务映射检查单个任务的校验状态（纯内存计算，不访问数据库）
         
-        :param db: orm对象
         :param task: 任务对象（ProjTask）
-        :param task_map: 任务映射 {task_id: task}，用于查找前置/后置任务。如果为None，会查询项目内所有任务
+        :param task_map: 任务映射 {task_id: task}，用于查找前置/后置任务
         :return: 字典 {
             'has_missing_info': bool,  # 是否有信息缺失
             'is_unassigned': bool,  # 是否未分配到阶段
@@ -365,7 +251,6 @@ class TaskValidator:
         }
         """
         import json
-        from module_task.configuration.dao.task_dao import TaskDao
         
         result = {
             'has_missing_info': False,
@@ -409,11 +294,6 @@ class TaskValidator:
         # 3. 检查时间关系异常
         has_time_error = False
         
-        # 如果没有提供task_map，需要查询项目内所有任务来构建映射
-        if task_map is None:
-            project_tasks = await TaskDao.get_tasks_by_project_id(db, task.project_id)
-            task_map = {t.task_id: t for t in project_tasks}
-        
         # 3.1 检查任务自身：开始时间 > 结束时间
         if task.start_time and task.end_time and task.start_time > task.end_time:
             has_time_error = True
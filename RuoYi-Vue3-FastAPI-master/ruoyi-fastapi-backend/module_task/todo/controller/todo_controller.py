@@ -179,32 +179,8 @@ async def resubmit_task(
     :param current_user: 当前用户
     """
     try:
-        from module_task.todo.dao.todo_task_dao import TodoTaskDao
-        from module_task.entity.do.todo_task_do import TodoTask
-        from sqlalchemy import select
-        
-        # 1. 验证任务是否存在且状态为驳回
-        todo_task_result = await query_db.execute(
-            select(TodoTask).where(TodoTask.task_id == task_id)
-        )
-        todo_task = todo_task_result.scalar_one_or_none()
-        
-        if not todo_task:
-            return ResponseUtil.failure(msg=f'任务不存在: task_id={task_id}')
-        
-        if todo_task.task_status != 4:  # 必须是驳回状态
-            return ResponseUtil.failure(msg=f'任务状态不正确，无法重新提交。当前状态: {todo_task.task_status}，只有驳回状态的任务才能重新提交')
-        
-        # 2. 验证是否是任务负责人
-        if todo_task.job_number != current_user.user.user_name:
-            return ResponseUtil.failure(msg='只有任务负责人才能重新提交任务')
-        
-        # 3. 更新任务状态为进行中（不更新实际开始时间）
-        # 旧申请单保持驳回状态即可，不需要额外操作
-        await TodoTaskDao.update_task_status(query_db, task_id, 1)  # 1-进行中
-        
+        await TodoService.resubmit_task(query_db, task_id, current_user.user.user_name)
         await query_db.commit()
-        logger.info(f'任务重新提交成功: task_id={task_id}，任务状态已重置为进行中')
         return ResponseUtil.success(msg='任务已重置为进行中状态，请在我的任务页面查看并提交')
     except ServiceException as e:
         await query_db.rollback()
@@ -243,6 +219,8 @@ async def get_my_tasks_list(
     task_status: Optional[int] = Query(None, alias='taskStatus', description='任务状态（1-待提交，2-审批中，4-驳回）'),
     page_num: Optional[int] = Query(1, alias='pageNum', description='页码（可选，如果pageSize为0或未提供，则不分页）'),
     page_size: Optional[int] = Query(0, alias='pageSize', description='每页数量（0表示不分页，返回所有数据）'),
+    cursor: Optional[str] = Query(None, description='游标分页的游标（传空字符串查询第一页，不传使用页码分页）'),
+    with_total: bool = Query(False, alias='withTotal', description='游标分页时是否返回总数'),
     query_db: AsyncSession = Depends(get_db),
     current_user: CurrentUserModel = Depends(LoginService.get_current_user),
 ):
@@ -254,6 +232,8 @@ async def get_my_tasks_list(
     :param task_status: 任务状态（可选）
     :param page_num: 页码
     :param page_size: 每页数量
+    :param cursor: 游标
+    :param with_total: 游标分页时是否返回总数
     :param query_db: orm对象
     :param current_user: 当前用户
     :return: 任务列表数据
@@ -261,7 +241,7 @@ async def get_my_tasks_list(
     try:
         job_number = current_user.user.user_name
         data = await TodoQueryService.get_my_tasks_list(
-            query_db, job_number, project_id, dept_id, task_status, page_num, page_size
+            query_db, job_number, project_id, dept_id, task_status, page_num, page_size, cursor, with_total
         )
         return ResponseUtil.success(data=data)
     except Exception as e:
@@ -275,6 +255,8 @@ async def get_history_tasks_list(
     dept_id: Optional[int] = Query(None, alias='deptId', description='部门ID（第二级部门）'),
     page_num: Optional[int] = Query(1, alias='pageNum', description='页码（可选，如果pageSize为0或未提供，则不分页）'),
     page_size: Optional[int] = Query(0, alias='pageSize', description='每页数量（0表示不分页，返回所有数据）'),
+    cursor: Optional[str] = Query(None, description='游标分页的游标（传空字符串查询第一页，不传使用页码分页）'),
+    with_total: bool = Query(False, alias='withTotal', description='游标分页时是否返回总数'),
     query_db: AsyncSession = Depends(get_db),
     current_user: CurrentUserModel = Depends(LoginService.get_current_user),
 ):
@@ -285,6 +267,8 @@ async def get_history_tasks_list(
     :param dept_id: 部门ID（可选，第二级部门）
     :param page_num: 页码
     :param page_size: 每页数量
+    :param cursor: 游标
+    :param with_total: 游标分页时是否返回总数
     :param query_db: orm对象
     :param current_user: 当前用户
     :return: 已完成任务列表数据
@@ -292,7 +276,7 @@ async def get_history_tasks_list(
     try:
         job_number = current_user.user.user_name
         data = await TodoQueryService.get_completed_tasks_list(
-            query_db, job_number, project_id, dept_id, page_num, page_size
+            query_db, job_number, project_id, dept_id, page_num, page_size, cursor, with_total
         )
         return ResponseUtil.success(data=data)
     except Exception as e:
@@ -2,7 +2,7 @@
 阶段执行表DAO
 """
 from typing import List, Optional
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from module_task.entity.do.todo_stage_do import TodoStage
 
@@ -52,6 +52,18 @@ class TodoStageDao:
         await db.flush()
         return stage
     
+    @classmethod
+    async def create_stages(cls, db: AsyncSession, stage_data_list: List[dict]) -> None:
+        """
+        批量创建阶段执行记录（单条多行INSERT）
+        
+        :param db: orm对象
+        :param stage_data_list: 阶段数据字典列表（字段需一致）
+        """
+        if not stage_data_list:
+            return
+        await db.execute(insert(TodoStage), stage_data_list)
+    
     @classmethod
     async def update_stage_status(cls, db: AsyncSession, stage_id: int, status: int, **kwargs) -> None:
         """
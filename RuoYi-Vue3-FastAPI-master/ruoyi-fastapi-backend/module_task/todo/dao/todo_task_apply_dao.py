@@ -1,8 +1,8 @@
 """
 任务申请详情表DAO
 """
-from typing import Optional, List
-from sqlalchemy import select
+from typing import Dict, Optional, List
+from sqlalchemy import desc, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from module_task.entity.do.todo_task_apply_do import TodoTaskApply
 
@@ -33,7 +33,6 @@ class TodoTaskApplyDao:
         :param task_id: 任务ID（关联todo_task.id）
         :return: 任务申请详情对象或None
         """
-        from sqlalchemy import desc
         result = await db.execute(
             select(TodoTaskApply)
             .where(TodoTaskApply.task_id == task_id)
@@ -42,6 +41,34 @@ class TodoTaskApplyDao:
         )
         return result.scalar_one_or_none()
     
+    @classmethod
+    async def get_latest_applies_by_task_ids(cls, db: AsyncSession, task_ids: List[int]) -> Dict[int, TodoTaskApply]:
+        """
+        根据任务ID列表批量查询每个任务最新的任务申请详情（窗口函数，一次查询）
+        
+        :param db: orm对象
+        :param task_ids: 任务ID列表（关联todo_task.id）
+        :return: 任务申请详情字典，key为任务ID
+        """
+        if not task_ids:
+            return {}
+        
+        row_number = func.row_number().over(
+            partition_by=TodoTaskApply.task_id,
+            order_by=(desc(TodoTaskApply.submit_time), desc(TodoTaskApply.id))
+        ).label('row_number')
+        ranked_applies = (
+            select(TodoTaskApply.id, row_number)
+            .where(TodoTaskApply.task_id.in_(task_ids))
+            .subquery()
+        )
+        result = await db.execute(
+            select(TodoTaskApply)
+            .join(ranked_applies, TodoTaskApply.id == ranked_applies.c.id)
+            .where(ranked_applies.c.row_number == 1)
+        )
+        return {apply.task_id: apply for apply in result.scalars().all()}
+    
     @classmethod
     async def get_all_applies_by_task_id(
         cls, 
@@ -57,7 +84,6 @@ class TodoTaskApplyDao:
         :param exclude_apply_id: 排除的申请单ID（可选，用于排除当前申请单）
         :return: 任务申请详情列表
         """
-        from sqlalchemy import desc
         query = select(TodoTaskApply).where(TodoTaskApply.task_id == task_id)
         
         if exclude_apply_id:
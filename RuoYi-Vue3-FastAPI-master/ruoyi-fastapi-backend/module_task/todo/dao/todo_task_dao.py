@@ -1,9 +1,10 @@
 """
 任务执行表DAO
 """
-from typing import List, Optional
-from sqlalchemy import select
+from typing import List, Optional, Set, Tuple
+from sqlalchemy import exists, insert, literal, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
+from module_task.entity.do.todo_stage_do import TodoStage
 from module_task.entity.do.todo_task_do import TodoTask
 
 
@@ -38,6 +39,46 @@ class TodoTaskDao:
         )
         return list(result.scalars().all())
     
+    @classmethod
+    async def exists_task_by_project_id(cls, db: AsyncSession, project_id: int) -> bool:
+        """
+        根据项目ID判断是否存在任务执行记录（EXISTS查询）
+        
+        :param db: orm对象
+        :param project_id: 项目ID
+        :return: True表示存在，False表示不存在
+        """
+        result = await db.execute(select(exists().where(TodoTask.project_id == project_id)))
+        return bool(result.scalar())
+    
+    @classmethod
+    async def get_generated_ids_by_project_id(cls, db: AsyncSession, project_id: int) -> Tuple[Set[int], Set[int]]:
+        """
+        根据项目ID一次查询已生成的阶段ID与任务ID
+        
+        :param db: orm对象
+        :param project_id: 项目ID
+        :return: (已生成的阶段ID集合, 已生成的任务ID集合)
+        """
+        result = await db.execute(
+            union_all(
+                select(literal('stage').label('kind'), TodoStage.stage_id.label('node_id')).where(
+                    TodoStage.project_id == project_id
+                ),
+                select(literal('task').label('kind'), TodoTask.task_id.label('node_id')).where(
+                    TodoTask.project_id == project_id
+                ),
+            )
+        )
+        generated_stage_ids = set()
+        generated_task_ids = set()
+        for kind, node_id in result.all():
+            if kind == 'stage':
+                generated_stage_ids.add(node_id)
+            else:
+                generated_task_ids.add(node_id)
+        return generated_stage_ids, generated_task_ids
+    
     @classmethod
     async def create_task(cls, db: AsyncSession, task_data: dict) -> TodoTask:
         """
@@ -52,6 +93,18 @@ class TodoTaskDao:
         await db.flush()
         return task
     
+    @classmethod
+    async def create_tasks(cls, db: AsyncSession, task_data_list: List[dict]) -> None:
+        """
+        批量创建任务执行记录（单条多行INSERT）
+        
+        :param db: orm对象
+        :param task_data_list: 任务数据字典列表（字段需一致）
+        """
+        if not task_data_list:
+            return
+        await db.execute(insert(TodoTask), task_data_list)
+    
     @classmethod
     async def update_task_status(cls, db: AsyncSession, task_id: int, status: int, **kwargs) -> None:
         """
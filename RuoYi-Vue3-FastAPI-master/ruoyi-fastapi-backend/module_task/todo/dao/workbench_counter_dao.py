@@ -0,0 +1,88 @@
+"""
+工作台计数DAO
+"""
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from module_task.entity.do.todo_task_do import TodoTask
+from module_task.entity.do.todo_task_apply_do import TodoTaskApply
+from module_apply.entity.do.apply_primary_do import ApplyPrimary
+from module_apply.entity.do.apply_rules_do import ApplyRules
+
+
+class WorkbenchCounterDao:
+    """工作台计数DAO"""
+
+    # 参与工作台统计的任务状态：1-进行中，2-已提交，4-驳回
+    COUNTED_TASK_STATUS = (1, 2, 4)
+
+    @classmethod
+    async def get_owner_counts(
+        cls,
+        db: AsyncSession,
+        job_numbers: Optional[Iterable[str]] = None
+    ) -> List[Tuple[str, int, int, int]]:
+        """
+        按负责人、任务状态、项目分组统计任务数量
+
+        :param db: orm对象
+        :param job_numbers: 负责人工号列表（为None时统计全部负责人）
+        :return: [(负责人工号, 任务状态, 项目ID, 任务数量)]
+        """
+        query = (
+            select(TodoTask.job_number, TodoTask.task_status, TodoTask.project_id, func.count(TodoTask.id))
+            .where(
+                TodoTask.job_number.is_not(None),
+                TodoTask.task_status.in_(cls.COUNTED_TASK_STATUS)
+            )
+            .group_by(TodoTask.job_number, TodoTask.task_status, TodoTask.project_id)
+        )
+        if job_numbers is not None:
+            job_numbers = list(job_numbers)
+            if not job_numbers:
+                return []
+            query = query.where(TodoTask.job_number.in_(job_numbers))
+        result = await db.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    @classmethod
+    async def get_node_counts(
+        cls,
+        db: AsyncSession,
+        organization_ids: Optional[Iterable[int]] = None
+    ) -> List[Tuple[int, int, int, str, int]]:
+        """
+        按当前审批节点、任务状态、项目、负责人分组统计任务数量
+        TodoTaskApply.task_id 关联的是 todo_task.id（主键），不是 task_id（业务ID）
+
+        :param db: orm对象
+        :param organization_ids: 审批节点（编制ID）列表（为None时统计全部审批节点）
+        :return: [(审批节点, 任务状态, 项目ID, 负责人工号, 任务数量)]
+        """
+        query = (
+            select(
+                ApplyRules.current_approval_node,
+                TodoTask.task_status,
+                TodoTask.project_id,
+                TodoTask.job_number,
+                func.count(func.distinct(TodoTask.id)),
+            )
+            .select_from(TodoTask)
+            .join(TodoTaskApply, TodoTaskApply.task_id == TodoTask.id)
+            .join(ApplyPrimary, TodoTaskApply.apply_id == ApplyPrimary.apply_id)
+            .join(ApplyRules, ApplyPrimary.apply_id == ApplyRules.apply_id)
+            .where(
+                ApplyRules.current_approval_node.is_not(None),
+                TodoTask.task_status.in_(cls.COUNTED_TASK_STATUS)
+            )
+            .group_by(
+                ApplyRules.current_approval_node, TodoTask.task_status, TodoTask.project_id, TodoTask.job_number
+            )
+        )
+        if organization_ids is not None:
+            organization_ids = list(organization_ids)
+            if not organization_ids:
+                return []
+            query = query.where(ApplyRules.current_approval_node.in_(organization_ids))
+        result = await db.execute(query)
+        return [tuple(row) for row in result.all()]
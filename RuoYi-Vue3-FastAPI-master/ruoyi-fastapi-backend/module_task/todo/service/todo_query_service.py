@@ -8,13 +8,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from module_task.todo.dao.todo_query_dao import TodoQueryDao
 from module_task.todo.dao.todo_task_apply_dao import TodoTaskApplyDao
 from module_apply.service.apply_service import ApplyService
-from module_apply.service.approval_service import ApprovalService
+from module_apply.service.approval_timeline_service import ApprovalTimelineService
 from module_apply.dao.approval_log_dao import ApprovalLogDao
-from module_admin.service.dict_service import DictDataService
-from module_admin.entity.do.oa_employee_primary_do import OaEmployeePrimary
-from module_admin.entity.do.oa_department_do import OaDepartment
-from module_task.todo.utils.dept_util import DeptUtil
+from module_admin.service.dict_cache_service import DictCacheService
+from module_admin.service.org_index_service import OrgIndexService
+from module_task.todo.service.workbench_counter_service import CounterEntry, WorkbenchCounterService
 from sqlalchemy import select
+from middlewares.trace_middleware import traced
 from utils.log_util import logger
 
 
@@ -22,6 +22,7 @@ class TodoQueryService:
     """任务查询服务"""
     
     @classmethod
+    @traced()
     async def get_my_tasks_categories(
         cls,
         db: AsyncSession,
@@ -29,130 +30,95 @@ class TodoQueryService:
     ) -> Dict[str, Any]:
         """
         获取我的任务分类统计
+        包含负责人是当前用户的任务与需要当前用户审批的任务（状态为进行中、已提交、驳回），
+        从工作台计数中读取，不再查询任务列表
         
         :param db: orm对象
         :param job_number: 负责人工号
         :return: 分类统计数据
         """
-        # 1. 获取当前用户的任务列表
-        tasks = await TodoQueryDao.get_my_tasks_for_categories(db, job_number)
+        # 1. 获取负责人计数与审批节点计数
+        entries = await cls._get_my_task_counter_entries(db, job_number)
         
         # 2. 获取项目字典
-        project_dict_list = await DictDataService.query_dict_data_list_services(db, 'sys_task_project')
-        project_dict = {item.dict_value: item.dict_label for item in project_dict_list}
+        project_dict = await DictCacheService.get_label_map('sys_task_project')
         
-        # 3. 获取所有相关的员工和部门信息
-        job_numbers = list(set([task.job_number for task in tasks if task.job_number]))
-        employees_map = {}
-        depts_map = {}
-        second_level_depts_map = {}
+        # 3. 获取组织架构索引（员工、部门、第二级部门均从进程内索引读取）
+        org_index = await OrgIndexService.get_index()
         
-        if job_numbers:
-            # 查询员工信息
-            employees = await db.execute(
-                select(OaEmployeePrimary)
-                .where(OaEmployeePrimary.job_number.in_(job_numbers))
-            )
-            employees_list = list(employees.scalars().all())
-            employees_map = {emp.job_number: emp for emp in employees_list}
-            
-            # 查询部门信息
-            org_ids = list(set([emp.organization_id for emp in employees_list if emp.organization_id]))
-            if org_ids:
-                depts = await db.execute(
-                    select(OaDepartment)
-                    .where(OaDepartment.id.in_(org_ids))
-                )
-                depts_list = list(depts.scalars().all())
-                depts_map = {dept.id: dept for dept in depts_list}
-                
-                # 获取所有第二级部门code
-                second_level_codes = set()
-                for dept in depts_list:
-                    if dept.code:
-                        second_level_code = DeptUtil.get_second_level_dept_code(dept.code)
-                        if second_level_code:
-                            second_level_codes.add(second_level_code)
-                
-                # 查询第二级部门
-                if second_level_codes:
-                    second_level_depts = await db.execute(
-                        select(OaDepartment)
-                        .where(OaDepartment.code.in_(list(second_level_codes)))
-                    )
-                    second_level_depts_list = list(second_level_depts.scalars().all())
-                    second_level_depts_map = {dept.code: dept for dept in second_level_depts_list}
-        
-        # 4. 统计项目分类
         project_stats = {}
-        for task in tasks:
-            project_id = task.project_id
+        dept_stats = {}
+        status_stats = {}
+        status_names = {1: '待提交', 2: '审批中', 4: '驳回'}
+        total = 0
+        for task_status, project_id, owner_job_number, count in entries:
+            total += count
+            
+            # 4. 统计项目分类
             if project_id not in project_stats:
                 project_stats[project_id] = {
                     'projectId': project_id,
                     'projectName': project_dict.get(str(project_id), f'项目{project_id}'),
                     'count': 0
                 }
-            project_stats[project_id]['count'] += 1
-        
-        # 5. 统计部门分类（第二级部门）
-        dept_stats = {}
-        for task in tasks:
-            employee = employees_map.get(task.job_number)
-            if not employee or not employee.organization_id:
-                continue
+            project_stats[project_id]['count'] += count
             
-            dept = depts_map.get(employee.organization_id)
-            if not dept or not dept.code:
-                continue
-            
-            # 获取第二级部门code
-            second_level_code = DeptUtil.get_second_level_dept_code(dept.code)
-            if not second_level_code:
-                continue
-            
-            second_level_dept = second_level_depts_map.get(second_level_code)
-            if not second_level_dept:
-                continue
+            # 5. 统计部门分类（第二级部门）
+            second_level_dept = org_index.get_employee_second_level_dept(owner_job_number)
+            if second_level_dept:
+                dept_id = second_level_dept.id
+                if dept_id not in dept_stats:
+                    dept_stats[dept_id] = {
+                        'deptId': dept_id,
+                        'deptName': second_level_dept.name,
+                        'count': 0
+                    }
+                dept_stats[dept_id]['count'] += count
             
-            dept_id = second_level_dept.id
-            if dept_id not in dept_stats:
-                dept_stats[dept_id] = {
-                    'deptId': dept_id,
-                    'deptName': second_level_dept.name,
-                    'count': 0
-                }
-            dept_stats[dept_id]['count'] += 1
-        
-        # 6. 统计状态分类
-        status_stats = {}
-        status_names = {1: '待提交', 2: '审批中', 4: '驳回'}
-        for task in tasks:
-            status = task.task_status
-            if status not in status_stats:
-                status_stats[status] = {
-                    'status': status,
-                    'statusName': status_names.get(status, f'状态{status}'),
+            # 6. 统计状态分类
+            if task_status not in status_stats:
+                status_stats[task_status] = {
+                    'status': task_status,
+                    'statusName': status_names.get(task_status, f'状态{task_status}'),
                     'count': 0
                 }
-            status_stats[status]['count'] += 1
+            status_stats[task_status]['count'] += count
         
         return {
             'project': {
-                'total': len(tasks),
+                'total': total,
                 'items': list(project_stats.values())
             },
             'department': {
-                'total': len(tasks),
+                'total': total,
                 'items': list(dept_stats.values())
             },
             'status': {
-                'total': len(tasks),
+                'total': total,
                 'items': list(status_stats.values())
             }
         }
     
     @classmethod
+    async def _get_my_task_counter_entries(
+        cls,
+        db: AsyncSession,
+        job_number: str
+    ) -> List[CounterEntry]:
+        """
+        获取我的任务计数（负责人是当前用户的任务，以及需要当前用户审批且负责人不是当前用户的任务）
+        
+        :param db: orm对象
+        :param job_number: 负责人工号
+        :return: 计数列表 [(任务状态, 项目ID, 负责人工号, 任务数量)]
+        """
+        organization_id = await TodoQueryDao.get_current_organization_id(job_number)
+        owner_entries, node_entries = await WorkbenchCounterService.get_counters(db, job_number, organization_id)
+        # 负责人是当前用户且需要当前用户审批的任务已计入负责人计数，不重复统计
+        return owner_entries + [entry for entry in node_entries if entry[2] != job_number]
+    
+    @classmethod
+    @traced()
     async def get_my_tasks_list(
         cls,
         db: AsyncSession,
@@ -161,7 +127,9 @@ class TodoQueryService:
         dept_id: Optional[int] = None,
         task_status: Optional[int] = None,
         page_num: int = 1,
-        page_size: int = 10
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+        with_total: bool = False
     ) -> Dict[str, Any]:
         """
         获取我的任务列表
@@ -173,24 +141,28 @@ class TodoQueryService:
         :param task_status: 任务状态（可选）
         :param page_num: 页码
         :param page_size: 每页数量
+        :param cursor: 游标（不为None时使用游标分页，空字符串表示第一页）
+        :param with_total: 游标分页时是否返回总数
         :return: 任务列表数据
         """
         # 1. 查询任务列表
-        task_data_list, total = await TodoQueryDao.get_my_tasks_list(
-            db, job_number, project_id, dept_id, task_status, page_num, page_size
+        task_data_list, total, next_cursor = await TodoQueryDao.get_my_tasks_list(
+            db, job_number, project_id, dept_id, task_status, page_num, page_size, cursor, with_total
         )
         
         if not task_data_list:
-            return {'total': 0, 'rows': []}
+            return {
+                'total': total,
+                'rows': [],
+                'nextCursor': next_cursor
+            }
         
         # 2. 获取项目字典
-        project_dict_list = await DictDataService.query_dict_data_list_services(db, 'sys_task_project')
-        project_dict = {item.dict_value: item.dict_label for item in project_dict_list}
+        project_dict = await DictCacheService.get_label_map('sys_task_project')
         
-        # 3. 获取所有相关的任务ID、阶段ID、员工工号
+        # 3. 获取所有相关的任务ID、阶段ID
         task_ids = [data['todo_task'].task_id for data in task_data_list]
         stage_ids = list(set([data['todo_task'].stage_id for data in task_data_list if data['todo_task'].stage_id]))
-        job_numbers = list(set([data['todo_task'].job_number for data in task_data_list if data['todo_task'].job_number]))
         
         # 4. 查询任务配置
         from module_task.entity.do.proj_task_do import ProjTask
@@ -208,45 +180,17 @@ class TodoQueryService:
             )
             proj_stages_map = {stage.stage_id: stage for stage in proj_stages.scalars().all()}
         
-        # 6. 查询员工和部门信息
-        employees_map = {}
-        depts_map = {}
-        second_level_depts_map = {}
+        # 6. 获取组织架构索引（员工、部门、第二级部门均从进程内索引读取）
+        org_index = await OrgIndexService.get_index()
         
-        if job_numbers:
-            employees = await db.execute(
-                select(OaEmployeePrimary)
-                .where(OaEmployeePrimary.job_number.in_(job_numbers))
-            )
-            employees_list = list(employees.scalars().all())
-            employees_map = {emp.job_number: emp for emp in employees_list}
-            
-            org_ids = list(set([emp.organization_id for emp in employees_list if emp.organization_id]))
-            if org_ids:
-                depts = await db.execute(
-                    select(OaDepartment)
-                    .where(OaDepartment.id.in_(org_ids))
-                )
-                depts_list = list(depts.scalars().all())
-                depts_map = {dept.id: dept for dept in depts_list}
-                
-                # 获取第二级部门
-                second_level_codes = set()
-                for dept in depts_list:
-                    if dept.code:
-                        second_level_code = DeptUtil.get_second_level_dept_code(dept.code)
-                        if second_level_code:
-                            second_level_codes.add(second_level_code)
-                
-                if second_level_codes:
-                    second_level_depts = await db.execute(
-                        select(OaDepartment)
-                        .where(OaDepartment.code.in_(list(second_level_codes)))
-                    )
-                    second_level_depts_list = list(second_level_depts.scalars().all())
-                    second_level_depts_map = {dept.code: dept for dept in second_level_depts_list}
+        # 7. 批量查询驳回任务的最新申请单及其最近一次驳回日志
+        rejected_task_ids = [data['todo_task'].id for data in task_data_list if data['todo_task'].task_status == 4]
+        rejected_applies_map = await TodoTaskApplyDao.get_latest_applies_by_task_ids(db, rejected_task_ids)
+        reject_logs_map = await ApprovalLogDao.get_latest_reject_logs_by_apply_ids(
+            db, [task_apply.apply_id for task_apply in rejected_applies_map.values()]
+        )
         
-        # 7. 构建返回数据
+        # 8. 构建返回数据
         rows = []
         status_names = {1: '待提交', 2: '审批中', 4: '驳回'}
         
@@ -255,13 +199,8 @@ class TodoQueryService:
             proj_task = proj_tasks_map.get(todo_task.task_id)
             
             # 获取员工和部门信息
-            employee = employees_map.get(todo_task.job_number) if todo_task.job_number else None
-            dept = depts_map.get(employee.organization_id) if employee and employee.organization_id else None
-            second_level_dept = None
-            if dept and dept.code:
-                second_level_code = DeptUtil.get_second_level_dept_code(dept.code)
-                if second_level_code:
-                    second_level_dept = second_level_depts_map.get(second_level_code)
+            employee = org_index.get_employee(todo_task.job_number)
+            second_level_dept = org_index.get_second_level_dept(employee.organization_id) if employee else None
             
             # 获取阶段信息
             proj_stage = proj_stages_map.get(todo_task.stage_id) if todo_task.stage_id else None
@@ -305,16 +244,11 @@ class TodoQueryService:
             
             # 如果是驳回状态，添加驳回时间
             if todo_task.task_status == 4:
-                # 查询驳回的审批日志
                 reject_time = None
-                task_apply = await TodoTaskApplyDao.get_latest_apply_by_task_id(db, todo_task.id)
-                if task_apply:
-                    apply_id = task_apply.apply_id
-                    logs = await ApprovalLogDao.get_logs_by_apply_id(db, apply_id)
-                    for log in logs:
-                        if log.approval_result == 2:  # 驳回
-                            reject_time = log.approval_end_time.strftime('%Y-%m-%d %H:%M:%S') if log.approval_end_time else None
-                            break
+                task_apply = rejected_applies_map.get(todo_task.id)
+                reject_log = reject_logs_map.get(task_apply.apply_id) if task_apply else None
+                if reject_log and reject_log.approval_end_time:
+                    reject_time = reject_log.approval_end_time.strftime('%Y-%m-%d %H:%M:%S')
                 row['rejectTime'] = reject_time
             else:
                 row['rejectTime'] = None
@@ -323,10 +257,12 @@ class TodoQueryService:
         
         return {
             'total': total,
-            'rows': rows
+            'rows': rows,
+            'nextCursor': next_cursor
         }
     
     @classmethod
+    @traced()
     async def get_completed_tasks_list(
         cls,
         db: AsyncSession,
@@ -334,7 +270,9 @@ class TodoQueryService:
         project_id: Optional[int] = None,
         dept_id: Optional[int] = None,
         page_num: int = 1,
-        page_size: int = 10
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+        with_total: bool = False
     ) -> Dict[str, Any]:
         """
         获取已完成任务列表（历史任务）
@@ -345,24 +283,28 @@ class TodoQueryService:
         :param dept_id: 部门ID（可选，第二级部门ID）
         :param page_num: 页码
         :param page_size: 每页数量
+        :param cursor: 游标（不为None时使用游标分页，空字符串表示第一页）
+        :param with_total: 游标分页时是否返回总数
         :return: 任务列表数据
         """
         # 1. 查询任务列表
-        task_data_list, total = await TodoQueryDao.get_completed_tasks_list(
-            db, job_number, project_id, dept_id, page_num, page_size
+        task_data_list, total, next_cursor = await TodoQueryDao.get_completed_tasks_list(
+            db, job_number, project_id, dept_id, page_num, page_size, cursor, with_total
         )
         
         if not task_data_list:
-            return {'total': 0, 'rows': []}
+            return {
+                'total': total,
+                'rows': [],
+                'nextCursor': next_cursor
+            }
         
         # 2. 获取项目字典
-        project_dict_list = await DictDataService.query_dict_data_list_services(db, 'sys_task_project')
-        project_dict = {item.dict_value: item.dict_label for item in project_dict_list}
+        project_dict = await DictCacheService.get_label_map('sys_task_project')
         
-        # 3. 获取所有相关的任务ID、阶段ID、员工工号
+        # 3. 获取所有相关的任务ID、阶段ID
         task_ids = [data['todo_task'].task_id for data in task_data_list]
         stage_ids = list(set([data['todo_task'].stage_id for data in task_data_list if data['todo_task'].stage_id]))
-        job_numbers = list(set([data['todo_task'].job_number for data in task_data_list if data['todo_task'].job_number]))
         
         # 4. 查询任务配置
         from module_task.entity.do.proj_task_do import ProjTask
@@ -380,45 +322,15 @@ class TodoQueryService:
             )
             proj_stages_map = {stage.stage_id: stage for stage in proj_stages.scalars().all()}
         
-        # 6. 查询员工和部门信息
-        employees_map = {}
-        depts_map = {}
-        second_level_depts_map = {}
+        # 6. 获取组织架构索引（员工、部门、第二级部门均从进程内索引读取）
+        org_index = await OrgIndexService.get_index()
         
-        if job_numbers:
-            employees = await db.execute(
-                select(OaEmployeePrimary)
-                .where(OaEmployeePrimary.job_number.in_(job_numbers))
-            )
-            employees_list = list(employees.scalars().all())
-            employees_map = {emp.job_number: emp for emp in employees_list}
-            
-            org_ids = list(set([emp.organization_id for emp in employees_list if emp.organization_id]))
-            if org_ids:
-                depts = await db.execute(
-                    select(OaDepartment)
-                    .where(OaDepartment.id.in_(org_ids))
-                )
-                depts_list = list(depts.scalars().all())
-                depts_map = {dept.id: dept for dept in depts_list}
-                
-                # 获取第二级部门
-                second_level_codes = set()
-                for dept in depts_list:
-                    if dept.code:
-                        second_level_code = DeptUtil.get_second_level_dept_code(dept.code)
-                        if second_level_code:
-                            second_level_codes.add(second_level_code)
-                
-                if second_level_codes:
-                    second_level_depts = await db.execute(
-                        select(OaDepartment)
-                        .where(OaDepartment.code.in_(list(second_level_codes)))
-                    )
-                    second_level_depts_list = list(second_level_depts.scalars().all())
-                    second_level_depts_map = {dept.code: dept for dept in second_level_depts_list}
+        # 7. 批量查询每个任务最新的申请单
+        latest_applies_map = await TodoTaskApplyDao.get_latest_applies_by_task_ids(
+            db, [data['todo_task'].id for data in task_data_list]
+        )
         
-        # 7. 构建返回数据
+        # 8. 构建返回数据
         rows = []
         status_names = {3: '完成'}
         
@@ -427,13 +339,8 @@ class TodoQueryService:
             proj_task = proj_tasks_map.get(todo_task.task_id)
             
             # 获取员工和部门信息
-            employee = employees_map.get(todo_task.job_number) if todo_task.job_number else None
-            dept = depts_map.get(employee.organization_id) if employee and employee.organization_id else None
-            second_level_dept = None
-            if dept and dept.code:
-                second_level_code = DeptUtil.get_second_level_dept_code(dept.code)
-                if second_level_code:
-                    second_level_dept = second_level_depts_map.get(second_level_code)
+            employee = org_index.get_employee(todo_task.job_number)
+            second_level_dept = org_index.get_second_level_dept(employee.organization_id) if employee else None
             
             # 获取阶段信息
             proj_stage = proj_stages_map.get(todo_task.stage_id) if todo_task.stage_id else None
@@ -452,10 +359,8 @@ class TodoQueryService:
             icon_color = '#67C23A'  # 绿色
             
             # 查询申请单号（无论任务状态如何，都查询最新的申请单）
-            apply_id = None
-            task_apply = await TodoTaskApplyDao.get_latest_apply_by_task_id(db, todo_task.id)
-            if task_apply:
-                apply_id = task_apply.apply_id
+            task_apply = latest_applies_map.get(todo_task.id)
+            apply_id = task_apply.apply_id if task_apply else None
             
             row = {
                 'taskId': todo_task.task_id,
@@ -481,10 +386,12 @@ class TodoQueryService:
         
         return {
             'total': total,
-            'rows': rows
+            'rows': rows,
+            'nextCursor': next_cursor
         }
     
     @classmethod
+    @traced()
     async def get_completed_tasks_categories(
         cls,
         db: AsyncSession,
@@ -501,50 +408,10 @@ class TodoQueryService:
         tasks = await TodoQueryDao.get_completed_tasks_for_categories(db, job_number)
         
         # 2. 获取项目字典
-        project_dict_list = await DictDataService.query_dict_data_list_services(db, 'sys_task_project')
-        project_dict = {item.dict_value: item.dict_label for item in project_dict_list}
+        project_dict = await DictCacheService.get_label_map('sys_task_project')
         
-        # 3. 获取所有相关的员工和部门信息
-        job_numbers = list(set([task.job_number for task in tasks if task.job_number]))
-        employees_map = {}
-        depts_map = {}
-        second_level_depts_map = {}
-        
-        if job_numbers:
-            # 查询员工信息
-            employees = await db.execute(
-                select(OaEmployeePrimary)
-                .where(OaEmployeePrimary.job_number.in_(job_numbers))
-            )
-            employees_list = list(employees.scalars().all())
-            employees_map = {emp.job_number: emp for emp in employees_list}
-            
-            # 查询部门信息
-            org_ids = list(set([emp.organization_id for emp in employees_list if emp.organization_id]))
-            if org_ids:
-                depts = await db.execute(
-                    select(OaDepartment)
-                    .where(OaDepartment.id.in_(org_ids))
-                )
-                depts_list = list(depts.scalars().all())
-                depts_map = {dept.id: dept for dept in depts_list}
-                
-                # 获取所有第二级部门code
-                second_level_codes = set()
-                for dept in depts_list:
-                    if dept.code:
-                        second_level_code = DeptUtil.get_second_level_dept_code(dept.code)
-                        if second_level_code:
-                            second_level_codes.add(second_level_code)
-                
-                # 查询第二级部门
-                if second_level_codes:
-                    second_level_depts = await db.execute(
-                        select(OaDepartment)
-                        .where(OaDepartment.code.in_(list(second_level_codes)))
-                    )
-                    second_level_depts_list = list(second_level_depts.scalars().all())
-                    second_level_depts_map = {dept.code: dept for dept in second_level_depts_list}
+        # 3. 获取组织架构索引（员工、部门、第二级部门均从进程内索引读取）
+        org_index = await OrgIndexService.get_index()
         
         # 4. 统计项目分类
         project_stats = {}
@@ -561,20 +428,7 @@ class TodoQueryService:
         # 5. 统计部门分类（第二级部门）
         dept_stats = {}
         for task in tasks:
-            employee = employees_map.get(task.job_number)
-            if not employee or not employee.organization_id:
-                continue
-            
-            dept = depts_map.get(employee.organization_id)
-            if not dept or not dept.code:
-                continue
-            
-            # 获取第二级部门code
-            second_level_code = DeptUtil.get_second_level_dept_code(dept.code)
-            if not second_level_code:
-                continue
-            
-            second_level_dept = second_level_depts_map.get(second_level_code)
+            second_level_dept = org_index.get_employee_second_level_dept(task.job_number)
             if not second_level_dept:
                 continue
             
@@ -617,6 +471,7 @@ class TodoQueryService:
         }
     
     @classmethod
+    @traced()
     async def get_task_detail(
         cls,
         db: AsyncSession,
@@ -642,10 +497,10 @@ class TodoQueryService:
         employee = task_data['employee']
         dept = task_data['dept']
         second_level_dept = task_data['second_level_dept']
+        org_index = await OrgIndexService.get_index()
         
-        # 2. 获取项目名称
-        project_dict_list = await DictDataService.query_dict_data_list_services(db, 'sys_task_project')
-        project_dict = {item.dict_value: item.dict_label for item in project_dict_list}
+        # 2. 获取项目名称（关联任务、未生成任务同样使用该字典）
+        project_dict = await DictCacheService.get_label_map('sys_task_project')
         project_name = project_dict.get(str(todo_task.project_id), f'项目{todo_task.project_id}')
         
         # 3. 构建任务基本信息
@@ -677,67 +532,34 @@ class TodoQueryService:
             except (json.JSONDecodeError, TypeError):
                 approval_nodes = []
         
+        # 查询任务的全部申请单（按提交时间倒序，第一条为最新申请单），并一次性获取所有申请单的审批时间线
+        task_applies = await TodoTaskApplyDao.get_all_applies_by_task_id(db, todo_task.id)
+        latest_task_apply = task_applies[0] if task_applies else None
+        timelines = await ApprovalTimelineService.get_timelines(db, [task_apply.apply_id for task_apply in task_applies])
+        
         if approval_nodes:
-            # 查询编制信息（用于审批节点显示）
-            dept_ids = list(set(approval_nodes))
-            approval_depts = {}
-            if dept_ids:
-                dept_result = await db.execute(
-                    select(OaDepartment).where(OaDepartment.id.in_(dept_ids))
-                )
-                depts_list = list(dept_result.scalars().all())
-                approval_depts = {dept.id: dept for dept in depts_list}
+            # 编制及岗位信息从组织架构索引读取（用于审批节点显示）
+            approval_depts = {dept_id: org_index.get_dept(dept_id) for dept_id in set(approval_nodes)}
+            ranks = {
+                dept.rank_id: org_index.get_rank(dept.rank_id)
+                for dept in approval_depts.values() if dept and dept.rank_id
+            }
             
-            # 查询每个编制对应的岗位信息（通过 rank_id）
-            rank_ids = list(set([dept.rank_id for dept in approval_depts.values() if dept.rank_id]))
-            ranks = {}
-            if rank_ids:
-                from module_admin.entity.do.oa_rank_do import OaRank
-                rank_result = await db.execute(
-                    select(OaRank).where(OaRank.id.in_(rank_ids))
-                )
-                ranks_list = list(rank_result.scalars().all())
-                ranks = {rank.id: rank for rank in ranks_list}
-                    
-            # 批量查询所有审批节点对应的审批人（用于pending状态显示）
-            pending_approvers_map = {}  # key: dept_id, value: employee
-            if dept_ids:
-                pending_approvers = await db.execute(
-                    select(OaEmployeePrimary)
-                    .where(OaEmployeePrimary.organization_id.in_(dept_ids))
-                )
-                pending_approvers_list = list(pending_approvers.scalars().all())
-                pending_approvers_map = {emp.organization_id: emp for emp in pending_approvers_list}
+            # 每个审批节点对应的审批人（编制下第一个启用的员工，用于pending状态显示）
+            pending_approvers_map = {dept_id: org_index.get_post_approver(dept_id) for dept_id in approval_depts}
             
             # 如果任务已提交，查询审批状态（已审批节点、当前审批节点、审批日志）
             approved_nodes = []
             current_approval_node = None
-            logs_map = {}  # key: approval_node, value: log
+            current_timeline = None
             apply_id = None
             
-            if todo_task.task_status in [2, 3, 4]:  # 已提交、完成、驳回
-                # 查询任务申请详情
-                task_apply = await TodoTaskApplyDao.get_latest_apply_by_task_id(db, todo_task.id)
-                if task_apply:
-                    apply_id = task_apply.apply_id
-                    
-                    # 查询审批规则（获取已审批节点和当前审批节点）
-                    rules = await ApprovalService.get_approval_rules(db, apply_id)
-                    if rules:
-                        if rules.approved_nodes:
-                            try:
-                                approved_nodes = json.loads(rules.approved_nodes) if isinstance(rules.approved_nodes, str) else rules.approved_nodes
-                            except (json.JSONDecodeError, TypeError):
-                                approved_nodes = []
-                        
-                        current_approval_node = rules.current_approval_node
-                        
-                        # 查询审批日志
-                        logs = await ApprovalLogDao.get_logs_by_apply_id(db, apply_id)
-                        for log in logs:
-                            if log.approval_node not in logs_map:
-                                logs_map[log.approval_node] = []
-                            logs_map[log.approval_node].append(log)
+            if todo_task.task_status in [2, 3, 4] and latest_task_apply:  # 已提交、完成、驳回
+                apply_id = latest_task_apply.apply_id
+                current_timeline = timelines.get(apply_id)
+                if current_timeline:
+                    approved_nodes = current_timeline.approved_nodes
+                    current_approval_node = current_timeline.current_approval_node
             
             # 构建审批节点列表
             approval_nodes_list = []
@@ -755,29 +577,16 @@ class TodoQueryService:
                 
                 # 判断节点状态
                 # 首先检查是否有审批日志（包括同意和驳回）
-                node_logs = logs_map.get(dept_id, [])
-                reject_log = None
-                approve_log = None
-                
-                for log in node_logs:
-                    if log.approval_result == 2:  # 驳回
-                        reject_log = log
-                        break
-                    elif log.approval_result == 1:  # 同意
-                        if not approve_log:  # 只取第一个同意的日志
-                            approve_log = log
+                reject_log, approve_log = (
+                    current_timeline.get_node_result_logs(dept_id) if current_timeline else (None, None)
+                )
                 
                 # 如果节点在已审批列表中，且有审批日志
                 if todo_task.task_status in [2, 3, 4] and dept_id in approved_nodes:
                     if reject_log:
                         # 被驳回（优先显示驳回信息）
                         status = 'rejected'
-                        # 查询驳回人信息
-                        rejecter_employee = await db.execute(
-                            select(OaEmployeePrimary)
-                            .where(OaEmployeePrimary.job_number == reject_log.approver_id)
-                        )
-                        rejecter_employee = rejecter_employee.scalar_one_or_none()
+                        rejecter_employee = org_index.get_employee(reject_log.approver_id)
                         
                         approval_nodes_list.append({
                             'nodeIndex': index,
@@ -792,12 +601,7 @@ class TodoQueryService:
                     elif approve_log:
                         # 已审批（同意）
                         status = 'approved'
-                        # 查询审批人信息
-                        approver_employee = await db.execute(
-                            select(OaEmployeePrimary)
-                            .where(OaEmployeePrimary.job_number == approve_log.approver_id)
-                        )
-                        approver_employee = approver_employee.scalar_one_or_none()
+                        approver_employee = org_index.get_employee(approve_log.approver_id)
                         
                         approval_nodes_list.append({
                             'nodeIndex': index,
@@ -826,15 +630,7 @@ class TodoQueryService:
                     # 审批中（任务已提交且该节点是当前审批节点）
                     status = 'approving'
                     current_node_index = index
-                    
-                    # 获取当前审批人（优先从批量查询的map中获取，如果没有则查询）
                     current_approver = pending_approvers_map.get(dept_id)
-                    if not current_approver:
-                        current_approver_result = await db.execute(
-                            select(OaEmployeePrimary)
-                            .where(OaEmployeePrimary.organization_id == dept_id)
-                        )
-                        current_approver = current_approver_result.scalar_one_or_none()
                     
                     approval_nodes_list.append({
                         'nodeIndex': index,
@@ -850,7 +646,7 @@ class TodoQueryService:
                     # 待审批（任务未提交，或任务已提交但该节点还未审批）
                     status = 'pending'
                     
-                    # 获取该编制对应的审批人（从批量查询的map中获取，即使任务未提交，也要显示将来谁会审批）
+                    # 获取该编制对应的审批人（即使任务未提交，也要显示将来谁会审批）
                     pending_approver = pending_approvers_map.get(dept_id)
                     
                     approval_nodes_list.append({
@@ -924,56 +720,11 @@ class TodoQueryService:
                     related_proj_stages_list = list(related_proj_stages.scalars().all())
                     related_proj_stages_map = {stage.stage_id: stage for stage in related_proj_stages_list}
                 
-                # 获取所有相关的员工工号
-                related_job_numbers = list(set([task.job_number for task in related_todo_tasks_list if task.job_number]))
-                related_employees_map = {}
-                related_depts_map = {}
-                related_second_level_depts_map = {}
-                
-                if related_job_numbers:
-                    related_employees = await db.execute(
-                        select(OaEmployeePrimary)
-                        .where(OaEmployeePrimary.job_number.in_(related_job_numbers))
-                    )
-                    related_employees_list = list(related_employees.scalars().all())
-                    related_employees_map = {emp.job_number: emp for emp in related_employees_list}
-                    
-                    # 查询部门信息
-                    related_org_ids = list(set([emp.organization_id for emp in related_employees_list if emp.organization_id]))
-                    if related_org_ids:
-                        related_depts = await db.execute(
-                            select(OaDepartment)
-                            .where(OaDepartment.id.in_(related_org_ids))
-                        )
-                        related_depts_list = list(related_depts.scalars().all())
-                        related_depts_map = {dept.id: dept for dept in related_depts_list}
-                        
-                        # 获取第二级部门
-                        related_second_level_codes = set()
-                        for dept in related_depts_list:
-                            if dept.code:
-                                second_level_code = DeptUtil.get_second_level_dept_code(dept.code)
-                                if second_level_code:
-                                    related_second_level_codes.add(second_level_code)
-                        
-                        if related_second_level_codes:
-                            related_second_level_depts = await db.execute(
-                                select(OaDepartment)
-                                .where(OaDepartment.code.in_(list(related_second_level_codes)))
-                            )
-                            related_second_level_depts_list = list(related_second_level_depts.scalars().all())
-                            related_second_level_depts_map = {dept.code: dept for dept in related_second_level_depts_list}
-                
                 # 为每个已生成的相关任务构建完整信息
                 for related_todo_task in related_todo_tasks_list:
                     related_proj_task = related_proj_tasks_map.get(related_todo_task.task_id)
-                    related_employee = related_employees_map.get(related_todo_task.job_number) if related_todo_task.job_number else None
-                    related_dept = related_depts_map.get(related_employee.organization_id) if related_employee and related_employee.organization_id else None
-                    related_second_level_dept = None
-                    if related_dept and related_dept.code:
-                        second_level_code = DeptUtil.get_second_level_dept_code(related_dept.code)
-                        if second_level_code:
-                            related_second_level_dept = related_second_level_depts_map.get(second_level_code)
+                    related_employee = org_index.get_employee(related_todo_task.job_number)
+                    related_second_level_dept = org_index.get_second_level_dept(related_employee.organization_id) if related_employee else None
                     
                     related_proj_stage = related_proj_stages_map.get(related_todo_task.stage_id) if related_todo_task.stage_id else None
                     related_project_name = project_dict.get(str(related_todo_task.project_id), f'项目{related_todo_task.project_id}')
@@ -1015,9 +766,8 @@ class TodoQueryService:
                     )
                     ungenerated_proj_tasks_list = list(ungenerated_proj_tasks.scalars().all())
                     
-                    # 获取未生成任务的阶段ID和员工工号
+                    # 获取未生成任务的阶段ID
                     ungenerated_stage_ids = list(set([task.stage_id for task in ungenerated_proj_tasks_list if task.stage_id]))
-                    ungenerated_job_numbers = list(set([task.job_number for task in ungenerated_proj_tasks_list if task.job_number]))
                     
                     # 查询未生成任务的阶段信息
                     ungenerated_proj_stages_map = {}
@@ -1028,53 +778,10 @@ class TodoQueryService:
                         ungenerated_proj_stages_list = list(ungenerated_proj_stages.scalars().all())
                         ungenerated_proj_stages_map = {stage.stage_id: stage for stage in ungenerated_proj_stages_list}
                     
-                    # 查询未生成任务的员工和部门信息
-                    ungenerated_employees_map = {}
-                    ungenerated_depts_map = {}
-                    ungenerated_second_level_depts_map = {}
-                    
-                    if ungenerated_job_numbers:
-                        ungenerated_employees = await db.execute(
-                            select(OaEmployeePrimary)
-                            .where(OaEmployeePrimary.job_number.in_(ungenerated_job_numbers))
-                        )
-                        ungenerated_employees_list = list(ungenerated_employees.scalars().all())
-                        ungenerated_employees_map = {emp.job_number: emp for emp in ungenerated_employees_list}
-                        
-                        ungenerated_org_ids = list(set([emp.organization_id for emp in ungenerated_employees_list if emp.organization_id]))
-                        if ungenerated_org_ids:
-                            ungenerated_depts = await db.execute(
-                                select(OaDepartment)
-                                .where(OaDepartment.id.in_(ungenerated_org_ids))
-                            )
-                            ungenerated_depts_list = list(ungenerated_depts.scalars().all())
-                            ungenerated_depts_map = {dept.id: dept for dept in ungenerated_depts_list}
-                            
-                            # 获取第二级部门
-                            ungenerated_second_level_codes = set()
-                            for dept in ungenerated_depts_list:
-                                if dept.code:
-                                    second_level_code = DeptUtil.get_second_level_dept_code(dept.code)
-                                    if second_level_code:
-                                        ungenerated_second_level_codes.add(second_level_code)
-                            
-                            if ungenerated_second_level_codes:
-                                ungenerated_second_level_depts = await db.execute(
-                                    select(OaDepartment)
-                                    .where(OaDepartment.code.in_(list(ungenerated_second_level_codes)))
-                                )
-                                ungenerated_second_level_depts_list = list(ungenerated_second_level_depts.scalars().all())
-                                ungenerated_second_level_depts_map = {dept.code: dept for dept in ungenerated_second_level_depts_list}
-                    
                     # 为每个未生成的任务构建完整信息
                     for ungenerated_proj_task in ungenerated_proj_tasks_list:
-                        ungenerated_employee = ungenerated_employees_map.get(ungenerated_proj_task.job_number) if ungenerated_proj_task.job_number else None
-                        ungenerated_dept = ungenerated_depts_map.get(ungenerated_employee.organization_id) if ungenerated_employee and ungenerated_employee.organization_id else None
-                        ungenerated_second_level_dept = None
-                        if ungenerated_dept and ungenerated_dept.code:
-                            second_level_code = DeptUtil.get_second_level_dept_code(ungenerated_dept.code)
-                            if second_level_code:
-                                ungenerated_second_level_dept = ungenerated_second_level_depts_map.get(second_level_code)
+                        ungenerated_employee = org_index.get_employee(ungenerated_proj_task.job_number)
+                        ungenerated_second_level_dept = org_index.get_second_level_dept(ungenerated_employee.organization_id) if ungenerated_employee else None
                         
                         ungenerated_proj_stage = ungenerated_proj_stages_map.get(ungenerated_proj_task.stage_id) if ungenerated_proj_task.stage_id else None
                         ungenerated_project_name = project_dict.get(str(ungenerated_proj_task.project_id), f'项目{ungenerated_proj_task.project_id}')
@@ -1152,45 +859,27 @@ class TodoQueryService:
         
         # 7. 获取提交内容
         submit_content = None
-        if todo_task.task_status in [2, 3, 4]:  # 已提交、完成、驳回
-            task_apply = await TodoTaskApplyDao.get_latest_apply_by_task_id(db, todo_task.id)
-            if task_apply:
-                submit_images = []
-                if task_apply.submit_images:
-                    try:
-                        submit_images = json.loads(task_apply.submit_images) if isinstance(task_apply.submit_images, str) else task_apply.submit_images
-                    except (json.JSONDecodeError, TypeError):
-                        submit_images = []
-                
-                submit_content = {
-                    'submitText': task_apply.submit_text,
-                    'submitImages': submit_images,
-                    'submitTime': task_apply.submit_time.strftime('%Y-%m-%d %H:%M:%S') if task_apply.submit_time else None,
-                }
+        if todo_task.task_status in [2, 3, 4] and latest_task_apply:  # 已提交、完成、驳回
+            submit_images = []
+            if latest_task_apply.submit_images:
+                try:
+                    submit_images = json.loads(latest_task_apply.submit_images) if isinstance(latest_task_apply.submit_images, str) else latest_task_apply.submit_images
+                except (json.JSONDecodeError, TypeError):
+                    submit_images = []
+            
+            submit_content = {
+                'submitText': latest_task_apply.submit_text,
+                'submitImages': submit_images,
+                'submitTime': latest_task_apply.submit_time.strftime('%Y-%m-%d %H:%M:%S') if latest_task_apply.submit_time else None,
+            }
         
         # 8. 获取驳回信息（无论任务状态如何，只要申请单状态为驳回，就查询驳回信息）
         reject_info = None
-        # 查询任务申请详情
-        task_apply = await TodoTaskApplyDao.get_latest_apply_by_task_id(db, todo_task.id)
-        if task_apply:
-            apply_id_for_reject = task_apply.apply_id
-            # 查询申请单状态
-            from module_apply.entity.do.apply_primary_do import ApplyPrimary
-            apply_primary_result = await db.execute(
-                select(ApplyPrimary).where(ApplyPrimary.apply_id == apply_id_for_reject)
-            )
-            apply_primary = apply_primary_result.scalar_one_or_none()
-            
+        latest_timeline = timelines.get(latest_task_apply.apply_id) if latest_task_apply else None
+        if latest_timeline:
             # 如果申请单状态为驳回（2），或者任务状态为驳回（4），都查询驳回信息
-            if (apply_primary and apply_primary.apply_status == 2) or todo_task.task_status == 4:
-                # 查询驳回的审批日志
-                logs = await ApprovalLogDao.get_logs_by_apply_id(db, apply_id_for_reject)
-                reject_log = None
-                for log in logs:
-                    if log.approval_result == 2:  # 驳回
-                        reject_log = log
-                        break
-                
+            if latest_timeline.apply_status == 2 or todo_task.task_status == 4:
+                reject_log = latest_timeline.get_latest_reject_log()
                 if reject_log:
                     reject_info = {
                         'rejectTime': reject_log.approval_end_time.strftime('%Y-%m-%d %H:%M:%S') if reject_log.approval_end_time else None,
@@ -1205,17 +894,11 @@ class TodoQueryService:
         # 判断是否可以审批
         if todo_task.task_status == 2 and approval_flow:
             # 查询当前审批节点（编制ID）
-            rules = await ApprovalService.get_approval_rules(db, approval_flow['applyId'])
-            if rules and rules.current_approval_node:
-                # 查询当前用户的编制ID
-                current_user_employee = await db.execute(
-                    select(OaEmployeePrimary)
-                    .where(OaEmployeePrimary.job_number == current_user_job_number)
-                )
-                current_user_employee = current_user_employee.scalar_one_or_none()
-                
+            current_flow_timeline = timelines.get(approval_flow['applyId']) if approval_flow['applyId'] else None
+            if current_flow_timeline and current_flow_timeline.current_approval_node:
                 # 当前用户的编制ID == 当前审批节点的编制ID
-                if current_user_employee and current_user_employee.organization_id == rules.current_approval_node:
+                current_user_employee = org_index.get_employee(current_user_job_number)
+                if current_user_employee and current_user_employee.organization_id == current_flow_timeline.current_approval_node:
                     can_approve = True
         
         # 10. 构建历史审批数据
@@ -1224,38 +907,22 @@ class TodoQueryService:
             # 获取当前申请单ID（如果有）
             current_apply_id = approval_flow.get('applyId') if approval_flow else None
             
-            # 查询所有历史申请单（排除当前申请单，按提交时间倒序）
-            history_applies = await TodoTaskApplyDao.get_all_applies_by_task_id(
-                db, todo_task.id, exclude_apply_id=current_apply_id
-            )
+            # 所有历史申请单（排除当前申请单，按提交时间倒序）
+            history_applies = [task_apply for task_apply in task_applies if task_apply.apply_id != current_apply_id]
             
-            # 批量查询编制和岗位信息（复用之前查询的结果）
-            # approval_depts, ranks, pending_approvers_map 已经在前面查询过了
+            # 编制、岗位及审批人信息复用前面的结果（approval_depts, ranks, pending_approvers_map）
             
             # 对于每个历史申请单，构建审批流程
             for history_apply in history_applies:
                 history_apply_id = history_apply.apply_id
                 
-                # 查询审批规则
-                history_rules = await ApprovalService.get_approval_rules(db, history_apply_id)
-                if not history_rules:
+                # 审批规则及审批日志来自预取的审批时间线
+                history_timeline = timelines.get(history_apply_id)
+                if not history_timeline:
                     continue
                 
                 # 获取已审批节点
-                history_approved_nodes = []
-                if history_rules.approved_nodes:
-                    try:
-                        history_approved_nodes = json.loads(history_rules.approved_nodes) if isinstance(history_rules.approved_nodes, str) else history_rules.approved_nodes
-                    except (json.JSONDecodeError, TypeError):
-                        history_approved_nodes = []
-                
-                # 查询审批日志
-                history_logs = await ApprovalLogDao.get_logs_by_apply_id(db, history_apply_id)
-                history_logs_map = {}  # key: approval_node, value: log
-                for log in history_logs:
-                    if log.approval_node not in history_logs_map:
-                        history_logs_map[log.approval_node] = []
-                    history_logs_map[log.approval_node].append(log)
+                history_approved_nodes = history_timeline.approved_nodes
                 
                 # 构建历史审批节点列表
                 history_approval_nodes_list = []
@@ -1271,17 +938,7 @@ class TodoQueryService:
                         post_name = f'编制{dept_id}'
                     
                     # 历史审批一定是结束的，所以节点状态只能是 approved 或 rejected
-                    node_logs = history_logs_map.get(dept_id, [])
-                    reject_log = None
-                    approve_log = None
-                    
-                    for log in node_logs:
-                        if log.approval_result == 2:  # 驳回
-                            reject_log = log
-                            break
-                        elif log.approval_result == 1:  # 同意
-                            if not approve_log:  # 只取第一个同意的日志
-                                approve_log = log
+                    reject_log, approve_log = history_timeline.get_node_result_logs(dept_id)
                     
                     # 处理审批附件
                     approval_images = []
@@ -1295,11 +952,7 @@ class TodoQueryService:
                     if reject_log:
                         # 被驳回
                         status = 'rejected'
-                        rejecter_employee = await db.execute(
-                            select(OaEmployeePrimary)
-                            .where(OaEmployeePrimary.job_number == reject_log.approver_id)
-                        )
-                        rejecter_employee = rejecter_employee.scalar_one_or_none()
+                        rejecter_employee = org_index.get_employee(reject_log.approver_id)
                         
                         history_approval_nodes_list.append({
                             'nodeIndex': index,
@@ -1315,11 +968,7 @@ class TodoQueryService:
                     elif approve_log:
                         # 已审批（同意）
                         status = 'approved'
-                        approver_employee = await db.execute(
-                            select(OaEmployeePrimary)
-                            .where(OaEmployeePrimary.job_number == approve_log.approver_id)
-                        )
-                        approver_employee = approver_employee.scalar_one_or_none()
+                        approver_employee = org_index.get_employee(approve_log.approver_id)
                         
                         history_approval_nodes_list.append({
                             'nodeIndex': index,
@@ -1372,36 +1021,16 @@ class TodoQueryService:
                         submit_images = []
                 
                 # 2. 从审批日志中获取提交人（approval_result=0 的日志的 approver_id）
-                submitter_id = None
+                submitter_id = history_timeline.get_submitter_id()
                 submitter_name = None
-                for log in history_logs:
-                    if log.approval_result == 0:  # 申请提交
-                        submitter_id = log.approver_id
-                        # 查询提交人信息
-                        submitter_employee = await db.execute(
-                            select(OaEmployeePrimary)
-                            .where(OaEmployeePrimary.job_number == submitter_id)
-                        )
-                        submitter_employee = submitter_employee.scalar_one_or_none()
-                        submitter_name = submitter_employee.name if submitter_employee else submitter_id
-                        break
+                if submitter_id:
+                    submitter_employee = org_index.get_employee(submitter_id)
+                    submitter_name = submitter_employee.name if submitter_employee else submitter_id
                 
-                # 3. 获取任务ID（todo_task_apply.task_id 是 todo_task 的主键ID，需要转换为 task_id）
-                # 这里需要查询 todo_task 来获取 task_id（业务ID）
-                from module_task.entity.do.todo_task_do import TodoTask
-                history_task_id = None
-                if history_apply.task_id:
-                    history_todo_task = await db.execute(
-                        select(TodoTask).where(TodoTask.id == history_apply.task_id)
-                    )
-                    history_todo_task = history_todo_task.scalar_one_or_none()
-                    if history_todo_task:
-                        history_task_id = history_todo_task.task_id
-                
-                # 构建提交内容
+                # 构建提交内容（历史申请单均按 todo_task.id 查询，task_id 即当前任务的业务ID）
                 submit_content_info = {
                     'applyId': history_apply_id,
-                    'taskId': history_task_id,
+                    'taskId': todo_task.task_id,
                     'submitterId': submitter_id,
                     'submitterName': submitter_name,
                     'submitText': history_apply.submit_text,
@@ -1430,6 +1059,7 @@ class TodoQueryService:
         }
     
     @classmethod
+    @traced()
     async def get_workbench_task_stats(
         cls,
         db: AsyncSession,
@@ -1438,8 +1068,18 @@ class TodoQueryService:
         """
         获取工作台任务统计数据
         
+        1. 待提交：负责人是当前用户，状态为1（进行中）
+        2. 待审批：当前审批节点是当前用户的编制，状态为2（已提交）
+        3. 被驳回：负责人是当前用户，状态为4（驳回）
+        
         :param db: orm对象
         :param job_number: 负责人工号
         :return: 统计数据字典 {pendingSubmit, pendingApprove, rejected}
         """
-        return await TodoQueryDao.get_workbench_task_stats(db, job_number)
+        organization_id = await TodoQueryDao.get_current_organization_id(job_number)
+        owner_entries, node_entries = await WorkbenchCounterService.get_counters(db, job_number, organization_id)
+        return {
+            'pendingSubmit': sum(count for task_status, _, _, count in owner_entries if task_status == 1),
+            'pendingApprove': sum(count for task_status, _, _, count in node_entries if task_status == 2),
+            'rejected': sum(count for task_status, _, _, count in owner_entries if task_status == 4),
+        }
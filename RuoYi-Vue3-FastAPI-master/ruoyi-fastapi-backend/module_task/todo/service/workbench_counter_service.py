@@ -0,0 +1,341 @@
+"""
+工作台任务计数服务
+"""
+import asyncio
+from redis import asyncio as aioredis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from config.database import AsyncSessionLocal
+from config.enums import RedisInitKeyConfig
+from module_apply.service.approval_engine import ApprovalEngine
+from module_task.todo.dao.workbench_counter_dao import WorkbenchCounterDao
+from utils.log_util import logger
+from utils.redis_util import RedisKeyUtil
+
+# 计数条目：(任务状态, 项目ID, 负责人工号, 任务数量)
+CounterEntry = Tuple[int, Optional[int], str, int]
+
+
+class WorkbenchCounterService:
+    """
+    工作台任务计数服务
+
+    在Redis哈希中按负责人工号（待提交、已提交、驳回任务按项目计数）和审批节点（当前审批节点为该编制的任务按项目、
+    负责人计数）维护聚合结果，工作台统计与任务分类统计只读取两个哈希，不再每次轮询都扫描任务表。
+    任务状态变更、任务生成以及审批节点流转时在会话中记录受影响的负责人与审批节点，事务提交成功后按分组聚合
+    重新计算这些键（回滚则丢弃），计数与数据库状态不会因增量累加而漂移；后台定时对账任务全量重建，
+    兜底处理未经过上述入口的数据变更。
+    """
+
+    # 会话info中记录本事务内计数受影响的负责人工号集合
+    OWNER_INFO_KEY = 'workbench_changed_owners'
+
+    # 标记哈希已构建的字段（哈希中没有任何计数时也能区分"计数为0"与"尚未构建"）
+    BUILT_FIELD = '_built'
+
+    # 对账任务执行间隔（秒）
+    RECONCILE_INTERVAL_SECONDS = 600
+
+    _redis: Optional[aioredis.Redis] = None
+    _reconcile_task: Optional[asyncio.Task] = None
+    _refresh_tasks: Set[asyncio.Task] = set()
+    _listening = False
+
+    @classmethod
+    def get_owner_key(cls, job_number: str) -> str:
+        """
+        获取负责人计数哈希的Redis键
+
+        :param job_number: 负责人工号
+        :return: Redis键
+        """
+        return f'{RedisInitKeyConfig.WORKBENCH_COUNTER.key}:owner:{job_number}'
+
+    @classmethod
+    def get_node_key(cls, organization_id: int) -> str:
+        """
+        获取审批节点计数哈希的Redis键
+
+        :param organization_id: 审批节点（编制ID）
+        :return: Redis键
+        """
+        return f'{RedisInitKeyConfig.WORKBENCH_COUNTER.key}:node:{organization_id}'
+
+    @classmethod
+    def get_reconcile_lock_key(cls) -> str:
+        """
+        获取对账任务互斥锁的Redis键（多进程部署时每个周期只由一个进程执行对账）
+
+        :return: Redis键
+        """
+        return f'{RedisInitKeyConfig.WORKBENCH_COUNTER.key}:reconcile_lock'
+
+    @classmethod
+    async def init_workbench_counter(cls, redis: aioredis.Redis):
+        """
+        应用启动时注册事务提交监听并启动对账任务（启动时立即执行一次全量重建）
+
+        :param redis: Redis连接对象
+        :return:
+        """
+        cls._redis = redis
+        if not cls._listening:
+            event.listen(Session, 'after_commit', cls._after_commit)
+            event.listen(Session, 'after_rollback', cls._after_rollback)
+            cls._listening = True
+        if cls._reconcile_task is None or cls._reconcile_task.done():
+            cls._reconcile_task = asyncio.create_task(cls._run_reconcile())
+
+    @classmethod
+    async def close_workbench_counter(cls):
+        """
+        应用关闭时停止对账任务
+
+        :return:
+        """
+        if cls._reconcile_task is not None:
+            cls._reconcile_task.cancel()
+            try:
+                await cls._reconcile_task
+            except asyncio.CancelledError:
+                pass
+            cls._reconcile_task = None
+
+    @classmethod
+    def mark_owners_changed(cls, db: AsyncSession, job_numbers: Iterable[Optional[str]]) -> None:
+        """
+        记录本事务内计数受影响的负责人（事务提交后刷新）
+
+        :param db: orm对象
+        :param job_numbers: 负责人工号列表
+        """
+        changed_owners = db.info.setdefault(cls.OWNER_INFO_KEY, set())
+        changed_owners.update(job_number for job_number in job_numbers if job_number)
+
+    @classmethod
+    async def get_counters(
+        cls,
+        db: AsyncSession,
+        job_number: str,
+        organization_id: Optional[int]
+    ) -> Tuple[List[CounterEntry], List[CounterEntry]]:
+        """
+        获取负责人与审批节点的计数（Redis中尚未构建时查询数据库并回写）
+
+        :param db: orm对象
+        :param job_number: 负责人工号
+        :param organization_id: 当前用户的编制ID（为None时不统计待审批任务）
+        :return: (负责人是当前用户的计数列表, 当前审批节点是当前用户编制的计数列表)
+        """
+        owner_mapping = node_mapping = None
+        if cls._redis is not None:
+            async with cls._redis.pipeline(transaction=False) as pipe:
+                pipe.hgetall(cls.get_owner_key(job_number))
+                if organization_id:
+                    pipe.hgetall(cls.get_node_key(organization_id))
+                results = await pipe.execute()
+            owner_mapping = results[0] if cls.BUILT_FIELD in results[0] else None
+            if organization_id:
+                node_mapping = results[1] if cls.BUILT_FIELD in results[1] else None
+
+        missing_owners = [job_number] if owner_mapping is None else []
+        missing_nodes = [organization_id] if organization_id and node_mapping is None else []
+        if missing_owners or missing_nodes:
+            owner_mappings, node_mappings = await cls._build_mappings(db, missing_owners, missing_nodes)
+            await cls._write_mappings(owner_mappings, node_mappings)
+            if missing_owners:
+                owner_mapping = owner_mappings[job_number]
+            if missing_nodes:
+                node_mapping = node_mappings[organization_id]
+
+        owner_entries = cls._parse_owner_mapping(job_number, owner_mapping)
+        node_entries = cls._parse_node_mapping(node_mapping) if organization_id else []
+        return owner_entries, node_entries
+
+    @classmethod
+    async def refresh(cls, job_numbers: Iterable[str] = (), organization_ids: Iterable[int] = ()) -> None:
+        """
+        重新计算指定负责人与审批节点的计数
+
+        :param job_numbers: 负责人工号列表
+        :param organization_ids: 审批节点（编制ID）列表
+        """
+        job_numbers = list(job_numbers)
+        organization_ids = list(organization_ids)
+        if cls._redis is None or not (job_numbers or organization_ids):
+            return
+        try:
+            async with AsyncSessionLocal() as session:
+                owner_mappings, node_mappings = await cls._build_mappings(session, job_numbers, organization_ids)
+            await cls._write_mappings(owner_mappings, node_mappings)
+        except Exception as e:
+            logger.warning(
+                f'刷新工作台任务计数失败，等待对账任务修正: owners={job_numbers}, nodes={organization_ids}, error={str(e)}'
+            )
+
+    @classmethod
+    async def reconcile(cls) -> bool:
+        """
+        全量重建工作台任务计数（多进程部署时同一周期内只有一个进程执行）
+
+        :return: 是否执行了重建
+        """
+        if cls._redis is None:
+            return False
+        acquired = await cls._redis.set(
+            cls.get_reconcile_lock_key(), '1', nx=True, ex=max(cls.RECONCILE_INTERVAL_SECONDS // 2, 1)
+        )
+        if not acquired:
+            return False
+        async with AsyncSessionLocal() as session:
+            owner_mappings, node_mappings = await cls._build_mappings(session, None, None)
+        # Redis中已有但数据库中已无计数的键同样需要重写为空计数
+        owner_prefix = cls.get_owner_key('')
+        node_prefix = cls.get_node_key('')
+        for key in await RedisKeyUtil.scan_keys(cls._redis, f'{owner_prefix}*'):
+            owner_mappings.setdefault(key[len(owner_prefix):], {cls.BUILT_FIELD: '1'})
+        for key in await RedisKeyUtil.scan_keys(cls._redis, f'{node_prefix}*'):
+            organization_id = key[len(node_prefix):]
+            if organization_id.isdigit():
+                node_mappings.setdefault(int(organization_id), {cls.BUILT_FIELD: '1'})
+        await cls._write_mappings(owner_mappings, node_mappings)
+        logger.info(f'工作台任务计数已重建，负责人{len(owner_mappings)}个，审批节点{len(node_mappings)}个')
+        return True
+
+    @classmethod
+    async def _run_reconcile(cls):
+        """
+        后台任务：定时执行对账
+
+        :return:
+        """
+        while True:
+            try:
+                await cls.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f'工作台任务计数对账失败: {str(e)}', exc_info=True)
+            await asyncio.sleep(cls.RECONCILE_INTERVAL_SECONDS)
+
+    @classmethod
+    async def _build_mappings(
+        cls,
+        db: AsyncSession,
+        job_numbers: Optional[List[str]],
+        organization_ids: Optional[List[int]]
+    ) -> Tuple[Dict[str, Dict], Dict[int, Dict]]:
+        """
+        查询数据库分组聚合结果并构建待写入Redis的哈希内容
+
+        :param db: orm对象
+        :param job_numbers: 负责人工号列表（为None时构建全部负责人）
+        :param organization_ids: 审批节点列表（为None时构建全部审批节点）
+        :return: ({负责人工号: 哈希内容}, {审批节点: 哈希内容})
+        """
+        owner_mappings: Dict = {job_number: {cls.BUILT_FIELD: '1'} for job_number in job_numbers or []}
+        node_mappings: Dict = {organization_id: {cls.BUILT_FIELD: '1'} for organization_id in organization_ids or []}
+        if job_numbers is None or job_numbers:
+            owner_counts = await WorkbenchCounterDao.get_owner_counts(db, job_numbers)
+            for job_number, task_status, project_id, count in owner_counts:
+                mapping = owner_mappings.setdefault(job_number, {cls.BUILT_FIELD: '1'})
+                mapping[f'{task_status}:{project_id}'] = count
+        if organization_ids is None or organization_ids:
+            node_counts = await WorkbenchCounterDao.get_node_counts(db, organization_ids)
+            for organization_id, task_status, project_id, job_number, count in node_counts:
+                mapping = node_mappings.setdefault(organization_id, {cls.BUILT_FIELD: '1'})
+                mapping[f'{task_status}:{project_id}:{job_number}'] = count
+        return owner_mappings, node_mappings
+
+    @classmethod
+    async def _write_mappings(cls, owner_mappings: Dict, node_mappings: Dict) -> None:
+        """
+        整体替换计数哈希（每批在一个事务中先删除再写入，读取方不会看到部分写入的哈希）
+
+        :param owner_mappings: {负责人工号: 哈希内容}
+        :param node_mappings: {审批节点: 哈希内容}
+        """
+        if cls._redis is None:
+            return
+        items = [(cls.get_owner_key(job_number), mapping) for job_number, mapping in owner_mappings.items()]
+        items.extend((cls.get_node_key(organization_id), mapping) for organization_id, mapping in node_mappings.items())
+        for start in range(0, len(items), RedisKeyUtil.BATCH_SIZE):
+            async with cls._redis.pipeline(transaction=True) as pipe:
+                for key, mapping in items[start : start + RedisKeyUtil.BATCH_SIZE]:
+                    pipe.unlink(key)
+                    pipe.hset(key, mapping=mapping)
+                await pipe.execute()
+
+    @classmethod
+    def _parse_owner_mapping(cls, job_number: str, mapping: Dict[str, str]) -> List[CounterEntry]:
+        """
+        解析负责人计数哈希
+
+        :param job_number: 负责人工号
+        :param mapping: 哈希内容（字段为"任务状态:项目ID"）
+        :return: 计数列表
+        """
+        entries = []
+        for field, count in mapping.items():
+            if field == cls.BUILT_FIELD:
+                continue
+            task_status, project_id = str(field).split(':', 1)
+            entries.append((int(task_status), cls._parse_project_id(project_id), job_number, int(count)))
+        return entries
+
+    @classmethod
+    def _parse_node_mapping(cls, mapping: Dict[str, str]) -> List[CounterEntry]:
+        """
+        解析审批节点计数哈希
+
+        :param mapping: 哈希内容（字段为"任务状态:项目ID:负责人工号"）
+        :return: 计数列表
+        """
+        entries = []
+        for field, count in mapping.items():
+            if field == cls.BUILT_FIELD:
+                continue
+            task_status, project_id, job_number = str(field).split(':', 2)
+            entries.append((int(task_status), cls._parse_project_id(project_id), job_number, int(count)))
+        return entries
+
+    @staticmethod
+    def _parse_project_id(value: str) -> Optional[int]:
+        """
+        解析哈希字段中的项目ID
+
+        :param value: 项目ID字符串
+        :return: 项目ID
+        """
+        return int(value) if value.lstrip('-').isdigit() else None
+
+    @classmethod
+    def _after_commit(cls, session: Session) -> None:
+        """
+        事务提交后刷新本事务内受影响的计数（在后台任务中执行，不阻塞请求）
+
+        :param session: 同步会话对象
+        """
+        job_numbers = session.info.pop(cls.OWNER_INFO_KEY, None)
+        organization_ids = session.info.pop(ApprovalEngine.CHANGED_NODES_INFO_KEY, None)
+        if not (job_numbers or organization_ids) or cls._redis is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(cls.refresh(job_numbers or (), organization_ids or ()))
+        cls._refresh_tasks.add(task)
+        task.add_done_callback(cls._refresh_tasks.discard)
+
+    @classmethod
+    def _after_rollback(cls, session: Session) -> None:
+        """
+        事务回滚后丢弃本事务内记录的受影响负责人与审批节点
+
+        :param session: 同步会话对象
+        """
+        session.info.pop(cls.OWNER_INFO_KEY, None)
+        session.info.pop(ApprovalEngine.CHANGED_NODES_INFO_KEY, None)
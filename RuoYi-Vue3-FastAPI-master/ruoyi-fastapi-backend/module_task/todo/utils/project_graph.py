@@ -0,0 +1,328 @@
+"""
+项目任务/阶段依赖图
+一次性加载项目的任务/阶段配置与执行记录，在内存中判断生成条件、阶段时间冲突和阶段完成状态
+"""
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from module_task.configuration.dao.task_dao import TaskDao
+from module_task.configuration.service.validator.task_validator import TaskValidator
+from module_task.todo.dao.todo_stage_dao import TodoStageDao
+from module_task.todo.dao.todo_task_dao import TodoTaskDao
+from utils.log_util import logger
+
+
+class ProjectGraph:
+    """
+    项目依赖图
+
+    前置关系的JSON只解析一次，每个节点维护"未完成前置数量"（Kahn算法的入度），
+    任务/阶段完成时只递减其后继节点的计数，计数为0且未生成的节点即为可生成的边界（frontier）。
+    """
+
+    def __init__(self, project_id: int, proj_tasks: List, proj_stages: List, todo_tasks: List, todo_stages: List):
+        """
+        根据已加载的配置与执行记录构建依赖图
+
+        :param project_id: 项目ID
+        :param proj_tasks: 有效的任务配置列表（ProjTask）
+        :param proj_stages: 有效的阶段配置列表（ProjStage）
+        :param todo_tasks: 任务执行记录列表（TodoTask）
+        :param todo_stages: 阶段执行记录列表（TodoStage）
+        """
+        self.project_id = project_id
+        self.proj_task_map = {task.task_id: task for task in proj_tasks}
+        self.proj_stage_map = {stage.stage_id: stage for stage in proj_stages}
+
+        # 执行记录状态 {task_id: task_status} / {stage_id: stage_status}
+        self.task_status_map: Dict[int, int] = {task.task_id: task.task_status for task in todo_tasks}
+        self.stage_status_map: Dict[int, int] = {stage.stage_id: stage.stage_status for stage in todo_stages}
+
+        # 阶段内已生成的任务 {stage_id: [task_id]}
+        self.stage_task_ids: Dict[int, List[int]] = {}
+        for task in todo_tasks:
+            if task.stage_id is not None:
+                self.stage_task_ids.setdefault(task.stage_id, []).append(task.task_id)
+
+        self.task_predecessors: Dict[int, List[int]] = {}
+        self.task_successors: Dict[int, List[int]] = {}
+        self.pending_task_counts: Dict[int, int] = {}
+        for task_id, proj_task in self.proj_task_map.items():
+            predecessor_ids = self._parse_id_list(proj_task.predecessor_tasks)
+            self.task_predecessors[task_id] = predecessor_ids
+            self.pending_task_counts[task_id] = sum(
+                1 for pred_id in predecessor_ids if self.task_status_map.get(pred_id) != 3  # 3-完成
+            )
+            for pred_id in predecessor_ids:
+                self.task_successors.setdefault(pred_id, []).append(task_id)
+
+        self.stage_predecessors: Dict[int, List[int]] = {}
+        self.stage_successors: Dict[int, List[int]] = {}
+        self.stage_dependents: Dict[int, List[int]] = {}
+        self.pending_stage_counts: Dict[int, int] = {}
+        for stage_id, proj_stage in self.proj_stage_map.items():
+            predecessor_ids = self._parse_id_list(proj_stage.predecessor_stages)
+            self.stage_predecessors[stage_id] = predecessor_ids
+            self.stage_successors[stage_id] = self._parse_id_list(proj_stage.successor_stages)
+            self.pending_stage_counts[stage_id] = sum(
+                1 for pred_id in predecessor_ids if self.stage_status_map.get(pred_id) != 2  # 2-已完成
+            )
+            for pred_id in predecessor_ids:
+                self.stage_dependents.setdefault(pred_id, []).append(stage_id)
+
+        # 任务校验结果缓存（配置在依赖图生命周期内不变）
+        self._validation_cache: Dict[int, bool] = {}
+
+    @classmethod
+    async def load(cls, db: AsyncSession, project_id: int) -> 'ProjectGraph':
+        """
+        加载项目依赖图（固定4次查询）
+
+        :param db: orm对象
+        :param project_id: 项目ID
+        :return: 项目依赖图
+        """
+        proj_tasks = await TaskDao.get_tasks_by_project_id(db, project_id)
+        proj_stages = await TaskDao.get_stages_by_project_id(db, project_id)
+        todo_tasks = await TodoTaskDao.get_tasks_by_project_id(db, project_id)
+        todo_stages = await TodoStageDao.get_stages_by_project_id(db, project_id)
+        return cls(project_id, proj_tasks, proj_stages, todo_tasks, todo_stages)
+
+    @staticmethod
+    def _parse_id_list(value) -> list:
+        """
+        解析JSON格式的ID列表
+
+        :param value: JSON字符串或列表
+        :return: ID列表
+        """
+        if not value:
+            return []
+        try:
+            id_list = json.loads(value) if isinstance(value, str) else value
+        except (json.JSONDecodeError, TypeError):
+            return []
+        return id_list if isinstance(id_list, list) else []
+
+    def is_task_generated(self, task_id: int) -> bool:
+        """
+        判断任务是否已生成
+
+        :param task_id: 任务ID
+        :return: 是否已生成
+        """
+        return task_id in self.task_status_map
+
+    def is_stage_generated(self, stage_id: int) -> bool:
+        """
+        判断阶段是否已生成
+
+        :param stage_id: 阶段ID
+        :return: 是否已生成
+        """
+        return stage_id in self.stage_status_map
+
+    def is_task_valid(self, task_id: int) -> bool:
+        """
+        判断任务是否通过校验（信息完整、已分配阶段、时间关系正常）
+
+        :param task_id: 任务ID
+        :return: 是否通过校验
+        """
+        if task_id not in self._validation_cache:
+            validation_result = TaskValidator.evaluate_task_validation(self.proj_task_map[task_id], self.proj_task_map)
+            self._validation_cache[task_id] = validation_result['is_valid']
+        return self._validation_cache[task_id]
+
+    def check_stage_time_conflict(self, stage_id: int, task_id: int = None) -> Tuple[bool, Optional[str]]:
+        """
+        检查阶段时间是否会与已生成的前置/后置阶段产生冲突
+
+        :param stage_id: 阶段ID
+        :param task_id: 任务ID（可选，用于错误消息）
+        :return: (是否通过检查, 错误消息)
+        """
+        proj_stage = self.proj_stage_map.get(stage_id)
+        if not proj_stage or not self.is_stage_generated(stage_id):
+            return True, None
+        task_info = f'任务【{task_id}】' if task_id else '任务'
+
+        if proj_stage.start_time:
+            generated_predecessors = [
+                self.proj_stage_map[pred_id]
+                for pred_id in self.stage_predecessors.get(stage_id, [])
+                if self.is_stage_generated(pred_id)
+                and pred_id in self.proj_stage_map
+                and self.proj_stage_map[pred_id].end_time
+            ]
+            if generated_predecessors:
+                latest_pred = max(generated_predecessors, key=lambda x: x.end_time)
+                if proj_stage.start_time <= latest_pred.end_time:
+                    return False, (
+                        f'{task_info}所属阶段【{proj_stage.name}】的开始时间 {proj_stage.start_time} 不能早于或等于'
+                        f'已生成的前置阶段【{latest_pred.name}】(ID: {latest_pred.stage_id}) 的结束时间 {latest_pred.end_time}'
+                    )
+
+        if proj_stage.end_time:
+            generated_successors = [
+                self.proj_stage_map[succ_id]
+                for succ_id in self.stage_successors.get(stage_id, [])
+                if self.is_stage_generated(succ_id)
+                and succ_id in self.proj_stage_map
+                and self.proj_stage_map[succ_id].start_time
+            ]
+            if generated_successors:
+                earliest_succ = min(generated_successors, key=lambda x: x.start_time)
+                if proj_stage.end_time >= earliest_succ.start_time:
+                    return False, (
+                        f'{task_info}所属阶段【{proj_stage.name}】的结束时间 {proj_stage.end_time} 不能晚于或等于'
+                        f'已生成的后置阶段【{earliest_succ.name}】(ID: {earliest_succ.stage_id}) 的开始时间 {earliest_succ.start_time}'
+                    )
+
+        return True, None
+
+    def get_ready_stage_ids(self) -> List[int]:
+        """
+        获取可生成的阶段（未生成且所有前置阶段都已完成）
+
+        :return: 阶段ID列表
+        """
+        return [
+            stage_id
+            for stage_id in self.proj_stage_map
+            if not self.is_stage_generated(stage_id) and self.pending_stage_counts[stage_id] == 0
+        ]
+
+    def get_ready_task_ids(self) -> List[int]:
+        """
+        获取可生成的任务
+        条件：未生成、所属阶段已生成、通过校验、所属阶段无时间冲突、所有前置任务都已完成
+
+        :return: 任务ID列表
+        """
+        ready_task_ids = []
+        conflict_checked_stage_ids = {}
+        for task_id, proj_task in self.proj_task_map.items():
+            if self.is_task_generated(task_id) or self.pending_task_counts[task_id] != 0:
+                continue
+            # 未分配阶段的任务无法通过校验，不会生成
+            if proj_task.stage_id is None or not self.is_stage_generated(proj_task.stage_id):
+                continue
+            if not self.is_task_valid(task_id):
+                logger.debug(f'任务校验未通过，不满足生成条件: task_id={task_id}')
+                continue
+            if proj_task.stage_id not in conflict_checked_stage_ids:
+                conflict_passed, conflict_message = self.check_stage_time_conflict(proj_task.stage_id, task_id)
+                if not conflict_passed:
+                    logger.warning(f'任务生成失败，阶段时间冲突: {conflict_message}')
+                conflict_checked_stage_ids[proj_task.stage_id] = conflict_passed
+            if conflict_checked_stage_ids[proj_task.stage_id]:
+                ready_task_ids.append(task_id)
+        return ready_task_ids
+
+    def build_stage_data(self, stage_id: int, now: datetime) -> dict:
+        """
+        根据阶段配置构建阶段执行记录
+
+        :param stage_id: 阶段ID
+        :param now: 生成时间
+        :return: 阶段数据字典
+        """
+        predecessor_stages = self.stage_predecessors[stage_id]
+        successor_stages = self.stage_successors[stage_id]
+        return {
+            'stage_id': stage_id,
+            'project_id': self.proj_stage_map[stage_id].project_id,
+            'stage_status': 1,  # 进行中
+            'predecessor_stages': json.dumps(predecessor_stages) if predecessor_stages else None,
+            'successor_stages': json.dumps(successor_stages) if successor_stages else None,
+            'actual_start_time': now,
+            'create_time': now,
+            'update_time': now,
+        }
+
+    def build_task_data(self, task_id: int, now: datetime) -> dict:
+        """
+        根据任务配置构建任务执行记录
+
+        :param task_id: 任务ID
+        :param now: 生成时间
+        :return: 任务数据字典
+        """
+        proj_task = self.proj_task_map[task_id]
+        predecessor_tasks = self.task_predecessors[task_id]
+        successor_tasks = self._parse_id_list(proj_task.successor_tasks)
+        approval_nodes = self._parse_id_list(proj_task.approval_nodes)
+        return {
+            'task_id': proj_task.task_id,
+            'project_id': proj_task.project_id,
+            'stage_id': proj_task.stage_id,
+            'name': proj_task.name,
+            'description': proj_task.description,
+            'start_time': proj_task.start_time,
+            'end_time': proj_task.end_time,
+            'duration': proj_task.duration,
+            'job_number': proj_task.job_number,
+            'predecessor_tasks': json.dumps(predecessor_tasks) if predecessor_tasks else None,
+            'successor_tasks': json.dumps(successor_tasks) if successor_tasks else None,
+            'approval_nodes': json.dumps(approval_nodes) if approval_nodes else None,
+            'task_status': 1,  # 进行中
+            'is_skipped': 0,
+            'actual_start_time': now,
+        }
+
+    def mark_stage_generated(self, stage_id: int) -> None:
+        """
+        标记阶段已生成（状态为进行中）
+
+        :param stage_id: 阶段ID
+        """
+        self.stage_status_map[stage_id] = 1
+
+    def mark_task_generated(self, task_id: int) -> None:
+        """
+        标记任务已生成（状态为进行中）
+
+        :param task_id: 任务ID
+        """
+        self.task_status_map[task_id] = 1
+        stage_id = self.proj_task_map[task_id].stage_id
+        if stage_id is not None:
+            self.stage_task_ids.setdefault(stage_id, []).append(task_id)
+
+    def mark_task_completed(self, task_id: int) -> None:
+        """
+        标记任务已完成，并递减后置任务的未完成前置数量
+
+        :param task_id: 任务ID
+        """
+        if self.task_status_map.get(task_id) == 3:
+            return
+        self.task_status_map[task_id] = 3
+        for succ_id in self.task_successors.get(task_id, []):
+            self.pending_task_counts[succ_id] -= 1
+
+    def mark_stage_completed(self, stage_id: int) -> None:
+        """
+        标记阶段已完成，并递减后置阶段的未完成前置数量
+
+        :param stage_id: 阶段ID
+        """
+        if self.stage_status_map.get(stage_id) == 2:
+            return
+        self.stage_status_map[stage_id] = 2
+        for succ_id in self.stage_dependents.get(stage_id, []):
+            self.pending_stage_counts[succ_id] -= 1
+
+    def is_stage_completable(self, stage_id: int) -> bool:
+        """
+        判断阶段是否可以标记为完成（阶段已生成、未完成，且阶段内已生成的任务全部完成）
+
+        :param stage_id: 阶段ID
+        :return: 是否可以标记为完成
+        """
+        stage_status = self.stage_status_map.get(stage_id)
+        if stage_status is None or stage_status == 2:
+            return False
+        return all(self.task_status_map.get(task_id) == 3 for task_id in self.stage_task_ids.get(stage_id, []))
@@ -32,7 +32,14 @@ from module_apply.entity.do import ApplyPrimary, ApplyRules, ApplyLog  # 确保D
 from sub_applications.handle import handle_sub_applications
 from utils.common_util import worship
 from utils.log_util import logger
+from utils.pwd_util import PwdUtil
 from module_admin.utils.init_admin_user import init_admin_user
+from module_admin.service.org_index_service import OrgIndexService
+from module_admin.service.log_writer_service import LogWriterService
+from module_admin.service.server_service import ServerService
+from module_admin.service.menu_index_service import MenuIndexService
+from module_admin.service.dict_cache_service import DictCacheService
+from module_task.todo.service.workbench_counter_service import WorkbenchCounterService
 
 
 # 生命周期事件
@@ -48,12 +55,26 @@ async def lifespan(app: FastAPI):
         logger.warning(f"管理员账户初始化失败: {str(e)}")
     app.state.redis = await RedisUtil.create_redis_pool()
     await RedisUtil.init_sys_dict(app.state.redis)
+    await DictCacheService.init_dict_cache(app.state.redis)
     await RedisUtil.init_sys_config(app.state.redis)
+    await RedisUtil.init_online_session(app.state.redis)
+    await OrgIndexService.init_org_index()
+    await MenuIndexService.init_menu_index()
+    await WorkbenchCounterService.init_workbench_counter(app.state.redis)
+    # 定时任务日志经日志写入队列落库，需先于调度器启动
+    LogWriterService.start()
     await SchedulerUtil.init_system_scheduler()
+    await ServerService.start_sampler(app.state.redis)
     logger.info(f"🚀 {AppConfig.app_name}启动成功")
     yield
-    await RedisUtil.close_redis_pool(app)
+    await ServerService.stop_sampler()
+    # 先关闭定时任务（等待执行中的任务结束），其任务日志及依赖的缓存、Redis连接此时仍可用
     await SchedulerUtil.close_system_scheduler()
+    await LogWriterService.stop()
+    await DictCacheService.close_dict_cache()
+    await WorkbenchCounterService.close_workbench_counter()
+    await RedisUtil.close_redis_pool(app)
+    PwdUtil.shutdown()
 
 
 # 初始化FastAPI对象
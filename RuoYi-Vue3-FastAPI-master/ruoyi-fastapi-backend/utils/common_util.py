@@ -2,14 +2,16 @@ import io
 import os
 import pandas as pd
 import re
+from functools import lru_cache
 from openpyxl import Workbook
 from openpyxl.styles import Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.engine.row import Row
 from sqlalchemy.orm.collections import InstrumentedList
 from sqlalchemy.sql.expression import TextClause, null
-from typing import Any, Dict, List, Literal, Union
+from typing import Any, Callable, Dict, List, Literal, Tuple, Union
 from config.database import Base
 from config.env import CachePathConfig
 
@@ -44,8 +46,84 @@ def worship():
 class SqlalchemyUtil:
     """
     sqlalchemy工具类
+
+    每个模型类首次序列化时根据映射信息编译专用的序列化函数（预先计算字段名转换结果）并缓存，
+    查询结果行按字段名元组缓存转换后的字段名，后续序列化不再逐行逐字段转换字段名。
     """
 
+    # 模型序列化函数缓存 {(模型类, 转换形式): 序列化函数}
+    _model_serializers: Dict[Tuple[type, str], Callable[[Base], Dict]] = {}
+
+    # 查询结果行字段名缓存 {(字段名元组, 转换形式): 转换后的字段名元组}
+    _row_keys: Dict[Tuple[Tuple[str, ...], str], Tuple[str, ...]] = {}
+
+    @classmethod
+    def get_key_converter(
+        cls, transform_case: Literal['no_case', 'snake_to_camel', 'camel_to_snake'] = 'no_case'
+    ) -> Callable[[str], str]:
+        """
+        获取字段名转换函数
+
+        :param transform_case: 转换得到的结果形式
+        :return: 字段名转换函数
+        """
+        if transform_case == 'snake_to_camel':
+            return CamelCaseUtil.snake_to_camel
+        elif transform_case == 'camel_to_snake':
+            return SnakeCaseUtil.camel_to_snake
+        return str
+
+    @classmethod
+    def get_model_serializer(
+        cls, model: type, transform_case: Literal['no_case', 'snake_to_camel', 'camel_to_snake'] = 'no_case'
+    ) -> Callable[[Base], Dict]:
+        """
+        获取模型类的序列化函数（首次获取时编译并缓存）
+
+        :param model: sqlalchemy模型类
+        :param transform_case: 转换得到的结果形式
+        :return: 序列化函数
+        """
+        serializer = cls._model_serializers.get((model, transform_case))
+        if serializer is None:
+            mapper = sa_inspect(model)
+            key_converter = cls.get_key_converter(transform_case)
+            key_map = {attr.key: key_converter(attr.key) for attr in mapper.attrs}
+            relationship_keys = frozenset(relationship.key for relationship in mapper.relationships)
+
+            def serializer(obj: Base) -> Dict:
+                # 只读取已加载的属性（与__dict__一致），避免触发延迟加载
+                result = {}
+                for name, value in obj.__dict__.items():
+                    if name == '_sa_instance_state':
+                        continue
+                    if name in relationship_keys and isinstance(value, InstrumentedList):
+                        value = cls.serialize_result(value, 'snake_to_camel')
+                    key = key_map.get(name)
+                    result[key if key is not None else key_converter(name)] = value
+                return result
+
+            cls._model_serializers[(model, transform_case)] = serializer
+        return serializer
+
+    @classmethod
+    def get_row_keys(
+        cls, fields: Tuple[str, ...], transform_case: Literal['no_case', 'snake_to_camel', 'camel_to_snake'] = 'no_case'
+    ) -> Tuple[str, ...]:
+        """
+        获取查询结果行转换后的字段名（按字段名元组缓存）
+
+        :param fields: 查询结果行的字段名元组
+        :param transform_case: 转换得到的结果形式
+        :return: 转换后的字段名元组
+        """
+        keys = cls._row_keys.get((fields, transform_case))
+        if keys is None:
+            key_converter = cls.get_key_converter(transform_case)
+            keys = tuple(key_converter(field) for field in fields)
+            cls._row_keys[(fields, transform_case)] = keys
+        return keys
+
     @classmethod
     def base_to_dict(
         cls, obj: Union[Base, Dict], transform_case: Literal['no_case', 'snake_to_camel', 'camel_to_snake'] = 'no_case'
@@ -58,23 +136,17 @@ class SqlalchemyUtil:
         :return: 字典结果
         """
         if isinstance(obj, Base):
-            base_dict = obj.__dict__.copy()
-            base_dict.pop('_sa_instance_state', None)
-            for name, value in base_dict.items():
-                if isinstance(value, InstrumentedList):
-                    base_dict[name] = cls.serialize_result(value, 'snake_to_camel')
+            return cls.get_model_serializer(type(obj), transform_case)(obj)
         elif isinstance(obj, dict):
-            base_dict = obj.copy()
+            base_dict = obj
         else:
             # 处理普通对象（有 __dict__ 属性的对象）
-            base_dict = obj.__dict__.copy() if hasattr(obj, '__dict__') else {}
-        
-        if transform_case == 'snake_to_camel':
-            return {CamelCaseUtil.snake_to_camel(k): v for k, v in base_dict.items()}
-        elif transform_case == 'camel_to_snake':
-            return {SnakeCaseUtil.camel_to_snake(k): v for k, v in base_dict.items()}
+            base_dict = obj.__dict__ if hasattr(obj, '__dict__') else {}
 
-        return base_dict
+        if transform_case == 'no_case':
+            return base_dict.copy()
+        key_converter = cls.get_key_converter(transform_case)
+        return {key_converter(k): v for k, v in base_dict.items()}
 
     @classmethod
     def serialize_result(
@@ -87,23 +159,23 @@ class SqlalchemyUtil:
         :param transform_case: 转换得到的结果形式，可选的有'no_case'(不转换)、'snake_to_camel'(下划线转小驼峰)、'camel_to_snake'(小驼峰转下划线)，默认为'no_case'
         :return: 序列化结果
         """
-        # 处理 Base 对象、字典或普通对象（有 __dict__ 属性的对象）
-        if isinstance(result, (Base, dict)) or (hasattr(result, '__dict__') and not isinstance(result, (list, Row))):
-            return cls.base_to_dict(result, transform_case)
-        elif isinstance(result, list):
+        # 已编译序列化函数的模型对象直接序列化
+        serializer = cls._model_serializers.get((type(result), transform_case))
+        if serializer is not None:
+            return serializer(result)
+        if isinstance(result, list):
             return [cls.serialize_result(row, transform_case) for row in result]
         elif isinstance(result, Row):
-            if all([isinstance(row, Base) for row in result]):
+            base_flags = [isinstance(row, Base) for row in result]
+            if all(base_flags):
                 return [cls.base_to_dict(row, transform_case) for row in result]
-            elif any([isinstance(row, Base) for row in result]):
+            elif any(base_flags):
                 return [cls.serialize_result(row, transform_case) for row in result]
             else:
-                result_dict = result._asdict()
-                if transform_case == 'snake_to_camel':
-                    return {CamelCaseUtil.snake_to_camel(k): v for k, v in result_dict.items()}
-                elif transform_case == 'camel_to_snake':
-                    return {SnakeCaseUtil.camel_to_snake(k): v for k, v in result_dict.items()}
-                return result_dict
+                return dict(zip(cls.get_row_keys(result._fields, transform_case), result))
+        # 处理 Base 对象、字典或普通对象（有 __dict__ 属性的对象）
+        elif isinstance(result, (Base, dict)) or hasattr(result, '__dict__'):
+            return cls.base_to_dict(result, transform_case)
         return result
 
     @classmethod
@@ -126,9 +198,10 @@ class CamelCaseUtil:
     """
 
     @classmethod
+    @lru_cache(maxsize=4096)
     def snake_to_camel(cls, snake_str: str):
         """
-        下划线形式字符串(snake_case)转换为小驼峰形式字符串(camelCase)
+        下划线形式字符串(snake_case)转换为小驼峰形式字符串(camelCase)（结果已缓存）
 
         :param snake_str: 下划线形式字符串
         :return: 小驼峰形式字符串
@@ -155,9 +228,10 @@ class SnakeCaseUtil:
     """
 
     @classmethod
+    @lru_cache(maxsize=4096)
     def camel_to_snake(cls, camel_str: str):
         """
-        小驼峰形式字符串(camelCase)转换为下划线形式字符串(snake_case)
+        小驼峰形式字符串(camelCase)转换为下划线形式字符串(snake_case)（结果已缓存）
 
         :param camel_str: 小驼峰形式字符串
         :return: 下划线形式字符串
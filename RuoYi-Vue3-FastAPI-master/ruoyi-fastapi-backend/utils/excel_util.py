@@ -1,10 +1,15 @@
+import asyncio
 import io
 import pandas as pd
+import tempfile
+from datetime import date, datetime, time
+from decimal import Decimal
 from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 from openpyxl.styles import Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
-from typing import Dict, List
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 
 
 class ExcelUtil:
@@ -12,6 +17,12 @@ class ExcelUtil:
     Excel操作类
     """
 
+    # 流式导出时内存中缓存的Excel文件大小上限（字节），超过后转存临时文件
+    STREAM_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+    # 流式导出时每次返回的数据块大小（字节）
+    STREAM_CHUNK_SIZE = 64 * 1024
+
     @classmethod
     def __mapping_list(cls, list_data: List, mapping_dict: Dict):
         """
@@ -42,6 +53,69 @@ class ExcelUtil:
 
         return binary_data
 
+    @classmethod
+    async def stream_list2excel(
+        cls,
+        row_batches: AsyncIterator[List[Dict]],
+        mapping_dict: Dict,
+        row_formatter: Optional[Callable[[Dict], Any]] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        工具方法：分批写入数据并流式输出excel的二进制数据
+        使用openpyxl只写模式逐行写入（工作表内容写入临时文件），生成的excel文件超过内存上限后转存临时文件，
+        内存占用与导出行数无关；写入与保存在线程中执行，不阻塞事件循环
+
+        :param row_batches: 分批返回数据列表的异步迭代器
+        :param mapping_dict: 映射字典
+        :param row_formatter: 可选，写入前对每行数据进行格式化（原地修改）
+        :return: excel二进制数据块的异步生成器
+        """
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet()
+        worksheet.append(list(mapping_dict.values()))
+        async for batch in row_batches:
+            await asyncio.to_thread(cls.__append_rows, worksheet, batch, mapping_dict, row_formatter)
+        with tempfile.SpooledTemporaryFile(max_size=cls.STREAM_SPOOL_MAX_SIZE) as file:
+            await asyncio.to_thread(workbook.save, file)
+            file.seek(0)
+            while True:
+                chunk = await asyncio.to_thread(file.read, cls.STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    @classmethod
+    def __append_rows(
+        cls, worksheet, batch: List[Dict], mapping_dict: Dict, row_formatter: Optional[Callable[[Dict], Any]]
+    ):
+        """
+        工具方法：将一批数据按映射字典的字段顺序写入工作表
+
+        :param worksheet: 只写模式的工作表对象
+        :param batch: 数据列表
+        :param mapping_dict: 映射字典
+        :param row_formatter: 写入前对每行数据进行格式化
+        :return:
+        """
+        for item in batch:
+            if row_formatter:
+                row_formatter(item)
+            worksheet.append([cls.__to_cell_value(item.get(key)) for key in mapping_dict])
+
+    @staticmethod
+    def __to_cell_value(value: Any):
+        """
+        工具方法：将数据转换为单元格可写入的值（字符串中去除excel不支持的控制字符，其他类型转换为字符串）
+
+        :param value: 原始值
+        :return: 单元格值
+        """
+        if value is None or isinstance(value, (bool, int, float, Decimal, datetime, date, time)):
+            return value
+        if not isinstance(value, str):
+            value = str(value)
+        return ILLEGAL_CHARACTERS_RE.sub('', value)
+
     @classmethod
     def get_excel_template(cls, header_list: List, selector_header_list: List, option_list: List[Dict]):
         """
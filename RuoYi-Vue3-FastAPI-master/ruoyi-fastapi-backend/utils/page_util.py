@@ -1,9 +1,18 @@
+import base64
+import json
 import math
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
 from pydantic import BaseModel, ConfigDict
 from pydantic.alias_generators import to_camel
-from sqlalchemy import func, select, Select
+from sqlalchemy import and_, case, false, func, or_, select, Select
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List
+from sqlalchemy.sql.elements import ColumnElement
+from typing import Any, AsyncIterator, List, Optional, Sequence, Tuple
+from config.database import AsyncSessionLocal, Base
+from exceptions.exception import ServiceException
 from utils.common_util import CamelCaseUtil
 
 
@@ -17,15 +26,34 @@ class PageResponseModel(BaseModel):
     rows: List = []
     page_num: Optional[int] = None
     page_size: Optional[int] = None
-    total: int
+    total: Optional[int] = None
     has_next: Optional[bool] = None
+    next_cursor: Optional[str] = None
+    total_cached: Optional[bool] = None
 
 
 class PageUtil:
     """
     分页工具类
+
+    默认使用 count(*) + OFFSET 分页；传入游标（cursor）与游标排序键（cursor_keys）时切换为游标分页，
+    以上一页最后一行的排序键值作为查询条件直接定位，不查询总数，深分页不再随页码线性变慢。
+    游标排序键为 (排序字段, 是否降序) 列表，最后一个排序键必须唯一（通常为主键）；
+    可为NULL的排序字段需通过nullable_cursor_keys生成，先按是否为NULL分组，否则游标无法越过NULL值所在的行。
+    导出等全量读取场景使用流式读取（is_stream），通过服务端游标分批返回，内存占用与结果行数无关。
     """
 
+    # 流式读取每批的行数
+    STREAM_BATCH_SIZE = 1000
+
+    # 游标分页的总数缓存时间（秒）
+    COUNT_CACHE_SECONDS = 60
+
+    # 游标分页的总数缓存数量上限
+    COUNT_CACHE_MAX_SIZE = 256
+
+    _count_cache: 'OrderedDict[str, Tuple[float, int]]' = OrderedDict()
+
     @classmethod
     def get_page_obj(cls, data_list: List, page_num: int, page_size: int):
         """
@@ -51,7 +79,18 @@ class PageUtil:
         return result
 
     @classmethod
-    async def paginate(cls, db: AsyncSession, query: Select, page_num: int, page_size: int, is_page: bool = False):
+    async def paginate(
+        cls,
+        db: AsyncSession,
+        query: Select,
+        page_num: int,
+        page_size: int,
+        is_page: bool = False,
+        cursor: Optional[str] = None,
+        cursor_keys: Optional[Sequence[Tuple[ColumnElement, bool]]] = None,
+        with_total: bool = False,
+        is_stream: bool = False,
+    ):
         """
         输入查询语句和分页信息，返回分页数据列表结果
 
@@ -60,9 +99,26 @@ class PageUtil:
         :param page_num: 当前页码
         :param page_size: 当前页面数据量
         :param is_page: 是否开启分页
+        :param cursor: 游标（不为None时使用游标分页，空字符串表示第一页）
+        :param cursor_keys: 游标排序键列表 [(排序字段, 是否降序)]
+        :param with_total: 游标分页时是否返回总数（按查询条件缓存的总数）
+        :param is_stream: 是否流式读取全量数据（返回分批读取的异步生成器，忽略分页参数）
         :return: 分页数据对象
         """
-        if is_page:
+        if is_stream:
+            return cls.stream(query)
+        if is_page and cursor is not None and cursor_keys:
+            paginated_data, next_cursor = await cls.seek(db, query, page_size, cursor, cursor_keys)
+            total, total_cached = await cls._get_cached_total(db, query) if with_total else (None, None)
+            result = PageResponseModel(
+                rows=CamelCaseUtil.transform_result(paginated_data),
+                pageSize=page_size,
+                total=total,
+                hasNext=next_cursor is not None,
+                nextCursor=next_cursor,
+                totalCached=total_cached,
+            )
+        elif is_page:
             total = (await db.execute(select(func.count('*')).select_from(query.subquery()))).scalar()
             query_result = await db.execute(query.offset((page_num - 1) * page_size).limit(page_size))
             paginated_data = []
@@ -91,6 +147,193 @@ class PageUtil:
 
         return result
 
+    @classmethod
+    async def stream(cls, query: Select, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[List]:
+        """
+        使用独立会话与服务端游标分批读取查询结果（迭代时才执行查询，可在响应流式返回期间使用）
+
+        :param query: sqlalchemy查询语句
+        :param batch_size: 每批的行数
+        :return: 每批数据列表（与不分页查询的返回格式一致）的异步生成器
+        """
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(query.execution_options(yield_per=batch_size))
+            async for partition in result.partitions():
+                batch_data = []
+                for row in partition:
+                    if row and len(row) == 1:
+                        batch_data.append(row[0])
+                    else:
+                        batch_data.append(row)
+                yield CamelCaseUtil.transform_result(batch_data)
+                # 已转换的ORM对象不再需要，释放会话持有的引用
+                session.expunge_all()
+
+    @classmethod
+    async def seek(
+        cls,
+        db: AsyncSession,
+        query: Select,
+        page_size: int,
+        cursor: Optional[str],
+        cursor_keys: Sequence[Tuple[ColumnElement, bool]],
+    ) -> Tuple[List, Optional[str]]:
+        """
+        游标分页查询一页数据
+
+        :param db: orm对象
+        :param query: sqlalchemy查询语句（原有排序会被游标排序键替换）
+        :param page_size: 当前页面数据量
+        :param cursor: 游标（空字符串或None表示第一页）
+        :param cursor_keys: 游标排序键列表 [(排序字段, 是否降序)]
+        :return: (当前页数据列表, 下一页游标，没有下一页时为None)
+        """
+        key_count = len(cursor_keys)
+        seek_query = (
+            query.add_columns(*[key.label(f'cursor_key_{index}') for index, (key, _) in enumerate(cursor_keys)])
+            .order_by(None)
+            .order_by(*[key.desc() if descending else key.asc() for key, descending in cursor_keys])
+        )
+        if cursor:
+            seek_query = seek_query.where(cls.build_seek_condition(cursor_keys, cls.decode_cursor(cursor, key_count)))
+        query_result = (await db.execute(seek_query.limit(page_size + 1))).all()
+
+        paginated_data = []
+        for row in query_result[:page_size]:
+            data = row[:-key_count]
+            if len(data) == 1:
+                paginated_data.append(data[0])
+            elif any(isinstance(item, Base) for item in data):
+                # 多实体行与原有Row的序列化结果一致（按实体逐个转换）
+                paginated_data.append(list(data))
+            else:
+                paginated_data.append(dict(zip(row._fields[:-key_count], data)))
+        next_cursor = None
+        if len(query_result) > page_size:
+            next_cursor = cls.encode_cursor(list(query_result[page_size - 1][-key_count:]))
+
+        return paginated_data, next_cursor
+
+    @classmethod
+    async def get_cached_total(cls, db: AsyncSession, query: Select) -> int:
+        """
+        获取查询语句的总数（相同查询条件的总数缓存一段时间，可能略有滞后）
+
+        :param db: orm对象
+        :param query: sqlalchemy查询语句
+        :return: 总数
+        """
+        total, _ = await cls._get_cached_total(db, query)
+        return total
+
+    @classmethod
+    async def _get_cached_total(cls, db: AsyncSession, query: Select) -> Tuple[int, bool]:
+        """
+        获取查询语句的总数及是否命中缓存
+
+        :param db: orm对象
+        :param query: sqlalchemy查询语句
+        :return: (总数, 是否命中缓存)
+        """
+        compiled = query.compile()
+        cache_key = f'{compiled}|{sorted(compiled.params.items(), key=lambda item: item[0])!r}'
+        now = time.monotonic()
+        cached = cls._count_cache.get(cache_key)
+        if cached is not None and cached[0] > now:
+            cls._count_cache.move_to_end(cache_key)
+            return cached[1], True
+        total = (await db.execute(select(func.count('*')).select_from(query.order_by(None).subquery()))).scalar()
+        cls._count_cache[cache_key] = (now + cls.COUNT_CACHE_SECONDS, total)
+        cls._count_cache.move_to_end(cache_key)
+        while len(cls._count_cache) > cls.COUNT_CACHE_MAX_SIZE:
+            cls._count_cache.popitem(last=False)
+        return total, False
+
+    @staticmethod
+    def nullable_cursor_keys(key: ColumnElement, descending: bool) -> List[Tuple[ColumnElement, bool]]:
+        """
+        生成可为NULL的排序字段的游标排序键：先按是否为NULL排序，再按字段值排序
+        （与MySQL默认一致：升序时NULL在前，降序时NULL在后）
+
+        :param key: 排序字段
+        :param descending: 是否降序
+        :return: 游标排序键列表 [(排序字段, 是否降序)]
+        """
+        is_null = case((key.is_(None), 1), else_=0)
+        return [(is_null, not descending), (key, descending)]
+
+    @staticmethod
+    def build_seek_condition(cursor_keys: Sequence[Tuple[ColumnElement, bool]], values: Sequence[Any]) -> ColumnElement:
+        """
+        构建游标定位条件：(k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...（降序排序键使用小于）
+
+        :param cursor_keys: 游标排序键列表 [(排序字段, 是否降序)]
+        :param values: 上一页最后一行的排序键值
+        :return: 查询条件
+        """
+        clauses = []
+        for index, ((key, descending), value) in enumerate(zip(cursor_keys, values)):
+            # 排序键值为NULL时，该键上不存在严格位于其后的行（NULL值只能通过前面的排序键分组）
+            if value is None:
+                beyond = false()
+            else:
+                beyond = key < value if descending else key > value
+            equals = [
+                prev_key.is_(None) if prev_value is None else prev_key == prev_value
+                for (prev_key, _), prev_value in zip(cursor_keys[:index], values[:index])
+            ]
+            clauses.append(and_(*equals, beyond) if equals else beyond)
+        return or_(*clauses)
+
+    @staticmethod
+    def encode_cursor(values: List[Any]) -> str:
+        """
+        将排序键值编码为不透明的游标字符串
+
+        :param values: 排序键值列表
+        :return: 游标
+        """
+        encoded_values = []
+        for value in values:
+            if isinstance(value, datetime):
+                encoded_values.append({'dt': value.isoformat()})
+            elif isinstance(value, date):
+                encoded_values.append({'d': value.isoformat()})
+            elif isinstance(value, Decimal):
+                encoded_values.append({'dec': str(value)})
+            else:
+                encoded_values.append(value)
+        payload = json.dumps(encoded_values, ensure_ascii=False, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str, key_count: int) -> List[Any]:
+        """
+        解析游标字符串
+
+        :param cursor: 游标
+        :param key_count: 排序键数量
+        :return: 排序键值列表
+        """
+        try:
+            payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+            encoded_values = json.loads(payload)
+            if not isinstance(encoded_values, list) or len(encoded_values) != key_count:
+                raise ValueError('cursor length mismatch')
+            values = []
+            for value in encoded_values:
+                if isinstance(value, dict) and 'dt' in value:
+                    values.append(datetime.fromisoformat(value['dt']))
+                elif isinstance(value, dict) and 'd' in value:
+                    values.append(date.fromisoformat(value['d']))
+                elif isinstance(value, dict) and 'dec' in value:
+                    values.append(Decimal(value['dec']))
+                else:
+                    values.append(value)
+            return values
+        except (ValueError, TypeError, UnicodeDecodeError):
+            raise ServiceException(message='分页游标无效，请从第一页重新查询')
+
 
 def get_page_obj(data_list: List, page_num: int, page_size: int):
     """
@@ -1,11 +1,39 @@
+import asyncio
 import bcrypt
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, TypeVar
+from config.env import AppConfig
+from exceptions.exception import ServiceException
+
+
+T = TypeVar('T')
 
 
 class PwdUtil:
     """
     密码工具类
+
+    bcrypt单次计算耗时约100~300毫秒，异步代码中应使用verify_password_async、get_password_hash_async，
+    在专用的有界线程池中计算（bcrypt计算期间释放GIL，线程池即可并行），不阻塞事件循环；
+    排队中的计算超过上限时直接拒绝，避免登录高峰时请求无限堆积。
     """
 
+    # 计算统计 {submitted: 提交数, completed: 成功数, failed: 失败及取消数, rejected: 拒绝数,
+    #          pending: 排队及计算中的数量（以线程池中的实际执行为准）, max_pending: 峰值}
+    stats: Dict[str, int] = {
+        'submitted': 0,
+        'completed': 0,
+        'failed': 0,
+        'rejected': 0,
+        'pending': 0,
+        'max_pending': 0,
+    }
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+    _stats_lock = threading.Lock()
+
     @classmethod
     def verify_password(cls, plain_password: str, hashed_password: str) -> bool:
         """
@@ -27,4 +55,98 @@ class PwdUtil:
         :param input_password: 输入的密码
         :return: 加密成功的密码
         """
-        return bcrypt.hashpw(input_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        return bcrypt.hashpw(
+            input_password.encode('utf-8'), bcrypt.gensalt(rounds=AppConfig.app_pwd_hash_rounds)
+        ).decode('utf-8')
+
+    @classmethod
+    async def verify_password_async(cls, plain_password: str, hashed_password: str) -> bool:
+        """
+        工具方法：在密码计算线程池中校验当前输入的密码与数据库存储的密码是否一致
+
+        :param plain_password: 当前输入的密码
+        :param hashed_password: 数据库存储的密码
+        :return: 校验结果
+        """
+        if not hashed_password:
+            return False
+        return await cls._run_in_executor(cls.verify_password, plain_password, hashed_password)
+
+    @classmethod
+    async def get_password_hash_async(cls, input_password: str) -> str:
+        """
+        工具方法：在密码计算线程池中对当前输入的密码进行加密
+
+        :param input_password: 输入的密码
+        :return: 加密成功的密码
+        """
+        return await cls._run_in_executor(cls.get_password_hash, input_password)
+
+    @classmethod
+    def shutdown(cls):
+        """
+        应用关闭时关闭密码计算线程池
+
+        :return:
+        """
+        with cls._executor_lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        """
+        获取密码计算线程池（首次使用时创建）
+
+        :return: 线程池
+        """
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=AppConfig.app_pwd_hash_workers, thread_name_prefix='pwd-hash'
+                    )
+        return cls._executor
+
+    @classmethod
+    async def _run_in_executor(cls, func: Callable[..., T], *args) -> T:
+        """
+        在密码计算线程池中执行，排队数量超过上限时拒绝
+
+        排队数量在线程池任务结束时才减少，等待方被取消时仍在计算的任务继续计入排队数量
+
+        :param func: 待执行的函数
+        :param args: 函数参数
+        :return: 函数返回值
+        """
+        with cls._stats_lock:
+            if cls.stats['pending'] >= AppConfig.app_pwd_hash_max_pending:
+                cls.stats['rejected'] += 1
+                raise ServiceException(message='系统繁忙，请稍后重试')
+            cls.stats['submitted'] += 1
+            cls.stats['pending'] += 1
+            cls.stats['max_pending'] = max(cls.stats['max_pending'], cls.stats['pending'])
+        try:
+            future = cls._get_executor().submit(func, *args)
+        except RuntimeError:
+            # 线程池已关闭
+            cls._on_done(None)
+            raise
+        future.add_done_callback(cls._on_done)
+        return await asyncio.wrap_future(future)
+
+    @classmethod
+    def _on_done(cls, future: Optional[Future]):
+        """
+        线程池任务结束时更新计算统计（在线程池线程中调用）
+
+        :param future: 任务结果（提交失败时为None）
+        :return:
+        """
+        with cls._stats_lock:
+            cls.stats['pending'] -= 1
+            if future is None or future.cancelled() or future.exception() is not None:
+                cls.stats['failed'] += 1
+            else:
+                cls.stats['completed'] += 1
@@ -0,0 +1,82 @@
+from redis import asyncio as aioredis
+from typing import List, Optional, Sequence
+
+
+class RedisKeyUtil:
+    """
+    Redis键批量操作工具类
+
+    需要按模式枚举键时使用SCAN分批遍历（不使用会阻塞Redis的KEYS），读取与删除按批次使用MGET与流水线UNLINK，
+    每批一次往返，删除在Redis后台线程释放内存。
+    """
+
+    # SCAN每次遍历的建议数量
+    SCAN_COUNT = 1000
+
+    # MGET、UNLINK每批处理的键数量
+    BATCH_SIZE = 500
+
+    @classmethod
+    async def scan_keys(cls, redis: aioredis.Redis, pattern: str) -> List[str]:
+        """
+        使用SCAN获取匹配模式的所有键（SCAN可能返回重复键，此处已去重）
+
+        :param redis: Redis连接对象
+        :param pattern: 键匹配模式
+        :return: 键列表
+        """
+        keys = {}
+        async for key in redis.scan_iter(match=pattern, count=cls.SCAN_COUNT):
+            keys[key] = None
+        return list(keys)
+
+    @classmethod
+    async def mget_values(cls, redis: aioredis.Redis, keys: Sequence[str]) -> List[Optional[str]]:
+        """
+        分批MGET获取键值，返回值与键列表一一对应（键不存在时为None）
+
+        :param redis: Redis连接对象
+        :param keys: 键列表
+        :return: 值列表
+        """
+        values = []
+        for start in range(0, len(keys), cls.BATCH_SIZE):
+            values.extend(await redis.mget(keys[start : start + cls.BATCH_SIZE]))
+        return values
+
+    @classmethod
+    async def unlink_keys(cls, redis: aioredis.Redis, keys: Sequence[str]) -> int:
+        """
+        分批使用流水线UNLINK删除键
+
+        :param redis: Redis连接对象
+        :param keys: 键列表
+        :return: 删除的键数量
+        """
+        if not keys:
+            return 0
+        async with redis.pipeline(transaction=False) as pipe:
+            for start in range(0, len(keys), cls.BATCH_SIZE):
+                pipe.unlink(*keys[start : start + cls.BATCH_SIZE])
+            results = await pipe.execute()
+        return sum(results)
+
+    @classmethod
+    async def unlink_by_pattern(cls, redis: aioredis.Redis, pattern: str) -> int:
+        """
+        边SCAN边分批UNLINK删除匹配模式的键
+
+        :param redis: Redis连接对象
+        :param pattern: 键匹配模式
+        :return: 删除的键数量
+        """
+        deleted = 0
+        batch = []
+        async for key in redis.scan_iter(match=pattern, count=cls.SCAN_COUNT):
+            batch.append(key)
+            if len(batch) >= cls.BATCH_SIZE:
+                deleted += await redis.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += await redis.unlink(*batch)
+        return deleted
@@ -1,13 +1,41 @@
+import orjson
 from datetime import datetime
+from decimal import Decimal
 from fastapi import status
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.encoders import decimal_encoder, jsonable_encoder
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from starlette.background import BackgroundTask
 from typing import Any, Dict, Mapping, Optional
 from config.constant import HttpStatusConstant
 
 
+class OrjsonResponse(ORJSONResponse):
+    """
+    使用orjson直接序列化响应内容的JSON响应（不再经过jsonable_encoder逐层转换）
+    datetime、date、UUID、枚举等由orjson原生序列化，其余orjson不支持的类型按jsonable_encoder的规则转换
+    """
+
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=self.default, option=self.OPTIONS)
+
+    @staticmethod
+    def default(obj: Any) -> Any:
+        """
+        orjson不支持的类型的转换方法
+
+        :param obj: 待转换的对象
+        :return: orjson支持的对象
+        """
+        if isinstance(obj, Decimal):
+            return decimal_encoder(obj)
+        if isinstance(obj, BaseModel):
+            return obj.model_dump(by_alias=True)
+        return jsonable_encoder(obj)
+
+
 class ResponseUtil:
     """
     响应工具类
@@ -51,9 +79,9 @@ class ResponseUtil:
 
         result.update({'success': True, 'time': datetime.now()})
 
-        return JSONResponse(
+        return OrjsonResponse(
             status_code=status.HTTP_200_OK,
-            content=jsonable_encoder(result),
+            content=result,
             headers=headers,
             media_type=media_type,
             background=background,
@@ -97,9 +125,9 @@ class ResponseUtil:
 
         result.update({'success': False, 'time': datetime.now()})
 
-        return JSONResponse(
+        return OrjsonResponse(
             status_code=status.HTTP_200_OK,
-            content=jsonable_encoder(result),
+            content=result,
             headers=headers,
             media_type=media_type,
             background=background,
@@ -143,9 +171,9 @@ class ResponseUtil:
 
         result.update({'success': False, 'time': datetime.now()})
 
-        return JSONResponse(
+        return OrjsonResponse(
             status_code=status.HTTP_200_OK,
-            content=jsonable_encoder(result),
+            content=result,
             headers=headers,
             media_type=media_type,
             background=background,
@@ -189,9 +217,9 @@ class ResponseUtil:
 
         result.update({'success': False, 'time': datetime.now()})
 
-        return JSONResponse(
+        return OrjsonResponse(
             status_code=status.HTTP_200_OK,
-            content=jsonable_encoder(result),
+            content=result,
             headers=headers,
             media_type=media_type,
             background=background,
@@ -235,9 +263,9 @@ class ResponseUtil:
 
         result.update({'success': False, 'time': datetime.now()})
 
-        return JSONResponse(
+        return OrjsonResponse(
             status_code=status.HTTP_200_OK,
-            content=jsonable_encoder(result),
+            content=result,
             headers=headers,
             media_type=media_type,
             background=background,
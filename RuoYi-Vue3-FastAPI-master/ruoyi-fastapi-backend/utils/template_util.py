@@ -1,8 +1,9 @@
 import json
 import os
+import threading
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader
-from typing import Dict, List, Set
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from typing import Dict, List, Optional, Set
 from config.constant import GenConstant
 from config.env import DataBaseConfig
 from exceptions.exception import ServiceWarning
@@ -14,10 +15,34 @@ from utils.string_util import StringUtil
 class TemplateInitializer:
     """
     模板引擎初始化类
+
+    Jinja2环境在进程内只创建一次并复用：已编译的模板保存在环境的模板缓存中，访问时按模板文件修改时间检查，
+    文件变更后自动重新编译；编译结果同时写入字节码缓存，进程重启后无需重新解析模板。
     """
 
+    # 模板缓存数量上限
+    TEMPLATE_CACHE_SIZE = 400
+
+    _env: Optional[Environment] = None
+    _lock = threading.Lock()
+
     @classmethod
     def init_jinja2(cls):
+        """
+        获取 Jinja2 模板引擎（首次调用时初始化）
+
+        :return: Jinja2 环境对象
+        """
+        env = cls._env
+        if env is not None:
+            return env
+        with cls._lock:
+            if cls._env is None:
+                cls._env = cls._create_jinja2()
+            return cls._env
+
+    @classmethod
+    def _create_jinja2(cls):
         """
         初始化 Jinja2 模板引擎
 
@@ -30,6 +55,9 @@ class TemplateInitializer:
                 keep_trailing_newline=True,
                 trim_blocks=True,
                 lstrip_blocks=True,
+                auto_reload=True,
+                cache_size=cls.TEMPLATE_CACHE_SIZE,
+                bytecode_cache=FileSystemBytecodeCache(),
             )
             env.filters.update(
                 {